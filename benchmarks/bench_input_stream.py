@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Compare FileStream and MmapCharStream on large synthetic grammars.
+
+Each measurement runs in a fresh subprocess so that the peak RSS reported by
+``getrusage`` belongs to a single stream implementation.
+
+    python benchmarks/bench_input_stream.py --sizes 1 10 50
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import write_synthetic_grammar
+
+STREAMS = ["FileStream", "MmapCharStream"]
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_worker(stream_name: str, path: str) -> None:
+    """Lex ``path`` with the given stream and print measurements as JSON."""
+    from antlr4 import FileStream, Token
+
+    from antlr_v4_linter.core.streams import MmapCharStream
+    from antlr_v4_linter.grammars.ANTLRv4Lexer import ANTLRv4Lexer
+
+    baseline = _peak_rss_mb()
+    start = time.perf_counter()
+    if stream_name == "FileStream":
+        stream = FileStream(path, encoding="utf-8")
+    else:
+        stream = MmapCharStream(path)
+    lexer = ANTLRv4Lexer(stream)
+    tokens = 0
+    while lexer.nextToken().type != Token.EOF:
+        tokens += 1
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        "tokens": tokens,
+        "seconds": elapsed,
+        "peak_rss_mb": _peak_rss_mb(),
+        "stream_rss_mb": _peak_rss_mb() - baseline,
+    }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 50],
+                        help="Grammar sizes in MB")
+    parser.add_argument("--worker", nargs=2, metavar=("STREAM", "PATH"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(*args.worker)
+        return
+
+    print(f"{'size':>6} {'stream':<16} {'tokens':>10} {'lex s':>8} {'tok/s':>10} {'peak MB':>9} {'delta MB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_mb in args.sizes:
+            path = write_synthetic_grammar(Path(tmp), size_mb * 1024 * 1024, f"Synthetic{size_mb}")
+            for stream_name in STREAMS:
+                output = subprocess.run(
+                    [sys.executable, __file__, "--worker", stream_name, str(path)],
+                    check=True, capture_output=True, text=True,
+                ).stdout
+                m = json.loads(output)
+                print(f"{size_mb:>4}MB {stream_name:<16} {m['tokens']:>10} {m['seconds']:>8.2f} "
+                      f"{m['tokens'] / m['seconds']:>10.0f} {m['peak_rss_mb']:>9.1f} {m['stream_rss_mb']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Measure ANTLRv4Lexer throughput with the table-driven LexerAdaptor.emit.
+
+The previous if/elif implementation of ``emit`` is kept here as
+``LegacyEmitLexer`` so both can be compared on the same input, and so the
+token streams can be checked for equality.
+
+    python benchmarks/bench_lexer.py --size 2 --repeat 3
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from antlr4 import Lexer, Token
+
+from synthetic import write_synthetic_grammar
+
+from antlr_v4_linter.core.streams import MmapCharStream
+from antlr_v4_linter.grammars.ANTLRv4Lexer import ANTLRv4Lexer
+from antlr_v4_linter.grammars.ANTLRv4Parser import ANTLRv4Parser
+
+
+class LegacyEmitLexer(ANTLRv4Lexer):
+    """ANTLRv4Lexer with the original if/elif emit chain."""
+
+    def emit(self):
+        if (
+            (self._type == ANTLRv4Parser.OPTIONS
+             or self._type == ANTLRv4Parser.TOKENS
+             or self._type == ANTLRv4Parser.CHANNELS)
+            and self.getCurrentRuleType() == Token.INVALID_TYPE
+        ):
+            self.setCurrentRuleType(self.PREQUEL_CONSTRUCT)
+        elif (
+            self._type == ANTLRv4Parser.OPTIONS
+            and self.getCurrentRuleType() == ANTLRv4Parser.TOKEN_REF
+        ):
+            self.setCurrentRuleType(self.OPTIONS_CONSTRUCT)
+        elif (
+            self._type == ANTLRv4Parser.RBRACE
+            and self.getCurrentRuleType() == self.PREQUEL_CONSTRUCT
+        ):
+            self.setCurrentRuleType(Token.INVALID_TYPE)
+        elif (
+            self._type == ANTLRv4Parser.RBRACE
+            and self.getCurrentRuleType() == self.OPTIONS_CONSTRUCT
+        ):
+            self.setCurrentRuleType(ANTLRv4Parser.TOKEN_REF)
+        elif (
+            self._type == ANTLRv4Parser.AT
+            and self.getCurrentRuleType() == Token.INVALID_TYPE
+        ):
+            self.setCurrentRuleType(ANTLRv4Parser.AT)
+        elif (
+            self._type == ANTLRv4Parser.SEMI
+            and self.getCurrentRuleType() == self.OPTIONS_CONSTRUCT
+        ):
+            pass
+        elif (
+            self._type == ANTLRv4Parser.ACTION
+            and self.getCurrentRuleType() == ANTLRv4Parser.AT
+        ):
+            self.setCurrentRuleType(Token.INVALID_TYPE)
+        elif self._type == ANTLRv4Parser.ID:
+            firstChar = self._input.getText(self._tokenStartCharIndex, self._tokenStartCharIndex)
+            if firstChar and firstChar[0].isupper():
+                self._type = ANTLRv4Parser.TOKEN_REF
+            else:
+                self._type = ANTLRv4Parser.RULE_REF
+            if self.getCurrentRuleType() == Token.INVALID_TYPE:
+                self.setCurrentRuleType(self._type)
+        elif self._type == ANTLRv4Parser.SEMI:
+            self.setCurrentRuleType(Token.INVALID_TYPE)
+
+        return Lexer.emit(self)
+
+
+def lex(lexer_class, path: Path):
+    """Lex ``path`` and return (token types, seconds)."""
+    lexer = lexer_class(MmapCharStream(str(path)))
+    types = []
+    start = time.perf_counter()
+    while True:
+        token = lexer.nextToken()
+        types.append(token.type)
+        if token.type == Token.EOF:
+            return types, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=float, default=2, help="Grammar size in MB")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per implementation")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synthetic_grammar(Path(tmp), int(args.size * 1024 * 1024))
+        # Warm up the shared lexer DFA so neither side pays for it
+        reference, _ = lex(ANTLRv4Lexer, path)
+
+        for name, lexer_class in (("before (if/elif)", LegacyEmitLexer),
+                                  ("after (table)", ANTLRv4Lexer)):
+            best = float("inf")
+            for _ in range(args.repeat):
+                types, seconds = lex(lexer_class, path)
+                assert types == reference, f"{name} produced a different token stream"
+                best = min(best, seconds)
+            print(f"{name:<18} {len(types):>10} tokens  {best:>7.2f}s  {len(types) / best:>10.0f} tok/s")
+
+
+if __name__ == "__main__":
+    main()
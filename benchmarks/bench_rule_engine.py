@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Compare fused and per-rule AST traversal as the number of visitor rules grows.
+
+Only visitor rules are enabled, so the difference between the two columns
+is the cost of each rule walking ``rules -> alternatives -> elements`` on its
+own versus sharing a single walk.
+
+    python benchmarks/bench_rule_engine.py --size 0.5 --repeat 5
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import write_synthetic_grammar
+
+from antlr_v4_linter.core.linter import ANTLRLinter
+from antlr_v4_linter.core.models import LinterConfig, RuleConfig
+from antlr_v4_linter.core.rule_engine import VisitorLintRule
+
+
+def time_rules(linter: ANTLRLinter, grammar, config: LinterConfig, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        linter.rule_engine.run_rules(grammar, config)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=float, default=0.5, help="Grammar size in MB")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per configuration")
+    args = parser.parse_args()
+
+    linter = ANTLRLinter()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_synthetic_grammar(Path(tmp), int(args.size * 1024 * 1024))
+        grammar = linter.parser.parse_file(str(path))
+
+    visitor_rules = [r for r in linter.rule_engine.rules if isinstance(r, VisitorLintRule)]
+    print(f"{len(grammar.rules)} grammar rules, {len(visitor_rules)} visitor rules")
+    print(f"{'rules':>5} {'separate ms':>12} {'fused ms':>10} {'speedup':>8}")
+
+    for count in range(1, len(visitor_rules) + 1):
+        config = LinterConfig(rules={r.rule_id: RuleConfig() for r in visitor_rules[:count]})
+
+        linter.rule_engine.fuse_traversal = False
+        separate = time_rules(linter, grammar, config, args.repeat)
+        linter.rule_engine.fuse_traversal = True
+        fused = time_rules(linter, grammar, config, args.repeat)
+
+        print(f"{count:>5} {separate * 1000:>12.1f} {fused * 1000:>10.1f} {separate / fused:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Synthetic grammar generators shared by the benchmark scripts."""
+
+import sys
+from pathlib import Path
+
+# Add src to path for development
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+
+def synthetic_grammar(target_bytes: int, name: str = "Synthetic") -> str:
+    """Build a combined grammar of roughly ``target_bytes`` UTF-8 bytes.
+
+    The grammar mixes parser rules, keyword tokens, character sets, actions
+    and comments so that every lexer mode of ANTLRv4Lexer is exercised.
+    """
+    parts = [
+        f"/* Synthetic benchmark grammar {name} — généré */\n",
+        f"grammar {name};\n\n",
+        "options { caseInsensitive = false; }\n\n",
+        "start: statement* EOF;\n\n",
+    ]
+    size = sum(len(p.encode("utf-8")) for p in parts)
+    i = 0
+    while size < target_bytes:
+        chunk = (
+            f"// rule group {i}\n"
+            f"stmt{i}\n"
+            f"    : KW{i} ID ('=' expr{i})? ';'  # assign{i}\n"
+            f"    | KW{i} '(' (expr{i} (',' expr{i})*)? ')' {{ count{i}++; }}  # call{i}\n"
+            f"    ;\n"
+            f"expr{i}: expr{i} ('*' | '/') expr{i} | INT | ID | '(' expr{i} ')';\n"
+            f"KW{i}: 'keyword{i}';\n"
+            f"FRAG{i}: [a-zA-Z_\\u00C0-\\u00FF] [a-zA-Z0-9_]* -> type(ID);\n\n"
+        )
+        parts.append(chunk)
+        size += len(chunk.encode("utf-8"))
+        i += 1
+    parts.append(
+        "ID: [a-zA-Z_]+;\n"
+        "INT: [0-9]+;\n"
+        "WS: [ \\t\\r\\n]+ -> skip;\n"
+    )
+    return "".join(parts)
+
+
+def write_synthetic_grammar(directory: Path, target_bytes: int, name: str = "Synthetic") -> Path:
+    """Write a synthetic grammar to ``directory`` and return its path."""
+    path = directory / f"{name}.g4"
+    path.write_text(synthetic_grammar(target_bytes, name), encoding="utf-8")
+    return path
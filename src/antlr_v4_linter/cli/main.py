@@ -1,5 +1,6 @@
 """Main CLI entry point for ANTLR v4 linter."""
 
+import json
 import sys
 from pathlib import Path
 from typing import List, Optional
@@ -9,7 +10,11 @@ from rich.console import Console
 
 from ..core.config import ConfigValidator, create_default_config_file, load_config
 from ..core.linter import ANTLRLinter
+from ..core.memory import MemoryProfiler
+from ..core.models import LinterConfig
 from ..core.reporter import ReporterFactory
+from ..core.stats import LintStats
+from ..core.trace import TraceRecorder
 
 
 @click.group()
@@ -34,51 +39,38 @@ def cli(ctx, verbose):
 @click.option("--disable-rule", multiple=True, help="Disable specific rules (can be used multiple times)")
 @click.option("--severity", type=click.Choice(["error", "warning", "info"]), 
               help="Minimum severity level to report")
+@click.option("--stats", "show_stats", is_flag=True,
+              help="Print per-phase and per-rule timings to stderr")
+@click.option("--trace", "trace_path", type=click.Path(dir_okay=False),
+              help="Write pipeline spans as Chrome trace-event JSON to this file")
+@click.option("--memory-report", is_flag=True,
+              help="Print peak and retained memory per phase to stderr (slow)")
+@click.option("--memory-report-json", type=click.Path(dir_okay=False),
+              help="Write the memory report as JSON to this file")
 @click.pass_context
-def lint(ctx, files, config, output_format, no_colors, exclude, rule, disable_rule, severity):
+def lint(ctx, files, config, output_format, no_colors, exclude, rule, disable_rule, severity,
+         show_stats, trace_path, memory_report, memory_report_json):
     """Lint ANTLR v4 grammar files."""
     verbose = ctx.obj.get('verbose', False)
     console = Console() if not no_colors else Console(color_system=None)
     
     try:
-        # Load configuration
-        linter_config = load_config(config)
-        
-        # Apply CLI overrides
+        linter_config = _load_lint_config(console, config, exclude, rule, disable_rule)
         if output_format:
             linter_config.output_format = output_format
         
-        if exclude:
-            linter_config.exclude_patterns.extend(exclude)
-        
-        # Handle rule overrides
-        if rule:
-            # Disable all rules first, then enable specified ones
-            for rule_id in linter_config.rules:
-                linter_config.rules[rule_id].enabled = False
-            for rule_id in rule:
-                if rule_id in linter_config.rules:
-                    linter_config.rules[rule_id].enabled = True
-                else:
-                    console.print(f"[yellow]Warning: Unknown rule '{rule_id}'[/yellow]")
-        
-        if disable_rule:
-            for rule_id in disable_rule:
-                if rule_id in linter_config.rules:
-                    linter_config.rules[rule_id].enabled = False
-                else:
-                    console.print(f"[yellow]Warning: Unknown rule '{rule_id}'[/yellow]")
-        
-        # Validate configuration
-        config_errors = ConfigValidator.validate_config(linter_config)
-        if config_errors:
-            console.print("[red]Configuration errors:[/red]")
-            for error in config_errors:
-                console.print(f"  • {error}")
-            sys.exit(1)
+        linter = ANTLRLinter(linter_config)
+        if show_stats:
+            linter.stats = LintStats()
+        if trace_path:
+            linter.tracer = TraceRecorder()
+        if memory_report or memory_report_json:
+            linter.memory = MemoryProfiler()
+            linter.memory.start()
         
         # Expand file paths and find .g4 files
-        file_paths = _expand_file_paths(files)
+        with linter._phase("discovery"):
+            file_paths = _expand_file_paths(files)
         
         if not file_paths:
             console.print("[yellow]No .g4 files found[/yellow]")
@@ -90,8 +82,7 @@ def lint(ctx, files, config, output_format, no_colors, exclude, rule, disable_ru
                 console.print(f"  • {file_path}")
             console.print()
         
-        # Create linter and run
-        linter = ANTLRLinter(linter_config)
+        # Run the linter
         results = linter.lint_files(file_paths)
         
         # Filter by severity if specified
@@ -108,11 +99,24 @@ def lint(ctx, files, config, output_format, no_colors, exclude, rule, disable_ru
                 ]
         
         # Output results
-        if linter_config.output_format == "text":
-            linter.print_results(results, use_colors=not no_colors)
-        else:
-            output = linter.format_results(results, linter_config.output_format)
-            console.print(output)
+        with linter._phase("report"):
+            if linter_config.output_format == "text":
+                linter.print_results(results, use_colors=not no_colors)
+            else:
+                output = linter.format_results(results, linter_config.output_format)
+                console.print(output)
+        
+        if show_stats:
+            Console(stderr=True).print(linter.stats.format(), markup=False, highlight=False)
+        if trace_path:
+            linter.tracer.write(trace_path)
+        if linter.memory is not None:
+            linter.memory.stop()
+            if memory_report:
+                Console(stderr=True).print(linter.memory.format(), markup=False, highlight=False)
+            if memory_report_json:
+                with open(memory_report_json, "w", encoding="utf-8") as f:
+                    json.dump(linter.memory.to_json(), f, indent=2)
         
         # Exit with error code if there are errors
         total_errors = sum(result.error_count for result in results)
@@ -127,6 +131,190 @@ def lint(ctx, files, config, output_format, no_colors, exclude, rule, disable_ru
         sys.exit(1)
 
 
+@cli.command()
+@click.argument("files", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option("--config", "-c", type=click.Path(exists=True), help="Configuration file path")
+@click.option("--output", "-o", default="antlr-lint-profile", show_default=True,
+              help="Output path prefix for the .pstats and .collapsed files")
+@click.option("--top", default=10, show_default=True, help="Functions to show per subsystem")
+@click.option("--exclude", multiple=True, help="Exclude patterns (can be used multiple times)")
+@click.option("--rule", multiple=True, help="Enable specific rules (can be used multiple times)")
+@click.option("--disable-rule", multiple=True, help="Disable specific rules (can be used multiple times)")
+@click.pass_context
+def profile(ctx, files, config, output, top, exclude, rule, disable_rule):
+    """Profile a lint run with cProfile.
+    
+    Writes OUTPUT.pstats (for pstats/snakeviz) and OUTPUT.collapsed (for
+    flamegraph tools), and prints the top functions grouped by subsystem.
+    """
+    from ..core.profiling import profile_lint, subsystem_report, write_collapsed_stacks
+    
+    verbose = ctx.obj.get('verbose', False)
+    console = Console()
+    
+    try:
+        linter_config = _load_lint_config(console, config, exclude, rule, disable_rule)
+        
+        file_paths = _expand_file_paths(files)
+        if not file_paths:
+            console.print("[yellow]No .g4 files found[/yellow]")
+            sys.exit(0)
+        
+        linter = ANTLRLinter(linter_config)
+        results, stats = profile_lint(linter, file_paths)
+        
+        pstats_path = f"{output}.pstats"
+        collapsed_path = f"{output}.collapsed"
+        stats.dump_stats(pstats_path)
+        write_collapsed_stacks(stats, collapsed_path)
+        
+        total_issues = sum(result.total_issues for result in results)
+        console.print(f"Profiled {len(file_paths)} files ({total_issues} issues)", highlight=False)
+        click.echo(subsystem_report(stats, top))
+        console.print(f"Wrote {pstats_path} and {collapsed_path}", highlight=False)
+    
+    except Exception as e:
+        console.print(f"[red]Error: {e}[/red]")
+        if verbose:
+            import traceback
+            console.print(traceback.format_exc())
+        sys.exit(1)
+
+
+@cli.command("profile-grammar")
+@click.option("--interp", "parser_interp", type=click.Path(exists=True, dir_okay=False),
+              help="Parser .interp file written by the ANTLR tool (lex only without it)")
+@click.option("--lexer-interp", required=True, type=click.Path(exists=True, dir_okay=False),
+              help="Lexer .interp file written by the ANTLR tool")
+@click.option("--inputs", "-i", multiple=True, type=click.Path(exists=True),
+              help="Sample input file or directory (can be used multiple times)")
+@click.option("--generate", type=int, default=0,
+              help="Also profile this many random sentences generated from the grammar files")
+@click.option("--size", default=10000, show_default=True, help="Characters per generated sentence")
+@click.option("--seed", type=int, help="Random seed for generated sentences")
+@click.option("--grammar", "-g", type=click.Path(exists=True, dir_okay=False),
+              help="Grammar file to report issues in [default: the .g4 file next to --interp]")
+@click.option("--start-rule", help="Rule to parse the inputs with [default: the first rule]")
+@click.option("--jobs", "-j", type=int, help="Worker processes [default: one per CPU]")
+@click.option("--top", default=20, show_default=True, help="Decisions to show in the summary")
+@click.option("--format", "-f", "output_format", default="text",
+              type=click.Choice(ReporterFactory.available_formats()), help="Output format of the issues")
+@click.option("--no-colors", is_flag=True, help="Disable colored output")
+@click.pass_context
+def profile_grammar(ctx, parser_interp, lexer_interp, inputs, generate, size, seed, grammar, start_rule,
+                    jobs, top, output_format, no_colors):
+    """Profile the parser of a grammar on sample inputs.
+    
+    Runs the ATNs of the .interp files over the inputs, prints the decisions
+    that took the most prediction time, and reports the decisions that fell
+    back to full-context prediction or stand out as R001 issues at their rules.
+    With --generate, random sentences of the .g4 files next to the .interp
+    files are profiled as well.
+    """
+    import tempfile
+    
+    from ..core.generator import SentenceGenerator, write_inputs
+    from ..core.grammar_profile import (
+        InterpreterData,
+        format_profile,
+        input_files,
+        profile_grammar as run_profile,
+        profile_issues,
+    )
+    from ..core.models import LintResult
+    from ..core.parser import AntlrGrammarParser
+    
+    verbose = ctx.obj.get('verbose', False)
+    console = Console() if not no_colors else Console(color_system=None)
+    
+    try:
+        if not inputs and not generate:
+            raise click.UsageError("Give sample inputs with --inputs or --generate")
+        lexer_data = InterpreterData.load(lexer_interp)
+        parser_data = InterpreterData.load(parser_interp) if parser_interp else None
+        if grammar is None and parser_interp and Path(parser_interp).with_suffix(".g4").is_file():
+            grammar = str(Path(parser_interp).with_suffix(".g4"))
+        
+        with tempfile.TemporaryDirectory() as generated:
+            paths = input_files(inputs)
+            if generate:
+                grammar_files = [path for path in (grammar, str(Path(lexer_interp).with_suffix(".g4")))
+                                 if path and Path(path).is_file()]
+                grammar_asts = [AntlrGrammarParser().parse_file(path) for path in dict.fromkeys(grammar_files)]
+                generator = SentenceGenerator(grammar_asts, start_rule, seed=seed)
+                paths += write_inputs(generator, generated, generate, size)
+            if not paths:
+                console.print("[yellow]No input files found[/yellow]")
+                sys.exit(0)
+            
+            profile = run_profile(lexer_data, parser_data, paths, start_rule, jobs)
+        click.echo(format_profile(profile, top))
+        if parser_data is None:
+            return
+        
+        grammar_ast = AntlrGrammarParser().parse_file(grammar) if grammar else None
+        result = LintResult(file_path=grammar or parser_interp,
+                            issues=profile_issues(profile, grammar_ast, grammar or parser_interp))
+        click.echo()
+        linter = ANTLRLinter()
+        if output_format == "text":
+            linter.print_results([result], use_colors=not no_colors)
+        else:
+            console.print(linter.format_results([result], output_format))
+    
+    except Exception as e:
+        console.print(f"[red]Error: {e}[/red]")
+        if verbose:
+            import traceback
+            console.print(traceback.format_exc())
+        sys.exit(1)
+
+
+@cli.command("generate-inputs")
+@click.argument("files", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option("--count", "-n", default=10, show_default=True, help="Number of sentences to generate")
+@click.option("--size", "-s", default=1000, show_default=True, help="Approximate characters per sentence")
+@click.option("--output", "-o", default="generated-inputs", show_default=True,
+              help="Directory to write the sentences to, or - for standard output")
+@click.option("--start-rule", help="Rule to generate sentences of [default: the first parser rule]")
+@click.option("--max-depth", default=24, show_default=True,
+              help="Nested rules after which sentences are closed the shortest way")
+@click.option("--seed", type=int, help="Random seed, for reproducible sentences")
+@click.option("--extension", default=".txt", show_default=True, help="Extension of the generated files")
+@click.pass_context
+def generate_inputs(ctx, files, count, size, output, start_rule, max_depth, seed, extension):
+    """Generate random sentences of a grammar, for benchmarks and fuzzing.
+    
+    FILES are the grammar and, for split grammars, its lexer grammar. Token
+    texts come from the lexer rules and sentences are streamed to disk, so
+    large inputs take little memory.
+    """
+    from ..core.generator import SentenceGenerator, write_inputs
+    from ..core.parser import AntlrGrammarParser
+    
+    verbose = ctx.obj.get('verbose', False)
+    console = Console(stderr=True)
+    
+    try:
+        parser = AntlrGrammarParser()
+        generator = SentenceGenerator([parser.parse_file(path) for path in files], start_rule,
+                                      max_depth=max_depth, seed=seed)
+        if output == "-":
+            for _ in range(count):
+                generator.write(sys.stdout, size)
+                sys.stdout.write("\n")
+        else:
+            paths = write_inputs(generator, output, count, size, extension)
+            console.print(f"Wrote {len(paths)} sentences of '{generator.start_rule}' to {output}")
+    
+    except Exception as e:
+        console.print(f"[red]Error: {e}[/red]")
+        if verbose:
+            import traceback
+            console.print(traceback.format_exc())
+        sys.exit(1)
+
+
 @cli.command()
 @click.argument("output_path", type=click.Path(), default="antlr-lint.json")
 @click.option("--overwrite", is_flag=True, help="Overwrite existing configuration file")
@@ -210,6 +398,45 @@ def validate_config(config_path):
         sys.exit(1)
 
 
+def _load_lint_config(console: Console, config: Optional[str], exclude: tuple, rule: tuple,
+                      disable_rule: tuple) -> LinterConfig:
+    """Load the configuration and apply the rule and exclude options; exit if it is invalid."""
+    # Load configuration
+    linter_config = load_config(config)
+    
+    # Apply CLI overrides
+    if exclude:
+        linter_config.exclude_patterns.extend(exclude)
+    
+    # Handle rule overrides
+    if rule:
+        # Disable all rules first, then enable specified ones
+        for rule_id in linter_config.rules:
+            linter_config.rules[rule_id].enabled = False
+        for rule_id in rule:
+            if rule_id in linter_config.rules:
+                linter_config.rules[rule_id].enabled = True
+            else:
+                console.print(f"[yellow]Warning: Unknown rule '{rule_id}'[/yellow]")
+    
+    if disable_rule:
+        for rule_id in disable_rule:
+            if rule_id in linter_config.rules:
+                linter_config.rules[rule_id].enabled = False
+            else:
+                console.print(f"[yellow]Warning: Unknown rule '{rule_id}'[/yellow]")
+    
+    # Validate configuration
+    config_errors = ConfigValidator.validate_config(linter_config)
+    if config_errors:
+        console.print("[red]Configuration errors:[/red]")
+        for error in config_errors:
+            console.print(f"  • {error}")
+        sys.exit(1)
+    
+    return linter_config
+
+
 def _expand_file_paths(file_paths: tuple) -> List[str]:
     """Expand file paths to find all .g4 files."""
     expanded = []
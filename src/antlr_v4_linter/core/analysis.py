@@ -0,0 +1,448 @@
+"""Nullable, FIRST and FOLLOW sets of parser rules and blocks.
+
+Token sets are integer bitsets over the token vocabulary of the grammar: bit
+i stands for ``Vocabulary.names[i]``. Nullable and FIRST are computed
+together by a worklist fixed point over the rule reference graph. FOLLOW is
+the union of the local follow sets of each rule reference, propagated along
+the edges from a rule to the rules that can end it. Only parser rules with
+an EBNF tree (see core/ebnf.py) are analyzed.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from . import ebnf
+from .models import GrammarAST, Rule
+
+EOF = "EOF"
+
+# FIRST set of a node and whether it matches the empty input
+FirstInfo = Tuple[int, bool]
+
+
+class Vocabulary:
+    """Assigns a bit to each token name or unnamed literal."""
+    
+    def __init__(self):
+        self.names: List[str] = []
+        self._indexes: Dict[str, int] = {}
+    
+    def bit(self, name: str) -> int:
+        index = self._indexes.get(name)
+        if index is None:
+            index = self._indexes[name] = len(self.names)
+            self.names.append(name)
+        return 1 << index
+    
+    @property
+    def all(self) -> int:
+        return (1 << len(self.names)) - 1
+    
+    def names_of(self, tokens: int) -> List[str]:
+        """Names of the tokens in a bitset, in vocabulary order."""
+        names = []
+        while tokens:
+            lowest = tokens & -tokens
+            names.append(self.names[lowest.bit_length() - 1])
+            tokens ^= lowest
+        return names
+
+
+@dataclass
+class Conflict:
+    """Two alternatives of a decision that can start with the same token.
+    
+    The decision of an optional block or loop (an OptionalBlock, Closure or
+    PositiveClosure) is between entering it or going round again (0), and
+    leaving it (1).
+    """
+    rule_name: str
+    block: Optional[ebnf.Node]  # None for the alternatives of the rule itself
+    alternatives: Tuple[int, int]  # Zero-based indexes
+    tokens: List[str]
+
+
+def format_tokens(tokens: List[str], limit: int = 3) -> str:
+    """Readable list of token names for issue messages."""
+    shown = ", ".join(tokens[:limit])
+    if len(tokens) > limit:
+        shown += f" and {len(tokens) - limit} more"
+    return shown
+
+
+class GrammarAnalysis:
+    """Nullable, FIRST and FOLLOW sets of the parser rules of a grammar."""
+    
+    def __init__(self, grammar: GrammarAST):
+        self.rules: Dict[str, Rule] = {
+            rule.name: rule for rule in grammar.rules
+            if not rule.is_lexer_rule and all(alt.node is not None for alt in rule.alternatives)
+        }
+        self.vocabulary = Vocabulary()
+        self.nullable: Dict[str, bool] = {name: False for name in self.rules}
+        self.first: Dict[str, int] = {name: 0 for name in self.rules}
+        self.follow: Dict[str, int] = {name: 0 for name in self.rules}
+        
+        self._literal_tokens = literal_token_names(grammar)
+        for rule in grammar.rules:
+            if rule.is_lexer_rule and not rule.is_fragment:
+                self.vocabulary.bit(rule.name)
+        for name in list(grammar.tokens) + [EOF]:
+            self.vocabulary.bit(name)
+        
+        # Token sets of the atoms other than rule references, by node id
+        self._atoms: Dict[int, int] = {}
+        self._references: Dict[str, Set[str]] = {}
+        sets = []
+        for name, rule in self.rules.items():
+            references = self._references[name] = set()
+            stack: List[ebnf.Node] = [
+                alternative.node for alternative in rule.alternatives if alternative.node is not None
+            ]
+            while stack:
+                node = stack.pop()
+                if isinstance(node, ebnf.RuleRef):
+                    references.add(node.name)
+                elif isinstance(node, (ebnf.Wildcard, ebnf.NotSet)):
+                    sets.append(node)
+                elif isinstance(node, ebnf.Atom):
+                    self._atoms[id(node)] = self._terminal(node)
+                else:
+                    stack.extend(node.children)
+        
+        # Wildcards and not-sets need the complete vocabulary
+        for node in sets:
+            excluded = 0
+            if isinstance(node, ebnf.NotSet):
+                for element in node.elements:
+                    excluded |= self._terminal(element)
+            self._atoms[id(node)] = self.vocabulary.all & ~excluded
+        
+        self._info: Dict[int, FirstInfo] = {}
+        self._contexts: Dict[int, Tuple[str, int, bool]] = {}
+        self._conflicts: Dict[str, List[Conflict]] = {}
+        self._compute_first()
+        self._compute_follow()
+    
+    def _terminal(self, node: ebnf.Node) -> int:
+        if isinstance(node, ebnf.TokenRef):
+            return self.vocabulary.bit(node.name)
+        if isinstance(node, ebnf.Literal):
+            name = self._literal_tokens.get(node.value)
+            return self.vocabulary.bit(name if name is not None else f"'{node.value}'")
+        return 0
+    
+    def _scan(self, node: ebnf.Node, cache: Optional[Dict[int, FirstInfo]] = None,
+              references: Optional[Set[str]] = None) -> FirstInfo:
+        """FIRST set and nullability of a node from the current rule sets.
+        
+        With ``references``, rule references at the start of the node are
+        collected there instead of contributing their FIRST sets.
+        """
+        if cache is not None:
+            info = cache.get(id(node))
+            if info is None:
+                info = cache[id(node)] = self._scan_node(node, cache, None)
+            return info
+        return self._scan_node(node, None, references)
+    
+    def _scan_node(self, node: ebnf.Node, cache: Optional[Dict[int, FirstInfo]],
+                   references: Optional[Set[str]]) -> FirstInfo:
+        tokens = self._atoms.get(id(node))
+        if tokens is not None:
+            return tokens, False
+        if isinstance(node, ebnf.RuleRef):
+            if references is not None:
+                references.add(node.name)
+                return 0, self.nullable.get(node.name, False)
+            return self.first.get(node.name, 0), self.nullable.get(node.name, False)
+        if isinstance(node, ebnf.Sequence):
+            tokens = 0
+            for element in node.elements:
+                element_tokens, nullable = self._scan(element, cache, references)
+                tokens |= element_tokens
+                if not nullable:
+                    return tokens, False
+            return tokens, True
+        if isinstance(node, ebnf.Alternative):
+            return self._scan(node.sequence, cache, references)
+        if isinstance(node, ebnf.Block):
+            tokens, nullable = 0, not node.alternatives
+            for alternative in node.alternatives:
+                alternative_tokens, alternative_nullable = self._scan(alternative, cache, references)
+                tokens |= alternative_tokens
+                nullable = nullable or alternative_nullable
+            return tokens, nullable
+        if isinstance(node, ebnf.Labeled):
+            return self._scan(node.element, cache, references)
+        if isinstance(node, ebnf.Suffixed):
+            tokens, nullable = self._scan(node.element, cache, references)
+            return tokens, nullable or not isinstance(node, ebnf.PositiveClosure)
+        # Actions and predicates match no input
+        return 0, True
+    
+    def _compute_first(self) -> None:
+        dependents: Dict[str, Set[str]] = {name: set() for name in self.rules}
+        for name, references in self._references.items():
+            for reference in references:
+                if reference in dependents:
+                    dependents[reference].add(name)
+        
+        # A rule becomes nullable at most once, and only then can its
+        # dependents change
+        worklist: Deque[str] = deque(self.rules)
+        queued = set(self.rules)
+        while worklist:
+            name = worklist.popleft()
+            queued.discard(name)
+            if any(self._scan(alternative.node)[1] for alternative in self.rules[name].alternatives
+                   if alternative.node is not None):
+                self.nullable[name] = True
+                for dependent in dependents[name]:
+                    if not self.nullable[dependent] and dependent not in queued:
+                        worklist.append(dependent)
+                        queued.add(dependent)
+        
+        # FIRST(a) is the tokens at the start of a plus the FIRST sets of the
+        # rules referenced at its start
+        starts: Dict[str, Set[str]] = {}
+        for name, rule in self.rules.items():
+            start_references: Set[str] = set()
+            for alternative in rule.alternatives:
+                if alternative.node is None:
+                    continue
+                self.first[name] |= self._scan(alternative.node, None, start_references)[0]
+            starts[name] = {reference for reference in start_references if reference in self.rules}
+        _propagate(self.first, starts)
+    
+    def _compute_follow(self) -> None:
+        # Rules that no other rule references are start rules, followed by EOF
+        referenced = set()
+        for name, references in self._references.items():
+            referenced.update(references - {name})
+        eof = self.vocabulary.bit(EOF)
+        for name in self.rules:
+            if name not in referenced:
+                self.follow[name] = eof
+        
+        # FOLLOW(b) includes FOLLOW(a) for every rule a that can end with b
+        enclosing: Dict[str, Set[str]] = {name: set() for name in self.rules}
+        for name, rule in self.rules.items():
+            for alternative in rule.alternatives:
+                if alternative.node is None:
+                    continue
+                self._collect_follow(name, alternative.node, 0, True, enclosing)
+        _propagate(self.follow, enclosing)
+    
+    def _collect_follow(self, rule_name: str, node: ebnf.Node, after: int, at_end: bool,
+                        enclosing: Dict[str, Set[str]]) -> None:
+        """Add the local follow sets of the references below a node.
+        
+        ``after`` is the FIRST set of what can follow the node inside the
+        rule, and ``at_end`` whether the rest of the rule can be empty.
+        """
+        if isinstance(node, ebnf.RuleRef):
+            if node.name in self.rules:
+                self.follow[node.name] |= after
+                if at_end:
+                    enclosing[node.name].add(rule_name)
+        elif isinstance(node, ebnf.Labeled):
+            self._collect_follow(rule_name, node.element, after, at_end, enclosing)
+        elif isinstance(node, ebnf.Sequence):
+            for element in reversed(node.elements):
+                self._collect_follow(rule_name, element, after, at_end, enclosing)
+                tokens, nullable = self._scan(element, self._info)
+                if nullable:
+                    after |= tokens
+                else:
+                    after, at_end = tokens, False
+        elif isinstance(node, ebnf.Alternative):
+            self._collect_follow(rule_name, node.sequence, after, at_end, enclosing)
+        elif isinstance(node, ebnf.Block):
+            self._contexts[id(node)] = (rule_name, after, at_end)
+            for alternative in node.alternatives:
+                self._collect_follow(rule_name, alternative, after, at_end, enclosing)
+        elif isinstance(node, ebnf.Suffixed):
+            self._contexts[id(node)] = (rule_name, after, at_end)
+            if not isinstance(node, ebnf.OptionalBlock):
+                # A repeated element can be followed by itself
+                after |= self._scan(node.element, self._info)[0]
+            self._collect_follow(rule_name, node.element, after, at_end, enclosing)
+    
+    def first_of(self, node: ebnf.Node) -> int:
+        """FIRST set of any node of an analyzed rule."""
+        return self._scan(node, self._info)[0]
+    
+    def is_nullable(self, node: ebnf.Node) -> bool:
+        """Whether a node of an analyzed rule can match the empty input."""
+        return self._scan(node, self._info)[1]
+    
+    def follow_of(self, node: ebnf.Node) -> int:
+        """Tokens that can follow a block, optional block or loop of an analyzed rule."""
+        rule_name, after, at_end = self._contexts[id(node)]
+        return after | self.follow[rule_name] if at_end else after
+    
+    def lookahead(self, alternatives: List[ebnf.Alternative], follow: int) -> List[int]:
+        """LL(1) lookahead set of each alternative of a decision."""
+        sets = []
+        for alternative in alternatives:
+            tokens, nullable = self._scan(alternative, self._info)
+            sets.append(tokens | follow if nullable else tokens)
+        return sets
+    
+    def loop_lookahead(self, node: ebnf.Suffixed) -> List[int]:
+        """LL(1) lookahead sets of entering an optional block or loop and of leaving it."""
+        follow = self.follow_of(node)
+        tokens, nullable = self._scan(node.element, self._info)
+        return [tokens | follow if nullable else tokens, follow]
+    
+    def first_sets(self) -> Dict[str, FrozenSet[str]]:
+        """FIRST sets of the analyzed rules as token names."""
+        return {name: frozenset(self.vocabulary.names_of(tokens)) for name, tokens in self.first.items()}
+    
+    def conflicts(self, rule_name: str) -> List[Conflict]:
+        """LL(1) conflicts between alternatives of a rule and of its blocks.
+        
+        Optional blocks and loops are decisions too, between entering and
+        leaving them. Alternatives that start with a semantic predicate are left out, as
+        the predicate decides between them. So are alternatives of the rule
+        that start with a reference to the rule itself: ANTLR rewrites direct
+        left recursion.
+        """
+        if rule_name in self._conflicts:
+            return self._conflicts[rule_name]
+        
+        rule = self.rules[rule_name]
+        alternatives = [alt.node for alt in rule.alternatives if alt.node is not None]
+        primary = [
+            i for i, alt in enumerate(alternatives)
+            if not _is_left_recursive(rule_name, alt) and not _is_predicated(alt)
+        ]
+        # Each decision with the lookahead sets of its alternatives
+        decisions: List[Tuple[Optional[ebnf.Node], List[int], List[int]]] = [
+            (None, self.lookahead([alternatives[i] for i in primary], self.follow[rule_name]), primary),
+        ]
+        for alternative in alternatives:
+            for node in alternative.walk():
+                if isinstance(node, ebnf.Block) and len(node.alternatives) > 1:
+                    indexes = [i for i, alt in enumerate(node.alternatives) if not _is_predicated(alt)]
+                    decisions.append((node, self.lookahead([node.alternatives[i] for i in indexes],
+                                                           self.follow_of(node)), indexes))
+                elif isinstance(node, ebnf.Suffixed):
+                    decisions.append((node, self.loop_lookahead(node), [0, 1]))
+        
+        conflicts = []
+        for block, sets, indexes in decisions:
+            seen = 0
+            for j, tokens in enumerate(sets):
+                if tokens & seen:
+                    for i in range(j):
+                        overlap = tokens & sets[i]
+                        if overlap:
+                            conflicts.append(Conflict(rule_name, block, (indexes[i], indexes[j]),
+                                                      self.vocabulary.names_of(overlap)))
+                seen |= tokens
+        
+        self._conflicts[rule_name] = conflicts
+        return conflicts
+
+
+def literal_token_names(grammar: GrammarAST) -> Dict[str, str]:
+    """Token names of the literals defined by a lexer rule of their own."""
+    names: Dict[str, str] = {}
+    for rule in grammar.rules:
+        if rule.is_lexer_rule and not rule.is_fragment and len(rule.alternatives) == 1:
+            node = rule.alternatives[0].node
+            if node is not None and len(node.elements) == 1 and isinstance(node.elements[0], ebnf.Literal):
+                names.setdefault(node.elements[0].value, rule.name)
+    return names
+
+
+def left_recursion_loop(rule: Rule) -> Optional[ebnf.Closure]:
+    """The loop ANTLR rewrites direct left recursion into.
+    
+    ``e: e x | e y | z`` is parsed as ``e: z (x | y)*``; this returns the
+    ``(x | y)*`` part, or None if the rule is not left-recursive.
+    """
+    suffixes = [
+        ebnf.Alternative(alt.node.text, alt.node.range,
+                         ebnf.Sequence(alt.node.sequence.text, alt.node.range, alt.node.elements[1:]))
+        for alt in rule.alternatives if alt.node is not None and _is_left_recursive(rule.name, alt.node)
+    ]
+    if not suffixes:
+        return None
+    return ebnf.Closure(rule.name, rule.range, ebnf.Block(rule.name, rule.range, suffixes))
+
+
+def _is_left_recursive(rule_name: str, alternative: ebnf.Alternative) -> bool:
+    if not alternative.elements:
+        return False
+    first = alternative.elements[0]
+    if isinstance(first, ebnf.Labeled):
+        first = first.element
+    return isinstance(first, ebnf.RuleRef) and first.name == rule_name
+
+
+def _is_predicated(alternative: ebnf.Alternative) -> bool:
+    return bool(alternative.elements) and isinstance(alternative.elements[0], ebnf.Predicate)
+
+
+def _propagate(values: Dict[str, int], depends: Dict[str, Set[str]]) -> None:
+    """Add to each value the values of all the names it depends on, transitively."""
+    for component in _components(depends):
+        merged = 0
+        for name in component:
+            merged |= values[name]
+            for dependency in depends[name]:
+                merged |= values[dependency]
+        for name in component:
+            values[name] = merged
+
+
+def _components(graph: Dict[str, Set[str]]) -> List[List[str]]:
+    """Strongly connected components, each after the components it depends on.
+    
+    Iterative Tarjan algorithm, so that long reference chains do not hit the
+    recursion limit.
+    """
+    index: Dict[str, int] = {}
+    low: Dict[str, int] = {}
+    stack: List[str] = []
+    on_stack: Set[str] = set()
+    components = []
+    
+    for root in graph:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph[root]))]
+        while work:
+            node, successors = work[-1]
+            for successor in successors:
+                if successor not in index:
+                    index[successor] = low[successor] = len(index)
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(graph[successor])))
+                    break
+                if successor in on_stack:
+                    low[node] = min(low[node], index[successor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    
+    return components
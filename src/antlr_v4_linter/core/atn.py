@@ -0,0 +1,438 @@
+"""ATNs of the parser and lexer rules, built from the EBNF trees.
+
+The networks follow the shape of the ones the ANTLR tool builds: a start and
+a stop state per rule, block start and end states around alternatives, and
+loop entry, loop back and loop end states for closures, with epsilon, atom,
+range, set, rule, predicate and action transitions. State and transition
+types use the constants of the ANTLR runtime (``ATNState.BASIC``,
+``Transition.EPSILON``, ...). Left-recursive rules are rewritten into a loop
+over their suffixes, like the tool does, without precedence predicates.
+
+States and transitions are stored in parallel arrays of machine integers.
+The transitions of state ``s`` are the indexes ``transition_offsets[s]`` to
+``transition_offsets[s + 1]`` of the transition arrays, in the order of the
+alternatives they lead to.
+"""
+
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from antlr4.Token import Token
+from antlr4.atn.ATNState import ATNState
+from antlr4.atn.Transition import Transition
+
+from . import ebnf
+from .analysis import EOF, _is_left_recursive, left_recursion_loop, literal_token_names
+from .intervals import EMPTY, IntervalSet, decode_literal, element_chars
+from .models import GrammarAST, Rule
+
+# Start and end state of the part of the network built for a node
+Fragment = Tuple[int, int]
+
+
+class ATN:
+    """Augmented transition network of the parser or the lexer rules of a grammar.
+    
+    The two integer arguments of a transition depend on its type:
+    
+    - ATOM: the token type or code point, and 0
+    - RANGE: the first and last code point
+    - SET, NOT_SET: the index into ``sets``, and 0
+    - RULE: the index of the rule, and the state to return to
+    - PREDICATE, ACTION: the index of the rule, and the index into ``code``
+    - EPSILON, WILDCARD: 0 and 0
+    """
+    
+    def __init__(self, lexer: bool):
+        self.lexer = lexer
+        self.rule_names: List[str] = []
+        self.token_names: List[str] = []  # Parser token type i + 1; EOF is Token.EOF
+        self.sets: List[IntervalSet] = []  # Token types or code points
+        self.code: List[str] = []  # Text of predicates and actions
+        self.unsupported: Dict[str, str] = {}  # Rule name -> what could not be built
+        
+        self.state_types = array('B')
+        self.state_rules = array('i')
+        self.rule_start_states = array('i')
+        self.rule_stop_states = array('i')
+        self.mode_start_states: Dict[Optional[str], int] = {}  # Lexer only
+        # Block, loop and mode start states that choose between transitions,
+        # with the tree node of each; None for the alternatives of a rule
+        self.decision_states = array('i')
+        self.decision_nodes: List[Optional[ebnf.Node]] = []
+        
+        self.transition_offsets = array('i', [0])
+        self.transition_types = array('B')
+        self.transition_targets = array('i')
+        self.transition_args = array('i')
+        self.transition_args2 = array('i')
+        
+        self._rule_indexes: Dict[str, int] = {}
+    
+    @property
+    def state_count(self) -> int:
+        return len(self.state_types)
+    
+    @property
+    def transition_count(self) -> int:
+        return len(self.transition_types)
+    
+    @property
+    def decision_count(self) -> int:
+        return len(self.decision_states)
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the state and transition arrays."""
+        arrays = (
+            self.state_types, self.state_rules, self.rule_start_states, self.rule_stop_states,
+            self.decision_states, self.transition_offsets, self.transition_types,
+            self.transition_targets, self.transition_args, self.transition_args2,
+        )
+        return sum(len(values) * values.itemsize for values in arrays)
+    
+    def rule_index(self, name: str) -> Optional[int]:
+        return self._rule_indexes.get(name)
+    
+    def transitions(self, state: int) -> Iterator[Tuple[int, int, int, int]]:
+        """Type, target and the two arguments of each transition of a state."""
+        for index in range(self.transition_offsets[state], self.transition_offsets[state + 1]):
+            yield (self.transition_types[index], self.transition_targets[index],
+                   self.transition_args[index], self.transition_args2[index])
+
+
+@dataclass
+class GrammarATNs:
+    """The parser and lexer ATNs of a grammar, for the kinds of rules it has."""
+    parser: Optional[ATN]
+    lexer: Optional[ATN]
+
+
+class _ATNBuilder:
+    """Adds the states and transitions of one kind of rules to an ATN."""
+    
+    def __init__(self, atn: ATN, rules: List[Rule], token_types: Optional[Dict[str, int]] = None,
+                 literal_tokens: Optional[Dict[str, str]] = None):
+        self.atn = atn
+        self.rules = rules
+        self.token_types = token_types if token_types is not None else {}
+        self.literal_tokens = literal_tokens if literal_tokens is not None else {}
+        self.rule_index = 0
+        self._set_indexes: Dict[IntervalSet, int] = {}
+        # Transitions in creation order, sorted by source state in finish()
+        self._sources = array('i')
+        self._types = array('B')
+        self._targets = array('i')
+        self._args = array('i')
+        self._args2 = array('i')
+        
+        for index, rule in enumerate(rules):
+            atn.rule_names.append(rule.name)
+            atn._rule_indexes[rule.name] = index
+            self.rule_index = index
+            atn.rule_start_states.append(self.state(ATNState.RULE_START))
+            atn.rule_stop_states.append(self.state(ATNState.RULE_STOP))
+    
+    def state(self, state_type: int = ATNState.BASIC) -> int:
+        self.atn.state_types.append(state_type)
+        self.atn.state_rules.append(self.rule_index)
+        return len(self.atn.state_types) - 1
+    
+    def transition(self, source: int, transition_type: int, target: int, arg: int = 0,
+                   arg2: int = 0) -> None:
+        self._sources.append(source)
+        self._types.append(transition_type)
+        self._targets.append(target)
+        self._args.append(arg)
+        self._args2.append(arg2)
+    
+    def epsilon(self, source: int, target: int) -> None:
+        self.transition(source, Transition.EPSILON, target)
+    
+    def decision(self, state: int, node: Optional[ebnf.Node]) -> None:
+        self.atn.decision_states.append(state)
+        self.atn.decision_nodes.append(node)
+    
+    def set_index(self, chars: IntervalSet) -> int:
+        index = self._set_indexes.get(chars)
+        if index is None:
+            index = self._set_indexes[chars] = len(self.atn.sets)
+            self.atn.sets.append(chars)
+        return index
+    
+    def build_rules(self) -> None:
+        for index, rule in enumerate(self.rules):
+            self.rule_index = index
+            if any(alt.node is None for alt in rule.alternatives):
+                self.atn.unsupported[rule.name] = "no syntax tree"
+                self.epsilon(self.atn.rule_start_states[index], self.atn.rule_stop_states[index])
+                continue
+            
+            alternatives = [alt.node for alt in rule.alternatives if not _is_left_recursive(rule.name, alt.node)]
+            start, end = self.alternatives(alternatives, None)
+            loop = left_recursion_loop(rule)
+            if loop is not None:
+                loop_start, loop_end = self.node(loop)
+                self.epsilon(end, loop_start)
+                end = loop_end
+            self.epsilon(self.atn.rule_start_states[index], start)
+            self.epsilon(end, self.atn.rule_stop_states[index])
+    
+    def finish(self) -> None:
+        """Store the transitions grouped by source state."""
+        atn = self.atn
+        count = len(self._sources)
+        offsets = array('i', [0]) * (atn.state_count + 1)
+        for source in self._sources:
+            offsets[source + 1] += 1
+        for state in range(atn.state_count):
+            offsets[state + 1] += offsets[state]
+        
+        positions = offsets[:-1]
+        types = array('B', [0]) * count
+        targets = array('i', [0]) * count
+        args = array('i', [0]) * count
+        args2 = array('i', [0]) * count
+        for index, source in enumerate(self._sources):
+            position = positions[source]
+            positions[source] += 1
+            types[position] = self._types[index]
+            targets[position] = self._targets[index]
+            args[position] = self._args[index]
+            args2[position] = self._args2[index]
+        
+        atn.transition_offsets = offsets
+        atn.transition_types, atn.transition_targets = types, targets
+        atn.transition_args, atn.transition_args2 = args, args2
+    
+    def alternatives(self, alternatives: List[ebnf.Node], node: Optional[ebnf.Node],
+                     start_type: int = ATNState.BLOCK_START) -> Fragment:
+        """A block; a single alternative is inlined unless the block is a loop."""
+        if len(alternatives) == 1 and start_type == ATNState.BLOCK_START:
+            return self.node(alternatives[0])
+        start, end = self.state(start_type), self.state(ATNState.BLOCK_END)
+        for alternative in alternatives:
+            alternative_start, alternative_end = self.node(alternative)
+            self.epsilon(start, alternative_start)
+            self.epsilon(alternative_end, end)
+        if len(alternatives) > 1:
+            self.decision(start, node)
+        return start, end
+    
+    def node(self, node: ebnf.Node) -> Fragment:
+        if isinstance(node, ebnf.Atom):
+            return self.atom(node)
+        if isinstance(node, (ebnf.Sequence, ebnf.Alternative)):
+            return self.chain([self.node(element) for element in node.elements])
+        if isinstance(node, ebnf.Labeled):
+            return self.node(node.element)
+        if isinstance(node, ebnf.Block):
+            return self.alternatives(node.alternatives, node)
+        if isinstance(node, ebnf.OptionalBlock):
+            return self.optional(node)
+        if isinstance(node, ebnf.Closure):
+            return self.closure(node)
+        if isinstance(node, ebnf.PositiveClosure):
+            return self.positive_closure(node)
+        if isinstance(node, (ebnf.Action, ebnf.Predicate)):
+            kind = Transition.PREDICATE if isinstance(node, ebnf.Predicate) else Transition.ACTION
+            start, end = self.state(), self.state()
+            self.transition(start, kind, end, self.rule_index, len(self.atn.code))
+            self.atn.code.append(node.code)
+            return start, end
+        state = self.state()
+        return state, state
+    
+    def chain(self, fragments: List[Fragment]) -> Fragment:
+        """Fragments matched one after the other."""
+        if not fragments:
+            state = self.state()
+            return state, state
+        for (_, end), (start, _) in zip(fragments, fragments[1:]):
+            self.epsilon(end, start)
+        return fragments[0][0], fragments[-1][1]
+    
+    def optional(self, node: ebnf.OptionalBlock) -> Fragment:
+        start, end = self.state(ATNState.BLOCK_START), self.state(ATNState.BLOCK_END)
+        if not node.greedy:
+            self.epsilon(start, end)
+        for alternative in _branches(node.element):
+            alternative_start, alternative_end = self.node(alternative)
+            self.epsilon(start, alternative_start)
+            self.epsilon(alternative_end, end)
+        if node.greedy:
+            self.epsilon(start, end)
+        self.decision(start, node)
+        return start, end
+    
+    def closure(self, node: ebnf.Closure) -> Fragment:
+        entry = self.state(ATNState.STAR_LOOP_ENTRY)
+        loop_end = self.state(ATNState.LOOP_END)
+        branches = _branches(node.element)
+        block_start, block_end = self.alternatives(branches, node, ATNState.STAR_BLOCK_START)
+        loop_back = self.state(ATNState.STAR_LOOP_BACK)
+        if node.greedy:
+            self.epsilon(entry, block_start)
+            self.epsilon(entry, loop_end)
+        else:
+            self.epsilon(entry, loop_end)
+            self.epsilon(entry, block_start)
+        self.epsilon(block_end, loop_back)
+        self.epsilon(loop_back, entry)
+        self.decision(entry, node)
+        return entry, loop_end
+    
+    def positive_closure(self, node: ebnf.PositiveClosure) -> Fragment:
+        branches = _branches(node.element)
+        block_start, block_end = self.alternatives(branches, node, ATNState.PLUS_BLOCK_START)
+        loop_back = self.state(ATNState.PLUS_LOOP_BACK)
+        loop_end = self.state(ATNState.LOOP_END)
+        self.epsilon(block_end, loop_back)
+        if node.greedy:
+            self.epsilon(loop_back, block_start)
+            self.epsilon(loop_back, loop_end)
+        else:
+            self.epsilon(loop_back, loop_end)
+            self.epsilon(loop_back, block_start)
+        self.decision(loop_back, node)
+        return block_start, loop_end
+    
+    def single(self, transition_type: int, arg: int = 0, arg2: int = 0) -> Fragment:
+        start, end = self.state(), self.state()
+        self.transition(start, transition_type, end, arg, arg2)
+        return start, end
+    
+    def rule_reference(self, name: str) -> Fragment:
+        index = self.atn.rule_index(name)
+        if index is None:
+            self.atn.unsupported.setdefault(self.rules[self.rule_index].name, f"reference to unknown rule {name}")
+            state = self.state()
+            return state, state
+        start, follow = self.state(), self.state()
+        self.transition(start, Transition.RULE, self.atn.rule_start_states[index], index, follow)
+        return start, follow
+    
+    def atom(self, node: ebnf.Atom) -> Fragment:
+        if isinstance(node, ebnf.Wildcard):
+            return self.single(Transition.WILDCARD)
+        if isinstance(node, ebnf.RuleRef):
+            return self.rule_reference(node.name)
+        if self.atn.lexer:
+            return self.lexer_atom(node)
+        if isinstance(node, ebnf.NotSet):
+            tokens = IntervalSet.of((token, token) for token in map(self.token_type, node.elements)
+                                    if token is not None)
+            return self.single(Transition.NOT_SET, self.set_index(tokens))
+        token = self.token_type(node)
+        if token is None:
+            self.atn.unsupported.setdefault(self.rules[self.rule_index].name,
+                                            f"lexer element {node.text} in a parser rule")
+            state = self.state()
+            return state, state
+        return self.single(Transition.ATOM, token)
+    
+    def token_type(self, node: ebnf.Node) -> Optional[int]:
+        if isinstance(node, ebnf.TokenRef):
+            name = node.name
+        elif isinstance(node, ebnf.Literal):
+            name = self.literal_tokens.get(node.value, f"'{node.value}'")
+        else:
+            return None
+        if name == EOF:
+            return Token.EOF
+        token = self.token_types.get(name)
+        if token is None:
+            self.atn.token_names.append(name)
+            token = self.token_types[name] = len(self.atn.token_names)
+        return token
+    
+    def lexer_atom(self, node: ebnf.Atom) -> Fragment:
+        if isinstance(node, ebnf.TokenRef):
+            if node.name == EOF:
+                return self.single(Transition.ATOM, Token.EOF)
+            return self.rule_reference(node.name)
+        if isinstance(node, ebnf.Literal):
+            try:
+                characters = decode_literal(node.value)
+            except (ValueError, IndexError):
+                characters = node.value
+            return self.chain([self.single(Transition.ATOM, ord(char)) for char in characters])
+        if isinstance(node, ebnf.CharRange):
+            chars = self.char_set(node)
+            if len(chars) == 1:
+                return self.single(Transition.RANGE, chars.starts[0], chars.ends[0])
+            return self.single(Transition.SET, self.set_index(chars))
+        if isinstance(node, ebnf.NotSet):
+            chars = EMPTY
+            for element in node.elements:
+                chars = chars | self.char_set(element)
+            return self.single(Transition.NOT_SET, self.set_index(chars))
+        return self.single(Transition.SET, self.set_index(self.char_set(node)))
+    
+    def char_set(self, node: ebnf.Node) -> IntervalSet:
+        """Code points of a set element; unsupported ones match nothing."""
+        try:
+            return element_chars(node)
+        except (ValueError, IndexError) as e:
+            self.atn.unsupported.setdefault(self.rules[self.rule_index].name, str(e) or type(e).__name__)
+            return EMPTY
+
+
+def _branches(node: ebnf.Node) -> List[ebnf.Node]:
+    """Alternatives of a block, or the node itself as the only one."""
+    return list(node.alternatives) if isinstance(node, ebnf.Block) else [node]
+
+
+def build_parser_atn(grammar: GrammarAST) -> ATN:
+    """ATN of the parser rules.
+    
+    Token types are numbered from 1: declared tokens, lexer rules, then any
+    other token names in the order the parser rules use them.
+    """
+    atn = ATN(lexer=False)
+    token_types: Dict[str, int] = {}
+    for name in grammar.tokens:
+        token_types.setdefault(name, len(token_types) + 1)
+    for rule in grammar.rules:
+        if rule.is_lexer_rule and not rule.is_fragment:
+            token_types.setdefault(rule.name, len(token_types) + 1)
+    atn.token_names = list(token_types)
+    
+    builder = _ATNBuilder(atn, [rule for rule in grammar.rules if not rule.is_lexer_rule],
+                          token_types, literal_token_names(grammar))
+    builder.build_rules()
+    builder.finish()
+    return atn
+
+
+def build_lexer_atn(grammar: GrammarAST) -> ATN:
+    """ATN of the lexer rules, with a start state per mode.
+    
+    Lexer commands are not part of the network.
+    """
+    atn = ATN(lexer=True)
+    rules = [rule for rule in grammar.rules if rule.is_lexer_rule]
+    builder = _ATNBuilder(atn, rules)
+    builder.build_rules()
+    for index, rule in enumerate(rules):
+        if rule.is_fragment:
+            continue
+        start = atn.mode_start_states.get(rule.mode)
+        if start is None:
+            builder.rule_index = index
+            start = atn.mode_start_states[rule.mode] = builder.state(ATNState.TOKEN_START)
+            builder.decision(start, None)
+        builder.epsilon(start, atn.rule_start_states[index])
+    builder.finish()
+    return atn
+
+
+def build_atns(grammar: GrammarAST) -> GrammarATNs:
+    """Build the ATNs for the kinds of rules the grammar has."""
+    has_parser_rules = any(not rule.is_lexer_rule for rule in grammar.rules)
+    has_lexer_rules = any(rule.is_lexer_rule for rule in grammar.rules)
+    return GrammarATNs(
+        parser=build_parser_atn(grammar) if has_parser_rules else None,
+        lexer=build_lexer_atn(grammar) if has_lexer_rules else None,
+    )
@@ -70,7 +70,8 @@ class ConfigLoader:
                     config.rules[rule_id] = RuleConfig(
                         enabled=rule_config.get("enabled", True),
                         severity=Severity(rule_config.get("severity", "warning")),
-                        thresholds=rule_config.get("thresholds", {})
+                        thresholds=rule_config.get("thresholds", {}),
+                        time_budget_ms=rule_config.get("timeBudgetMs")
                     )
                 elif isinstance(rule_config, bool):
                     # Simple boolean configuration
@@ -87,6 +88,13 @@ class ConfigLoader:
         if "outputFormat" in data:
             config.output_format = data["outputFormat"]
         
+        # Parse time budgets
+        if "ruleTimeBudgetMs" in data:
+            config.rule_time_budget_ms = data["ruleTimeBudgetMs"]
+        
+        if "fileTimeBudgetMs" in data:
+            config.file_time_budget_ms = data["fileTimeBudgetMs"]
+        
         return config
     
     @staticmethod
@@ -114,6 +122,15 @@ class ConfigLoader:
             
             if rule_config.thresholds:
                 data["rules"][rule_id]["thresholds"] = rule_config.thresholds
+            
+            if rule_config.time_budget_ms is not None:
+                data["rules"][rule_id]["timeBudgetMs"] = rule_config.time_budget_ms
+        
+        if config.rule_time_budget_ms is not None:
+            data["ruleTimeBudgetMs"] = config.rule_time_budget_ms
+        
+        if config.file_time_budget_ms is not None:
+            data["fileTimeBudgetMs"] = config.file_time_budget_ms
         
         return data
 
@@ -139,7 +156,7 @@ class ConfigValidator:
         # Error Handling (future)
         "E001", "E002",
         # Performance (future)
-        "P001", "P002",
+        "P001", "P002", "P003", "P004", "P005",
         # Documentation (future)
         "D001", "D002",
     }
@@ -164,6 +181,15 @@ class ConfigValidator:
             if rule_config.severity.value not in cls.VALID_SEVERITIES:
                 errors.append(f"Invalid severity '{rule_config.severity.value}' for rule {rule_id}. "
                              f"Valid options: {', '.join(cls.VALID_SEVERITIES)}")
+            
+            if not cls._is_valid_budget(rule_config.time_budget_ms):
+                errors.append(f"Time budget for rule {rule_id} must be a positive number of milliseconds")
+        
+        # Validate time budgets
+        if not cls._is_valid_budget(config.rule_time_budget_ms):
+            errors.append("ruleTimeBudgetMs must be a positive number of milliseconds")
+        if not cls._is_valid_budget(config.file_time_budget_ms):
+            errors.append("fileTimeBudgetMs must be a positive number of milliseconds")
         
         # Validate exclude patterns (basic check)
         for pattern in config.exclude_patterns:
@@ -172,6 +198,13 @@ class ConfigValidator:
         
         return errors
     
+    @staticmethod
+    def _is_valid_budget(value: Any) -> bool:
+        """Check that a time budget is unset or a positive number."""
+        if value is None:
+            return True
+        return isinstance(value, (int, float)) and not isinstance(value, bool) and value > 0
+    
     @classmethod
     def validate_rule_thresholds(cls, rule_id: str, thresholds: Dict[str, Any]) -> List[str]:
         """Validate rule-specific threshold values."""
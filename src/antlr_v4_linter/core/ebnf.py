@@ -0,0 +1,198 @@
+"""Structured EBNF tree of grammar rule bodies.
+
+GrammarASTBuilder builds one tree per alternative next to the flat element
+list: ``Alternative.node`` holds the whole alternative and ``Element.node``
+the subtree of each of its elements. Nesting depth, token counts and the
+suffixes used below a node are computed once, when the node is created.
+"""
+
+from dataclasses import dataclass, field
+from typing import FrozenSet, Iterator, List, Optional
+
+from .models import Range
+
+
+@dataclass
+class Node:
+    """Base class of the EBNF tree nodes."""
+    text: str  # Source text, without whitespace or comments
+    range: Range
+    # Computed from the children when the node is created
+    depth: int = field(init=False, default=0, compare=False)  # Nested parenthesized blocks
+    token_count: int = field(init=False, default=0, compare=False)  # Atoms in the subtree
+    suffixes: FrozenSet[str] = field(init=False, default=frozenset(), compare=False)
+    
+    @property
+    def children(self) -> List["Node"]:
+        return []
+    
+    def __post_init__(self) -> None:
+        children = self.children
+        self.depth = max((child.depth for child in children), default=0)
+        self.token_count = sum(child.token_count for child in children)
+        self.suffixes = frozenset().union(*(child.suffixes for child in children))
+    
+    def walk(self) -> Iterator["Node"]:
+        """This node and all nodes below it, in depth-first order."""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+
+@dataclass
+class Atom(Node):
+    """A node that matches a single token or character."""
+    
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        self.token_count = 1
+
+
+@dataclass
+class TokenRef(Atom):
+    name: str
+
+
+@dataclass
+class RuleRef(Atom):
+    name: str
+    arguments: Optional[str] = None  # Text of the [...] argument block
+
+
+@dataclass
+class Literal(Atom):
+    value: str  # Text between the quotes, escapes left as written
+
+
+@dataclass
+class CharSet(Atom):
+    """A lexer character set such as ``[a-z_]``."""
+    body: str  # Text between the brackets
+
+
+@dataclass
+class CharRange(Atom):
+    """A lexer range such as ``'a'..'z'``."""
+    start: str
+    end: str
+
+
+@dataclass
+class Wildcard(Atom):
+    pass
+
+
+@dataclass
+class NotSet(Atom):
+    """``~x`` or ``~(x | y)``: any single symbol except the listed ones."""
+    elements: List[Node]
+    
+    @property
+    def children(self) -> List[Node]:
+        return self.elements
+
+
+@dataclass
+class Action(Node):
+    code: str  # Text between the braces
+
+
+@dataclass
+class Predicate(Node):
+    """A semantic predicate ``{...}?``."""
+    code: str
+
+
+@dataclass
+class LexerCommand(Node):
+    """A lexer command such as ``skip`` or ``pushMode(TAG)``."""
+    name: str
+    argument: Optional[str] = None
+
+
+@dataclass
+class Labeled(Node):
+    """An element with a label, such as ``left=expr`` or ``ids+=ID``."""
+    label: str
+    operator: str  # "=" or "+="
+    element: Node
+    
+    @property
+    def children(self) -> List[Node]:
+        return [self.element]
+
+
+@dataclass
+class Sequence(Node):
+    elements: List[Node]
+    
+    @property
+    def children(self) -> List[Node]:
+        return self.elements
+
+
+@dataclass
+class Alternative(Node):
+    sequence: Sequence
+    label: Optional[str] = None  # Parser alternative label (#name)
+    commands: List[LexerCommand] = field(default_factory=list)
+    
+    @property
+    def children(self) -> List[Node]:
+        return [self.sequence, *self.commands]
+    
+    @property
+    def elements(self) -> List[Node]:
+        return self.sequence.elements
+
+
+@dataclass
+class Block(Node):
+    """A parenthesized subrule ``( ... | ... )``."""
+    alternatives: List[Alternative]
+    
+    @property
+    def children(self) -> List[Node]:
+        return self.alternatives
+    
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        self.depth += 1
+
+
+@dataclass
+class Suffixed(Node):
+    """An element followed by an EBNF suffix."""
+    element: Node
+    greedy: bool = True  # False for the non-greedy forms ??, *? and +?
+    
+    suffix = ""
+    
+    @property
+    def children(self) -> List[Node]:
+        return [self.element]
+    
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        self.suffixes = self.suffixes | {self.suffix}
+
+
+@dataclass
+class OptionalBlock(Suffixed):
+    """``x?``"""
+    suffix = "?"
+
+
+@dataclass
+class Closure(Suffixed):
+    """``x*``"""
+    suffix = "*"
+
+
+@dataclass
+class PositiveClosure(Suffixed):
+    """``x+``"""
+    suffix = "+"
+
+
+SUFFIX_NODES = {node.suffix: node for node in (OptionalBlock, Closure, PositiveClosure)}
@@ -0,0 +1,466 @@
+"""Random sentences of a grammar, for benchmarking and fuzzing (``antlr-lint generate-inputs``).
+
+The generator walks the EBNF trees of the parser rules from a start rule and
+writes the text of each token it reaches, made from the token's lexer rule.
+Alternatives are picked at random, weighted towards short ones as the rule
+nesting gets deeper; past ``max_depth`` nested rules, or once the sentence
+has reached its target size, every choice takes the shortest way to finish
+the sentence. The walk keeps its pending work on an explicit stack and the
+text goes out in chunks, so memory does not grow with the size of the input.
+
+Token texts are checked against the lexer DFA of their mode and generated
+again if another rule would match them. Predicates and actions are ignored.
+"""
+
+import math
+import random
+from bisect import bisect_right
+from itertools import accumulate
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Set, TextIO
+
+from . import ebnf
+from .analysis import EOF, _components, literal_token_names
+from .index import GrammarIndex
+from .intervals import MAX_CODE_POINT, IntervalSet, decode_literal, element_chars
+from .lexer_dfa import LexerDFA
+from .models import GrammarAST, Rule
+
+# Characters preferred when a set allows them: tab, newline and printable ASCII
+PRINTABLE = IntervalSet.of([(9, 10), (32, 126)])
+# Code points that can be written out: all but the surrogates
+ENCODABLE = IntervalSet.of([(0, 0xD7FF), (0xE000, MAX_CODE_POINT)])
+# Stand-in for sets that cannot be decoded
+LETTERS = IntervalSet.of([(65, 90), (97, 122)])
+
+# Chunks of text are written out once they reach this many characters
+CHUNK_SIZE = 8192
+# Attempts at a token text that the lexer matches with the intended rule
+TOKEN_ATTEMPTS = 8
+# Texts kept per token; once there are this many, tokens reuse them
+TOKEN_POOL_SIZE = 128
+
+INFINITE = math.inf
+
+
+# Kinds of stack entries in the walk, looked up by node class
+_SEQUENCE, _BLOCK, _CLOSURE, _PLUS, _OPTIONAL, _LABELED, _IGNORED, _REFERENCE, _REPEAT, _TERMINAL = range(10)
+
+_KINDS = {
+    ebnf.Sequence: _SEQUENCE,
+    ebnf.Alternative: _SEQUENCE,
+    ebnf.Block: _BLOCK,
+    ebnf.Closure: _CLOSURE,
+    ebnf.PositiveClosure: _PLUS,
+    ebnf.OptionalBlock: _OPTIONAL,
+    ebnf.Labeled: _LABELED,
+    ebnf.Action: _IGNORED,
+    ebnf.Predicate: _IGNORED,
+    ebnf.LexerCommand: _IGNORED,
+}
+
+
+class _Repeat:
+    """Stack entry deciding whether a loop runs once more."""
+    __slots__ = ("loop",)
+    
+    def __init__(self, loop: ebnf.Suffixed):
+        self.loop = loop
+
+
+# Stack entry marking the end of a rule, where the nesting depth goes down
+_RETURN = object()
+
+
+class _Choice:
+    """Alternatives of a block or rule with their costs and cached weights."""
+    __slots__ = ("alternatives", "finite", "shortest", "weights")
+    
+    def __init__(self, alternatives: List[ebnf.Alternative], costs: List[float]):
+        self.alternatives = alternatives
+        self.finite = [index for index, cost in enumerate(costs) if cost < INFINITE]
+        least = min((costs[index] for index in self.finite), default=INFINITE)
+        self.shortest = [index for index in self.finite if costs[index] == least]
+        # Cumulative weights of the finite alternatives by nesting depth
+        self.weights: Dict[int, List[float]] = {}
+
+
+class _Expander:
+    """Random walk over the EBNF trees of one kind of rules."""
+    
+    def __init__(self, rules: Dict[str, Rule], lexer: bool, rng: random.Random, max_depth: int,
+                 loop_probability: float):
+        self.rules = rules
+        self.lexer = lexer
+        self.random = rng
+        self.max_depth = max_depth
+        self.loop_probability = loop_probability
+        self.reference_type = ebnf.TokenRef if lexer else ebnf.RuleRef
+        self.kinds = dict(_KINDS)
+        self.kinds[self.reference_type] = _REFERENCE
+        self.kinds[_Repeat] = _REPEAT
+        self.produced = 0
+        self._choices: Dict[int, _Choice] = {}
+        self._reversed: Dict[int, List[ebnf.Node]] = {}
+        self.costs = self._rule_costs()
+    
+    def _rule_costs(self) -> Dict[str, float]:
+        """Size of the smallest text of each rule, counting each rule reference as 1.
+        
+        Rules that cannot derive a finite text cost INFINITE.
+        """
+        graph = {
+            name: {child.name for alt in rule.alternatives if alt.node is not None
+                   for child in alt.node.walk()
+                   if isinstance(child, self.reference_type) and child.name in self.rules}
+            for name, rule in self.rules.items()
+        }
+        self.costs = {name: INFINITE for name in self.rules}
+        for component in _components(graph):
+            changed = True
+            while changed:
+                changed = False
+                for name in component:
+                    cost = min((self.cost(alt.node) for alt in self.rules[name].alternatives
+                                if alt.node is not None), default=INFINITE)
+                    if cost < self.costs[name]:
+                        self.costs[name] = cost
+                        changed = True
+        return self.costs
+    
+    def cost(self, node: ebnf.Node) -> float:
+        kind = self.kinds.get(node.__class__, _TERMINAL)
+        if kind == _SEQUENCE:
+            return sum(self.cost(element) for element in node.elements)
+        if kind == _BLOCK:
+            return min((self.cost(alt) for alt in node.alternatives), default=0)
+        if kind in (_CLOSURE, _OPTIONAL, _IGNORED):
+            return 0
+        if kind in (_PLUS, _LABELED):
+            return self.cost(node.element)
+        if kind == _REFERENCE:
+            return 1 + self.costs.get(node.name, INFINITE)
+        if self.lexer and isinstance(node, ebnf.Literal):
+            return len(node.value)
+        return 1
+    
+    def _choice(self, key: object, alternatives: List[ebnf.Alternative]) -> _Choice:
+        choice = self._choices.get(id(key))
+        if choice is None:
+            choice = self._choices[id(key)] = _Choice(alternatives, [self.cost(alt) for alt in alternatives])
+        return choice
+    
+    def _rule_choice(self, name: str) -> _Choice:
+        rule = self.rules[name]
+        choice = self._choices.get(id(rule))
+        if choice is None:
+            choice = self._choice(rule, [alt.node for alt in rule.alternatives if alt.node is not None])
+        return choice
+    
+    def choose(self, choice: _Choice, depth: int, closing: bool) -> Optional[ebnf.Alternative]:
+        """Pick an alternative: a shortest one when closing, else weighted towards short ones."""
+        finite = choice.finite
+        if not finite:
+            return choice.alternatives[0] if choice.alternatives else None
+        if closing:
+            shortest = choice.shortest
+            index = shortest[0] if len(shortest) == 1 else self.random.choice(shortest)
+            return choice.alternatives[index]
+        if len(finite) == 1:
+            return choice.alternatives[finite[0]]
+        
+        weights = choice.weights.get(depth)
+        if weights is None:
+            # Uniform at the start rule, increasingly favoring short alternatives deeper down
+            bias = depth / self.max_depth
+            costs = [self.cost(choice.alternatives[index]) for index in finite]
+            weights = choice.weights[depth] = list(accumulate((1 + cost) ** -bias for cost in costs))
+        return choice.alternatives[finite[bisect_right(weights, self.random.random() * weights[-1])]]
+    
+    def expand(self, start: str, size: int, top_level_loops: bool) -> Iterator[ebnf.Node]:
+        """Terminal nodes of a random derivation of ``start``.
+        
+        The consumer adds the length of the text it makes to ``produced``;
+        once that reaches ``size``, the derivation is closed. With
+        ``top_level_loops``, the loops of the start rule run until then.
+        """
+        self.produced = 0
+        kinds = self.kinds
+        rng = self.random
+        max_depth = self.max_depth
+        loop_probability = self.loop_probability
+        depth = 0
+        stack: List[object] = []
+        chosen = self.choose(self._rule_choice(start), 0, False)
+        if chosen is not None:
+            stack.append(chosen)
+        
+        while stack:
+            node = stack.pop()
+            if node is _RETURN:
+                depth -= 1
+                continue
+            kind = kinds.get(node.__class__, _TERMINAL)
+            if kind == _TERMINAL:
+                yield node
+                continue
+            
+            closing = depth >= max_depth or self.produced >= size
+            if kind == _SEQUENCE:
+                elements = self._reversed.get(id(node))
+                if elements is None:
+                    elements = self._reversed[id(node)] = node.elements[::-1]
+                stack.extend(elements)
+            elif kind == _REFERENCE:
+                if node.name in self.rules:
+                    chosen = self.choose(self._rule_choice(node.name), depth + 1, closing)
+                    if chosen is not None:
+                        depth += 1
+                        stack.append(_RETURN)
+                        stack.append(chosen)
+            elif kind == _BLOCK:
+                chosen = self.choose(self._choice(node, node.alternatives), depth, closing)
+                if chosen is not None:
+                    stack.append(chosen)
+            elif kind == _REPEAT:
+                if closing:
+                    continue
+                if (depth == 0 and top_level_loops) or rng.random() < loop_probability:
+                    stack.append(node)
+                    stack.append(node.loop.element)
+            elif kind == _CLOSURE:
+                stack.append(_Repeat(node))
+            elif kind == _PLUS:
+                stack.append(_Repeat(node))
+                stack.append(node.element)
+            elif kind == _OPTIONAL:
+                if not closing and rng.random() < loop_probability:
+                    stack.append(node.element)
+            elif kind == _LABELED:
+                stack.append(node.element)
+
+
+class SentenceGenerator:
+    """Random valid sentences of a grammar.
+    
+    Several grammar files can be given, such as a parser grammar and the
+    lexer grammar of its tokens; their rules are combined.
+    """
+    
+    def __init__(self, grammars: Sequence[GrammarAST], start_rule: Optional[str] = None,
+                 max_depth: int = 24, loop_probability: float = 0.5, token_size: int = 12,
+                 separator: Optional[str] = None, seed: Optional[int] = None):
+        self.random = random.Random(seed)
+        parser_rules: Dict[str, Rule] = {}
+        lexer_rules: Dict[str, Rule] = {}
+        self.literal_tokens: Dict[str, str] = {}
+        self.dfas: Dict[Optional[str], LexerDFA] = {}
+        for grammar in grammars:
+            for rule in grammar.rules:
+                (lexer_rules if rule.is_lexer_rule else parser_rules).setdefault(rule.name, rule)
+            self.literal_tokens.update(literal_token_names(grammar))
+            if any(rule.is_lexer_rule for rule in grammar.rules):
+                for mode, dfa in GrammarIndex.of(grammar).lexer_dfas.items():
+                    self.dfas.setdefault(mode, dfa)
+        
+        if not parser_rules:
+            raise ValueError("The grammar has no parser rules")
+        if start_rule is None:
+            start_rule = next(iter(parser_rules))
+        elif start_rule not in parser_rules:
+            raise ValueError(f"Unknown start rule '{start_rule}'")
+        self.start_rule = start_rule
+        self.token_size = token_size
+        
+        self.parser = _Expander(parser_rules, False, self.random, max_depth, loop_probability)
+        if self.parser.costs[start_rule] == INFINITE:
+            raise ValueError(f"Rule '{start_rule}' cannot derive a finite sentence")
+        self.lexer = _Expander(lexer_rules, True, self.random, 8, loop_probability)
+        self.lexer_rules = lexer_rules
+        
+        hidden = {name for name, rule in lexer_rules.items() if _is_hidden(rule)}
+        # Tokens that a wildcard or negated set in a parser rule can stand for
+        self.tokens = [name for name, rule in lexer_rules.items()
+                       if not rule.is_fragment and name not in hidden and
+                       self.lexer.costs[name] < INFINITE]
+        self.separator = separator if separator is not None else self._separator(hidden)
+        
+        self._fixed_texts: Dict[str, Optional[str]] = {}
+        self._token_pools: Dict[str, List[str]] = {}
+        self._literal_texts: Dict[int, str] = {}
+        self._set_cache: Dict[int, IntervalSet] = {}
+        self._allowed_tokens: Dict[int, List[str]] = {}
+    
+    def _separator(self, hidden: Set[str]) -> str:
+        """Whitespace that the lexer skips, to put between tokens.
+        
+        Without any lexer rules, tokens are separated by a space.
+        """
+        if not self.dfas:
+            return " "
+        for candidate in (" ", "\n"):
+            for dfa in self.dfas.values():
+                if dfa.match(candidate) in hidden:
+                    return candidate
+        return ""
+    
+    def sentence(self, size: int) -> Iterator[str]:
+        """Chunks of text of one sentence of about ``size`` characters."""
+        chunk: List[str] = []
+        chunk_length = 0
+        first = True
+        expansion = self.parser.expand(self.start_rule, size, top_level_loops=True)
+        for node in expansion:
+            text = self._token(node)
+            if not text:
+                continue
+            if not first and self.separator:
+                chunk.append(self.separator)
+                chunk_length += len(self.separator)
+            first = False
+            chunk.append(text)
+            chunk_length += len(text)
+            self.parser.produced += len(text) + len(self.separator)
+            if chunk_length >= CHUNK_SIZE:
+                yield "".join(chunk)
+                chunk = []
+                chunk_length = 0
+        if chunk:
+            yield "".join(chunk)
+    
+    def write(self, out: TextIO, size: int) -> int:
+        """Write one sentence and return its length."""
+        length = 0
+        for chunk in self.sentence(size):
+            out.write(chunk)
+            length += len(chunk)
+        return length
+    
+    def _token(self, node: ebnf.Node) -> str:
+        if isinstance(node, ebnf.TokenRef):
+            return "" if node.name == EOF else self.token_text(node.name)
+        if isinstance(node, ebnf.Literal):
+            return self._literal(node)
+        if isinstance(node, ebnf.Wildcard):
+            return self.token_text(self.random.choice(self.tokens)) if self.tokens else ""
+        if isinstance(node, ebnf.NotSet):
+            allowed = self._allowed_tokens.get(id(node))
+            if allowed is None:
+                excluded = {self.literal_tokens.get(element.value, element.value)
+                            if isinstance(element, ebnf.Literal) else getattr(element, "name", None)
+                            for element in _set_elements(node)}
+                allowed = self._allowed_tokens[id(node)] = [
+                    name for name in self.tokens if name not in excluded
+                ]
+            return self.token_text(self.random.choice(allowed)) if allowed else ""
+        return ""
+    
+    def token_text(self, name: str) -> str:
+        """Random text of a token that the lexer matches with the token's own rule.
+        
+        Tokens without a lexer rule are written as their name. Each token
+        keeps up to TOKEN_POOL_SIZE texts and then picks among them.
+        """
+        rule = self.lexer_rules.get(name)
+        if rule is None or self.lexer.costs.get(name, INFINITE) == INFINITE:
+            return name
+        if name not in self._fixed_texts:
+            self._fixed_texts[name] = self._fixed_text(rule)
+        fixed = self._fixed_texts[name]
+        if fixed is not None:
+            return fixed
+        
+        pool = self._token_pools.setdefault(name, [])
+        if len(pool) >= TOKEN_POOL_SIZE:
+            return pool[self.random.randrange(TOKEN_POOL_SIZE)]
+        
+        dfa = self.dfas.get(rule.mode)
+        text = ""
+        for _ in range(TOKEN_ATTEMPTS):
+            text = "".join(self._char_text(node) for node in self.lexer.expand(name, self.token_size, False))
+            if text and (dfa is None or dfa.match(text) == name):
+                break
+        pool.append(text)
+        return text
+    
+    def _fixed_text(self, rule: Rule) -> Optional[str]:
+        """Text of a rule that is a single literal, such as a keyword."""
+        if len(rule.alternatives) != 1 or rule.alternatives[0].node is None:
+            return None
+        elements = rule.alternatives[0].node.elements
+        if not elements or not all(isinstance(element, ebnf.Literal) for element in elements):
+            return None
+        return "".join(self._literal(element) for element in elements)
+    
+    def _literal(self, node: ebnf.Literal) -> str:
+        text = self._literal_texts.get(id(node))
+        if text is None:
+            try:
+                text = decode_literal(node.value)
+            except (ValueError, IndexError):
+                text = node.value
+            self._literal_texts[id(node)] = text
+        return text
+    
+    def _char_text(self, node: ebnf.Node) -> str:
+        if isinstance(node, ebnf.Literal):
+            return self._literal(node)
+        chars = self._set_cache.get(id(node))
+        if chars is None:
+            if isinstance(node, ebnf.Wildcard):
+                chars = PRINTABLE
+            else:
+                try:
+                    chars = element_chars(node)
+                except (ValueError, IndexError):
+                    chars = LETTERS
+            self._set_cache[id(node)] = chars
+        return _random_char(self.random, chars)
+
+
+def _set_elements(node: ebnf.NotSet) -> List[ebnf.Node]:
+    elements = []
+    for element in node.elements:
+        if isinstance(element, ebnf.Block):
+            elements.extend(element for alt in element.alternatives for element in alt.elements)
+        else:
+            elements.append(element)
+    return elements
+
+
+def _is_hidden(rule: Rule) -> bool:
+    """Whether the lexer skips the rule's tokens or sends them to another channel."""
+    return any(
+        command.name in ("skip", "channel")
+        for alt in rule.alternatives if alt.node is not None
+        for command in alt.node.commands
+    )
+
+
+def _random_char(rng: random.Random, chars: IntervalSet) -> str:
+    """A character of ``chars``, printable ASCII if the set has any."""
+    preferred = chars & PRINTABLE or chars & ENCODABLE
+    if not preferred:
+        return ""
+    offset = rng.randrange(preferred.size)
+    for low, high in preferred:
+        if offset <= high - low:
+            return chr(low + offset)
+        offset -= high - low + 1
+    return ""
+
+
+def write_inputs(generator: SentenceGenerator, output_dir: str, count: int, size: int,
+                 extension: str = ".txt") -> List[str]:
+    """Write ``count`` sentences to numbered files in ``output_dir`` and return their paths."""
+    directory = Path(output_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    width = len(str(max(count - 1, 0)))
+    paths = []
+    for index in range(count):
+        path = directory / f"input-{index:0{width}d}{extension}"
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            generator.write(f, size)
+            f.write("\n")
+        paths.append(str(path))
+    return paths
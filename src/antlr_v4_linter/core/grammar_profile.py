@@ -0,0 +1,532 @@
+"""Runtime profiling of a grammar from ANTLR .interp files (``antlr-lint profile-grammar``).
+
+The ANTLR tool writes an .interp file next to each generated recognizer,
+holding its vocabulary, rule names and serialized ATN. The profiler loads
+them into a ParserInterpreter and a lexer interpreter, parses a corpus of
+sample inputs and collects per-decision prediction statistics like the
+ProfilingATNSimulator of the Java runtime: invocations, full-context (LL)
+fallbacks, lookahead depth and time. Semantic predicates are taken to be
+true and lexer actions are not run, as in the interpreters of the runtime.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import zip_longest
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from antlr4 import CommonTokenStream, InputStream
+from antlr4.BufferedTokenStream import TokenStream
+from antlr4.Lexer import Lexer
+from antlr4.ParserInterpreter import ParserInterpreter
+from antlr4.ParserRuleContext import InterpreterRuleContext, ParserRuleContext
+from antlr4.PredictionContext import PredictionContextCache
+from antlr4.Token import Token
+from antlr4.atn.ATN import ATN
+from antlr4.atn.ATNDeserializer import ATNDeserializer
+from antlr4.atn.ATNState import ATNState, LoopEndState
+from antlr4.atn.LexerATNSimulator import LexerATNSimulator
+from antlr4.atn.ParserATNSimulator import ParserATNSimulator
+from antlr4.atn.Transition import Transition
+from antlr4.dfa.DFA import DFA
+from antlr4.error.ErrorListener import ErrorListener
+from antlr4.error.Errors import FailedPredicateException, RecognitionException, UnsupportedOperationException
+
+from .models import GrammarAST, Issue, Position, Range, Severity
+
+# Rule id of the issues made from profile results
+PROFILE_RULE_ID = "R001"
+
+
+@dataclass
+class InterpreterData:
+    """Contents of an .interp file written by the ANTLR tool."""
+    path: str
+    literal_names: List[Optional[str]]
+    symbolic_names: List[Optional[str]]
+    rule_names: List[str]
+    serialized_atn: List[int]
+    channel_names: List[str] = field(default_factory=list)  # Lexer only
+    mode_names: List[str] = field(default_factory=list)  # Lexer only
+    
+    @property
+    def is_lexer(self) -> bool:
+        return bool(self.mode_names)
+    
+    @classmethod
+    def load(cls, path: str) -> "InterpreterData":
+        sections: Dict[str, List[str]] = {}
+        current: Optional[List[str]] = None
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.rstrip("\n")
+                if line.endswith(":") and line[:-1] in _SECTIONS:
+                    current = sections.setdefault(line[:-1], [])
+                elif line and current is not None:
+                    current.append(line)
+        
+        if "rule names" not in sections or "atn" not in sections:
+            raise ValueError(f"{path} is not an ANTLR .interp file")
+        atn_text = "".join(sections["atn"]).strip()
+        try:
+            serialized_atn = [int(value) for value in atn_text.strip("[]").split(",")]
+        except ValueError:
+            raise ValueError(f"{path} has a malformed serialized ATN")
+        
+        def names(section: str) -> List[Optional[str]]:
+            return [None if name == "null" else name for name in sections.get(section, [])]
+        
+        return cls(
+            path=path,
+            literal_names=names("token literal names"),
+            symbolic_names=names("token symbolic names"),
+            rule_names=sections["rule names"],
+            serialized_atn=serialized_atn,
+            channel_names=sections.get("channel names", []),
+            mode_names=sections.get("mode names", []),
+        )
+    
+    def deserialize(self) -> ATN:
+        return ATNDeserializer().deserialize(self.serialized_atn)
+
+
+_SECTIONS = ("token literal names", "token symbolic names", "rule names", "channel names",
+             "mode names", "atn")
+
+
+@dataclass
+class DecisionStats:
+    """Prediction statistics of one parser decision."""
+    decision: int
+    rule_name: str
+    invocations: int = 0
+    ll_fallbacks: int = 0  # Predictions that needed full-context (LL) prediction
+    ambiguities: int = 0
+    sll_lookahead: int = 0  # Total tokens looked at by SLL prediction
+    ll_lookahead: int = 0  # Total tokens looked at by LL prediction
+    max_lookahead: int = 0
+    seconds: float = 0.0
+    
+    def add(self, other: "DecisionStats") -> None:
+        self.invocations += other.invocations
+        self.ll_fallbacks += other.ll_fallbacks
+        self.ambiguities += other.ambiguities
+        self.sll_lookahead += other.sll_lookahead
+        self.ll_lookahead += other.ll_lookahead
+        self.max_lookahead = max(self.max_lookahead, other.max_lookahead)
+        self.seconds += other.seconds
+    
+    @property
+    def average_lookahead(self) -> float:
+        if not self.invocations:
+            return 0.0
+        return (self.sll_lookahead + self.ll_lookahead) / self.invocations
+
+
+@dataclass
+class GrammarProfile:
+    """Statistics of parsing a corpus of inputs."""
+    decisions: List[DecisionStats] = field(default_factory=list)  # Indexed by decision number
+    files: int = 0
+    tokens: int = 0
+    syntax_errors: int = 0
+    unreadable: List[str] = field(default_factory=list)
+    lex_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    
+    @property
+    def prediction_seconds(self) -> float:
+        return sum(stats.seconds for stats in self.decisions)
+    
+    def merge(self, other: "GrammarProfile") -> None:
+        if not self.decisions:
+            self.decisions = [DecisionStats(stats.decision, stats.rule_name) for stats in other.decisions]
+        for stats, other_stats in zip(self.decisions, other.decisions):
+            stats.add(other_stats)
+        self.files += other.files
+        self.tokens += other.tokens
+        self.syntax_errors += other.syntax_errors
+        self.unreadable.extend(other.unreadable)
+        self.lex_seconds += other.lex_seconds
+        self.parse_seconds += other.parse_seconds
+
+
+def _runtime_names(names: List[Optional[str]]) -> List[str]:
+    """Token names with the placeholder the generated recognizers use for missing ones."""
+    return [name if name is not None else "<INVALID>" for name in names]
+
+
+class LexerInterpreter(Lexer):
+    """Lexer running the ATN of an .interp file."""
+    
+    def __init__(self, data: InterpreterData, atn: ATN, input=None):
+        super().__init__(input)
+        self.grammarFileName = data.path
+        self.atn = atn
+        self.literalNames = _runtime_names(data.literal_names)
+        self.symbolicNames = _runtime_names(data.symbolic_names)
+        self.ruleNames = data.rule_names
+        self.channelNames = data.channel_names
+        self.modeNames = data.mode_names
+        self.decisionsToDFA = [DFA(state, index) for index, state in enumerate(atn.decisionToState)]
+        self._interp = LexerATNSimulator(self, atn, self.decisionsToDFA, PredictionContextCache())
+    
+    def action(self, localctx, ruleIndex: int, actionIndex: int) -> None:
+        pass
+
+
+class _ParserInterpreter(ParserInterpreter):
+    """ParserInterpreter that follows the Java runtime's version.
+    
+    The one of the Python runtime matches atoms against their label set,
+    fails on left-recursive rules and calls an action method that parsers
+    do not have.
+    """
+    
+    def __init__(self, data: InterpreterData, atn: ATN, input: TokenStream):
+        token_names = [
+            literal or symbolic or str(index)
+            for index, (literal, symbolic) in enumerate(zip_longest(data.literal_names, data.symbolic_names))
+        ]
+        super().__init__(data.path, token_names, data.rule_names, atn, input)
+        self.literalNames = _runtime_names(data.literal_names)
+        self.symbolicNames = _runtime_names(data.symbolic_names)
+    
+    def parse(self, startRuleIndex: int) -> ParserRuleContext:
+        startRuleStartState = self.atn.ruleToStartState[startRuleIndex]
+        rootContext = InterpreterRuleContext(None, ATNState.INVALID_STATE_NUMBER, startRuleIndex)
+        if startRuleStartState.isPrecedenceRule:
+            self.enterRecursionRule(rootContext, startRuleStartState.stateNumber, startRuleIndex, 0)
+        else:
+            self.enterRule(rootContext, startRuleStartState.stateNumber, startRuleIndex)
+        while True:
+            p = self.getATNState()
+            if p.stateType == ATNState.RULE_STOP:
+                if self._ctx.isEmpty():
+                    if startRuleStartState.isPrecedenceRule:
+                        result = self._ctx
+                        parentContext = self._parentContextStack.pop()
+                        self.unrollRecursionContexts(parentContext[0])
+                        return result
+                    self.exitRule()
+                    return rootContext
+                self.visitRuleStopState(p)
+            else:
+                try:
+                    self.visitState(p)
+                except RecognitionException as e:
+                    self.state = self.atn.ruleToStopState[p.ruleIndex].stateNumber
+                    self._ctx.exception = e
+                    self._errHandler.reportError(self, e)
+                    self._errHandler.recover(self, e)
+    
+    def visitState(self, p: ATNState) -> None:
+        edge = 1
+        if len(p.transitions) > 1:
+            self._errHandler.sync(self)
+            edge = self._interp.adaptivePredict(self._input, p.decision, self._ctx)
+        
+        transition = p.transitions[edge - 1]
+        tt = transition.serializationType
+        if tt == Transition.EPSILON:
+            if (p.stateNumber in self.pushRecursionContextStates and
+                    not isinstance(transition.target, LoopEndState)):
+                parent, invokingState = self._parentContextStack[-1]
+                ctx = InterpreterRuleContext(parent, invokingState, self._ctx.ruleIndex)
+                self.pushNewRecursionContext(ctx, self.atn.ruleToStartState[p.ruleIndex].stateNumber,
+                                             self._ctx.ruleIndex)
+        elif tt == Transition.ATOM:
+            self.match(transition.label_)
+        elif tt in (Transition.RANGE, Transition.SET, Transition.NOT_SET):
+            if not transition.matches(self._input.LA(1), Token.MIN_USER_TOKEN_TYPE, Lexer.MAX_CHAR_VALUE):
+                self._errHandler.recoverInline(self)
+            self.matchWildcard()
+        elif tt == Transition.WILDCARD:
+            self.matchWildcard()
+        elif tt == Transition.RULE:
+            ruleStartState = transition.target
+            ruleIndex = ruleStartState.ruleIndex
+            ctx = InterpreterRuleContext(self._ctx, p.stateNumber, ruleIndex)
+            if ruleStartState.isPrecedenceRule:
+                self.enterRecursionRule(ctx, ruleStartState.stateNumber, ruleIndex, transition.precedence)
+            else:
+                self.enterRule(ctx, transition.target.stateNumber, ruleIndex)
+        elif tt == Transition.PREDICATE:
+            if not self.sempred(self._ctx, transition.ruleIndex, transition.predIndex):
+                raise FailedPredicateException(self)
+        elif tt == Transition.PRECEDENCE:
+            if not self.precpred(self._ctx, transition.precedence):
+                raise FailedPredicateException(self, f"precpred(_ctx, {transition.precedence})")
+        elif tt != Transition.ACTION:
+            raise UnsupportedOperationException("Unrecognized ATN transition type.")
+        
+        self.state = transition.target.stateNumber
+    
+    def visitRuleStopState(self, p: ATNState) -> None:
+        ruleStartState = self.atn.ruleToStartState[p.ruleIndex]
+        if ruleStartState.isPrecedenceRule:
+            parent, invokingState = self._parentContextStack.pop()
+            self.unrollRecursionContexts(parent)
+            self.state = invokingState
+        else:
+            self.exitRule()
+        
+        ruleTransition = self.atn.states[self.state].transitions[0]
+        self.state = ruleTransition.followState.stateNumber
+
+
+class ProfilingATNSimulator(ParserATNSimulator):
+    """Parser simulator that records the statistics of each prediction."""
+    
+    def __init__(self, parser, atn: ATN, decisionToDFA: list, sharedContextCache: PredictionContextCache,
+                 decisions: List[DecisionStats]):
+        super().__init__(parser, atn, decisionToDFA, sharedContextCache)
+        self.decisions = decisions
+        self._sll_stop = -1
+        self._ll_stop = -1
+    
+    def adaptivePredict(self, input, decision: int, outerContext):
+        self._sll_stop = -1
+        self._ll_stop = -1
+        start_index = input.index
+        start = time.perf_counter()
+        try:
+            return super().adaptivePredict(input, decision, outerContext)
+        finally:
+            stats = self.decisions[decision]
+            stats.seconds += time.perf_counter() - start
+            stats.invocations += 1
+            lookahead = 0
+            if self._sll_stop >= 0:
+                lookahead = self._sll_stop - start_index + 1
+                stats.sll_lookahead += lookahead
+            if self._ll_stop >= 0:
+                lookahead = self._ll_stop - start_index + 1
+                stats.ll_lookahead += lookahead
+            stats.max_lookahead = max(stats.max_lookahead, lookahead)
+    
+    def getExistingTargetState(self, previousD, t: int):
+        self._sll_stop = self._input.index
+        return super().getExistingTargetState(previousD, t)
+    
+    def computeTargetState(self, dfa, previousD, t: int):
+        self._sll_stop = self._input.index
+        return super().computeTargetState(dfa, previousD, t)
+    
+    def computeReachSet(self, closure, t: int, fullCtx: bool):
+        if fullCtx:
+            self._ll_stop = self._input.index
+        return super().computeReachSet(closure, t, fullCtx)
+    
+    def reportAttemptingFullContext(self, dfa, conflictingAlts, configs, startIndex: int, stopIndex: int):
+        self.decisions[dfa.decision].ll_fallbacks += 1
+        super().reportAttemptingFullContext(dfa, conflictingAlts, configs, startIndex, stopIndex)
+    
+    def reportAmbiguity(self, dfa, D, startIndex: int, stopIndex: int, exact: bool, ambigAlts, configs):
+        self.decisions[dfa.decision].ambiguities += 1
+        super().reportAmbiguity(dfa, D, startIndex, stopIndex, exact, ambigAlts, configs)
+
+
+class _ErrorCounter(ErrorListener):
+    def __init__(self):
+        self.count = 0
+    
+    def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
+        self.count += 1
+
+
+class GrammarProfiler:
+    """Parses inputs with the interpreters of a grammar, keeping the DFAs between inputs."""
+    
+    def __init__(self, lexer_data: InterpreterData, parser_data: Optional[InterpreterData] = None,
+                 start_rule: Optional[str] = None):
+        self.profile = GrammarProfile()
+        self.errors = _ErrorCounter()
+        self.lexer = LexerInterpreter(lexer_data, lexer_data.deserialize())
+        self.lexer.removeErrorListeners()
+        self.lexer.addErrorListener(self.errors)
+        self.parser: Optional[_ParserInterpreter] = None
+        self.start_rule_index = 0
+        if parser_data is None:
+            return
+        
+        if start_rule is not None:
+            if start_rule not in parser_data.rule_names:
+                raise ValueError(f"Unknown start rule '{start_rule}'")
+            self.start_rule_index = parser_data.rule_names.index(start_rule)
+        atn = parser_data.deserialize()
+        self.profile.decisions = [
+            DecisionStats(decision, parser_data.rule_names[state.ruleIndex])
+            for decision, state in enumerate(atn.decisionToState)
+        ]
+        self.parser = _ParserInterpreter(parser_data, atn, CommonTokenStream(self.lexer))
+        self.parser._interp = ProfilingATNSimulator(self.parser, atn, self.parser.decisionToDFA,
+                                                    self.parser.sharedContextCache,
+                                                    self.profile.decisions)
+        self.parser.removeErrorListeners()
+        self.parser.addErrorListener(self.errors)
+    
+    def profile_text(self, text: str) -> None:
+        self.lexer.inputStream = InputStream(text)
+        tokens = CommonTokenStream(self.lexer)
+        start = time.perf_counter()
+        tokens.fill()
+        lexed = time.perf_counter()
+        if self.parser is not None:
+            self.parser.setTokenStream(tokens)
+            self.parser.parse(self.start_rule_index)
+        end = time.perf_counter()
+        
+        self.profile.files += 1
+        self.profile.tokens += len(tokens.tokens)
+        self.profile.lex_seconds += lexed - start
+        self.profile.parse_seconds += end - lexed
+    
+    def profile_file(self, path: str) -> None:
+        try:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                text = f.read()
+        except OSError:
+            self.profile.unreadable.append(path)
+            return
+        self.profile_text(text)
+    
+    def reset(self) -> None:
+        """Start a new profile, keeping the DFAs built so far."""
+        self.profile = GrammarProfile(
+            decisions=[DecisionStats(stats.decision, stats.rule_name) for stats in self.profile.decisions]
+        )
+        self.errors.count = 0
+        if self.parser is not None:
+            self.parser._interp.decisions = self.profile.decisions
+    
+    def result(self) -> GrammarProfile:
+        self.profile.syntax_errors = self.errors.count
+        return self.profile
+
+
+def input_files(paths: Iterable[str]) -> List[str]:
+    """The files given, and the files under the directories given, skipping hidden ones."""
+    files = []
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            files.extend(
+                str(file) for file in path.rglob("*")
+                if file.is_file() and not any(part.startswith(".") for part in file.relative_to(path).parts)
+            )
+        elif path.is_file():
+            files.append(str(path))
+    return sorted(files)
+
+
+# Profiler of a worker process, created once by _init_worker
+_worker: Optional[GrammarProfiler] = None
+
+
+def _init_worker(lexer_data: InterpreterData, parser_data: Optional[InterpreterData],
+                 start_rule: Optional[str]) -> None:
+    global _worker
+    _worker = GrammarProfiler(lexer_data, parser_data, start_rule)
+
+
+def _profile_chunk(paths: List[str]) -> GrammarProfile:
+    _worker.reset()
+    for path in paths:
+        _worker.profile_file(path)
+    return _worker.result()
+
+
+def profile_grammar(lexer_data: InterpreterData, parser_data: Optional[InterpreterData],
+                    paths: List[str], start_rule: Optional[str] = None,
+                    jobs: Optional[int] = None) -> GrammarProfile:
+    """Parse the input files and collect their statistics.
+    
+    With more than one job, the files are split between worker processes.
+    Each worker warms up DFAs of its own, so the first predictions in every
+    worker go through the ATN.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    jobs = min(jobs, len(paths))
+    if jobs <= 1:
+        profiler = GrammarProfiler(lexer_data, parser_data, start_rule)
+        for path in paths:
+            profiler.profile_file(path)
+        return profiler.result()
+    
+    # Several chunks per worker so that one slow chunk does not hold up the run
+    chunks = [paths[index::jobs * 4] for index in range(jobs * 4)]
+    profile = GrammarProfile()
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(lexer_data, parser_data, start_rule)) as executor:
+        for chunk_profile in executor.map(_profile_chunk, [chunk for chunk in chunks if chunk]):
+            profile.merge(chunk_profile)
+    return profile
+
+
+def profile_issues(profile: GrammarProfile, grammar: Optional[GrammarAST], file_path: str,
+                   min_share: float = 0.1, max_lookahead: int = 3) -> List[Issue]:
+    """Issues for the decisions that fell back to LL prediction or stand out in time or lookahead.
+    
+    Each issue is placed at the rule of the decision in ``grammar``, or at
+    the start of the file if the rule is not found. Issues are sorted by
+    prediction time.
+    """
+    rule_ranges = {rule.name: rule.range for rule in grammar.rules} if grammar is not None else {}
+    file_start = Range(Position(1, 1), Position(1, 1))
+    total = profile.prediction_seconds
+    
+    issues = []
+    for stats in sorted(profile.decisions, key=lambda stats: -stats.seconds):
+        if not stats.invocations:
+            continue
+        share = stats.seconds / total if total else 0.0
+        if not (stats.ll_fallbacks or share >= min_share or stats.max_lookahead > max_lookahead):
+            continue
+        
+        details = [f"{share:.1%} of prediction time",
+                   f"up to {_count(stats.max_lookahead, 'token')} of lookahead"]
+        if stats.ll_fallbacks:
+            details.append(_count(stats.ll_fallbacks, "full-context (LL) fallback"))
+        if stats.ambiguities:
+            details.append(_count(stats.ambiguities, "ambiguity", "ambiguities"))
+        issues.append(Issue(
+            rule_id=PROFILE_RULE_ID,
+            severity=Severity.WARNING if stats.ll_fallbacks else Severity.INFO,
+            message=(f"Decision {stats.decision} in rule '{stats.rule_name}' was predicted "
+                     f"{_count(stats.invocations, 'time')}: {', '.join(details)}"),
+            file_path=file_path,
+            range=rule_ranges.get(stats.rule_name, file_start),
+        ))
+    return issues
+
+
+def _count(number: int, singular: str, plural: Optional[str] = None) -> str:
+    return f"{number} {singular if number == 1 else plural or singular + 's'}"
+
+
+def format_profile(profile: GrammarProfile, top: int = 20) -> str:
+    """Summary of the run and a table of the decisions with the most prediction time."""
+    lines = [
+        f"Profiled {profile.files} files ({profile.tokens} tokens, {profile.syntax_errors} syntax errors)",
+        f"Lexing {profile.lex_seconds:.3f}s, parsing {profile.parse_seconds:.3f}s, "
+        f"prediction {profile.prediction_seconds:.3f}s",
+    ]
+    if profile.unreadable:
+        lines.append(f"Could not read {len(profile.unreadable)} files")
+    
+    decisions = [stats for stats in profile.decisions if stats.invocations]
+    decisions.sort(key=lambda stats: -stats.seconds)
+    if decisions:
+        lines.append("")
+        lines.append(f"{'decision':>8}  {'rule':<24} {'calls':>9} {'LL':>7} {'avg k':>6} "
+                     f"{'max k':>6} {'seconds':>9}")
+        for stats in decisions[:top]:
+            lines.append(
+                f"{stats.decision:>8}  {stats.rule_name:<24} {stats.invocations:>9} "
+                f"{stats.ll_fallbacks:>7} {stats.average_lookahead:>6.2f} {stats.max_lookahead:>6} "
+                f"{stats.seconds:>9.4f}"
+            )
+    return "\n".join(lines)
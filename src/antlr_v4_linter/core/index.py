@@ -0,0 +1,189 @@
+"""Per-grammar index of the facets that lint rules declare they need.
+
+Rules list the facets they use in ``LintRule.requires``. The parser captures
+the lexical facets (tokens, comments, raw source) only when an enabled rule
+asks for them, and the derived facets (reference graph, nullable/FIRST/FOLLOW
+analysis, LL(k) lookahead, ATNs, lexer DFA, literal tries) are computed on first use and cached on
+the grammar's index.
+"""
+
+import enum
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+
+from ..grammars.ANTLRv4Lexer import ANTLRv4Lexer
+from .analysis import GrammarAnalysis
+from .atn import GrammarATNs, build_atns
+from .lexer_dfa import LexerDFA, build_lexer_dfas
+from .literal_index import LiteralIndex, build_literal_indexes
+from .lookahead import LookaheadAnalysis
+from .models import GrammarAST, SourceToken
+
+
+class Facet(enum.Enum):
+    TOKENS = "tokens"  # Every token of the file, on all channels
+    COMMENTS = "comments"
+    REFERENCE_GRAPH = "reference_graph"
+    FIRST_SETS = "first_sets"  # Nullable, FIRST and FOLLOW sets (GrammarAnalysis)
+    LOOKAHEAD = "lookahead"  # LL(k) lookahead of conflicting decisions (LookaheadAnalysis)
+    ATN = "atn"  # Parser and lexer ATNs (GrammarATNs)
+    LEXER_DFA = "lexer_dfa"  # One DFA per lexer mode, built from the lexer ATN (LexerDFA)
+    LITERALS = "literals"  # Trie of the lexer literals per mode (LiteralIndex)
+    RAW_SOURCE = "raw_source"
+
+
+# Facets that can only be captured while the file is being parsed
+LEXICAL_FACETS = frozenset({Facet.TOKENS, Facet.COMMENTS, Facet.RAW_SOURCE})
+
+
+@dataclass
+class ReferenceGraph:
+    """Rule and token references made by each rule of a grammar."""
+    rule_refs: Dict[str, Set[str]] = field(default_factory=dict)
+    token_refs: Dict[str, Set[str]] = field(default_factory=dict)
+    
+    def rules_referenced_by(self, rule_names: Iterable[str]) -> Set[str]:
+        """Names of the parser rules referenced from the given rules."""
+        referenced = set()
+        for name in rule_names:
+            referenced.update(self.rule_refs.get(name, ()))
+        return referenced
+    
+    def tokens_referenced_by(self, rule_names: Iterable[str]) -> Set[str]:
+        """Names of the tokens referenced from the given rules."""
+        referenced = set()
+        for name in rule_names:
+            referenced.update(self.token_refs.get(name, ()))
+        return referenced
+
+
+def build_reference_graph(grammar: GrammarAST) -> ReferenceGraph:
+    """Collect the rule and token references of every rule."""
+    graph = ReferenceGraph()
+    for rule in grammar.rules:
+        rule_refs = graph.rule_refs.setdefault(rule.name, set())
+        token_refs = graph.token_refs.setdefault(rule.name, set())
+        for alternative in rule.alternatives:
+            for element in alternative.elements:
+                text = element.text
+                if not text:
+                    continue
+                if element.element_type == "rule_ref":
+                    rule_refs.add(text)
+                # Fallback for rule references not properly tagged
+                elif (text[0].islower() and text.isalnum() and
+                      element.element_type not in ["suffix", "terminal", "char_set", "token_ref"]):
+                    rule_refs.add(text)
+                if text[0].isupper() and text.isalnum():
+                    token_refs.add(text)
+    return graph
+
+
+def build_lookahead(grammar: GrammarAST) -> LookaheadAnalysis:
+    """Set up the LL(k) analysis on top of the grammar's FIRST/FOLLOW analysis."""
+    return LookaheadAnalysis(GrammarIndex.of(grammar).analysis)
+
+
+def build_mode_dfas(grammar: GrammarAST) -> Dict[Optional[str], LexerDFA]:
+    """Build the lexer DFAs from the grammar's lexer ATN."""
+    return build_lexer_dfas(GrammarIndex.of(grammar).atns.lexer)
+
+
+class GrammarIndex:
+    """Facets of one grammar, computed on first use and cached."""
+    
+    def __init__(self, grammar: GrammarAST, tokens: Optional[List[SourceToken]] = None,
+                 comments: Optional[List[SourceToken]] = None, source: Optional[str] = None):
+        self.grammar = grammar
+        self._tokens = tokens
+        self._comments = comments
+        self._source = source
+        self._derived: Dict[Facet, object] = {}
+    
+    @classmethod
+    def of(cls, grammar: GrammarAST) -> "GrammarIndex":
+        """Get the index of a grammar, creating an empty one if needed."""
+        if grammar.index is None:
+            grammar.index = cls(grammar)
+        return grammar.index
+    
+    @property
+    def computed(self) -> Set[Facet]:
+        """Facets that are available without further work."""
+        available = set(self._derived)
+        if self._tokens is not None:
+            available.update((Facet.TOKENS, Facet.COMMENTS))
+        if self._comments is not None:
+            available.add(Facet.COMMENTS)
+        if self._source is not None:
+            available.add(Facet.RAW_SOURCE)
+        return available
+    
+    def build(self, facets: Iterable[Facet]) -> None:
+        """Compute the derived facets in ``facets`` that are not cached yet."""
+        for facet in facets:
+            if facet not in LEXICAL_FACETS:
+                self._get(facet)
+    
+    def _get(self, facet: Facet):
+        if facet not in self._derived:
+            self._derived[facet] = _BUILDERS[facet](self.grammar)
+        return self._derived[facet]
+    
+    @property
+    def tokens(self) -> Optional[List[SourceToken]]:
+        """All tokens, or None if Facet.TOKENS was not requested when parsing."""
+        return self._tokens
+    
+    @property
+    def comments(self) -> Optional[List[SourceToken]]:
+        """Comment tokens, or None if neither comments nor tokens were captured."""
+        if self._comments is None and self._tokens is not None:
+            self._comments = [t for t in self._tokens if t.channel == ANTLRv4Lexer.COMMENT]
+        return self._comments
+    
+    @property
+    def source(self) -> Optional[str]:
+        """The grammar text, or None if Facet.RAW_SOURCE was not requested when parsing."""
+        return self._source
+    
+    @property
+    def reference_graph(self) -> ReferenceGraph:
+        return self._get(Facet.REFERENCE_GRAPH)
+    
+    @property
+    def analysis(self) -> GrammarAnalysis:
+        return self._get(Facet.FIRST_SETS)
+    
+    @property
+    def first_sets(self) -> Dict[str, FrozenSet[str]]:
+        """FIRST sets of the parser rules as token names."""
+        return self.analysis.first_sets()
+    
+    @property
+    def lookahead(self) -> LookaheadAnalysis:
+        return self._get(Facet.LOOKAHEAD)
+    
+    @property
+    def atns(self) -> GrammarATNs:
+        return self._get(Facet.ATN)
+    
+    @property
+    def lexer_dfas(self) -> Dict[Optional[str], LexerDFA]:
+        """One DFA per lexer mode."""
+        return self._get(Facet.LEXER_DFA)
+    
+    @property
+    def literals(self) -> Dict[Optional[str], LiteralIndex]:
+        """One literal trie per lexer mode."""
+        return self._get(Facet.LITERALS)
+
+
+_BUILDERS = {
+    Facet.REFERENCE_GRAPH: build_reference_graph,
+    Facet.FIRST_SETS: GrammarAnalysis,
+    Facet.LOOKAHEAD: build_lookahead,
+    Facet.ATN: build_atns,
+    Facet.LEXER_DFA: build_mode_dfas,
+    Facet.LITERALS: build_literal_indexes,
+}
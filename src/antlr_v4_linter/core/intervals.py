@@ -0,0 +1,399 @@
+"""Immutable sets of code points, stored as sorted interval arrays.
+
+An ``IntervalSet`` keeps the inclusive bounds of its disjoint, non-adjacent
+intervals in two parallel ``array('i')`` objects. Union, intersection,
+difference and complement merge the arrays in one pass, in O(n + m) time.
+
+The module also decodes ANTLR lexer syntax into sets: escapes in literals,
+``\\u{...}`` code points and ``[...]`` character sets with ranges and
+``\\p{...}`` / ``\\P{...}`` Unicode properties. The properties are the general
+categories of ``unicode_tables`` under their short and long names, their
+one-letter groups and ``Any``, ``ASCII``, ``Assigned`` and ``White_Space``.
+"""
+
+from array import array
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from . import ebnf
+from .unicode_tables import CATEGORY_TABLES
+
+MAX_CODE_POINT = 0x10FFFF
+
+_ESCAPES = {'n': '\n', 'r': '\r', 't': '\t', 'b': '\b', 'f': '\f'}
+
+
+class CharSetError(ValueError):
+    """Raised for character sets and escapes that cannot be decoded."""
+
+
+class IntervalSet:
+    """Immutable set of code points (or token types) as sorted disjoint intervals."""
+    __slots__ = ('starts', 'ends', '_hash')
+    
+    def __init__(self, starts: Iterable[int] = (), ends: Iterable[int] = ()):
+        """Wrap bounds that are already sorted, disjoint and not adjacent; see ``of``."""
+        self.starts = array('i', starts)
+        self.ends = array('i', ends)
+        self._hash = None
+    
+    @classmethod
+    def of(cls, intervals: Iterable[Tuple[int, int]]) -> 'IntervalSet':
+        """Set of the given inclusive (low, high) intervals, in any order."""
+        starts: List[int] = []
+        ends: List[int] = []
+        for low, high in sorted(intervals):
+            if starts and low <= ends[-1] + 1:
+                if high > ends[-1]:
+                    ends[-1] = high
+            else:
+                starts.append(low)
+                ends.append(high)
+        return cls(starts, ends)
+    
+    @classmethod
+    def range(cls, low: int, high: int) -> 'IntervalSet':
+        return cls((low,), (high,)) if low <= high else EMPTY
+    
+    @classmethod
+    def char(cls, char: str) -> 'IntervalSet':
+        return cls((ord(char),), (ord(char),))
+    
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return zip(self.starts, self.ends)
+    
+    def __len__(self) -> int:
+        """Number of intervals."""
+        return len(self.starts)
+    
+    def __bool__(self) -> bool:
+        return len(self.starts) > 0
+    
+    def __contains__(self, code_point: int) -> bool:
+        index = bisect_right(self.starts, code_point) - 1
+        return index >= 0 and code_point <= self.ends[index]
+    
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, IntervalSet):
+            return NotImplemented
+        return self.starts == other.starts and self.ends == other.ends
+    
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash((self.starts.tobytes(), self.ends.tobytes()))
+        return self._hash
+    
+    def __repr__(self) -> str:
+        return f"IntervalSet({list(self)!r})"
+    
+    @property
+    def size(self) -> int:
+        """Number of code points."""
+        return sum(self.ends) - sum(self.starts) + len(self.starts)
+    
+    def __or__(self, other: 'IntervalSet') -> 'IntervalSet':
+        starts: List[int] = []
+        ends: List[int] = []
+        a_starts, a_ends, b_starts, b_ends = self.starts, self.ends, other.starts, other.ends
+        i = j = 0
+        while i < len(a_starts) or j < len(b_starts):
+            if j == len(b_starts) or (i < len(a_starts) and a_starts[i] <= b_starts[j]):
+                low, high = a_starts[i], a_ends[i]
+                i += 1
+            else:
+                low, high = b_starts[j], b_ends[j]
+                j += 1
+            if starts and low <= ends[-1] + 1:
+                if high > ends[-1]:
+                    ends[-1] = high
+            else:
+                starts.append(low)
+                ends.append(high)
+        return IntervalSet(starts, ends)
+    
+    def __and__(self, other: 'IntervalSet') -> 'IntervalSet':
+        starts: List[int] = []
+        ends: List[int] = []
+        a_starts, a_ends, b_starts, b_ends = self.starts, self.ends, other.starts, other.ends
+        i = j = 0
+        while i < len(a_starts) and j < len(b_starts):
+            low = max(a_starts[i], b_starts[j])
+            high = min(a_ends[i], b_ends[j])
+            if low <= high:
+                starts.append(low)
+                ends.append(high)
+            if a_ends[i] < b_ends[j]:
+                i += 1
+            else:
+                j += 1
+        return IntervalSet(starts, ends)
+    
+    def __invert__(self) -> 'IntervalSet':
+        """All code points up to MAX_CODE_POINT that are not in the set."""
+        starts: List[int] = []
+        ends: List[int] = []
+        next_low = 0
+        for low, high in self:
+            if low > next_low:
+                starts.append(next_low)
+                ends.append(low - 1)
+            next_low = high + 1
+        if next_low <= MAX_CODE_POINT:
+            starts.append(next_low)
+            ends.append(MAX_CODE_POINT)
+        return IntervalSet(starts, ends)
+    
+    def __sub__(self, other: 'IntervalSet') -> 'IntervalSet':
+        return self & ~other
+    
+    def __le__(self, other: 'IntervalSet') -> bool:
+        return self.issubset(other)
+    
+    def issubset(self, other: 'IntervalSet') -> bool:
+        """Whether every code point of this set is in ``other``."""
+        j = 0
+        for low, high in self:
+            while j < len(other.starts) and other.ends[j] < low:
+                j += 1
+            if j == len(other.starts) or other.starts[j] > low or other.ends[j] < high:
+                return False
+        return True
+    
+    def isdisjoint(self, other: 'IntervalSet') -> bool:
+        return not self & other
+
+
+EMPTY = IntervalSet()
+ALL = IntervalSet((0,), (MAX_CODE_POINT,))
+
+
+def decode_char(text: str, pos: int) -> Tuple[str, int]:
+    """The character at ``pos``, decoding escapes, and the position after it."""
+    char = text[pos]
+    pos += 1
+    if char != '\\':
+        return char, pos
+    
+    escape = text[pos]
+    pos += 1
+    if escape == 'u':
+        if text.startswith('{', pos):
+            end = text.index('}', pos)
+            code, pos = text[pos + 1:end], end + 1
+        else:
+            code, pos = text[pos:pos + 4], pos + 4
+        try:
+            return chr(int(code, 16)), pos
+        except ValueError:
+            raise CharSetError(f"invalid code point escape \\u{code}") from None
+    return _ESCAPES.get(escape, escape), pos
+
+
+def decode_literal(value: str) -> str:
+    """Characters of a literal, given its text between the quotes."""
+    chars = []
+    pos = 0
+    while pos < len(value):
+        char, pos = decode_char(value, pos)
+        chars.append(char)
+    return ''.join(chars)
+
+
+def read_char_set(text: str, pos: int) -> Tuple[IntervalSet, int]:
+    """Parse the ``[...]`` set starting at ``pos``; return it and the position after it."""
+    if not text.startswith('[', pos):
+        raise CharSetError(f"expected '[' in {text!r}")
+    pos += 1
+    intervals: List[Tuple[int, int]] = []
+    properties: List[IntervalSet] = []
+    while pos < len(text) and text[pos] != ']':
+        if text.startswith(('\\p', '\\P'), pos):
+            negated = text[pos + 1] == 'P'
+            if not text.startswith('{', pos + 2):
+                raise CharSetError(f"expected '{{' after \\{text[pos + 1]} in {text!r}")
+            end = text.index('}', pos)
+            found = unicode_property(text[pos + 3:end])
+            properties.append(~found if negated else found)
+            pos = end + 1
+            continue
+        low, pos = decode_char(text, pos)
+        if text.startswith('-', pos) and pos + 1 < len(text) and text[pos + 1] != ']':
+            high, pos = decode_char(text, pos + 1)
+            if ord(high) < ord(low):
+                raise CharSetError(f"empty range {low!r}-{high!r} in {text!r}")
+            intervals.append((ord(low), ord(high)))
+        else:
+            intervals.append((ord(low), ord(low)))
+    if pos >= len(text):
+        raise CharSetError(f"unterminated character set {text!r}")
+    
+    result = IntervalSet.of(intervals)
+    for found in properties:
+        result = result | found
+    return result, pos + 1
+
+
+def char_set(body: str) -> IntervalSet:
+    """Code points of a character set, given its text between the brackets."""
+    return read_char_set(f"[{body}]", 0)[0]
+
+
+def element_chars(node: ebnf.Node) -> IntervalSet:
+    """Code points that a lexer set element matches as one character.
+    
+    The element is a ``[...]`` set, a ``'a'..'z'`` range, a one-character
+    literal, a wildcard or a ``~`` set of those; others raise CharSetError.
+    """
+    if isinstance(node, ebnf.CharSet):
+        return char_set(node.body)
+    if isinstance(node, ebnf.CharRange):
+        low, high = decode_literal(node.start), decode_literal(node.end)
+        if len(low) == 1 and len(high) == 1:
+            return IntervalSet.range(ord(low), ord(high))
+    elif isinstance(node, ebnf.Literal):
+        characters = decode_literal(node.value)
+        if len(characters) == 1:
+            return IntervalSet.char(characters)
+    elif isinstance(node, ebnf.Wildcard):
+        return ALL
+    elif isinstance(node, ebnf.NotSet):
+        chars = EMPTY
+        for element in node.elements:
+            chars = chars | element_chars(element)
+        return ~chars
+    raise CharSetError(f"unsupported set element {node.text}")
+
+
+def format_char_set(chars: IntervalSet, limit: int = 8) -> str:
+    """ANTLR ``[...]`` syntax for a set, with at most ``limit`` intervals written out."""
+    parts = []
+    for index, (low, high) in enumerate(chars):
+        if index == limit:
+            parts.append("...")
+            break
+        parts.append(_format_char(low) if low == high else f"{_format_char(low)}-{_format_char(high)}")
+    return f"[{''.join(parts)}]"
+
+
+def _format_char(code_point: int) -> str:
+    char = chr(code_point)
+    if char in '\\]-^':
+        return '\\' + char
+    if 0x20 <= code_point < 0x7F:
+        return char
+    for escape, value in _ESCAPES.items():
+        if char == value:
+            return '\\' + escape
+    return f"\\u{code_point:04X}" if code_point <= 0xFFFF else f"\\u{{{code_point:X}}}"
+
+
+def char_set_items(body: str) -> int:
+    """Number of characters, ranges and properties written in a character set."""
+    text = f"[{body}]"
+    items = 0
+    pos = 1
+    while pos < len(text) - 1:
+        if text.startswith(('\\p', '\\P'), pos):
+            pos = text.index('}', pos) + 1
+        else:
+            _, pos = decode_char(text, pos)
+            if text.startswith('-', pos) and pos + 1 < len(text) - 1:
+                _, pos = decode_char(text, pos + 1)
+        items += 1
+    return items
+
+
+def _decode_table(table: str) -> IntervalSet:
+    starts: List[int] = []
+    ends: List[int] = []
+    numbers = [int(number, 36) for number in table.split()]
+    previous = -1
+    for gap, length in zip(numbers[::2], numbers[1::2]):
+        low = previous + 1 + gap
+        previous = low + length
+        starts.append(low)
+        ends.append(previous)
+    return IntervalSet(starts, ends)
+
+
+_CATEGORY_NAMES = {
+    'L': 'Letter', 'LC': 'Cased_Letter', 'Lu': 'Uppercase_Letter', 'Ll': 'Lowercase_Letter',
+    'Lt': 'Titlecase_Letter', 'Lm': 'Modifier_Letter', 'Lo': 'Other_Letter',
+    'M': 'Mark', 'Mn': 'Nonspacing_Mark', 'Mc': 'Spacing_Mark', 'Me': 'Enclosing_Mark',
+    'N': 'Number', 'Nd': 'Decimal_Number', 'Nl': 'Letter_Number', 'No': 'Other_Number',
+    'P': 'Punctuation', 'Pc': 'Connector_Punctuation', 'Pd': 'Dash_Punctuation',
+    'Ps': 'Open_Punctuation', 'Pe': 'Close_Punctuation', 'Pi': 'Initial_Punctuation',
+    'Pf': 'Final_Punctuation', 'Po': 'Other_Punctuation',
+    'S': 'Symbol', 'Sm': 'Math_Symbol', 'Sc': 'Currency_Symbol', 'Sk': 'Modifier_Symbol',
+    'So': 'Other_Symbol',
+    'Z': 'Separator', 'Zs': 'Space_Separator', 'Zl': 'Line_Separator', 'Zp': 'Paragraph_Separator',
+    'C': 'Other', 'Cc': 'Control', 'Cf': 'Format', 'Cs': 'Surrogate', 'Co': 'Private_Use',
+    'Cn': 'Unassigned',
+}
+
+_WHITE_SPACE = IntervalSet.of([
+    (0x09, 0x0D), (0x20, 0x20), (0x85, 0x85), (0xA0, 0xA0), (0x1680, 0x1680), (0x2000, 0x200A),
+    (0x2028, 0x2029), (0x202F, 0x202F), (0x205F, 0x205F), (0x3000, 0x3000),
+])
+
+
+def _loose(name: str) -> str:
+    """Property name for loose matching: case, spaces, hyphens and underscores are ignored."""
+    return ''.join(char for char in name.lower() if char not in ' -_')
+
+
+@lru_cache(maxsize=None)
+def _category(code: str) -> IntervalSet:
+    if code in CATEGORY_TABLES:
+        return _decode_table(CATEGORY_TABLES[code])
+    if code == 'Cn':
+        return ~_assigned()
+    if code == 'LC':
+        return _category('Lu') | _category('Ll') | _category('Lt')
+    result = EMPTY
+    for other in _CATEGORY_NAMES:
+        if len(other) == 2 and other[0] == code and other != 'LC':
+            result = result | _category(other)
+    return result
+
+
+@lru_cache(maxsize=None)
+def _assigned() -> IntervalSet:
+    result = EMPTY
+    for code in CATEGORY_TABLES:
+        result = result | _category(code)
+    return result
+
+
+def _properties() -> Dict[str, str]:
+    names = {}
+    for code, name in _CATEGORY_NAMES.items():
+        names[code.lower()] = code
+        names[_loose(name)] = code
+    return names
+
+
+_PROPERTIES = _properties()
+
+
+def unicode_property(name: str) -> IntervalSet:
+    """Code points of a ``\\p{...}`` property, such as ``Lu``, ``Letter`` or ``gc=Nd``."""
+    loose = _loose(name)
+    if '=' in name:
+        prefix, value = name.split('=', 1)
+        if _loose(prefix) not in ('gc', 'generalcategory'):
+            raise CharSetError(f"unsupported Unicode property {name}")
+        loose = _loose(value)
+    code = _PROPERTIES.get(loose)
+    if code is not None:
+        return _category(code)
+    if loose == 'any':
+        return ALL
+    if loose == 'ascii':
+        return IntervalSet.range(0, 0x7F)
+    if loose == 'assigned':
+        return _assigned()
+    if loose in ('whitespace', 'wspace', 'space'):
+        return _WHITE_SPACE
+    raise CharSetError(f"unsupported Unicode property {name}")
@@ -0,0 +1,417 @@
+"""Lexer DFA built from the lexer ATN of a grammar.
+
+The rules of a lexer mode are combined into one DFA by subset construction
+over the lexer ATN (``atn.build_lexer_atn``), following rule references into
+fragment rules. A DFA state is the ordered list of ATN configurations the
+lexer simulator of the ANTLR runtime would hold. Accepting states report the
+earliest rule, which is how ANTLR resolves matches of equal length. Rules that
+cannot be expressed this way (recursive rules, unsupported Unicode properties,
+references to unknown rules) are left out of the DFA and listed in
+``LexerDFA.unsupported``.
+
+Subset construction stops at ``max_states`` DFA states (``MAX_DFA_STATES`` by
+default); the DFA is then marked ``truncated`` and the states past the cap
+are missing, so ``match`` may reject texts the lexer would accept.
+"""
+
+import bisect
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from antlr4.Token import Token
+from antlr4.atn.ATNState import ATNState
+from antlr4.atn.Transition import Transition
+
+from . import ebnf
+from .analysis import _components
+from .atn import ATN
+from .intervals import MAX_CODE_POINT
+
+# States after which subset construction stops
+MAX_DFA_STATES = 10000
+
+# An ATN state, the follow states of the rule references it was reached
+# through, the position of the token rule being matched, and whether it was
+# reached through a non-greedy decision
+Config = Tuple[int, Tuple[int, ...], int, bool]
+
+_READING = frozenset({
+    Transition.ATOM, Transition.RANGE, Transition.SET, Transition.NOT_SET, Transition.WILDCARD,
+})
+
+
+@dataclass
+class LexerDFA:
+    """Deterministic automaton recognizing the tokens of one lexer mode.
+    
+    Code points are grouped into classes: class ``i`` covers
+    ``boundaries[i] <= cp < boundaries[i + 1]``. ``accepts[state]`` is the
+    index into ``rule_names`` of the rule that wins in that state.
+    
+    ``rule_states[i]`` counts the DFA states in which rule ``i`` can still
+    match, and ``rule_boundaries[i]`` the class boundaries its character
+    sets and literals put into the alphabet.
+    """
+    mode: Optional[str]
+    rule_names: List[str]
+    boundaries: List[int]
+    transitions: List[Dict[int, int]]
+    accepts: List[Optional[int]]
+    unsupported: Dict[str, str] = field(default_factory=dict)
+    truncated: bool = False
+    rule_states: List[int] = field(default_factory=list)
+    rule_boundaries: List[int] = field(default_factory=list)
+    
+    @property
+    def state_count(self) -> int:
+        return len(self.transitions)
+    
+    @property
+    def class_count(self) -> int:
+        """Number of character classes the code points are split into."""
+        return len(self.boundaries) - 1
+    
+    def char_class(self, code_point: int) -> int:
+        return bisect.bisect_right(self.boundaries, code_point) - 1
+    
+    def match(self, text: str) -> Optional[str]:
+        """Name of the rule that matches all of ``text``, if any."""
+        state = 0
+        for char in text:
+            state = self.transitions[state].get(self.char_class(ord(char)))
+            if state is None:
+                return None
+        accept = self.accepts[state]
+        return self.rule_names[accept] if accept is not None else None
+
+
+def _reads(transition_type: int, arg: int) -> bool:
+    """Whether a transition reads a character; EOF matches without reading one."""
+    return transition_type in _READING and not (transition_type == Transition.ATOM and arg == Token.EOF)
+
+
+def _consumed(atn: ATN, transition_type: int, arg: int, arg2: int) -> List[Tuple[int, int]]:
+    """Code point intervals a transition reads."""
+    if not _reads(transition_type, arg):
+        return []
+    if transition_type == Transition.ATOM:
+        return [(arg, arg)]
+    if transition_type == Transition.RANGE:
+        return [(arg, arg2)]
+    if transition_type == Transition.SET:
+        return list(atn.sets[arg])
+    if transition_type == Transition.NOT_SET:
+        return list(~atn.sets[arg])
+    return [(0, MAX_CODE_POINT)]
+
+
+def _token_problem(atn: ATN, rule: int, points: Set[int]) -> Optional[str]:
+    """Why a token rule cannot be part of the DFA, if it cannot.
+    
+    Walks the states of the rule and of the rules it references, adding the
+    bounds of the intervals they read to ``points``.
+    """
+    calls: Dict[int, Set[int]] = {rule: set()}
+    stack = [atn.rule_start_states[rule]]
+    seen = set(stack)
+    while stack:
+        state = stack.pop()
+        for transition_type, target, arg, arg2 in atn.transitions(state):
+            following = [target]
+            if transition_type == Transition.RULE:
+                calls[atn.state_rules[state]].add(arg)
+                calls.setdefault(arg, set())
+                following.append(arg2)
+            else:
+                for low, high in _consumed(atn, transition_type, arg, arg2):
+                    points.update((low, high + 1))
+            for successor in following:
+                if successor not in seen:
+                    seen.add(successor)
+                    stack.append(successor)
+    
+    for called in calls:
+        problem = atn.unsupported.get(atn.rule_names[called])
+        if problem is not None:
+            return problem
+    for component in _components(calls):
+        if len(component) > 1 or component[0] in calls[component[0]]:
+            return f"recursive reference to {atn.rule_names[component[0]]}"
+    return None
+
+
+class _SubsetBuilder:
+    """Epsilon closures and moves of ATN configurations.
+    
+    As in the lexer simulator of the runtime, once a token reaches its stop
+    state the configurations of that token that passed through a non-greedy
+    decision are dropped, which ends ``.*?`` loops at the shortest match.
+    """
+    
+    def __init__(self, atn: ATN, boundaries: List[int]):
+        self.atn = atn
+        self.boundaries = boundaries
+        self.non_greedy = {
+            state for state, node in zip(atn.decision_states, atn.decision_nodes)
+            if isinstance(node, ebnf.Suffixed) and not node.greedy
+        }
+        self._closures: Dict[Tuple[Config, bool], Tuple[Tuple[Config, ...], bool]] = {}
+        self._moves: Dict[int, List[Tuple[int, int, int]]] = {}
+    
+    def config(self, state: int, follow: Tuple[int, ...], token: int, non_greedy: bool) -> Config:
+        return state, follow, token, non_greedy or state in self.non_greedy
+    
+    def start(self, rules: Sequence[int]) -> Tuple[Config, ...]:
+        """Configurations of the start state, one token rule after the other."""
+        reached: Dict[Config, None] = {}
+        for token, rule in enumerate(rules):
+            closure, _ = self.closure(self.config(self.atn.rule_start_states[rule], (), token, False), False)
+            reached.update(dict.fromkeys(closure))
+        return tuple(reached)
+    
+    def step(self, moved: Sequence[Tuple[Config, int]]) -> Tuple[Config, ...]:
+        """Configurations after reading a character, given each configuration that reads it and its target."""
+        reached: Dict[Config, None] = {}
+        accepted_token = None
+        for (_, follow, token, non_greedy), target in moved:
+            accepted = token == accepted_token
+            if accepted and non_greedy:
+                continue
+            closure, accepts = self.closure(self.config(target, follow, token, non_greedy), accepted)
+            reached.update(dict.fromkeys(closure))
+            if accepts:
+                accepted_token = token
+        return tuple(reached)
+    
+    def closure(self, config: Config, accepted: bool) -> Tuple[Tuple[Config, ...], bool]:
+        key = (config, accepted)
+        closure = self._closures.get(key)
+        if closure is None:
+            closure = self._closures[key] = self._closure(config, accepted)
+        return closure
+    
+    def _closure(self, config: Config, accepted: bool) -> Tuple[Tuple[Config, ...], bool]:
+        """Depth-first closure of one configuration, and whether its token is accepted.
+        
+        Only the configurations that read input or accept a token are kept;
+        the others only lead to them.
+        """
+        atn = self.atn
+        reached: List[Config] = []
+        stack = [config]
+        seen = {config}
+        while stack:
+            state, follow, token, non_greedy = current = stack.pop()
+            if atn.state_types[state] == ATNState.RULE_STOP:
+                if not follow:
+                    reached.append(current)
+                    accepted = True
+                    continue
+                following = [self.config(follow[-1], follow[:-1], token, non_greedy)]
+            else:
+                following = []
+                reads = False
+                for transition_type, target, arg, arg2 in atn.transitions(state):
+                    if transition_type == Transition.RULE:
+                        following.append(self.config(target, follow + (arg2,), token, non_greedy))
+                    elif _reads(transition_type, arg):
+                        reads = True
+                    else:
+                        following.append(self.config(target, follow, token, non_greedy))
+                if reads and not (accepted and non_greedy):
+                    reached.append(current)
+            for successor in reversed(following):
+                if successor not in seen:
+                    seen.add(successor)
+                    stack.append(successor)
+        return tuple(reached), accepted
+    
+    def moves(self, state: int) -> List[Tuple[int, int, int]]:
+        """First and past-the-last character class and target of each transition reading input."""
+        moves = self._moves.get(state)
+        if moves is None:
+            moves = self._moves[state] = []
+            for transition_type, target, arg, arg2 in self.atn.transitions(state):
+                for low, high in _consumed(self.atn, transition_type, arg, arg2):
+                    moves.append((bisect.bisect_left(self.boundaries, low),
+                                  bisect.bisect_left(self.boundaries, high + 1), target))
+        return moves
+
+
+def build_lexer_dfa(atn: ATN, rule_names: Sequence[str], mode: Optional[str] = None,
+                    max_states: int = MAX_DFA_STATES) -> LexerDFA:
+    """Build the DFA for the given non-fragment rules of one mode of the lexer ATN."""
+    tokens: List[int] = []
+    included: List[str] = []
+    unsupported: Dict[str, str] = {}
+    # Split the code point space at every range boundary read by a token
+    points = {0, MAX_CODE_POINT + 1}
+    rule_points: List[Set[int]] = []
+    
+    for name in rule_names:
+        rule = atn.rule_index(name)
+        if rule is None:
+            unsupported[name] = f"reference to unknown lexer rule {name}"
+            continue
+        token_points: Set[int] = set()
+        problem = _token_problem(atn, rule, token_points)
+        if problem is not None:
+            unsupported[name] = problem
+            continue
+        tokens.append(rule)
+        included.append(name)
+        rule_points.append(token_points)
+        points |= token_points
+    boundaries = sorted(points)
+    
+    builder = _SubsetBuilder(atn, boundaries)
+    stop_states = set(atn.rule_stop_states)
+    initial = builder.start(tokens)
+    state_ids = {initial: 0}
+    worklist = [initial]
+    transitions: List[Dict[int, int]] = []
+    accepts: List[Optional[int]] = []
+    rule_states = [0] * len(tokens)
+    truncated = False
+    
+    while worklist:
+        configs = worklist.pop()
+        state_id = state_ids[configs]
+        while len(transitions) <= state_id:
+            transitions.append({})
+            accepts.append(None)
+        
+        # Configurations keep the order of the rules, so the first accepting
+        # one is of the earliest rule
+        accepts[state_id] = next((config[2] for config in configs if config[0] in stop_states), None)
+        for token in {config[2] for config in configs}:
+            rule_states[token] += 1
+        
+        moves: Dict[int, List[Tuple[Config, int]]] = {}
+        for config in configs:
+            for first, last, target in builder.moves(config[0]):
+                for char_class in range(first, last):
+                    moves.setdefault(char_class, []).append((config, target))
+        
+        steps: Dict[Tuple[Tuple[Config, int], ...], Tuple[Config, ...]] = {}
+        for char_class, moved in moves.items():
+            key = tuple(moved)
+            next_configs = steps.get(key)
+            if next_configs is None:
+                next_configs = steps[key] = builder.step(moved)
+            next_id = state_ids.get(next_configs)
+            if next_id is None:
+                if len(state_ids) >= max_states:
+                    truncated = True
+                    continue
+                next_id = state_ids[next_configs] = len(state_ids)
+                worklist.append(next_configs)
+            transitions[state_id][char_class] = next_id
+    
+    while len(transitions) < len(state_ids):
+        transitions.append({})
+        accepts.append(None)
+    
+    return LexerDFA(
+        mode=mode,
+        rule_names=included,
+        boundaries=boundaries,
+        transitions=transitions,
+        accepts=accepts,
+        unsupported=unsupported,
+        truncated=truncated,
+        rule_states=rule_states,
+        rule_boundaries=[len(found - {0, MAX_CODE_POINT + 1}) for found in rule_points]
+    )
+
+
+@dataclass
+class Rescan:
+    """How far the lexer can read past a token before falling back to it.
+    
+    ``distance`` is the most characters read after the end of ``token``
+    while looking for a longer match that then fails, or None if there is
+    no bound. Those characters are scanned again for the next token.
+    ``candidates`` are the rules whose longer matches are attempted.
+    """
+    token: str
+    distance: Optional[int]
+    candidates: List[str]
+
+
+def rescan_distances(dfa: LexerDFA) -> List[Rescan]:
+    """Worst-case rescanning distance of each token that a longer match can fall back to.
+    
+    The lexer backs up when it leaves an accepting state and reaches a dead
+    end through states that accept nothing. The longest such path is found
+    on the strongly connected components of the non-accepting states; a
+    cycle among them makes the distance unbounded. On truncated DFAs the
+    distances are lower bounds.
+    """
+    pending = {
+        state: {target for target in transitions.values() if dfa.accepts[target] is None}
+        for state, transitions in enumerate(dfa.transitions)
+        if state != 0 and dfa.accepts[state] is None
+    }
+    # Non-accepting states on the longest path from each state; None for unbounded
+    longest: Dict[int, Optional[int]] = {}
+    for component in _components(pending):
+        if len(component) > 1 or component[0] in pending[component[0]]:
+            for state in component:
+                longest[state] = None
+            continue
+        state = component[0]
+        following = [longest[target] for target in pending[state]]
+        longest[state] = None if None in following else 1 + max(following, default=0)
+    
+    worst: Dict[int, Tuple[Optional[int], List[int]]] = {}
+    for state, transitions in enumerate(dfa.transitions):
+        token = dfa.accepts[state]
+        if token is None:
+            continue
+        for target in set(transitions.values()):
+            if target not in pending:
+                continue
+            distance = longest[target]
+            current = worst.get(token)
+            if current is None or _further(distance, current[0]):
+                worst[token] = (distance, [target])
+            elif distance == current[0]:
+                current[1].append(target)
+    
+    return [
+        Rescan(dfa.rule_names[token], distance, _accepted_from(dfa, pending, starts))
+        for token, (distance, starts) in sorted(worst.items())
+    ]
+
+
+def _further(distance: Optional[int], other: Optional[int]) -> bool:
+    if other is None:
+        return False
+    return distance is None or distance > other
+
+
+def _accepted_from(dfa: LexerDFA, pending: Dict[int, set], starts: List[int]) -> List[str]:
+    """Rules accepted by the first accepting states reachable through non-accepting ones."""
+    seen = set(starts)
+    stack = list(starts)
+    accepted = set()
+    while stack:
+        for target in dfa.transitions[stack.pop()].values():
+            if dfa.accepts[target] is not None:
+                accepted.add(dfa.accepts[target])
+            elif target not in seen:
+                seen.add(target)
+                stack.append(target)
+    return [dfa.rule_names[index] for index in sorted(accepted)]
+
+
+def build_lexer_dfas(atn: Optional[ATN]) -> Dict[Optional[str], LexerDFA]:
+    """Build one DFA per mode of the lexer ATN."""
+    if atn is None:
+        return {}
+    return {
+        mode: build_lexer_dfa(atn, [atn.rule_names[atn.state_rules[target]]
+                                    for _, target, _, _ in atn.transitions(start)], mode)
+        for mode, start in atn.mode_start_states.items()
+    }
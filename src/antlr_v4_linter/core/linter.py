@@ -1,20 +1,63 @@
+import asyncio
+import dataclasses
 import fnmatch
+import hashlib
+import os
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
-from typing import List, Union
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
 
-from .parser import AntlrGrammarParser
+from .parser import AntlrGrammarParser, DFACache
 from .models import GrammarAST, LintResult, LinterConfig
 from .reporter import Reporter, ReporterFactory
-from .rule_engine import RuleEngine
+from .rule_engine import ExecutionPlan, RuleEngine
+from .stats import LintObserver, LintStats, ObserverGroup
+
+# Worker threads of the async API; more threads mostly add GIL contention
+DEFAULT_ASYNC_WORKERS = min(4, os.cpu_count() or 1)
+
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+def _content_digest(file_path: str) -> Optional[str]:
+    """Hash of a file's content, or None if the file cannot be read."""
+    digest = hashlib.sha256()
+    try:
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def _duplicate_result(original: LintResult, file_path: str) -> LintResult:
+    """The result of ``original`` reported for another file with the same content."""
+    return LintResult(
+        file_path=file_path,
+        issues=[dataclasses.replace(issue, file_path=file_path) for issue in original.issues],
+        duplicate_of=original.file_path
+    )
 
 
 class ANTLRLinter:
     """Main linter class that coordinates parsing, rule checking, and reporting."""
     
-    def __init__(self, config: LinterConfig = None):
+    def __init__(self, config: LinterConfig = None, max_workers: Optional[int] = None,
+                 dfa_cache: DFACache = DFACache.LOCKED):
         self.config = config or LinterConfig.default()
-        self.parser = AntlrGrammarParser()
+        # Size of the thread pool used by the async API, created on first use
+        self.max_workers = max_workers or DEFAULT_ASYNC_WORKERS
+        self._executor: Optional[Executor] = None
+        self.parser = AntlrGrammarParser(dfa_cache)
         self.rule_engine = RuleEngine()
+        # Set to a LintStats instance to collect timings (--stats)
+        self.stats: Optional[LintStats] = None
+        # Set to receive the same timing events, e.g. a TraceRecorder (--trace)
+        self.tracer: Optional[LintObserver] = None
+        # Set to a MemoryProfiler to measure memory per phase (--memory-report)
+        self.memory: Optional[LintObserver] = None
         self._register_default_rules()
     
     def _register_default_rules(self) -> None:
@@ -50,7 +93,10 @@ class ANTLRLinter:
         )
         from ..rules.performance_rules import (
             BacktrackingRule,
-            InefficientLexerRule
+            InefficientLexerRule,
+            DeepLookaheadRule,
+            LexerStateExplosionRule,
+            LexerRescanningRule
         )
         from ..rules.documentation_rules import (
             MissingRuleDocumentationRule,
@@ -88,9 +134,12 @@ class ANTLRLinter:
             MissingErrorRecoveryRule(),
             PotentialAmbiguityRule(),
             
-            # Performance (P001-P002)
+            # Performance (P001-P005)
             BacktrackingRule(),
             InefficientLexerRule(),
+            DeepLookaheadRule(),
+            LexerStateExplosionRule(),
+            LexerRescanningRule(),
             
             # Documentation (D001-D002)
             MissingRuleDocumentationRule(),
@@ -101,43 +150,195 @@ class ANTLRLinter:
     
     def lint_file(self, file_path: str) -> LintResult:
         """Lint a single grammar file."""
+        return self._lint_file(file_path, self.rule_engine.compile(self.config))
+    
+    def _lint_file(self, file_path: str, plan: ExecutionPlan,
+                   content: Optional[str] = None) -> LintResult:
+        """Lint a single grammar file with a compiled execution plan.
+        
+        ``content`` is the text of the file when it has already been read.
+        """
         # Check if file should be excluded
         if self._should_exclude_file(file_path):
             return LintResult(file_path=file_path, issues=[])
         
+        if self.stats is not None:
+            self.stats.files += 1
+        observer = self.observer
+        
         try:
             # Parse the grammar
-            grammar = self.parser.parse_file(file_path)
+            if content is None:
+                grammar = self.parser.parse_file(file_path, plan.facets, observer)
+            else:
+                grammar = self.parser.parse_content(content, file_path, plan.facets, observer)
             
             # Run linting rules
-            issues = self.rule_engine.run_rules(grammar, self.config)
+            with self._phase("rules", file_path):
+                issues = self.rule_engine.run_plan(grammar, plan, observer)
             
             return LintResult(file_path=file_path, issues=issues)
         
         except Exception as e:
-            # Create an error issue for parsing failures
-            from .models import Issue, Position, Range, Severity
-            
-            error_issue = Issue(
-                rule_id="PARSE_ERROR",
-                severity=Severity.ERROR,
-                message=f"Failed to parse grammar file: {str(e)}",
-                file_path=file_path,
-                range=Range(Position(1, 1), Position(1, 1))
-            )
-            
-            return LintResult(file_path=file_path, issues=[error_issue])
+            return self._error_result(file_path, e)
+    
+    def _error_result(self, file_path: str, error: Exception) -> LintResult:
+        """Create the result reported for a file that could not be parsed."""
+        from .models import Issue, Position, Range, Severity
+        
+        error_issue = Issue(
+            rule_id="PARSE_ERROR",
+            severity=Severity.ERROR,
+            message=f"Failed to parse grammar file: {str(error)}",
+            file_path=file_path,
+            range=Range(Position(1, 1), Position(1, 1))
+        )
+        
+        return LintResult(file_path=file_path, issues=[error_issue])
     
     def lint_files(self, file_paths: List[str]) -> List[LintResult]:
-        """Lint multiple grammar files."""
+        """Lint multiple grammar files.
+        
+        Files are hashed first and each distinct content is linted once; the
+        other files with the same content get a copy of its issues, marked
+        with ``duplicate_of``.
+        """
+        results = []
+        
+        # Resolve the configuration once for the whole run
+        plan = self.rule_engine.compile(self.config)
+        
+        with self._phase("hash"):
+            digests = [
+                None if self._should_exclude_file(file_path) else _content_digest(file_path)
+                for file_path in file_paths
+            ]
+        
+        first_results: Dict[str, LintResult] = {}
+        for file_path, digest in zip(file_paths, digests):
+            if digest in first_results:
+                results.append(_duplicate_result(first_results[digest], file_path))
+                continue
+            
+            result = self._lint_file(file_path, plan)
+            if digest is not None:
+                first_results[digest] = result
+            results.append(result)
+        
+        return results
+    
+    def lint_content(self, content: str, virtual_path: str = "<string>") -> LintResult:
+        """Lint grammar text without touching the filesystem.
+        
+        ``virtual_path`` is reported as the file path of the result and its
+        issues, and is matched against the exclude patterns.
+        """
+        return self._lint_file(virtual_path, self.rule_engine.compile(self.config), content)
+    
+    def lint_batch(self, sources: Iterable[Tuple[str, str]]) -> List[LintResult]:
+        """Lint ``(virtual_path, content)`` pairs, returning results in input order.
+        
+        Identical contents are linted once, as in lint_files().
+        """
+        plan = self.rule_engine.compile(self.config)
         results = []
+        first_results: Dict[str, LintResult] = {}
         
-        for file_path in file_paths:
-            result = self.lint_file(file_path)
+        for virtual_path, content in sources:
+            digest = None
+            if not self._should_exclude_file(virtual_path):
+                digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+                if digest in first_results:
+                    results.append(_duplicate_result(first_results[digest], virtual_path))
+                    continue
+            
+            result = self._lint_file(virtual_path, plan, content)
+            if digest is not None:
+                first_results[digest] = result
             results.append(result)
         
         return results
     
+    async def lint_file_async(self, file_path: str,
+                              executor: Optional[Executor] = None) -> LintResult:
+        """Lint a single grammar file without blocking the event loop.
+        
+        The file is read on the event loop's default executor, then parsed and
+        checked on ``executor`` (a thread pool) or on the linter's own pool.
+        """
+        plan = self.rule_engine.compile(self.config)
+        return await self._lint_file_async(file_path, plan, executor)
+    
+    async def lint_content_async(self, content: str, file_path: str = "<string>",
+                                 executor: Optional[Executor] = None) -> LintResult:
+        """Lint grammar text without blocking the event loop."""
+        plan = self.rule_engine.compile(self.config)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor or self._get_executor(),
+                                          self._lint_file, file_path, plan, content)
+    
+    async def lint_files_async(self, file_paths: Iterable[str],
+                               max_concurrency: Optional[int] = None,
+                               executor: Optional[Executor] = None) -> AsyncIterator[LintResult]:
+        """Lint several grammar files, yielding each result as soon as it is ready.
+        
+        At most ``max_concurrency`` files (by default ``max_workers``) are in
+        flight at once, so reading one file overlaps with linting another.
+        Closing the generator, or cancelling the task iterating it, cancels
+        the files that have not started; files already being linted finish
+        in the background and their results are dropped.
+        """
+        plan = self.rule_engine.compile(self.config)
+        limit = asyncio.Semaphore(max_concurrency or self.max_workers)
+        
+        async def lint_one(file_path: str) -> LintResult:
+            async with limit:
+                return await self._lint_file_async(file_path, plan, executor)
+        
+        tasks = [asyncio.ensure_future(lint_one(file_path)) for file_path in file_paths]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def _lint_file_async(self, file_path: str, plan: ExecutionPlan,
+                               executor: Optional[Executor]) -> LintResult:
+        if self._should_exclude_file(file_path):
+            return LintResult(file_path=file_path, issues=[])
+        
+        loop = asyncio.get_running_loop()
+        try:
+            content = await loop.run_in_executor(None, self._read_file, file_path)
+        except (OSError, UnicodeDecodeError) as e:
+            return self._error_result(file_path, e)
+        
+        return await loop.run_in_executor(executor or self._get_executor(),
+                                          self._lint_file, file_path, plan, content)
+    
+    def _read_file(self, file_path: str) -> str:
+        with self._phase("read", file_path):
+            try:
+                with open(file_path, "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                raise FileNotFoundError(f"Grammar file not found: {file_path}") from None
+        return data.decode("utf-8")
+    
+    def _get_executor(self) -> Executor:
+        """The linter's own worker pool for the async API."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix="antlr-lint")
+        return self._executor
+    
+    def close(self) -> None:
+        """Shut down the worker pool of the async API, if it was started."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+    
     def lint_directory(self, directory: str, pattern: str = "*.g4") -> List[LintResult]:
         """Lint all grammar files in a directory."""
         directory_path = Path(directory)
@@ -153,6 +354,24 @@ class ANTLRLinter:
         
         return self.lint_files(file_paths)
     
+    @property
+    def observer(self) -> Optional[LintObserver]:
+        """The observer receiving timing events, or None when timing is off."""
+        # Memory comes first so its snapshots fall outside the timed spans
+        observers = [o for o in (self.memory, self.stats, self.tracer) if o is not None]
+        if not observers:
+            return None
+        if len(observers) == 1:
+            return observers[0]
+        return ObserverGroup(observers)
+    
+    def _phase(self, name: str, file_path: Optional[str] = None):
+        """Time a pipeline phase when statistics or tracing are enabled."""
+        observer = self.observer
+        if observer is None:
+            return nullcontext()
+        return observer.phase(name, file_path)
+    
     def _should_exclude_file(self, file_path: str) -> bool:
         """Check if file should be excluded based on patterns."""
         file_name = Path(file_path).name
@@ -0,0 +1,200 @@
+"""Trie of the string literals used by the lexer rules of one mode.
+
+The index is built once per grammar and mode, and answers in time
+proportional to the length of the literal which rules use or define a literal
+and which literals are prefixes of it. Walking the trie alongside a
+``LexerDFA`` finds every literal a token (an identifier rule, say) also
+matches while visiting each trie node at most once.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from . import ebnf
+from .intervals import decode_literal
+from .lexer_dfa import LexerDFA
+from .models import Element, GrammarAST, Rule
+
+
+@dataclass
+class LiteralEntry:
+    """One literal and the lexer rules that use it.
+    
+    ``text`` is the decoded literal, or None if its escapes are invalid;
+    ``raw`` is how its first use spells it, quotes included. ``uses`` are the
+    top-level literal elements spelling it and ``rules`` the names of the
+    rules whose whole pattern is this literal.
+    """
+    text: Optional[str]
+    raw: Optional[str] = None
+    uses: List[Tuple[Rule, Element]] = field(default_factory=list)
+    rules: List[str] = field(default_factory=list)
+
+
+class LiteralIndex:
+    """Literals of one lexer mode, stored in a character trie."""
+    
+    def __init__(self, mode: Optional[str] = None):
+        self.mode = mode
+        # Node 0 is the root; each node maps a character to its child node
+        self._children: List[Dict[str, int]] = [{}]
+        self._entries: List[Optional[LiteralEntry]] = [None]
+        # Literals whose escapes cannot be decoded, by raw text
+        self._undecoded: Dict[str, LiteralEntry] = {}
+        self._order: List[LiteralEntry] = []
+    
+    def __len__(self) -> int:
+        return len(self._order)
+    
+    def __iter__(self) -> Iterator[LiteralEntry]:
+        """Entries in the order their literals first appear."""
+        return iter(self._order)
+    
+    def __contains__(self, text: str) -> bool:
+        return self.get(text) is not None
+    
+    def add_use(self, rule: Rule, element: Element) -> LiteralEntry:
+        """Record a literal element of a rule."""
+        entry = self._entry(element.text)
+        if entry.raw is None:
+            entry.raw = element.text
+        entry.uses.append((rule, element))
+        return entry
+    
+    def add_rule(self, rule: Rule, text: str) -> LiteralEntry:
+        """Record a rule whose whole pattern is the decoded literal ``text``."""
+        entry = self._entry(None, text)
+        entry.rules.append(rule.name)
+        return entry
+    
+    def _entry(self, raw: Optional[str], text: Optional[str] = None) -> LiteralEntry:
+        if text is None:
+            try:
+                text = decode_literal(raw[1:-1])
+            except (ValueError, IndexError):
+                entry = self._undecoded.get(raw)
+                if entry is None:
+                    entry = self._undecoded[raw] = self._new_entry(None)
+                return entry
+        node = 0
+        for char in text:
+            child = self._children[node].get(char)
+            if child is None:
+                child = len(self._children)
+                self._children[node][char] = child
+                self._children.append({})
+                self._entries.append(None)
+            node = child
+        if self._entries[node] is None:
+            self._entries[node] = self._new_entry(text)
+        return self._entries[node]
+    
+    def _new_entry(self, text: Optional[str]) -> LiteralEntry:
+        entry = LiteralEntry(text)
+        self._order.append(entry)
+        return entry
+    
+    def _node(self, text: str) -> Optional[int]:
+        node = 0
+        for char in text:
+            node = self._children[node].get(char)
+            if node is None:
+                return None
+        return node
+    
+    def get(self, text: str) -> Optional[LiteralEntry]:
+        """The entry of a decoded literal, if any rule uses or defines it."""
+        node = self._node(text)
+        return self._entries[node] if node is not None else None
+    
+    def rules_for(self, text: str) -> List[str]:
+        """Names of the rules whose whole pattern is ``text``."""
+        entry = self.get(text)
+        return list(entry.rules) if entry is not None else []
+    
+    def prefixes(self, text: str) -> List[LiteralEntry]:
+        """Entries of the literals that are proper prefixes of ``text``, shortest first."""
+        found = []
+        node = 0
+        for char in text[:-1]:
+            node = self._children[node].get(char)
+            if node is None:
+                break
+            if self._entries[node] is not None:
+                found.append(self._entries[node])
+        return found
+    
+    def prefix_pairs(self) -> Iterator[Tuple[LiteralEntry, LiteralEntry]]:
+        """Each pair (shorter, longer) where one literal is a proper prefix of the other.
+        
+        These are the longest-match hazards: after reading the shorter literal
+        the lexer keeps going in case the input spells the longer one.
+        """
+        # Depth-first, keeping the literals on the path from the root
+        stack = [(0, ())]
+        while stack:
+            node, above = stack.pop()
+            entry = self._entries[node]
+            if entry is not None:
+                for shorter in above:
+                    yield shorter, entry
+                above = above + (entry,)
+            for child in reversed(list(self._children[node].values())):
+                stack.append((child, above))
+    
+    def accepted_by(self, dfa: LexerDFA) -> Iterator[LiteralEntry]:
+        """Entries of the literals that ``dfa`` matches in full.
+        
+        The trie and the automaton are walked together, so a branch is
+        abandoned as soon as the automaton rejects its prefix.
+        """
+        if not dfa.transitions:
+            return
+        stack = [(0, 0)]
+        while stack:
+            node, state = stack.pop()
+            entry = self._entries[node]
+            if entry is not None and entry.text is not None and dfa.accepts[state] is not None:
+                yield entry
+            transitions = dfa.transitions[state]
+            for char, child in reversed(list(self._children[node].items())):
+                target = transitions.get(dfa.char_class(ord(char)))
+                if target is not None:
+                    stack.append((child, target))
+
+
+def literal_text(rule: Rule) -> Optional[str]:
+    """Text of a rule that is a single literal, or a sequence of them."""
+    if len(rule.alternatives) != 1 or rule.alternatives[0].node is None:
+        return None
+    elements = rule.alternatives[0].node.elements
+    if not elements or not all(isinstance(element, ebnf.Literal) for element in elements):
+        return None
+    try:
+        return "".join(decode_literal(element.value) for element in elements)
+    except (ValueError, IndexError):
+        return None
+
+
+def is_literal_element(element: Element) -> bool:
+    """Whether a top-level element of a lexer rule is a quoted literal."""
+    return element.element_type == "terminal" and len(element.text) >= 2 and element.text[0] in "'\""
+
+
+def build_literal_indexes(grammar: GrammarAST) -> Dict[Optional[str], LiteralIndex]:
+    """Index the literals of the lexer rules, one trie per lexer mode."""
+    indexes: Dict[Optional[str], LiteralIndex] = {}
+    for rule in grammar.rules:
+        if not rule.is_lexer_rule:
+            continue
+        index = indexes.get(rule.mode)
+        if index is None:
+            index = indexes[rule.mode] = LiteralIndex(rule.mode)
+        for alternative in rule.alternatives:
+            for element in alternative.elements:
+                if is_literal_element(element):
+                    index.add_use(rule, element)
+        text = literal_text(rule)
+        if text is not None:
+            index.add_rule(rule, text)
+    return indexes
@@ -0,0 +1,378 @@
+"""Bounded LL(k) lookahead of parser decisions.
+
+A decision is the choice between the alternatives of a parser rule or of a
+block with more than one alternative, or between entering (or going round
+again) and leaving an optional block or loop. For each decision whose LL(1)
+lookahead sets overlap (see GrammarAnalysis.conflicts), the analysis finds
+the smallest k for which the alternatives' LL(k) lookahead sets are
+disjoint, up to a cap.
+
+The decision is simulated on the EBNF trees. Each alternative starts as a
+set of configurations: what remains to be matched, and the call stack of
+rule references. Only the lookahead prefixes that two or more alternatives
+share are extended by another token, and tokens that lead to the same
+configurations are followed together, as one class. The successors of a
+configuration are memoized for the whole grammar, so prefixes shared
+between decisions are only expanded once.
+
+When a configuration reaches the end of the decision's rule with an empty
+call stack, the simulation continues after every reference to the rule,
+like ANTLR's SLL prediction. The k found can therefore be larger than what
+full-context prediction needs, but no conflict is missed.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from . import ebnf
+from .analysis import (
+    EOF,
+    GrammarAnalysis,
+    _components,
+    _is_left_recursive,
+    _is_predicated,
+    left_recursion_loop,
+)
+
+# Configurations stepped or expanded for one decision before the analysis
+# gives up on it
+MAX_WORK = 100000
+
+
+class _Cell:
+    """Cons cell of a continuation or call stack.
+    
+    Cells are created through LookaheadAnalysis._cell and shared, so two
+    cells are equal exactly when they are the same object.
+    """
+    __slots__ = ("head", "tail", "size")
+    
+    def __init__(self, head: object, tail: Optional["_Cell"]):
+        self.head = head
+        self.tail = tail
+        self.size = 1 if tail is None else tail.size + 1
+
+
+class _RuleEnd:
+    """Marks the end of a rule in a continuation."""
+    __slots__ = ("name",)
+    
+    def __init__(self, name: str):
+        self.name = name
+
+
+# What remains to be matched, and the continuations of the calling rules
+Configuration = Tuple[Optional[_Cell], Optional[_Cell]]
+# Tokens matched next, and the configuration that follows them
+Step = Tuple[int, Configuration]
+
+
+@dataclass
+class LookaheadDecision:
+    """A decision that needs more than one token of lookahead."""
+    rule_name: str
+    block: Optional[ebnf.Node]  # None for the alternatives of the rule itself
+    k: Optional[int]  # None if the alternatives are not LL(k) for any k up to the cap
+    alternatives: Tuple[int, ...]  # Zero-based indexes of the alternatives still in conflict at k
+    ambiguous: bool  # Two alternatives can match the same input
+    cost: int  # Configurations stepped to find k, an estimate of the cost of prediction
+
+
+class LookaheadAnalysis:
+    """Minimal LL(k) lookahead of the decisions of the analyzed parser rules."""
+    
+    def __init__(self, analysis: GrammarAnalysis):
+        self.analysis = analysis
+        self._eof = analysis.vocabulary.bit(EOF)
+        self._cells: Dict[Tuple[int, int], _Cell] = {}
+        self._loops: Dict[int, ebnf.Closure] = {}
+        self._steps: Dict[Configuration, List[Step]] = {}
+        self._decisions: Dict[Tuple[str, int], List[LookaheadDecision]] = {}
+        self._exits: Optional[Dict[str, List[Step]]] = None
+        self._expanded = 0  # Configurations expanded by _closure so far
+        
+        # Continuations of the alternatives of a rule when the rule is
+        # entered, of each reference to a rule, and of each block, optional
+        # block and loop
+        self._ends: Dict[str, _Cell] = {}
+        self._entries: Dict[str, List[_Cell]] = {}
+        self._call_sites: Dict[str, List[_Cell]] = {}
+        self._after: Dict[int, _Cell] = {}
+        for name, rule in analysis.rules.items():
+            end = self._cell(_RuleEnd(name), None)
+            primary = [alt.node for alt in rule.alternatives if not _is_left_recursive(name, alt.node)]
+            loop = left_recursion_loop(rule)
+            if loop is not None:
+                self._walk(loop, end)
+                end = self._cell(loop, end)
+            for alternative in primary:
+                self._walk(alternative, end)
+            self._ends[name] = end
+            self._entries[name] = [self._cell(alternative, end) for alternative in primary]
+    
+    def _cell(self, head: object, tail: Optional[_Cell]) -> _Cell:
+        key = (id(head), id(tail))
+        cell = self._cells.get(key)
+        if cell is None:
+            cell = self._cells[key] = _Cell(head, tail)
+        return cell
+    
+    def _loop(self, node: ebnf.PositiveClosure) -> ebnf.Closure:
+        """The x* that remains after the first iteration of x+."""
+        loop = self._loops.get(id(node))
+        if loop is None:
+            loop = self._loops[id(node)] = ebnf.Closure(node.text, node.range, node.element, node.greedy)
+        return loop
+    
+    def _walk(self, node: ebnf.Node, after: _Cell) -> None:
+        """Record the continuations of the rule references and blocks below a node."""
+        if isinstance(node, ebnf.RuleRef):
+            self._call_sites.setdefault(node.name, []).append(after)
+        elif isinstance(node, ebnf.Sequence):
+            for element in reversed(node.elements):
+                self._walk(element, after)
+                after = self._cell(element, after)
+        elif isinstance(node, ebnf.Alternative):
+            self._walk(node.sequence, after)
+        elif isinstance(node, ebnf.Block):
+            self._after[id(node)] = after
+            for alternative in node.alternatives:
+                self._walk(alternative, after)
+        elif isinstance(node, ebnf.Labeled):
+            self._walk(node.element, after)
+        elif isinstance(node, ebnf.PositiveClosure):
+            self._after[id(node)] = after
+            self._walk(node.element, self._cell(self._loop(node), after))
+        elif isinstance(node, ebnf.Closure):
+            self._after[id(node)] = after
+            self._walk(node.element, self._cell(node, after))
+        elif isinstance(node, ebnf.OptionalBlock):
+            self._after[id(node)] = after
+            self._walk(node.element, after)
+    
+    def _step(self, configuration: Configuration) -> List[Step]:
+        """Tokens a configuration can match next, each with the configuration it leads to."""
+        steps = self._steps.get(configuration)
+        if steps is None:
+            exits: Set[str] = set()
+            steps = self._steps[configuration] = self._closure(configuration, exits)
+            if exits:
+                rule_exits = self._rule_exits()
+                for name in exits:
+                    steps.extend(rule_exits[name])
+        return steps
+    
+    def _rule_exits(self) -> Dict[str, List[Step]]:
+        """Steps after the end of each rule reached with an empty call stack.
+        
+        The steps of a rule are those at all of its references, and those
+        of the rules that can end with it; they are propagated over the
+        components of the "ends with" graph, like FOLLOW sets.
+        """
+        if self._exits is not None:
+            return self._exits
+        
+        referenced: Set[str] = set()
+        for name, references in self.analysis._references.items():
+            referenced.update(references - {name})
+        local: Dict[str, Dict[Step, None]] = {}
+        ends_in: Dict[str, Set[str]] = {}
+        for name in self.analysis.rules:
+            steps = local[name] = {}
+            exits = ends_in[name] = set()
+            if name not in referenced:
+                # Start rules are followed by the end of the input
+                steps[(self._eof, (None, None))] = None
+            for site in self._call_sites.get(name, ()):
+                steps.update(dict.fromkeys(self._closure((site, None), exits)))
+        
+        self._exits = {}
+        for component in _components(ends_in):
+            merged: Dict[Step, None] = {}
+            for name in component:
+                merged.update(local[name])
+                for other in ends_in[name]:
+                    if other in self._exits:
+                        merged.update(dict.fromkeys(self._exits[other]))
+            for name in component:
+                self._exits[name] = list(merged)
+        return self._exits
+    
+    def _closure(self, configuration: Configuration, exits: Set[str]) -> List[Step]:
+        """Steps of a configuration up to the end of its rule.
+        
+        Rules whose end is reached with an empty call stack are added to
+        ``exits`` instead of being followed.
+        """
+        steps: List[Step] = []
+        # Rules entered since the last token; entering one again would be
+        # (indirect) left recursion, which ANTLR rejects
+        seen: Set[Tuple[Configuration, FrozenSet[str]]] = set()
+        work: List[Tuple[Configuration, FrozenSet[str]]] = [(configuration, frozenset())]
+        while work:
+            current, entered = work.pop()
+            if (current, entered) in seen:
+                continue
+            seen.add((current, entered))
+            items, stack = current
+            if items is None:
+                continue  # Past the end of the input
+            node, rest = items.head, items.tail
+            
+            if isinstance(node, _RuleEnd):
+                if stack is not None:
+                    work.append(((stack.head, stack.tail), entered - {node.name}))
+                else:
+                    exits.add(node.name)
+                continue
+            
+            tokens = self.analysis._atoms.get(id(node))
+            if tokens is not None:
+                steps.append((tokens, (rest, stack)))
+            elif isinstance(node, ebnf.RuleRef):
+                if node.name in self._entries and node.name not in entered:
+                    caller = self._cell(rest, stack)
+                    inside = entered | {node.name}
+                    work.extend(((entry, caller), inside) for entry in self._entries[node.name])
+            elif isinstance(node, ebnf.Sequence):
+                for element in reversed(node.elements):
+                    rest = self._cell(element, rest)
+                work.append(((rest, stack), entered))
+            elif isinstance(node, ebnf.Alternative):
+                work.append(((self._cell(node.sequence, rest), stack), entered))
+            elif isinstance(node, ebnf.Block):
+                work.extend(((self._cell(alternative, rest), stack), entered)
+                            for alternative in node.alternatives)
+            elif isinstance(node, ebnf.Labeled):
+                work.append(((self._cell(node.element, rest), stack), entered))
+            elif isinstance(node, ebnf.PositiveClosure):
+                loop = self._cell(self._loop(node), rest)
+                work.append(((self._cell(node.element, loop), stack), entered))
+            elif isinstance(node, ebnf.Closure):
+                work.append(((rest, stack), entered))
+                work.append(((self._cell(node.element, items), stack), entered))
+            elif isinstance(node, ebnf.OptionalBlock):
+                work.append(((rest, stack), entered))
+                work.append(((self._cell(node.element, rest), stack), entered))
+            else:
+                # Actions and predicates match no input
+                work.append(((rest, stack), entered))
+        self._expanded += len(seen)
+        return steps
+    
+    def decisions(self, rule_name: str, cap: int = 6) -> List[LookaheadDecision]:
+        """Decisions of a rule whose LL(1) lookahead sets overlap, with their minimal k."""
+        key = (rule_name, cap)
+        if key in self._decisions:
+            return self._decisions[key]
+        
+        rule = self.analysis.rules[rule_name]
+        blocks: Dict[int, Optional[ebnf.Node]] = {}
+        for conflict in self.analysis.conflicts(rule_name):
+            blocks.setdefault(id(conflict.block), conflict.block)
+        
+        decisions = []
+        for block in blocks.values():
+            if block is None:
+                end = self._ends[rule_name]
+                starts = {
+                    i: self._cell(alt.node, end) for i, alt in enumerate(rule.alternatives)
+                    if not _is_left_recursive(rule_name, alt.node) and not _is_predicated(alt.node)
+                }
+            elif isinstance(block, ebnf.Suffixed):
+                after = self._after[id(block)]
+                if isinstance(block, ebnf.PositiveClosure):
+                    # Going round x+ again leaves the x* that remains
+                    entered = self._cell(self._loop(block), after)
+                elif isinstance(block, ebnf.Closure):
+                    entered = self._cell(block, after)
+                else:
+                    entered = after
+                starts = {0: self._cell(block.element, entered), 1: after}
+            elif isinstance(block, ebnf.Block):
+                after = self._after[id(block)]
+                starts = {
+                    i: self._cell(alt, after) for i, alt in enumerate(block.alternatives)
+                    if not _is_predicated(alt)
+                }
+            else:
+                continue
+            decisions.append(self._decide(rule_name, block, starts, cap))
+        
+        self._decisions[key] = decisions
+        return decisions
+    
+    def _decide(self, rule_name: str, block: Optional[ebnf.Node], starts: Dict[int, _Cell],
+                cap: int) -> LookaheadDecision:
+        alternatives = list(starts)
+        # Each state is a lookahead prefix shared by two or more alternatives,
+        # as the configurations of each alternative after the prefix
+        initial = tuple(frozenset({(start, None)}) for start in starts.values())
+        queue: Deque[Tuple[int, Tuple[FrozenSet[Configuration], ...]]] = deque([(1, initial)])
+        # States queued for the next depth; a state met again at a later
+        # depth is explored again, so loops run into the cap
+        queued: Set[Tuple[FrozenSet[Configuration], ...]] = set()
+        # Alternatives that share a prefix of each length
+        conflicting: Dict[int, Set[int]] = {}
+        depth = cost = 0
+        budget = self._expanded + MAX_WORK
+        
+        while queue:
+            state_depth, state = queue.popleft()
+            if state_depth > depth:
+                depth, queued = state_depth, set()
+            cost += sum(len(configurations) for configurations in state)
+            moves: List[Tuple[int, int, Configuration]] = []
+            seen = shared = 0
+            for alternative, configurations in enumerate(state):
+                tokens = 0
+                for configuration in configurations:
+                    for step_tokens, target in self._step(configuration):
+                        moves.append((step_tokens, alternative, target))
+                        tokens |= step_tokens
+                    if self._expanded + cost > budget:
+                        involved = {i for i, configurations in enumerate(state) if configurations}
+                        return LookaheadDecision(rule_name, block, None, _indexes(alternatives, involved),
+                                                 False, cost)
+                shared |= seen & tokens
+                seen |= tokens
+            if not shared:
+                continue
+            
+            involved = {alternative for tokens, alternative, _ in moves if tokens & shared}
+            if depth >= cap:
+                return LookaheadDecision(rule_name, block, None, _indexes(alternatives, involved),
+                                         False, cost)
+            conflicting.setdefault(depth, set()).update(involved)
+            
+            # Split the shared tokens into classes that lead to the same configurations
+            classes = [shared]
+            for tokens, _, _ in moves:
+                if tokens & shared:
+                    classes = [part for cls in classes for part in (cls & tokens, cls & ~tokens) if part]
+            for cls in classes:
+                targets = tuple(
+                    frozenset(target for tokens, move_alternative, target in moves
+                              if move_alternative == alternative and tokens & cls)
+                    for alternative in range(len(state))
+                )
+                matched = [i for i, configurations in enumerate(targets) if configurations]
+                overlapping = {
+                    i for i in matched for j in matched
+                    if i != j and not targets[i].isdisjoint(targets[j])
+                }
+                if overlapping:
+                    # The alternatives go on the same way: no k tells them apart
+                    return LookaheadDecision(rule_name, block, None, _indexes(alternatives, overlapping),
+                                             True, cost)
+                if targets not in queued:
+                    queued.add(targets)
+                    queue.append((depth + 1, targets))
+        
+        return LookaheadDecision(rule_name, block, depth,
+                                 _indexes(alternatives, conflicting.get(depth - 1, set())), False, cost)
+
+
+def _indexes(alternatives: List[int], positions: Set[int]) -> Tuple[int, ...]:
+    return tuple(alternatives[position] for position in sorted(positions))
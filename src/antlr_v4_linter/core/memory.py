@@ -0,0 +1,183 @@
+"""tracemalloc-based memory report of lint runs (``antlr-lint lint --memory-report``).
+
+For each pipeline phase of each file the profiler records the peak memory
+allocated while the phase ran and the memory still allocated when it ended,
+relative to the start of the phase. Snapshots taken around every phase give
+the allocation sites responsible for the retained memory.
+
+Snapshots are expensive; timings collected in the same run are inflated.
+"""
+
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+from .stats import LintObserver
+
+# Python 3.8 has no reset_peak(); peaks are then measured from the start of the run
+_reset_peak = getattr(tracemalloc, "reset_peak", None)
+
+_IGNORED_TRACES = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+@dataclass
+class PhaseMemory:
+    """Memory use of one phase on one file (or of the whole run)."""
+    phase: str
+    file_path: Optional[str]
+    peak_bytes: int
+    retained_bytes: int
+
+
+@dataclass
+class AllocationSite:
+    """Memory retained by one source line over all runs of a phase."""
+    location: str
+    size_bytes: int
+    count: int
+
+
+def format_bytes(size: float) -> str:
+    """Format a byte count as a human-readable string."""
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+class MemoryProfiler(LintObserver):
+    """Measures peak and retained memory per phase with tracemalloc."""
+    
+    def __init__(self, frames: int = 1):
+        self.frames = frames
+        self.phases: List[PhaseMemory] = []
+        self._sites: Dict[str, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(lambda: [0, 0]))
+        self._started_tracing = False
+    
+    def start(self) -> None:
+        """Start tracing allocations, unless tracemalloc is already running."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+    
+    def stop(self) -> None:
+        """Stop tracing if start() started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+    
+    @contextmanager
+    def phase(self, name: str, file_path: Optional[str] = None) -> Iterator[None]:
+        if not tracemalloc.is_tracing():
+            yield
+            return
+        
+        before = tracemalloc.take_snapshot()
+        if _reset_peak is not None:
+            _reset_peak()
+        start_bytes = tracemalloc.get_traced_memory()[0]
+        try:
+            yield
+        finally:
+            end_bytes, peak_bytes = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+            self.phases.append(PhaseMemory(
+                phase=name,
+                file_path=file_path,
+                peak_bytes=max(0, peak_bytes - start_bytes),
+                retained_bytes=end_bytes - start_bytes
+            ))
+            self._record_sites(name, before, after)
+    
+    def _record_sites(self, phase: str, before: tracemalloc.Snapshot,
+                      after: tracemalloc.Snapshot) -> None:
+        before = before.filter_traces(_IGNORED_TRACES)
+        after = after.filter_traces(_IGNORED_TRACES)
+        sites = self._sites[phase]
+        for diff in after.compare_to(before, "lineno"):
+            if diff.size_diff <= 0:
+                continue
+            frame = diff.traceback[0]
+            site = sites[f"{frame.filename}:{frame.lineno}"]
+            site[0] += diff.size_diff
+            site[1] += diff.count_diff
+    
+    def phase_totals(self) -> List[PhaseMemory]:
+        """Largest peak and total retained memory of each phase over all files."""
+        totals: Dict[str, PhaseMemory] = {}
+        for record in self.phases:
+            total = totals.setdefault(record.phase, PhaseMemory(record.phase, None, 0, 0))
+            total.peak_bytes = max(total.peak_bytes, record.peak_bytes)
+            total.retained_bytes += record.retained_bytes
+        return list(totals.values())
+    
+    def top_sites(self, phase: str, limit: int = 10) -> List[AllocationSite]:
+        """Source lines that retained the most memory during a phase."""
+        sites = [
+            AllocationSite(location, size, count)
+            for location, (size, count) in self._sites.get(phase, {}).items()
+        ]
+        sites.sort(key=lambda site: site.size_bytes, reverse=True)
+        return sites[:limit]
+    
+    def format(self, top: int = 5) -> str:
+        """Format the report as plain text."""
+        lines = ["Memory by phase (peak / retained):"]
+        for total in self.phase_totals():
+            lines.append(f"  {total.phase:<12} {format_bytes(total.peak_bytes):>12} "
+                         f"{format_bytes(total.retained_bytes):>12}")
+        
+        files: Dict[str, List[PhaseMemory]] = defaultdict(list)
+        for record in self.phases:
+            if record.file_path is not None:
+                files[record.file_path].append(record)
+        for file_path, records in files.items():
+            lines.extend(["", file_path])
+            for record in records:
+                lines.append(f"  {record.phase:<12} {format_bytes(record.peak_bytes):>12} "
+                             f"{format_bytes(record.retained_bytes):>12}")
+        
+        for total in self.phase_totals():
+            sites = self.top_sites(total.phase, top)
+            if not sites:
+                continue
+            lines.extend(["", f"Top allocation sites retained by {total.phase}:"])
+            for site in sites:
+                lines.append(f"  {format_bytes(site.size_bytes):>12} {site.count:>8} blocks  "
+                             f"{site.location}")
+        
+        return "\n".join(lines)
+    
+    def to_json(self, top: int = 10) -> Dict[str, Any]:
+        """The report as a JSON-serializable dict."""
+        files: Dict[str, Dict[str, Dict[str, int]]] = defaultdict(dict)
+        for record in self.phases:
+            if record.file_path is not None:
+                files[record.file_path][record.phase] = {
+                    "peak_bytes": record.peak_bytes,
+                    "retained_bytes": record.retained_bytes,
+                }
+        
+        return {
+            "phases": {
+                total.phase: {
+                    "peak_bytes": total.peak_bytes,
+                    "retained_bytes": total.retained_bytes,
+                    "top_sites": [
+                        {"location": site.location, "size_bytes": site.size_bytes,
+                         "count": site.count}
+                        for site in self.top_sites(total.phase, top)
+                    ],
+                }
+                for total in self.phase_totals()
+            },
+            "files": dict(files),
+        }
@@ -2,7 +2,11 @@ from __future__ import annotations
 
 import enum
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
+
+if TYPE_CHECKING:
+    from . import ebnf
+    from .index import GrammarIndex
 
 
 class Severity(enum.Enum):
@@ -78,6 +82,8 @@ class Alternative:
     elements: List[Element] = field(default_factory=list)
     label: Optional[str] = None
     range: Optional[Range] = None
+    # Structured EBNF tree of the alternative, when built from a parse tree
+    node: Optional[ebnf.Alternative] = field(default=None, repr=False, compare=False)
 
 
 @dataclass
@@ -86,6 +92,8 @@ class Element:
     range: Range
     label: Optional[str] = None
     element_type: str = "unknown"  # terminal, nonterminal, action, etc.
+    # Structured EBNF tree of the element, when built from a parse tree
+    node: Optional[ebnf.Node] = field(default=None, repr=False, compare=False)
 
 
 @dataclass
@@ -97,12 +105,31 @@ class GrammarAST:
     imports: List[str] = field(default_factory=list)
     tokens: List[str] = field(default_factory=list)
     channels: List[str] = field(default_factory=list)
+    # Facets captured while parsing and derived on demand (see GrammarIndex)
+    index: Optional[GrammarIndex] = field(default=None, repr=False, compare=False)
+
+
+@dataclass
+class SourceToken:
+    """A token of the grammar file itself, kept when a rule needs tokens or comments."""
+    token_type: int
+    text: str
+    channel: int
+    line: int
+    column: int
+    
+    @property
+    def end_line(self) -> int:
+        return self.line + self.text.count("\n")
 
 
 @dataclass
 class LintResult:
     file_path: str
     issues: List[Issue] = field(default_factory=list)
+    # Set when the file has the same content as this earlier file of the run,
+    # whose issues were reused instead of linting the file again
+    duplicate_of: Optional[str] = None
     
     @property
     def error_count(self) -> int:
@@ -126,6 +153,7 @@ class RuleConfig:
     enabled: bool = True
     severity: Severity = Severity.WARNING
     thresholds: Dict[str, Union[int, float, str]] = field(default_factory=dict)
+    time_budget_ms: Optional[float] = None  # Overrides LinterConfig.rule_time_budget_ms
 
 
 @dataclass
@@ -133,6 +161,8 @@ class LinterConfig:
     rules: Dict[str, RuleConfig] = field(default_factory=dict)
     exclude_patterns: List[str] = field(default_factory=list)
     output_format: str = "text"
+    rule_time_budget_ms: Optional[float] = None  # Per rule and file; None = unlimited
+    file_time_budget_ms: Optional[float] = None  # All rules on one file; None = unlimited
     
     @classmethod
     def default(cls) -> LinterConfig:
@@ -1,15 +1,23 @@
 """ANTLR4 grammar-based parser for accurate AST generation."""
 
+import enum
 import logging
-from pathlib import Path
-from typing import List, Optional, Set
+import threading
+from contextlib import nullcontext
+from typing import AbstractSet, Iterable, List, Optional, Set
 
-from antlr4 import CommonTokenStream, FileStream, InputStream
+from antlr4 import CommonTokenStream, InputStream, Token
+from antlr4.PredictionContext import PredictionContextCache
+from antlr4.atn.LexerATNSimulator import LexerATNSimulator
+from antlr4.atn.ParserATNSimulator import ParserATNSimulator
+from antlr4.dfa.DFA import DFA
 from antlr4.error.ErrorListener import ErrorListener
 
 from ..grammars.ANTLRv4Lexer import ANTLRv4Lexer
 from ..grammars.ANTLRv4Parser import ANTLRv4Parser
 from ..grammars.ANTLRv4ParserVisitor import ANTLRv4ParserVisitor
+from . import ebnf
+from .index import Facet, GrammarIndex
 from .models import (
     Alternative,
     Element,
@@ -19,7 +27,10 @@ from .models import (
     Position,
     Range,
     Rule,
+    SourceToken,
 )
+from .stats import LintObserver
+from .streams import MmapCharStream
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +49,11 @@ class GrammarErrorListener(ErrorListener):
         })
 
 
+def _token_text(node) -> str:
+    """Text of a terminal node that may be missing after error recovery."""
+    return node.getText() if node is not None else ""
+
+
 class GrammarASTBuilder(ANTLRv4ParserVisitor):
     """Build our AST from the ANTLR parse tree."""
     
@@ -50,6 +66,8 @@ class GrammarASTBuilder(ANTLRv4ParserVisitor):
         self.imports = []
         self.tokens = []
         self.channels = []
+        # Lexer mode of the rules being visited, None for the default mode
+        self.mode: Optional[str] = None
     
     def visitGrammarSpec(self, ctx):
         """Visit the root grammar specification."""
@@ -62,6 +80,10 @@ class GrammarASTBuilder(ANTLRv4ParserVisitor):
             for rule_spec in ctx.rules().ruleSpec():
                 self.visitRuleSpec(rule_spec)
         
+        # Visit the lexer rules of each mode section
+        for mode_spec in ctx.modeSpec():
+            self.visitModeSpec(mode_spec)
+        
         return GrammarAST(
             file_path=self.file_path,
             declaration=GrammarDeclaration(
@@ -92,6 +114,14 @@ class GrammarASTBuilder(ANTLRv4ParserVisitor):
         else:
             self.grammar_type = GrammarType.COMBINED
     
+    def visitModeSpec(self, ctx):
+        """Visit a lexer mode section and the rules it declares."""
+        name = ctx.identifier().getText() if ctx.identifier() else None
+        self.mode = None if name == "DEFAULT_MODE" else name
+        for rule_spec in ctx.lexerRuleSpec():
+            self.visitLexerRuleSpec(rule_spec)
+        self.mode = None
+    
     def visitRuleSpec(self, ctx):
         """Visit a rule specification."""
         if ctx.parserRuleSpec():
@@ -112,7 +142,8 @@ class GrammarASTBuilder(ANTLRv4ParserVisitor):
                 label = None
                 if hasattr(alt, 'identifier') and alt.identifier():
                     label = alt.identifier().getText()
-                alternatives.append(Alternative(elements=elements, label=label))
+                node = self._alternative_node(alt.alternative(), [e.node for e in elements], label)
+                alternatives.append(Alternative(elements=elements, label=label, node=node))
         
         rule = Rule(
             name=rule_name,
@@ -134,7 +165,8 @@ class GrammarASTBuilder(ANTLRv4ParserVisitor):
         if ctx.lexerRuleBlock() and ctx.lexerRuleBlock().lexerAltList():
             for alt in ctx.lexerRuleBlock().lexerAltList().lexerAlt():
                 elements = self._extract_elements_from_lexer_alt(alt)
-                alternatives.append(Alternative(elements=elements, label=None))
+                node = self._lexer_alternative_node(alt, [e.node for e in elements])
+                alternatives.append(Alternative(elements=elements, label=None, node=node))
         
         rule = Rule(
             name=rule_name,
@@ -142,7 +174,7 @@ class GrammarASTBuilder(ANTLRv4ParserVisitor):
             is_fragment=is_fragment,
             range=self._get_range(ctx),
             alternatives=alternatives,
-            mode=None
+            mode=self.mode
         )
         self.rules.append(rule)
     
@@ -160,7 +192,8 @@ class GrammarASTBuilder(ANTLRv4ParserVisitor):
                     elements.append(Element(
                         text=element_text,
                         range=self._get_range(elem),
-                        element_type=element_type
+                        element_type=element_type,
+                        node=self._element_node(elem)
                     ))
         
         return elements
@@ -177,11 +210,180 @@ class GrammarASTBuilder(ANTLRv4ParserVisitor):
                 elements.append(Element(
                     text=element_text,
                     range=self._get_range(elem),
-                    element_type=element_type
+                    element_type=element_type,
+                    node=self._lexer_element_node(elem)
                 ))
         
         return elements
     
+    # EBNF tree construction. Parser and lexer rules use separate parse tree
+    # contexts for the same constructs, hence the parallel methods. Trees
+    # recovered after syntax errors can lack any subcontext; missing parts
+    # become empty sequences.
+    
+    def _empty_node(self, ctx) -> ebnf.Sequence:
+        if ctx is None:
+            return ebnf.Sequence("", Range(Position(1, 1), Position(1, 1)), [])
+        return ebnf.Sequence(ctx.getText(), self._get_range(ctx), [])
+    
+    def _alternative_node(self, ctx, elements: List[ebnf.Node],
+                          label: Optional[str] = None) -> ebnf.Alternative:
+        """Build the node of a parser alternative from its element nodes."""
+        if ctx is None:
+            empty = self._empty_node(None)
+            return ebnf.Alternative(empty.text, empty.range, empty, label)
+        text, node_range = ctx.getText(), self._get_range(ctx)
+        return ebnf.Alternative(text, node_range, ebnf.Sequence(text, node_range, elements), label)
+    
+    def _lexer_alternative_node(self, ctx, elements: List[ebnf.Node]) -> ebnf.Alternative:
+        """Build the node of a lexer alternative, including its lexer commands."""
+        commands = []
+        if ctx.lexerCommands():
+            for command in ctx.lexerCommands().lexerCommand():
+                name, argument = command.lexerCommandName(), command.lexerCommandExpr()
+                commands.append(ebnf.LexerCommand(
+                    command.getText(), self._get_range(command),
+                    name.getText() if name else command.getText(),
+                    argument.getText() if argument else None
+                ))
+        
+        sequence_ctx = ctx.lexerElements() or ctx
+        sequence = ebnf.Sequence(sequence_ctx.getText(), self._get_range(sequence_ctx), elements)
+        return ebnf.Alternative(ctx.getText(), self._get_range(ctx), sequence, None, commands)
+    
+    def _element_node(self, ctx) -> ebnf.Node:
+        """Build the node of a parser ``element``."""
+        if ctx.labeledElement():
+            node = self._labeled_node(ctx.labeledElement())
+        elif ctx.atom():
+            node = self._atom_node(ctx.atom())
+        elif ctx.ebnf():
+            block_suffix = ctx.ebnf().blockSuffix()
+            return self._suffixed_node(ctx, self._block_node(ctx.ebnf().block()),
+                                       block_suffix.ebnfSuffix() if block_suffix else None)
+        else:
+            return self._action_node(ctx, ctx.actionBlock(), ctx.QUESTION() is not None)
+        return self._suffixed_node(ctx, node, ctx.ebnfSuffix())
+    
+    def _lexer_element_node(self, ctx) -> ebnf.Node:
+        """Build the node of a ``lexerElement``."""
+        if ctx.lexerAtom():
+            node = self._lexer_atom_node(ctx.lexerAtom())
+        elif ctx.lexerBlock():
+            node = self._lexer_block_node(ctx.lexerBlock())
+        else:
+            return self._action_node(ctx, ctx.actionBlock(), ctx.QUESTION() is not None)
+        return self._suffixed_node(ctx, node, ctx.ebnfSuffix())
+    
+    def _suffixed_node(self, ctx, node: ebnf.Node, suffix_ctx) -> ebnf.Node:
+        """Wrap ``node`` in the node of its EBNF suffix, if it has one."""
+        suffix = suffix_ctx.getText() if suffix_ctx else ""
+        if suffix[:1] not in ebnf.SUFFIX_NODES:
+            return node
+        return ebnf.SUFFIX_NODES[suffix[0]](ctx.getText(), self._get_range(ctx), node,
+                                            greedy=len(suffix) == 1)
+    
+    def _action_node(self, ctx, action_ctx, is_predicate: bool) -> ebnf.Node:
+        if action_ctx is None:
+            return self._empty_node(ctx)
+        code = action_ctx.getText()[1:-1]
+        if is_predicate:
+            return ebnf.Predicate(ctx.getText(), self._get_range(ctx), code)
+        return ebnf.Action(ctx.getText(), self._get_range(ctx), code)
+    
+    def _labeled_node(self, ctx) -> ebnf.Node:
+        if ctx.atom():
+            element = self._atom_node(ctx.atom())
+        elif ctx.block():
+            element = self._block_node(ctx.block())
+        else:
+            element = self._empty_node(ctx)
+        if not ctx.identifier():
+            return element
+        operator = "+=" if ctx.PLUS_ASSIGN() else "="
+        return ebnf.Labeled(ctx.getText(), self._get_range(ctx), ctx.identifier().getText(),
+                            operator, element)
+    
+    def _block_node(self, ctx) -> ebnf.Node:
+        if ctx is None:
+            return self._empty_node(ctx)
+        alt_list = ctx.altList().alternative() if ctx.altList() else []
+        alternatives = [
+            self._alternative_node(alt, [self._element_node(elem) for elem in alt.element()])
+            for alt in alt_list
+        ]
+        return ebnf.Block(ctx.getText(), self._get_range(ctx), alternatives)
+    
+    def _lexer_block_node(self, ctx) -> ebnf.Block:
+        alternatives = []
+        alt_list = ctx.lexerAltList().lexerAlt() if ctx.lexerAltList() else []
+        for alt in alt_list:
+            elements = alt.lexerElements().lexerElement() if alt.lexerElements() else []
+            alternatives.append(self._lexer_alternative_node(
+                alt, [self._lexer_element_node(elem) for elem in elements]))
+        return ebnf.Block(ctx.getText(), self._get_range(ctx), alternatives)
+    
+    def _atom_node(self, ctx) -> ebnf.Node:
+        """Build the node of a parser ``atom``."""
+        if ctx.terminalDef():
+            return self._terminal_node(ctx.terminalDef())
+        if ctx.ruleref():
+            ref = ctx.ruleref()
+            arguments = ref.argActionBlock()
+            return ebnf.RuleRef(ref.getText(), self._get_range(ref), _token_text(ref.RULE_REF()),
+                                arguments.getText()[1:-1] if arguments else None)
+        if ctx.notSet():
+            return self._not_set_node(ctx.notSet())
+        if ctx.wildcard():
+            return ebnf.Wildcard(ctx.getText(), self._get_range(ctx))
+        return self._empty_node(ctx)
+    
+    def _lexer_atom_node(self, ctx) -> ebnf.Node:
+        """Build the node of a ``lexerAtom``."""
+        if ctx.characterRange():
+            return self._char_range_node(ctx.characterRange())
+        if ctx.terminalDef():
+            return self._terminal_node(ctx.terminalDef())
+        if ctx.notSet():
+            return self._not_set_node(ctx.notSet())
+        if ctx.LEXER_CHAR_SET():
+            text = ctx.getText()
+            return ebnf.CharSet(text, self._get_range(ctx), text[1:-1])
+        if ctx.wildcard():
+            return ebnf.Wildcard(ctx.getText(), self._get_range(ctx))
+        return self._empty_node(ctx)
+    
+    def _terminal_node(self, ctx) -> ebnf.Node:
+        if ctx.TOKEN_REF():
+            return ebnf.TokenRef(ctx.getText(), self._get_range(ctx), ctx.TOKEN_REF().getText())
+        return ebnf.Literal(ctx.getText(), self._get_range(ctx),
+                            _token_text(ctx.STRING_LITERAL())[1:-1])
+    
+    def _char_range_node(self, ctx) -> ebnf.CharRange:
+        bounds = [_token_text(literal)[1:-1] for literal in ctx.STRING_LITERAL()] + ["", ""]
+        return ebnf.CharRange(ctx.getText(), self._get_range(ctx), bounds[0], bounds[1])
+    
+    def _not_set_node(self, ctx) -> ebnf.NotSet:
+        if ctx.setElement():
+            set_elements = [ctx.setElement()]
+        elif ctx.blockSet():
+            set_elements = ctx.blockSet().setElement()
+        else:
+            set_elements = []
+        return ebnf.NotSet(ctx.getText(), self._get_range(ctx),
+                           [self._set_element_node(element) for element in set_elements])
+    
+    def _set_element_node(self, ctx) -> ebnf.Node:
+        if ctx.TOKEN_REF():
+            return ebnf.TokenRef(ctx.getText(), self._get_range(ctx), ctx.TOKEN_REF().getText())
+        if ctx.STRING_LITERAL():
+            return ebnf.Literal(ctx.getText(), self._get_range(ctx),
+                                ctx.STRING_LITERAL().getText()[1:-1])
+        if ctx.characterRange():
+            return self._char_range_node(ctx.characterRange())
+        text = ctx.getText()
+        return ebnf.CharSet(text, self._get_range(ctx), text[1:-1])
+    
     def _determine_element_type(self, text):
         """Determine the type of an element based on its text."""
         if not text:
@@ -222,65 +424,209 @@ class GrammarASTBuilder(ANTLRv4ParserVisitor):
         )
 
 
-class AntlrGrammarParser:
-    """Parser using the official ANTLR4 grammar."""
+class DFACache(enum.Enum):
+    """How the recognizers of different threads share the ANTLR DFA caches."""
+    LOCKED = "locked"  # One cache per process; updates are serialized by a lock
+    PER_THREAD = "per-thread"  # Every thread warms up a cache of its own
+
+
+# The ANTLR runtime grows its DFAs while it parses and does not synchronize
+# the updates, so all writes to the process-wide caches go through this lock.
+# Lookups of existing states and edges stay lock-free.
+_DFA_LOCK = threading.RLock()
+
+
+class _LockedLexerATNSimulator(LexerATNSimulator):
+    """Lexer simulator that adds states and edges to a shared DFA under _DFA_LOCK."""
     
-    def parse_file(self, file_path: str) -> GrammarAST:
-        """Parse a .g4 grammar file and return the AST."""
-        path = Path(file_path)
-        if not path.exists():
-            raise FileNotFoundError(f"Grammar file not found: {file_path}")
-        
-        # Create input stream
-        input_stream = FileStream(file_path, encoding='utf-8')
-        
-        # Create lexer and parser
-        lexer = ANTLRv4Lexer(input_stream)
-        token_stream = CommonTokenStream(lexer)
-        parser = ANTLRv4Parser(token_stream)
-        
-        # Add error listener
-        error_listener = GrammarErrorListener()
-        parser.removeErrorListeners()
-        parser.addErrorListener(error_listener)
+    def addDFAEdge(self, from_, tk, to=None, cfgs=None):
+        with _DFA_LOCK:
+            return super().addDFAEdge(from_, tk, to, cfgs)
+    
+    def addDFAState(self, configs):
+        with _DFA_LOCK:
+            return super().addDFAState(configs)
+
+
+class _LockedParserATNSimulator(ParserATNSimulator):
+    """Parser simulator that adds states and edges to a shared DFA under _DFA_LOCK."""
+    
+    def addDFAEdge(self, dfa, from_, t, to):
+        with _DFA_LOCK:
+            return super().addDFAEdge(dfa, from_, t, to)
+    
+    def addDFAState(self, dfa, D):
+        with _DFA_LOCK:
+            return super().addDFAState(dfa, D)
+
+
+class _LockedContextCache(PredictionContextCache):
+    """Prediction context cache that can be shared between threads."""
+    
+    def add(self, ctx):
+        with _DFA_LOCK:
+            return super().add(ctx)
+
+
+_SHARED_CONTEXT_CACHE = _LockedContextCache()
+
+
+def _new_dfas(atn) -> List[DFA]:
+    return [DFA(state, i) for i, state in enumerate(atn.decisionToState)]
+
+
+class _Recognizers:
+    """Lexer, token stream, parser and error listener reused across parses."""
+    
+    def __init__(self, dfa_cache: DFACache = DFACache.LOCKED):
+        self.lexer = ANTLRv4Lexer(None)
+        self.token_stream = CommonTokenStream(self.lexer)
+        self.parser = ANTLRv4Parser(self.token_stream)
+        self.error_listener = GrammarErrorListener()
         
-        # Parse the grammar
-        tree = parser.grammarSpec()
+        # Replace the simulators set up by the generated recognizers, which
+        # write to the class-level DFAs without any synchronization
+        if dfa_cache is DFACache.PER_THREAD:
+            self.lexer._interp = LexerATNSimulator(
+                self.lexer, self.lexer.atn, _new_dfas(self.lexer.atn), PredictionContextCache())
+            self.parser._interp = ParserATNSimulator(
+                self.parser, self.parser.atn, _new_dfas(self.parser.atn), PredictionContextCache())
+        else:
+            self.lexer._interp = _LockedLexerATNSimulator(
+                self.lexer, self.lexer.atn, ANTLRv4Lexer.decisionsToDFA, PredictionContextCache())
+            self.parser._interp = _LockedParserATNSimulator(
+                self.parser, self.parser.atn, ANTLRv4Parser.decisionsToDFA, _SHARED_CONTEXT_CACHE)
         
-        # Check for errors
-        if error_listener.errors:
-            logger.warning(f"Parse errors in {file_path}: {error_listener.errors}")
+        self.parser.removeErrorListeners()
+        self.parser.addErrorListener(self.error_listener)
+    
+    def attach(self, input_stream) -> None:
+        """Point the recognizers at a new input and reset their state."""
+        self.lexer.inputStream = input_stream
+        self.token_stream.setTokenSource(self.lexer)
+        self.parser.setTokenStream(self.token_stream)
+        self.error_listener.errors = []
+    
+    def detach(self) -> None:
+        """Drop references to the last input so it can be freed."""
+        self.token_stream.setTokenSource(self.lexer)
+        self.lexer.inputStream = None
+
+
+class AntlrGrammarParser:
+    """Parser using the official ANTLR4 grammar.
+    
+    The ANTLR lexer and parser are created once per thread and reset between
+    inputs, so parsing many small grammars does not pay their setup cost on
+    every call. ``dfa_cache`` selects whether the threads share one
+    lock-protected DFA cache or each keep their own, which costs a warm-up
+    per thread but needs no locking; either way parsing is thread-safe.
+    """
+    
+    def __init__(self, dfa_cache: DFACache = DFACache.LOCKED):
+        self.dfa_cache = dfa_cache
+        self._local = threading.local()
+    
+    def _recognizers(self) -> _Recognizers:
+        """Get the recognizers owned by the current thread."""
+        recognizers = getattr(self._local, 'recognizers', None)
+        if recognizers is None:
+            recognizers = _Recognizers(self.dfa_cache)
+            self._local.recognizers = recognizers
+        return recognizers
+    
+    def parse_file(self, file_path: str, facets: AbstractSet[Facet] = frozenset(),
+                   observer: Optional[LintObserver] = None) -> GrammarAST:
+        """Parse a .g4 grammar file and return the AST.
         
-        # Build AST
-        builder = GrammarASTBuilder(file_path)
-        ast = builder.visit(tree)
+        Tokens, comments and the raw source are kept on the grammar's index
+        only if they are listed in ``facets``. The read, lex, parse and build
+        steps are reported to ``observer`` as phases.
+        """
+        # Create input stream; opening the file doubles as the existence check
+        try:
+            with _phase(observer, "read", file_path):
+                input_stream = MmapCharStream(file_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Grammar file not found: {file_path}") from None
         
-        return ast
+        try:
+            return self._parse_stream(input_stream, file_path, facets, observer)
+        finally:
+            input_stream.close()
     
-    def parse_content(self, content: str, file_path: str) -> GrammarAST:
+    def parse_content(self, content: str, file_path: str,
+                      facets: AbstractSet[Facet] = frozenset(),
+                      observer: Optional[LintObserver] = None) -> GrammarAST:
         """Parse grammar content and return the AST."""
-        # Create input stream from content
-        input_stream = InputStream(content)
-        
-        # Create lexer and parser
-        lexer = ANTLRv4Lexer(input_stream)
-        token_stream = CommonTokenStream(lexer)
-        parser = ANTLRv4Parser(token_stream)
-        
-        # Add error listener
-        error_listener = GrammarErrorListener()
-        parser.removeErrorListeners()
-        parser.addErrorListener(error_listener)
+        return self._parse_stream(InputStream(content), file_path, facets, observer)
+    
+    def parse_many(self, file_paths: Iterable[str],
+                   facets: AbstractSet[Facet] = frozenset()) -> List[GrammarAST]:
+        """Parse several grammar files, reusing the same recognizers for all of them."""
+        return [self.parse_file(file_path, facets) for file_path in file_paths]
+    
+    def _parse_stream(self, input_stream, file_path: str,
+                      facets: AbstractSet[Facet] = frozenset(),
+                      observer: Optional[LintObserver] = None) -> GrammarAST:
+        """Parse a character stream with this thread's pooled recognizers."""
+        recognizers = self._recognizers()
+        recognizers.attach(input_stream)
         
-        # Parse the grammar
-        tree = parser.grammarSpec()
+        try:
+            # Tokenize everything up front so lexing and parsing can be timed apart
+            with _phase(observer, "lex", file_path):
+                recognizers.token_stream.fill()
+            
+            # Parse the grammar
+            with _phase(observer, "parse", file_path):
+                tree = recognizers.parser.grammarSpec()
+            
+            # Check for errors
+            errors = recognizers.error_listener.errors
+            if errors:
+                logger.warning(f"Parse errors in {file_path}: {errors}")
+            
+            # Build AST
+            with _phase(observer, "build", file_path):
+                builder = GrammarASTBuilder(file_path)
+                grammar = builder.visit(tree)
+                grammar.index = self._build_index(grammar, recognizers, input_stream, facets)
+            return grammar
+        finally:
+            recognizers.detach()
+    
+    def _build_index(self, grammar: GrammarAST, recognizers: _Recognizers, input_stream,
+                     facets: AbstractSet[Facet]) -> GrammarIndex:
+        """Capture the lexical facets that were asked for while the input is still open."""
+        tokens = comments = source = None
         
-        # Check for errors
-        if error_listener.errors:
-            logger.warning(f"Parse errors: {error_listener.errors}")
+        if Facet.TOKENS in facets or Facet.COMMENTS in facets:
+            captured = [
+                SourceToken(
+                    token_type=token.type,
+                    text=token.text,
+                    channel=token.channel,
+                    line=token.line,
+                    column=token.column + 1
+                )
+                for token in recognizers.token_stream.tokens
+                if token.type != Token.EOF and
+                (Facet.TOKENS in facets or token.channel == ANTLRv4Lexer.COMMENT)
+            ]
+            if Facet.TOKENS in facets:
+                tokens = captured
+            else:
+                comments = captured
         
-        # Build AST
-        builder = GrammarASTBuilder(file_path)
-        ast = builder.visit(tree)
+        if Facet.RAW_SOURCE in facets:
+            source = str(input_stream)
         
-        return ast
\ No newline at end of file
+        return GrammarIndex(grammar, tokens=tokens, comments=comments, source=source)
+
+
+def _phase(observer: Optional[LintObserver], name: str, file_path: str):
+    """Time a parsing step when an observer is attached."""
+    if observer is None:
+        return nullcontext()
+    return observer.phase(name, file_path)
\ No newline at end of file
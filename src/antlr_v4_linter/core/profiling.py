@@ -0,0 +1,158 @@
+"""cProfile capture of lint runs (``antlr-lint profile``)."""
+
+import cProfile
+import pstats
+from collections import defaultdict
+from pathlib import PurePath
+from typing import Dict, List, Optional, Tuple
+
+from .linter import ANTLRLinter
+from .models import LintResult
+
+# (filename, line number, function name), as used by pstats
+FunctionKey = Tuple[str, int, str]
+
+# Stacks deeper than this, or carrying less time than this, are not expanded
+# further in the collapsed-stack output
+MAX_STACK_DEPTH = 64
+MIN_STACK_SECONDS = 1e-5
+
+# Modules of the rule engine and of the grammar facets it computes for rules
+RULE_ENGINE_MODULES = frozenset({
+    "rule_engine.py", "index.py", "analysis.py", "lookahead.py", "atn.py",
+    "lexer_dfa.py", "literal_index.py", "intervals.py", "unicode_tables.py",
+})
+
+# Modules of the other commands, which a lint run does not use
+TOOL_MODULES = frozenset({"generator.py", "grammar_profile.py"})
+
+
+def profile_lint(linter: ANTLRLinter, file_paths: List[str],
+                 output_format: Optional[str] = None) -> Tuple[List[LintResult], pstats.Stats]:
+    """Lint and format the results under cProfile.
+    
+    The formatted report is discarded; formatting runs only so that the
+    reporter shows up in the profile.
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        results = linter.lint_files(file_paths)
+        linter.format_results(results, output_format)
+    finally:
+        profiler.disable()
+    
+    return results, pstats.Stats(profiler)
+
+
+def subsystem(filename: str) -> str:
+    """Name of the linter subsystem a source file belongs to."""
+    parts = PurePath(filename).parts
+    name = parts[-1] if parts else filename
+    
+    if "antlr_v4_linter" in parts:
+        package_parts = parts[parts.index("antlr_v4_linter") + 1:]
+        if package_parts[:1] == ("rules",):
+            return "rules/" + PurePath(name).stem
+        if package_parts[:1] == ("grammars",):
+            return "runtime parser" if name.startswith("ANTLRv4Parser") else "runtime lexer"
+        if name in ("parser.py", "ebnf.py"):
+            return "AST builder"
+        if name == "streams.py":
+            return "runtime lexer"
+        if name == "reporter.py":
+            return "reporter"
+        if name in RULE_ENGINE_MODULES:
+            return "rule engine"
+        if name in TOOL_MODULES:
+            return "tools"
+        return "linter"
+    
+    if "antlr4" in parts:
+        if "Lexer" in name or name in ("InputStream.py", "FileStream.py"):
+            return "runtime lexer"
+        return "runtime parser"
+    
+    if filename == "~":  # Built-in functions
+        return "builtins"
+    return "other"
+
+
+def subsystem_report(stats: pstats.Stats, top: int = 10) -> str:
+    """Format own time per subsystem and the top functions of each one."""
+    by_subsystem: Dict[str, List[Tuple[float, int, FunctionKey]]] = defaultdict(list)
+    for func, (_, calls, own_time, _, _) in stats.stats.items():
+        by_subsystem[subsystem(func[0])].append((own_time, calls, func))
+    
+    total = sum(own for entries in by_subsystem.values() for own, _, _ in entries) or 1.0
+    totals = sorted(
+        ((sum(own for own, _, _ in entries), name) for name, entries in by_subsystem.items()),
+        reverse=True
+    )
+    
+    lines = [f"Total time: {total * 1000:.1f} ms", ""]
+    for subsystem_time, name in totals:
+        lines.append(f"{name:<32} {subsystem_time * 1000:>10.1f} ms {subsystem_time / total:>6.1%}")
+        for own_time, calls, func in sorted(by_subsystem[name], reverse=True)[:top]:
+            if own_time <= 0:
+                break
+            lines.append(f"    {own_time * 1000:>10.1f} ms {calls:>9} calls  {_describe(func)}")
+        lines.append("")
+    
+    return "\n".join(lines).rstrip() + "\n"
+
+
+def write_collapsed_stacks(stats: pstats.Stats, output_path: str) -> int:
+    """Write stacks in the collapsed format read by flamegraph tools.
+    
+    cProfile only records caller/callee pairs, so stacks are rebuilt by
+    walking down from the root functions and splitting each function's time
+    between its callers in proportion to the time spent on each call edge.
+    Returns the number of stack lines written.
+    """
+    callees: Dict[FunctionKey, List[Tuple[FunctionKey, float]]] = defaultdict(list)
+    roots = []
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        if not callers:
+            roots.append(func)
+        for caller, edge in callers.items():
+            callees[caller].append((func, edge[3]))
+    
+    samples: Dict[str, float] = defaultdict(float)
+    
+    def walk(func: FunctionKey, stack: List[str], on_stack: set, scale: float) -> None:
+        _, _, own_time, cumulative, _ = stats.stats[func]
+        stack.append(_describe(func))
+        on_stack.add(func)
+        key = ";".join(stack)
+        samples[key] += own_time * scale
+        
+        if len(stack) < MAX_STACK_DEPTH:
+            for callee, edge_time in callees.get(func, ()):
+                if callee in on_stack or edge_time * scale < MIN_STACK_SECONDS:
+                    continue
+                callee_cumulative = stats.stats[callee][3]
+                if callee_cumulative:
+                    walk(callee, stack, on_stack, scale * min(1.0, edge_time / callee_cumulative))
+        
+        on_stack.discard(func)
+        stack.pop()
+    
+    for root in roots:
+        walk(root, [], set(), 1.0)
+    
+    written = 0
+    with open(output_path, "w", encoding="utf-8") as f:
+        for key, seconds in samples.items():
+            microseconds = int(round(seconds * 1_000_000))
+            if microseconds > 0:
+                f.write(f"{key} {microseconds}\n")
+                written += 1
+    return written
+
+
+def _describe(func: FunctionKey) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name
+    return f"{name} ({PurePath(filename).name}:{line})"
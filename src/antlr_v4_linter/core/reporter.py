@@ -10,6 +10,11 @@ from rich.text import Text
 from .models import Issue, LintResult, Severity
 
 
+def _deduplicated_count(results: List[LintResult]) -> int:
+    """Number of files whose issues were copied from a file with identical content."""
+    return sum(1 for result in results if result.duplicate_of is not None)
+
+
 class Reporter(ABC):
     """Base class for result reporters."""
     
@@ -72,6 +77,10 @@ class TextReporter(Reporter):
         else:
             output_lines.append("✅ No issues found!")
         
+        deduplicated = _deduplicated_count(results)
+        if deduplicated > 0:
+            output_lines.append(f"Deduplicated files: {deduplicated} (identical content linted once)")
+        
         return "\n".join(output_lines)
     
     def format_results_rich(self, results: List[LintResult]) -> None:
@@ -139,6 +148,11 @@ class TextReporter(Reporter):
                 self.console.print(f"[blue]Info: {total_info}[/blue]")
         else:
             self.console.print("✅ [green]No issues found![/green]")
+        
+        deduplicated = _deduplicated_count(results)
+        if deduplicated > 0:
+            self.console.print(f"[dim]Deduplicated files: {deduplicated} "
+                               f"(identical content linted once)[/dim]")
     
     def _get_severity_symbol(self, severity: Severity) -> str:
         """Get symbol for severity level."""
@@ -162,7 +176,8 @@ class JsonReporter(Reporter):
                 "totalIssues": 0,
                 "errorCount": 0,
                 "warningCount": 0,
-                "infoCount": 0
+                "infoCount": 0,
+                "deduplicatedFiles": _deduplicated_count(results)
             }
         }
         
@@ -195,6 +210,8 @@ class JsonReporter(Reporter):
                     "infoCount": result.info_count
                 }
             }
+            if result.duplicate_of is not None:
+                file_result["duplicateOf"] = result.duplicate_of
             output["results"].append(file_result)
             
             # Update global summary
@@ -226,6 +243,7 @@ class XmlReporter(Reporter):
         ET.SubElement(summary, "errorCount").text = str(total_errors)
         ET.SubElement(summary, "warningCount").text = str(total_warnings)
         ET.SubElement(summary, "infoCount").text = str(total_info)
+        ET.SubElement(summary, "deduplicatedFiles").text = str(_deduplicated_count(results))
         
         # Results
         results_elem = ET.SubElement(root, "results")
@@ -1,11 +1,52 @@
+import copy
+import time
 from abc import ABC, abstractmethod
-from typing import List
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, FrozenSet, List, Optional, Sequence, Tuple, Type
 
-from .models import GrammarAST, Issue, LinterConfig, RuleConfig, Severity
+from .index import Facet, GrammarIndex
+from .models import (
+    Alternative,
+    Element,
+    FixSuggestion,
+    GrammarAST,
+    Issue,
+    LinterConfig,
+    Rule,
+    RuleConfig,
+    Severity,
+)
+from .stats import BudgetOverrun, LintObserver
+
+# perf_counter() deadline of the rule currently running in this context
+_deadline: ContextVar[Optional[float]] = ContextVar("rule_deadline", default=None)
+
+
+class RuleTimeout(Exception):
+    """Raised by checkpoint() when the running rule has used up its time budget."""
+
+
+def checkpoint() -> None:
+    """Cooperative cancellation point for long-running rule loops.
+    
+    Rules call this from loops whose cost can grow with the grammar. It is a
+    no-op unless a time budget is configured, and raises RuleTimeout once the
+    budget of the running rule is exhausted.
+    """
+    deadline = _deadline.get()
+    if deadline is not None and time.perf_counter() > deadline:
+        raise RuleTimeout()
 
 
 class LintRule(ABC):
-    """Base class for all linting rules."""
+    """Base class for all linting rules.
+    
+    ``requires`` lists the grammar facets the rule reads from the grammar's
+    index; only facets required by an enabled rule are captured or built.
+    """
+    
+    requires: FrozenSet[Facet] = frozenset()
     
     def __init__(self, rule_id: str, name: str, description: str):
         self.rule_id = rule_id
@@ -28,39 +69,346 @@ class LintRule(ABC):
         if rule_config:
             return rule_config.severity
         return Severity.WARNING
+    
+    def checkpoint(self) -> None:
+        """Give the engine a chance to interrupt this rule (see checkpoint())."""
+        checkpoint()
+
+
+class RuleVisitor:
+    """Receives AST traversal events for one grammar on behalf of a VisitorLintRule.
+    
+    Subclasses override only the hooks they need; the engine dispatches each
+    event only to visitors that override its hook. Issues are collected in
+    ``self.issues``.
+    """
+    
+    def __init__(self, lint_rule: "VisitorLintRule", grammar: GrammarAST, config: RuleConfig):
+        self.lint_rule = lint_rule
+        self.grammar = grammar
+        self.config = config
+        self.issues: List[Issue] = []
+    
+    def on_rule(self, rule: Rule) -> None:
+        """Called before the alternatives of a grammar rule are visited."""
+    
+    def on_alternative(self, rule: Rule, alternative: Alternative) -> None:
+        """Called before the elements of an alternative are visited."""
+    
+    def on_element(self, rule: Rule, alternative: Alternative, element: Element) -> None:
+        """Called for every element of every alternative."""
+    
+    def on_rule_end(self, rule: Rule) -> None:
+        """Called after all alternatives of a grammar rule were visited."""
+    
+    def on_grammar_end(self) -> None:
+        """Called once after the whole grammar was visited."""
+
+
+class VisitorLintRule(LintRule):
+    """Base class for rules that run as part of a single shared AST traversal.
+    
+    Instead of walking ``grammar.rules`` itself, the rule provides a
+    ``visitor_class`` whose hooks are fed by one walk of the AST shared with
+    all other visitor rules. ``check()`` still works standalone.
+    """
+    
+    visitor_class: Type[RuleVisitor] = RuleVisitor
+    
+    def create_visitor(self, grammar: GrammarAST, config: RuleConfig) -> RuleVisitor:
+        """Create the per-grammar visitor for this rule."""
+        return self.visitor_class(self, grammar, config)
+    
+    def check(self, grammar: GrammarAST, config: RuleConfig) -> List[Issue]:
+        visitor = self.create_visitor(grammar, config)
+        walk_grammar(grammar, [visitor])
+        return visitor.issues
+
+
+def _subscribers(visitors: Sequence[RuleVisitor], hook: str) -> list:
+    """Bound hook methods of the visitors that override ``hook``."""
+    default = getattr(RuleVisitor, hook)
+    return [getattr(v, hook) for v in visitors if getattr(type(v), hook) is not default]
+
+
+def walk_grammar(grammar: GrammarAST, visitors: Sequence[RuleVisitor]) -> None:
+    """Walk the grammar once, dispatching traversal events to the visitors."""
+    on_rule = _subscribers(visitors, "on_rule")
+    on_alternative = _subscribers(visitors, "on_alternative")
+    on_element = _subscribers(visitors, "on_element")
+    on_rule_end = _subscribers(visitors, "on_rule_end")
+    on_grammar_end = _subscribers(visitors, "on_grammar_end")
+    visit_alternatives = bool(on_alternative or on_element)
+    
+    for rule in grammar.rules:
+        checkpoint()
+        
+        for callback in on_rule:
+            callback(rule)
+        
+        if visit_alternatives:
+            for alternative in rule.alternatives:
+                for callback in on_alternative:
+                    callback(rule, alternative)
+                
+                if on_element:
+                    for element in alternative.elements:
+                        for callback in on_element:
+                            callback(rule, alternative, element)
+        
+        for callback in on_rule_end:
+            callback(rule)
+    
+    for callback in on_grammar_end:
+        callback()
+
+
+@dataclass(frozen=True)
+class PlannedRule:
+    """An enabled rule with its configuration resolved for execution."""
+    rule: LintRule
+    config: RuleConfig
+    severity: Severity
+    time_budget_ms: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class ExecutionPlan:
+    """The enabled rules of a LinterConfig, resolved once and reused for every file.
+    
+    The plan holds its own copies of the rule configurations, so it is not
+    affected by later changes to the LinterConfig it was compiled from, and
+    it can be pickled and shipped to worker processes as a unit.
+    """
+    rules: Tuple[PlannedRule, ...]
+    fingerprint: Tuple[Any, ...]
+    file_time_budget_ms: Optional[float] = None
+    facets: FrozenSet[Facet] = frozenset()  # Required by at least one planned rule
+    
+    @property
+    def rule_ids(self) -> List[str]:
+        return [planned.rule.rule_id for planned in self.rules]
+
+
+def _freeze(value: Any) -> Any:
+    """Turn threshold values into hashable, comparable equivalents."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def config_fingerprint(config: LinterConfig) -> Tuple[Any, ...]:
+    """Summarize the parts of a LinterConfig that affect rule execution."""
+    rules = tuple(
+        (rule_id, rule_config.enabled, rule_config.severity,
+         _freeze(rule_config.thresholds), rule_config.time_budget_ms)
+        for rule_id, rule_config in config.rules.items()
+    )
+    return rules + ((config.rule_time_budget_ms, config.file_time_budget_ms),)
+
+
+class _RuleRun:
+    """Outcome of running one planned rule on one grammar."""
+    __slots__ = ('planned', 'issues', 'timeout')
+    
+    def __init__(self, planned: PlannedRule):
+        self.planned = planned
+        self.issues: List[Issue] = []
+        self.timeout: Optional[Issue] = None
 
 
 class RuleEngine:
-    """Engine that runs all linting rules against a grammar."""
+    """Engine that runs all linting rules against a grammar.
     
-    def __init__(self):
+    Enabled ``VisitorLintRule`` instances share a single traversal of the
+    AST; other rules are run through their own ``check()``. Pass
+    ``fuse_traversal=False`` to run every rule through ``check()``.
+    """
+    
+    def __init__(self, fuse_traversal: bool = True):
         self.rules: List[LintRule] = []
+        self.fuse_traversal = fuse_traversal
+        self._plan: Optional[ExecutionPlan] = None
     
     def register_rule(self, rule: LintRule) -> None:
         """Register a linting rule with the engine."""
         self.rules.append(rule)
+        self._plan = None
     
     def register_rules(self, rules: List[LintRule]) -> None:
         """Register multiple linting rules with the engine."""
         self.rules.extend(rules)
+        self._plan = None
     
-    def run_rules(self, grammar: GrammarAST, config: LinterConfig) -> List[Issue]:
-        """Run all enabled rules against the grammar and return issues."""
-        all_issues = []
+    def compile(self, config: LinterConfig) -> ExecutionPlan:
+        """Compile the configuration into an execution plan.
+        
+        The last plan is cached and returned again as long as the
+        configuration has not changed since it was compiled.
+        """
+        fingerprint = config_fingerprint(config)
+        if self._plan is not None and self._plan.fingerprint == fingerprint:
+            return self._plan
         
+        planned = []
         for rule in self.rules:
             if rule.is_enabled(config):
-                rule_config = config.rules.get(rule.rule_id, RuleConfig())
-                issues = rule.check(grammar, rule_config)
-                
-                # Update severity based on configuration
-                for issue in issues:
-                    issue.severity = rule.get_severity(config)
-                
-                all_issues.extend(issues)
+                rule_config = copy.deepcopy(config.rules.get(rule.rule_id, RuleConfig()))
+                time_budget_ms = rule_config.time_budget_ms or config.rule_time_budget_ms
+                planned.append(PlannedRule(rule, rule_config, rule.get_severity(config), time_budget_ms))
+        
+        self._plan = ExecutionPlan(
+            rules=tuple(planned),
+            fingerprint=fingerprint,
+            file_time_budget_ms=config.file_time_budget_ms,
+            facets=frozenset().union(*(p.rule.requires for p in planned))
+        )
+        return self._plan
+    
+    def run_rules(self, grammar: GrammarAST, config: LinterConfig) -> List[Issue]:
+        """Run all enabled rules against the grammar and return issues."""
+        return self.run_plan(grammar, self.compile(config))
+    
+    def run_plan(self, grammar: GrammarAST, plan: ExecutionPlan,
+                 stats: Optional[LintObserver] = None) -> List[Issue]:
+        """Run the rules of a compiled plan against the grammar and return issues.
+        
+        Rules that exceed their time budget are interrupted at their next
+        checkpoint() and reported as a RULE_TIMEOUT info issue instead.
+        """
+        file_deadline = None
+        if plan.file_time_budget_ms:
+            file_deadline = time.perf_counter() + plan.file_time_budget_ms / 1000
+        
+        if plan.facets:
+            start = time.perf_counter()
+            GrammarIndex.of(grammar).build(plan.facets)
+            if stats is not None:
+                stats.record_rule("index", start, time.perf_counter(), grammar.file_path)
+        
+        # Runs in plan order; visitor issue lists are filled in by the shared
+        # traversal below.
+        runs = []
+        fused = []
+        
+        for planned in plan.rules:
+            run = _RuleRun(planned)
+            runs.append(run)
+            if self.fuse_traversal and isinstance(planned.rule, VisitorLintRule):
+                visitor = planned.rule.create_visitor(grammar, planned.config)
+                run.issues = visitor.issues
+                fused.append((run, visitor))
+            else:
+                self._run_check(grammar, run, plan, file_deadline, stats)
+        
+        if fused:
+            self._run_fused(grammar, fused, plan, file_deadline, stats)
+        
+        all_issues = []
+        for run in runs:
+            if run.timeout is not None:
+                all_issues.append(run.timeout)
+                continue
+            
+            # Update severity based on configuration
+            severity = run.planned.severity
+            for issue in run.issues:
+                issue.severity = severity
+            
+            all_issues.extend(run.issues)
         
         return all_issues
     
+    def _run_check(self, grammar: GrammarAST, run: _RuleRun, plan: ExecutionPlan,
+                   file_deadline: Optional[float], stats: Optional[LintObserver]) -> None:
+        """Run a rule through its own check() under its time budget."""
+        planned = run.planned
+        start = time.perf_counter()
+        
+        if file_deadline is not None and start >= file_deadline:
+            run.timeout = self._timeout_issue(grammar, planned, "file", plan.file_time_budget_ms,
+                                              skipped=True)
+            self._record_overrun(stats, grammar, planned, "file", plan.file_time_budget_ms, 0.0)
+            return
+        
+        deadline, scope, budget_ms = None, "rule", planned.time_budget_ms
+        if budget_ms:
+            deadline = start + budget_ms / 1000
+        if file_deadline is not None and (deadline is None or file_deadline < deadline):
+            deadline, scope, budget_ms = file_deadline, "file", plan.file_time_budget_ms
+        
+        token = _deadline.set(deadline)
+        try:
+            run.issues = planned.rule.check(grammar, planned.config)
+        except RuleTimeout:
+            elapsed = time.perf_counter() - start
+            run.timeout = self._timeout_issue(grammar, planned, scope, budget_ms)
+            self._record_overrun(stats, grammar, planned, scope, budget_ms, elapsed)
+        finally:
+            _deadline.reset(token)
+            if stats is not None:
+                stats.record_rule(planned.rule.rule_id, start, time.perf_counter(),
+                                  grammar.file_path)
+    
+    def _run_fused(self, grammar: GrammarAST, fused: list, plan: ExecutionPlan,
+                   file_deadline: Optional[float], stats: Optional[LintObserver]) -> None:
+        """Run the visitor rules in one traversal, bounded by the file budget."""
+        start = time.perf_counter()
+        token = _deadline.set(file_deadline)
+        try:
+            walk_grammar(grammar, [visitor for _, visitor in fused])
+        except RuleTimeout:
+            elapsed = time.perf_counter() - start
+            for run, _ in fused:
+                run.timeout = self._timeout_issue(grammar, run.planned, "file",
+                                                  plan.file_time_budget_ms)
+                self._record_overrun(stats, grammar, run.planned, "file",
+                                     plan.file_time_budget_ms, elapsed)
+        finally:
+            _deadline.reset(token)
+            if stats is not None:
+                stats.record_rule("shared traversal", start, time.perf_counter(),
+                                  grammar.file_path)
+    
+    def _timeout_issue(self, grammar: GrammarAST, planned: PlannedRule, scope: str,
+                       budget_ms: float, skipped: bool = False) -> Issue:
+        """Create the RULE_TIMEOUT issue reported in place of an interrupted rule."""
+        rule = planned.rule
+        if skipped:
+            message = (f"Rule {rule.rule_id} ({rule.name}) was skipped: the {scope} time budget "
+                       f"of {budget_ms:.0f} ms was exhausted")
+        else:
+            message = (f"Rule {rule.rule_id} ({rule.name}) exceeded the {scope} time budget "
+                       f"of {budget_ms:.0f} ms and was interrupted")
+        
+        return Issue(
+            rule_id="RULE_TIMEOUT",
+            severity=Severity.INFO,
+            message=message,
+            file_path=grammar.file_path,
+            range=grammar.declaration.range,
+            suggestions=[
+                FixSuggestion(
+                    description="Raise the time budget or disable the rule for this grammar",
+                    fix=f"Set \"timeBudgetMs\" for {rule.rule_id} in antlr-lint.json"
+                )
+            ]
+        )
+    
+    def _record_overrun(self, stats: Optional[LintObserver], grammar: GrammarAST,
+                        planned: PlannedRule, scope: str, budget_ms: float,
+                        elapsed: float) -> None:
+        if stats is not None:
+            stats.record_overrun(BudgetOverrun(
+                file_path=grammar.file_path,
+                rule_id=planned.rule.rule_id,
+                scope=scope,
+                budget_ms=budget_ms,
+                elapsed_ms=elapsed * 1000
+            ))
+    
     def get_rule(self, rule_id: str) -> LintRule:
         """Get a specific rule by ID."""
         for rule in self.rules:
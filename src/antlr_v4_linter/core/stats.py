@@ -0,0 +1,109 @@
+"""Timing hooks of the lint pipeline and the statistics collected from them.
+
+The linter, parser and rule engine report pipeline phases and rule runs to
+a LintObserver. LintStats aggregates them for ``antlr-lint lint --stats``;
+other observers, such as the trace recorder, receive the same events.
+"""
+
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence
+
+
+@dataclass
+class BudgetOverrun:
+    """A rule that was interrupted because it ran out of time."""
+    file_path: str
+    rule_id: str
+    scope: str  # "rule" or "file"
+    budget_ms: float
+    elapsed_ms: float
+
+
+class LintObserver:
+    """Receives timing events from the lint pipeline; the default ignores them."""
+    
+    @contextmanager
+    def phase(self, name: str, file_path: Optional[str] = None) -> Iterator[None]:
+        """Time a pipeline phase such as "parse" or "report"."""
+        yield
+    
+    def record_rule(self, rule_id: str, start: float, end: float,
+                    file_path: Optional[str] = None) -> None:
+        """Record one rule run on one grammar, as perf_counter() start and end times."""
+    
+    def record_overrun(self, overrun: BudgetOverrun) -> None:
+        """Record a rule interrupted by its time budget."""
+
+
+class ObserverGroup(LintObserver):
+    """Forwards every event to several observers."""
+    
+    def __init__(self, observers: Sequence[LintObserver]):
+        self.observers = list(observers)
+    
+    @contextmanager
+    def phase(self, name: str, file_path: Optional[str] = None) -> Iterator[None]:
+        with ExitStack() as stack:
+            for observer in self.observers:
+                stack.enter_context(observer.phase(name, file_path))
+            yield
+    
+    def record_rule(self, rule_id: str, start: float, end: float,
+                    file_path: Optional[str] = None) -> None:
+        for observer in self.observers:
+            observer.record_rule(rule_id, start, end, file_path)
+    
+    def record_overrun(self, overrun: BudgetOverrun) -> None:
+        for observer in self.observers:
+            observer.record_overrun(overrun)
+
+
+class LintStats(LintObserver):
+    """Accumulates per-phase and per-rule timings over a lint run."""
+    
+    def __init__(self):
+        self.files = 0
+        self.phase_times: Dict[str, float] = defaultdict(float)
+        self.rule_times: Dict[str, float] = defaultdict(float)
+        self.rule_calls: Dict[str, int] = defaultdict(int)
+        self.budget_overruns: List[BudgetOverrun] = []
+    
+    @contextmanager
+    def phase(self, name: str, file_path: Optional[str] = None) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_times[name] += time.perf_counter() - start
+    
+    def record_rule(self, rule_id: str, start: float, end: float,
+                    file_path: Optional[str] = None) -> None:
+        self.rule_times[rule_id] += end - start
+        self.rule_calls[rule_id] += 1
+    
+    def record_overrun(self, overrun: BudgetOverrun) -> None:
+        self.budget_overruns.append(overrun)
+    
+    def format(self) -> str:
+        """Format the statistics as a plain-text report."""
+        lines = [f"Files linted: {self.files}", "", "Phase timings:"]
+        for name, seconds in sorted(self.phase_times.items(), key=lambda item: -item[1]):
+            lines.append(f"  {name:<24} {seconds * 1000:>10.1f} ms")
+        
+        lines.extend(["", "Rule timings:"])
+        for rule_id, seconds in sorted(self.rule_times.items(), key=lambda item: -item[1]):
+            calls = self.rule_calls[rule_id]
+            lines.append(f"  {rule_id:<24} {seconds * 1000:>10.1f} ms  ({calls} calls)")
+        
+        if self.budget_overruns:
+            lines.extend(["", f"Budget overruns: {len(self.budget_overruns)}"])
+            for overrun in self.budget_overruns:
+                lines.append(
+                    f"  {overrun.rule_id:<8} {overrun.file_path}: {overrun.scope} budget "
+                    f"{overrun.budget_ms:.0f} ms, interrupted after {overrun.elapsed_ms:.0f} ms"
+                )
+        
+        return "\n".join(lines)
@@ -0,0 +1,114 @@
+"""Character streams for feeding grammar files to the ANTLR runtime."""
+
+import codecs
+import mmap
+import sys
+from array import array
+
+from antlr4 import InputStream
+from antlr4.Token import Token
+
+# Native-endian UTF-32 lets code points move between ``str`` and ``array('I')``
+# with a single encode/decode call and no per-character Python objects.
+_UTF32 = "utf-32-le" if sys.byteorder == "little" else "utf-32-be"
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+class MmapCharStream(InputStream):
+    """ANTLR character stream backed by a memory-mapped UTF-8 file.
+
+    ``FileStream`` reads the whole file into ``bytes``, decodes it into a
+    ``str`` and then builds a list of code points from it. This stream maps
+    the file instead and decodes it chunk by chunk, on demand, into a compact
+    ``array('I')`` of code points. Token text is rebuilt from that array, so
+    the decoded file is never held as a single string.
+    """
+
+    __slots__ = ('fileName', '_map', '_offset', '_decoder', '_chunk_size')
+
+    def __init__(self, fileName: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.name = fileName
+        self.fileName = fileName
+        self.strdata = None
+        self._index = 0
+        self.data = array('I')
+        self._size = 0
+        self._offset = 0
+        self._chunk_size = chunk_size
+        self._decoder = codecs.getincrementaldecoder('utf-8')('strict')
+        self._map = None
+
+        # Opening the file is the existence check: a missing file surfaces as
+        # FileNotFoundError from this single open() call.
+        with open(fileName, 'rb') as file:
+            try:
+                self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped; they simply have no content.
+                self._map = None
+
+    @property
+    def size(self):
+        self._fill_all()
+        return self._size
+
+    def _fill(self, pos: int) -> bool:
+        """Decode more of the file until ``pos`` is available or input ends."""
+        while pos >= self._size and self._map is not None:
+            chunk = self._map[self._offset:self._offset + self._chunk_size]
+            self._offset += len(chunk)
+            final = self._offset >= len(self._map)
+            text = self._decoder.decode(chunk, final)
+            if text:
+                self.data.frombytes(text.encode(_UTF32))
+                self._size = len(self.data)
+            if final:
+                self.close()
+        return pos < self._size
+
+    def _fill_all(self) -> None:
+        while self._map is not None:
+            self._fill(self._size)
+
+    def close(self) -> None:
+        """Release the memory map. Already decoded content stays available."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def consume(self):
+        if self._index >= self._size and not self._fill(self._index):
+            raise Exception("cannot consume EOF")
+        self._index += 1
+
+    def LA(self, offset: int):
+        if offset == 0:
+            return 0  # undefined
+        if offset < 0:
+            offset += 1  # e.g., translate LA(-1) to use offset=0
+        pos = self._index + offset - 1
+        if pos < 0:
+            return Token.EOF
+        if pos >= self._size and not self._fill(pos):
+            return Token.EOF
+        return self.data[pos]
+
+    def seek(self, _index: int):
+        if _index <= self._index:
+            self._index = _index
+            return
+        self._fill(_index)
+        self._index = min(_index, self._size)
+
+    def getText(self, start: int, stop: int):
+        self._fill(stop)
+        if stop >= self._size:
+            stop = self._size - 1
+        if start >= self._size:
+            return ""
+        return self.data[start:stop + 1].tobytes().decode(_UTF32)
+
+    def __str__(self):
+        self._fill_all()
+        return self.data.tobytes().decode(_UTF32)
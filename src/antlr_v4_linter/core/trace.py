@@ -0,0 +1,98 @@
+"""Chrome trace-event export of lint pipeline spans (``antlr-lint lint --trace``).
+
+The recorder receives the same phase and rule events as LintStats and keeps
+each one as a complete ("X") event with its process and thread id. The
+resulting JSON opens in chrome://tracing, Perfetto and speedscope.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from .stats import BudgetOverrun, LintObserver
+
+
+def _microseconds(seconds: float) -> float:
+    return round(seconds * 1_000_000, 3)
+
+
+class TraceRecorder(LintObserver):
+    """Records pipeline phases and rule runs as Chrome trace events."""
+    
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._thread_names: Dict[int, str] = {}
+    
+    def _add(self, event: Dict[str, Any]) -> None:
+        thread = threading.current_thread()
+        event["pid"] = os.getpid()
+        event["tid"] = thread.ident
+        with self._lock:
+            self._thread_names.setdefault(thread.ident, thread.name)
+            self.events.append(event)
+    
+    def _span(self, name: str, category: str, start: float, end: float,
+              file_path: Optional[str]) -> None:
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": _microseconds(start),
+            "dur": _microseconds(end - start),
+        }
+        if file_path is not None:
+            event["args"] = {"file": file_path}
+        self._add(event)
+    
+    @contextmanager
+    def phase(self, name: str, file_path: Optional[str] = None) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._span(name, "phase", start, time.perf_counter(), file_path)
+    
+    def record_rule(self, rule_id: str, start: float, end: float,
+                    file_path: Optional[str] = None) -> None:
+        self._span(rule_id, "rule", start, end, file_path)
+    
+    def record_overrun(self, overrun: BudgetOverrun) -> None:
+        self._add({
+            "name": f"{overrun.rule_id} timeout",
+            "cat": "budget",
+            "ph": "i",
+            "s": "t",
+            "ts": _microseconds(time.perf_counter()),
+            "args": {
+                "file": overrun.file_path,
+                "scope": overrun.scope,
+                "budget_ms": overrun.budget_ms,
+                "elapsed_ms": overrun.elapsed_ms,
+            },
+        })
+    
+    def to_json(self) -> Dict[str, Any]:
+        """The recorded events in Chrome trace-event JSON object format."""
+        pid = os.getpid()
+        metadata = [{
+            "name": "process_name", "ph": "M", "pid": pid, "tid": 0,
+            "args": {"name": "antlr-lint"},
+        }]
+        with self._lock:
+            events = list(self.events)
+            for tid, name in self._thread_names.items():
+                metadata.append({
+                    "name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                    "args": {"name": name},
+                })
+        
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+    
+    def write(self, output_path: str) -> None:
+        """Write the trace to a JSON file."""
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_json(), f)
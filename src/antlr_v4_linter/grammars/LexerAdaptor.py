@@ -38,10 +38,62 @@ from typing import TextIO
 # Cannot import lexer so use parser instead.
 from .ANTLRv4Parser import ANTLRv4Parser
 
+# Constants (mirroring the Java static final ints)
+PREQUEL_CONSTRUCT = -10
+OPTIONS_CONSTRUCT = -11
+
+
+def _build_rule_type_transitions():
+    """
+    Precompute the rule-type state machine driven by emit().
+
+    Maps (token_type, current_rule_type) to the next rule type. Pairs that
+    are absent leave the current rule type unchanged. ID tokens are looked up
+    after they have been retyped to TOKEN_REF or RULE_REF.
+    """
+    outside = Token.INVALID_TYPE
+    ruleTypes = (
+        outside,
+        PREQUEL_CONSTRUCT,
+        OPTIONS_CONSTRUCT,
+        ANTLRv4Parser.TOKEN_REF,
+        ANTLRv4Parser.RULE_REF,
+        ANTLRv4Parser.AT,
+    )
+    transitions = {}
+
+    # The ';' token indicates the end of a rule definition, except inside an
+    # options {...} block of a lexer rule.
+    for ruleType in ruleTypes:
+        if ruleType != OPTIONS_CONSTRUCT:
+            transitions[(ANTLRv4Parser.SEMI, ruleType)] = outside
+
+    # Enter prequel construct block, which ends when we see a '}'
+    transitions[(ANTLRv4Parser.OPTIONS, outside)] = PREQUEL_CONSTRUCT
+    transitions[(ANTLRv4Parser.TOKENS, outside)] = PREQUEL_CONSTRUCT
+    transitions[(ANTLRv4Parser.CHANNELS, outside)] = PREQUEL_CONSTRUCT
+    transitions[(ANTLRv4Parser.RBRACE, PREQUEL_CONSTRUCT)] = outside
+
+    # OPTIONS inside a lexer rule opens an options block; '}' returns to the rule
+    transitions[(ANTLRv4Parser.OPTIONS, ANTLRv4Parser.TOKEN_REF)] = OPTIONS_CONSTRUCT
+    transitions[(ANTLRv4Parser.RBRACE, OPTIONS_CONSTRUCT)] = ANTLRv4Parser.TOKEN_REF
+
+    # '@name {...}' action blocks end with their ACTION token
+    transitions[(ANTLRv4Parser.AT, outside)] = ANTLRv4Parser.AT
+    transitions[(ANTLRv4Parser.ACTION, ANTLRv4Parser.AT)] = outside
+
+    # If we were outside a rule, a rule name puts us inside a rule of that type
+    transitions[(ANTLRv4Parser.TOKEN_REF, outside)] = ANTLRv4Parser.TOKEN_REF
+    transitions[(ANTLRv4Parser.RULE_REF, outside)] = ANTLRv4Parser.RULE_REF
+
+    return transitions
+
+
 class LexerAdaptor(Lexer):
-    # Constants (mirroring the Java static final ints)
-    PREQUEL_CONSTRUCT = -10
-    OPTIONS_CONSTRUCT = -11
+    PREQUEL_CONSTRUCT = PREQUEL_CONSTRUCT
+    OPTIONS_CONSTRUCT = OPTIONS_CONSTRUCT
+
+    _RULE_TYPE_TRANSITIONS = _build_rule_type_transitions()
 
     def __init__(self, input: InputStream, output: TextIO = sys.stdout):
         super().__init__(input, output)
@@ -80,76 +132,19 @@ class LexerAdaptor(Lexer):
         Custom emit logic to update _currentRuleType based on tokens like OPTIONS, TOKENS,
         CHANNELS, RBRACE, AT, SEMI, ID, etc.
         """
-        if (
-            (self._type == ANTLRv4Parser.OPTIONS
-             or self._type == ANTLRv4Parser.TOKENS
-             or self._type == ANTLRv4Parser.CHANNELS)
-            and self.getCurrentRuleType() == Token.INVALID_TYPE
-        ):
-            # Enter prequel construct block, which ends when we see a '}'
-            self.setCurrentRuleType(self.PREQUEL_CONSTRUCT)
-
-        elif (
-            self._type == ANTLRv4Parser.OPTIONS
-            and self.getCurrentRuleType() == ANTLRv4Parser.TOKEN_REF
-        ):
-            # We encountered OPTIONS inside a lexer rule, treat it specially
-            self.setCurrentRuleType(self.OPTIONS_CONSTRUCT)
-
-        elif (
-            self._type == ANTLRv4Parser.RBRACE
-            and self.getCurrentRuleType() == self.PREQUEL_CONSTRUCT
-        ):
-            # Exiting a prequel construct block
-            self.setCurrentRuleType(Token.INVALID_TYPE)
-
-        elif (
-            self._type == ANTLRv4Parser.RBRACE
-            and self.getCurrentRuleType() == self.OPTIONS_CONSTRUCT
-        ):
-            # Exiting an options block back into a lexer rule
-            self.setCurrentRuleType(ANTLRv4Parser.TOKEN_REF)
-
-        elif (
-            self._type == ANTLRv4Parser.AT
-            and self.getCurrentRuleType() == Token.INVALID_TYPE
-        ):
-            # Entering an action block
-            self.setCurrentRuleType(ANTLRv4Parser.AT)
-
-        elif (
-            self._type == ANTLRv4Parser.SEMI
-            and self.getCurrentRuleType() == self.OPTIONS_CONSTRUCT
-        ):
-            # A semicolon inside an options {...} block, do nothing special
-            pass
-
-        elif (
-            self._type == ANTLRv4Parser.ACTION
-            and self.getCurrentRuleType() == ANTLRv4Parser.AT
-        ):
-            # Exiting an action block
-            self.setCurrentRuleType(Token.INVALID_TYPE)
-
-        elif self._type == ANTLRv4Parser.ID:
-            # Distinguish between TOKEN_REF (uppercase ID) vs. RULE_REF (lowercase ID)
-            # If the input is only a single char, getText(...) should still return that char
-            # You may need to import Interval or adapt how text is retrieved for your runtime
-            from antlr4 import InputStream
-
-            firstChar = self._input.getText(self._tokenStartCharIndex, self._tokenStartCharIndex)
-            if firstChar and firstChar[0].isupper():
+        if self._type == ANTLRv4Parser.ID:
+            # Distinguish between TOKEN_REF (uppercase ID) vs. RULE_REF (lowercase ID).
+            # A negative LA offset reads the token's first code point without
+            # materializing the token text.
+            firstChar = self._input.LA(self._tokenStartCharIndex - self._input.index)
+            if chr(firstChar).isupper():
                 self._type = ANTLRv4Parser.TOKEN_REF
             else:
                 self._type = ANTLRv4Parser.RULE_REF
 
-            # If we were outside a rule, now we're inside a rule of the indicated type
-            if self.getCurrentRuleType() == Token.INVALID_TYPE:
-                self.setCurrentRuleType(self._type)
-
-        elif self._type == ANTLRv4Parser.SEMI:
-            # The ';' token indicates the end of a rule definition
-            self.setCurrentRuleType(Token.INVALID_TYPE)
+        nextRuleType = self._RULE_TYPE_TRANSITIONS.get((self._type, self._currentRuleType))
+        if nextRuleType is not None:
+            self._currentRuleType = nextRuleType
 
         return super().emit()
 
@@ -39,9 +39,12 @@ __all__ = [
     "MissingErrorRecoveryRule",
     "PotentialAmbiguityRule",
     
-    # Performance rules (P001-P002)
+    # Performance rules (P001-P005)
     "BacktrackingRule",
     "InefficientLexerRule",
+    "DeepLookaheadRule",
+    "LexerStateExplosionRule",
+    "LexerRescanningRule",
     
     # Documentation rules (D001-D002)
     "MissingRuleDocumentationRule",
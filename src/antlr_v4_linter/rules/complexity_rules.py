@@ -1,58 +1,69 @@
 """Complexity and maintainability linting rules (C001-C003)."""
 
-from typing import List
+from ..core.models import Alternative, Element, FixSuggestion, Issue, Rule
+from ..core.rule_engine import RuleVisitor, VisitorLintRule
 
-from ..core.models import FixSuggestion, GrammarAST, Issue, RuleConfig
-from ..core.rule_engine import LintRule
 
-
-class ExcessiveComplexityRule(LintRule):
+class ExcessiveComplexityRule(VisitorLintRule):
     """C001: Rule exceeds complexity thresholds."""
     
-    def __init__(self):
-        super().__init__(
-            rule_id="C001",
-            name="Excessive Rule Complexity",
-            description="Rules should not exceed complexity thresholds for maintainability"
-        )
-    
-    def check(self, grammar: GrammarAST, config: RuleConfig) -> List[Issue]:
-        issues = []
-        
-        # Get thresholds from config
-        max_alternatives = config.thresholds.get("maxAlternatives", 10)
-        max_nesting_depth = config.thresholds.get("maxNestingDepth", 5)
-        max_tokens = config.thresholds.get("maxTokens", 50)
+    class Visitor(RuleVisitor):
+        def __init__(self, lint_rule, grammar, config):
+            super().__init__(lint_rule, grammar, config)
+            # Get thresholds from config
+            self.max_alternatives = config.thresholds.get("maxAlternatives", 10)
+            self.max_nesting_depth = config.thresholds.get("maxNestingDepth", 5)
+            self.max_tokens = config.thresholds.get("maxTokens", 50)
+        
+        def on_rule(self, rule: Rule) -> None:
+            self.max_depth = 0
+            self.total_tokens = 0
+        
+        def on_alternative(self, rule: Rule, alternative: Alternative) -> None:
+            # Parentheses nesting is counted per alternative
+            self.current_depth = 0
+            self.total_tokens += len(alternative.elements)
+        
+        def on_element(self, rule: Rule, alternative: Alternative, element: Element) -> None:
+            if element.node is not None:
+                self.max_depth = max(self.max_depth, element.node.depth)
+                return
+            
+            # Elements built without a tree: count parentheses in the text
+            for char in element.text:
+                if char == '(':
+                    self.current_depth += 1
+                    self.max_depth = max(self.max_depth, self.current_depth)
+                elif char == ')':
+                    self.current_depth = max(0, self.current_depth - 1)
         
-        for rule in grammar.rules:
+        def on_rule_end(self, rule: Rule) -> None:
             complexity_issues = []
             
             # Check number of alternatives
-            if len(rule.alternatives) > max_alternatives:
+            if len(rule.alternatives) > self.max_alternatives:
                 complexity_issues.append(
-                    f"too many alternatives ({len(rule.alternatives)} > {max_alternatives})"
+                    f"too many alternatives ({len(rule.alternatives)} > {self.max_alternatives})"
                 )
             
             # Check nesting depth
-            max_depth = self._calculate_max_nesting_depth(rule)
-            if max_depth > max_nesting_depth:
+            if self.max_depth > self.max_nesting_depth:
                 complexity_issues.append(
-                    f"excessive nesting depth ({max_depth} > {max_nesting_depth})"
+                    f"excessive nesting depth ({self.max_depth} > {self.max_nesting_depth})"
                 )
             
             # Check total tokens
-            total_tokens = self._count_total_tokens(rule)
-            if total_tokens > max_tokens:
+            if self.total_tokens > self.max_tokens:
                 complexity_issues.append(
-                    f"too many tokens ({total_tokens} > {max_tokens})"
+                    f"too many tokens ({self.total_tokens} > {self.max_tokens})"
                 )
             
             if complexity_issues:
-                issues.append(Issue(
-                    rule_id=self.rule_id,
-                    severity=config.severity,
+                self.issues.append(Issue(
+                    rule_id=self.lint_rule.rule_id,
+                    severity=self.config.severity,
                     message=f"Rule '{rule.name}' is too complex: {', '.join(complexity_issues)}",
-                    file_path=grammar.file_path,
+                    file_path=self.grammar.file_path,
                     range=rule.range,
                     suggestions=[
                         FixSuggestion(
@@ -61,74 +72,53 @@ class ExcessiveComplexityRule(LintRule):
                         )
                     ]
                 ))
-        
-        return issues
     
-    def _calculate_max_nesting_depth(self, rule) -> int:
-        """Calculate maximum nesting depth in a rule."""
-        max_depth = 0
-        
-        for alt in rule.alternatives:
-            depth = self._calculate_alt_depth(alt)
-            max_depth = max(max_depth, depth)
-        
-        return max_depth
-    
-    def _calculate_alt_depth(self, alternative) -> int:
-        """Calculate nesting depth of an alternative."""
-        if not alternative.elements:
-            return 0
-        
-        # Simple heuristic: count parentheses nesting
-        max_depth = 0
-        current_depth = 0
-        
-        for element in alternative.elements:
-            text = element.text
-            for char in text:
-                if char == '(':
-                    current_depth += 1
-                    max_depth = max(max_depth, current_depth)
-                elif char == ')':
-                    current_depth = max(0, current_depth - 1)
-        
-        return max_depth
-    
-    def _count_total_tokens(self, rule) -> int:
-        """Count total number of tokens/elements in a rule."""
-        total = 0
-        
-        for alt in rule.alternatives:
-            total += len(alt.elements)
-        
-        return total
-
-
-class DeeplyNestedRuleRule(LintRule):
-    """C002: Deeply nested rule structure."""
+    visitor_class = Visitor
     
     def __init__(self):
         super().__init__(
-            rule_id="C002",
-            name="Deeply Nested Rule",
-            description="Rules should avoid deep nesting for readability"
+            rule_id="C001",
+            name="Excessive Rule Complexity",
+            description="Rules should not exceed complexity thresholds for maintainability"
         )
+
+
+class DeeplyNestedRuleRule(VisitorLintRule):
+    """C002: Deeply nested rule structure."""
     
-    def check(self, grammar: GrammarAST, config: RuleConfig) -> List[Issue]:
-        issues = []
-        
-        # Get threshold from config, default to 4
-        max_nesting = config.thresholds.get("maxNestingDepth", 4)
-        
-        for rule in grammar.rules:
-            max_depth = self._calculate_max_nesting_depth(rule)
+    class Visitor(RuleVisitor):
+        def __init__(self, lint_rule, grammar, config):
+            super().__init__(lint_rule, grammar, config)
+            # Get threshold from config, default to 4
+            self.max_nesting = config.thresholds.get("maxNestingDepth", 4)
+        
+        def on_rule(self, rule: Rule) -> None:
+            self.max_depth = 0
+        
+        def on_alternative(self, rule: Rule, alternative: Alternative) -> None:
+            self.current_depth = 0
+        
+        def on_element(self, rule: Rule, alternative: Alternative, element: Element) -> None:
+            if element.node is not None:
+                self.max_depth = max(self.max_depth, element.node.depth)
+                return
             
-            if max_depth > max_nesting:
-                issues.append(Issue(
-                    rule_id=self.rule_id,
-                    severity=config.severity,
-                    message=f"Rule '{rule.name}' has deep nesting (depth: {max_depth})",
-                    file_path=grammar.file_path,
+            # Elements built without a tree: count nested parentheses, brackets,
+            # and subrule references in the text
+            for char in element.text:
+                if char in '([{':
+                    self.current_depth += 1
+                    self.max_depth = max(self.max_depth, self.current_depth)
+                elif char in ')]}':
+                    self.current_depth = max(0, self.current_depth - 1)
+        
+        def on_rule_end(self, rule: Rule) -> None:
+            if self.max_depth > self.max_nesting:
+                self.issues.append(Issue(
+                    rule_id=self.lint_rule.rule_id,
+                    severity=self.config.severity,
+                    message=f"Rule '{rule.name}' has deep nesting (depth: {self.max_depth})",
+                    file_path=self.grammar.file_path,
                     range=rule.range,
                     suggestions=[
                         FixSuggestion(
@@ -137,57 +127,35 @@ class DeeplyNestedRuleRule(LintRule):
                         )
                     ]
                 ))
-        
-        return issues
     
-    def _calculate_max_nesting_depth(self, rule) -> int:
-        """Calculate maximum nesting depth in a rule."""
-        max_depth = 0
-        
-        for alt in rule.alternatives:
-            # Count nested parentheses, brackets, and subrule references
-            depth = 0
-            current_depth = 0
-            
-            for element in alt.elements:
-                text = element.text
-                for char in text:
-                    if char in '([{':
-                        current_depth += 1
-                        max_depth = max(max_depth, current_depth)
-                    elif char in ')]}':
-                        current_depth = max(0, current_depth - 1)
-        
-        return max_depth
-
-
-class VeryLongRuleRule(LintRule):
-    """C003: Very long rule definition."""
+    visitor_class = Visitor
     
     def __init__(self):
         super().__init__(
-            rule_id="C003",
-            name="Very Long Rule",
-            description="Rules should be kept concise for maintainability"
+            rule_id="C002",
+            name="Deeply Nested Rule",
+            description="Rules should avoid deep nesting for readability"
         )
+
+
+class VeryLongRuleRule(VisitorLintRule):
+    """C003: Very long rule definition."""
     
-    def check(self, grammar: GrammarAST, config: RuleConfig) -> List[Issue]:
-        issues = []
-        
-        # Get threshold from config, default to 30
-        max_lines = config.thresholds.get("maxLines", 30)
-        
-        for rule in grammar.rules:
+    class Visitor(RuleVisitor):
+        def on_rule(self, rule: Rule) -> None:
+            # Get threshold from config, default to 30
+            max_lines = self.config.thresholds.get("maxLines", 30)
+            
             # Calculate rule length (simple approximation)
             if rule.range:
                 rule_lines = rule.range.end.line - rule.range.start.line + 1
                 
                 if rule_lines > max_lines:
-                    issues.append(Issue(
-                        rule_id=self.rule_id,
-                        severity=config.severity,
+                    self.issues.append(Issue(
+                        rule_id=self.lint_rule.rule_id,
+                        severity=self.config.severity,
                         message=f"Rule '{rule.name}' is very long ({rule_lines} lines)",
-                        file_path=grammar.file_path,
+                        file_path=self.grammar.file_path,
                         range=rule.range,
                         suggestions=[
                             FixSuggestion(
@@ -196,5 +164,12 @@ class VeryLongRuleRule(LintRule):
                             )
                         ]
                     ))
-        
-        return issues
\ No newline at end of file
+    
+    visitor_class = Visitor
+    
+    def __init__(self):
+        super().__init__(
+            rule_id="C003",
+            name="Very Long Rule",
+            description="Rules should be kept concise for maintainability"
+        )
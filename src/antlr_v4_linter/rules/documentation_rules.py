@@ -2,13 +2,63 @@
 
 from typing import List
 
-from ..core.models import FixSuggestion, GrammarAST, Issue, RuleConfig
-from ..core.rule_engine import LintRule
+from ..core.index import Facet, GrammarIndex
+from ..core.models import Alternative, Element, FixSuggestion, GrammarAST, Issue, Rule, RuleConfig
+from ..core.rule_engine import LintRule, RuleVisitor, VisitorLintRule
+from ..grammars.ANTLRv4Lexer import ANTLRv4Lexer
 
 
-class MissingRuleDocumentationRule(LintRule):
+class MissingRuleDocumentationRule(VisitorLintRule):
     """D001: Missing documentation for complex rules."""
     
+    requires = frozenset({Facet.COMMENTS})
+    
+    class Visitor(RuleVisitor):
+        def __init__(self, lint_rule, grammar, config):
+            super().__init__(lint_rule, grammar, config)
+            # Lines on which a comment ends
+            comments = GrammarIndex.of(grammar).comments or []
+            self.comment_end_lines = {comment.end_line for comment in comments}
+        
+        def on_rule(self, rule: Rule) -> None:
+            # Criteria for complexity:
+            # - Multiple alternatives (3+)
+            # - Many elements in alternatives
+            # - Contains actions or predicates
+            self.is_complex = len(rule.alternatives) >= 3
+            self.total_elements = 0
+        
+        def on_alternative(self, rule: Rule, alternative: Alternative) -> None:
+            self.total_elements += len(alternative.elements)
+        
+        def on_element(self, rule: Rule, alternative: Alternative, element: Element) -> None:
+            # Check for actions or predicates (simplified)
+            if '{' in element.text or '?' in element.text:
+                self.is_complex = True
+        
+        def on_rule_end(self, rule: Rule) -> None:
+            # Check if rule is complex enough to need documentation
+            if not (self.is_complex or self.total_elements > 10):
+                return
+            
+            # Check if rule has documentation (simplified check)
+            if not self.lint_rule._has_documentation(rule, self.comment_end_lines):
+                self.issues.append(Issue(
+                    rule_id=self.lint_rule.rule_id,
+                    severity=self.config.severity,
+                    message=f"Complex rule '{rule.name}' lacks documentation",
+                    file_path=self.grammar.file_path,
+                    range=rule.range,
+                    suggestions=[
+                        FixSuggestion(
+                            description="Add documentation comment",
+                            fix=f"Add /* Description of {rule.name} */ before the rule"
+                        )
+                    ]
+                ))
+    
+    visitor_class = Visitor
+    
     def __init__(self):
         super().__init__(
             rule_id="D001",
@@ -16,62 +66,17 @@ class MissingRuleDocumentationRule(LintRule):
             description="Complex rules should have documentation comments"
         )
     
-    def check(self, grammar: GrammarAST, config: RuleConfig) -> List[Issue]:
-        issues = []
-        
-        for rule in grammar.rules:
-            # Check if rule is complex enough to need documentation
-            if self._is_complex_rule(rule):
-                # Check if rule has documentation (simplified check)
-                if not self._has_documentation(rule):
-                    issues.append(Issue(
-                        rule_id=self.rule_id,
-                        severity=config.severity,
-                        message=f"Complex rule '{rule.name}' lacks documentation",
-                        file_path=grammar.file_path,
-                        range=rule.range,
-                        suggestions=[
-                            FixSuggestion(
-                                description="Add documentation comment",
-                                fix=f"Add /* Description of {rule.name} */ before the rule"
-                            )
-                        ]
-                    ))
-        
-        return issues
-    
-    def _is_complex_rule(self, rule) -> bool:
-        """Determine if a rule is complex enough to need documentation."""
-        # Criteria for complexity:
-        # - Multiple alternatives (3+)
-        # - Many elements in alternatives
-        # - Contains actions or predicates
-        
-        if len(rule.alternatives) >= 3:
-            return True
-        
-        total_elements = sum(len(alt.elements) for alt in rule.alternatives)
-        if total_elements > 10:
-            return True
-        
-        # Check for actions or predicates (simplified)
-        for alt in rule.alternatives:
-            for element in alt.elements:
-                if '{' in element.text or '?' in element.text:
-                    return True
-        
-        return False
-    
-    def _has_documentation(self, rule) -> bool:
+    def _has_documentation(self, rule, comment_end_lines) -> bool:
         """Check if rule has documentation (simplified)."""
-        # In a real implementation, we'd check for comments before the rule
-        # For now, we'll assume rules don't have documentation
-        return False
+        # A comment ending on the line right before the rule documents it
+        return rule.range.start.line - 1 in comment_end_lines
 
 
 class MissingGrammarHeaderRule(LintRule):
     """D002: Missing grammar header documentation."""
     
+    requires = frozenset({Facet.TOKENS})
+    
     def __init__(self):
         super().__init__(
             rule_id="D002",
@@ -108,6 +113,12 @@ class MissingGrammarHeaderRule(LintRule):
     
     def _has_header_documentation(self, grammar: GrammarAST) -> bool:
         """Check if grammar has header documentation (simplified)."""
-        # In a real implementation, we'd check for comments at the beginning
-        # For now, we'll assume grammars don't have header documentation
+        tokens = GrammarIndex.of(grammar).tokens
+        if tokens is None:
+            return False
+        
+        # The first token that is not whitespace must be a comment
+        for token in tokens:
+            if token.channel != ANTLRv4Lexer.OFF_CHANNEL:
+                return token.channel == ANTLRv4Lexer.COMMENT
         return False
\ No newline at end of file
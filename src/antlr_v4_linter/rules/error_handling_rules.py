@@ -2,6 +2,8 @@
 
 from typing import List, Set
 
+from ..core.analysis import GrammarAnalysis, format_tokens
+from ..core.index import Facet, GrammarIndex
 from ..core.models import FixSuggestion, GrammarAST, Issue, RuleConfig
 from ..core.rule_engine import LintRule
 
@@ -92,6 +94,8 @@ class MissingErrorRecoveryRule(LintRule):
 class PotentialAmbiguityRule(LintRule):
     """E002: Potential ambiguity in grammar."""
     
+    requires = frozenset({Facet.FIRST_SETS})
+    
     def __init__(self):
         super().__init__(
             rule_id="E002",
@@ -101,27 +105,34 @@ class PotentialAmbiguityRule(LintRule):
     
     def check(self, grammar: GrammarAST, config: RuleConfig) -> List[Issue]:
         issues = []
+        analysis = GrammarIndex.of(grammar).analysis
         
         for rule in grammar.rules:
-            if not rule.is_lexer_rule and len(rule.alternatives) > 1:
-                # Check for ambiguous alternatives
+            if rule.is_lexer_rule:
+                continue
+            if rule.name in analysis.rules:
+                # LL(1) conflicts of the rule and of its subrules
+                ambiguities = self._find_conflicts(analysis, rule)
+            elif len(rule.alternatives) > 1:
+                # Rules without an EBNF tree: compare the first elements
                 ambiguities = self._find_ambiguous_alternatives(rule)
-                
-                if ambiguities:
-                    for alt_pair, reason in ambiguities:
-                        issues.append(Issue(
-                            rule_id=self.rule_id,
-                            severity=config.severity,
-                            message=f"Rule '{rule.name}' has potentially ambiguous alternatives: {reason}",
-                            file_path=grammar.file_path,
-                            range=rule.range,
-                            suggestions=[
-                                FixSuggestion(
-                                    description="Resolve ambiguity",
-                                    fix="Use predicates, reorder alternatives, or refactor the rule"
-                                )
-                            ]
-                        ))
+            else:
+                continue
+            
+            for alt_pair, reason in ambiguities:
+                issues.append(Issue(
+                    rule_id=self.rule_id,
+                    severity=config.severity,
+                    message=f"Rule '{rule.name}' has potentially ambiguous alternatives: {reason}",
+                    file_path=grammar.file_path,
+                    range=rule.range,
+                    suggestions=[
+                        FixSuggestion(
+                            description="Resolve ambiguity",
+                            fix="Use predicates, reorder alternatives, or refactor the rule"
+                        )
+                    ]
+                ))
         
         # Check for left recursion (common source of ambiguity)
         left_recursive_rules = self._find_left_recursive_rules(grammar)
@@ -142,11 +153,25 @@ class PotentialAmbiguityRule(LintRule):
         
         return issues
     
+    def _find_conflicts(self, analysis: GrammarAnalysis, rule) -> List:
+        """Find alternatives whose lookahead sets overlap."""
+        self.checkpoint()
+        ambiguities = []
+        for conflict in analysis.conflicts(rule.name):
+            i, j = conflict.alternatives
+            where = "" if conflict.block is None else f" of the subrule at line {conflict.block.range.start.line}"
+            ambiguities.append((
+                (i, j),
+                f"alternatives {i+1} and {j+1}{where} can both start with {format_tokens(conflict.tokens)}"
+            ))
+        return ambiguities
+    
     def _find_ambiguous_alternatives(self, rule) -> List:
         """Find potentially ambiguous alternatives in a rule."""
         ambiguities = []
         
         for i, alt1 in enumerate(rule.alternatives):
+            self.checkpoint()
             for j, alt2 in enumerate(rule.alternatives[i+1:], i+1):
                 # Check if alternatives have same first element
                 if alt1.elements and alt2.elements:
@@ -2,47 +2,45 @@
 
 from typing import Dict, List, Set
 
-from ..core.models import FixSuggestion, GrammarAST, Issue, RuleConfig
-from ..core.rule_engine import LintRule
+from ..core.models import FixSuggestion, GrammarAST, Issue, Rule, RuleConfig
+from ..core.rule_engine import LintRule, RuleVisitor, VisitorLintRule
 
 
-class MissingAlternativeLabelsRule(LintRule):
+class MissingAlternativeLabelsRule(VisitorLintRule):
     """L001: Missing labels for alternatives in parser rules."""
     
+    class Visitor(RuleVisitor):
+        def on_rule(self, rule: Rule) -> None:
+            # Check if parser rule has multiple alternatives
+            if rule.is_lexer_rule or len(rule.alternatives) <= 1:
+                return
+            
+            # Check if any alternative is missing a label
+            unlabeled_count = sum(1 for alt in rule.alternatives if not alt.label)
+            
+            if unlabeled_count > 0:
+                self.issues.append(Issue(
+                    rule_id=self.lint_rule.rule_id,
+                    severity=self.config.severity,
+                    message=f"Rule '{rule.name}' has {unlabeled_count} unlabeled alternative(s) out of {len(rule.alternatives)}",
+                    file_path=self.grammar.file_path,
+                    range=rule.range,
+                    suggestions=[
+                        FixSuggestion(
+                            description="Add labels to alternatives",
+                            fix=f"Add #label syntax to each alternative in '{rule.name}'"
+                        )
+                    ]
+                ))
+    
+    visitor_class = Visitor
+    
     def __init__(self):
         super().__init__(
             rule_id="L001",
             name="Missing Alternative Labels",
             description="Parser rules with multiple alternatives should have labels for clarity"
         )
-    
-    def check(self, grammar: GrammarAST, config: RuleConfig) -> List[Issue]:
-        issues = []
-        
-        parser_rules = [rule for rule in grammar.rules if not rule.is_lexer_rule]
-        
-        for rule in parser_rules:
-            # Check if rule has multiple alternatives
-            if len(rule.alternatives) > 1:
-                # Check if any alternative is missing a label
-                unlabeled_count = sum(1 for alt in rule.alternatives if not alt.label)
-                
-                if unlabeled_count > 0:
-                    issues.append(Issue(
-                        rule_id=self.rule_id,
-                        severity=config.severity,
-                        message=f"Rule '{rule.name}' has {unlabeled_count} unlabeled alternative(s) out of {len(rule.alternatives)}",
-                        file_path=grammar.file_path,
-                        range=rule.range,
-                        suggestions=[
-                            FixSuggestion(
-                                description="Add labels to alternatives",
-                                fix=f"Add #label syntax to each alternative in '{rule.name}'"
-                            )
-                        ]
-                    ))
-        
-        return issues
 
 
 class InconsistentLabelNamingRule(LintRule):
@@ -156,46 +154,45 @@ class InconsistentLabelNamingRule(LintRule):
         return name
 
 
-class DuplicateLabelsRule(LintRule):
+class DuplicateLabelsRule(VisitorLintRule):
     """L003: Duplicate label names within the same rule."""
     
+    class Visitor(RuleVisitor):
+        def on_rule(self, rule: Rule) -> None:
+            # Track labels within this rule
+            self.seen_labels: Dict[str, List] = {}
+            self.alt_index = 0
+        
+        def on_alternative(self, rule: Rule, alternative) -> None:
+            idx = self.alt_index
+            self.alt_index += 1
+            if not rule.is_lexer_rule and alternative.label:
+                self.seen_labels.setdefault(alternative.label, []).append((idx, alternative))
+        
+        def on_rule_end(self, rule: Rule) -> None:
+            # Check for duplicates
+            for label, occurrences in self.seen_labels.items():
+                if len(occurrences) > 1:
+                    for idx, alt in occurrences:
+                        self.issues.append(Issue(
+                            rule_id=self.lint_rule.rule_id,
+                            severity=self.config.severity,
+                            message=f"Duplicate label '{label}' in rule '{rule.name}' (alternative {idx + 1})",
+                            file_path=self.grammar.file_path,
+                            range=alt.range if alt.range else rule.range,
+                            suggestions=[
+                                FixSuggestion(
+                                    description="Use unique label",
+                                    fix=f"Change to #{label}_{idx + 1} or another unique name"
+                                )
+                            ]
+                        ))
+    
+    visitor_class = Visitor
+    
     def __init__(self):
         super().__init__(
             rule_id="L003",
             name="Duplicate Labels",
             description="Labels within the same rule must be unique"
         )
-    
-    def check(self, grammar: GrammarAST, config: RuleConfig) -> List[Issue]:
-        issues = []
-        
-        for rule in grammar.rules:
-            if not rule.is_lexer_rule:
-                # Track labels within this rule
-                seen_labels: Dict[str, List] = {}
-                
-                for idx, alt in enumerate(rule.alternatives):
-                    if alt.label:
-                        if alt.label not in seen_labels:
-                            seen_labels[alt.label] = []
-                        seen_labels[alt.label].append((idx, alt))
-                
-                # Check for duplicates
-                for label, occurrences in seen_labels.items():
-                    if len(occurrences) > 1:
-                        for idx, alt in occurrences:
-                            issues.append(Issue(
-                                rule_id=self.rule_id,
-                                severity=config.severity,
-                                message=f"Duplicate label '{label}' in rule '{rule.name}' (alternative {idx + 1})",
-                                file_path=grammar.file_path,
-                                range=alt.range if alt.range else rule.range,
-                                suggestions=[
-                                    FixSuggestion(
-                                        description="Use unique label",
-                                        fix=f"Change to #{label}_{idx + 1} or another unique name"
-                                    )
-                                ]
-                            ))
-        
-        return issues
\ No newline at end of file
@@ -4,33 +4,25 @@ import re
 from typing import List, Set
 
 from ..core.models import FixSuggestion, GrammarAST, Issue, Position, Range, Rule, RuleConfig
-from ..core.rule_engine import LintRule
+from ..core.rule_engine import LintRule, RuleVisitor, VisitorLintRule
 
 
-class ParserRuleNamingRule(LintRule):
+class ParserRuleNamingRule(VisitorLintRule):
     """N001: Parser rules should start with lowercase letter."""
     
-    def __init__(self):
-        super().__init__(
-            rule_id="N001",
-            name="Parser Rule Naming",
-            description="Parser rule names must start with a lowercase letter"
-        )
-    
-    def check(self, grammar: GrammarAST, config: RuleConfig) -> List[Issue]:
-        issues = []
-        
-        parser_rules = [rule for rule in grammar.rules if not rule.is_lexer_rule]
-        
-        for rule in parser_rules:
+    class Visitor(RuleVisitor):
+        def on_rule(self, rule: Rule) -> None:
+            if rule.is_lexer_rule:
+                return
+            
             if rule.name and not rule.name[0].islower():
                 correct_name = rule.name[0].lower() + rule.name[1:]
                 
-                issues.append(Issue(
-                    rule_id=self.rule_id,
-                    severity=config.severity,
+                self.issues.append(Issue(
+                    rule_id=self.lint_rule.rule_id,
+                    severity=self.config.severity,
                     message=f"Parser rule '{rule.name}' should start with lowercase letter",
-                    file_path=grammar.file_path,
+                    file_path=self.grammar.file_path,
                     range=rule.range,
                     suggestions=[
                         FixSuggestion(
@@ -39,35 +31,34 @@ class ParserRuleNamingRule(LintRule):
                         )
                     ]
                 ))
-        
-        return issues
-
-
-class LexerRuleNamingRule(LintRule):
-    """N002: Lexer rules should be in uppercase."""
+    
+    visitor_class = Visitor
     
     def __init__(self):
         super().__init__(
-            rule_id="N002",
-            name="Lexer Rule Naming", 
-            description="Lexer rule names must start with an uppercase letter"
+            rule_id="N001",
+            name="Parser Rule Naming",
+            description="Parser rule names must start with a lowercase letter"
         )
+
+
+class LexerRuleNamingRule(VisitorLintRule):
+    """N002: Lexer rules should be in uppercase."""
     
-    def check(self, grammar: GrammarAST, config: RuleConfig) -> List[Issue]:
-        issues = []
-        
-        lexer_rules = [rule for rule in grammar.rules if rule.is_lexer_rule]
-        
-        for rule in lexer_rules:
+    class Visitor(RuleVisitor):
+        def on_rule(self, rule: Rule) -> None:
+            if not rule.is_lexer_rule:
+                return
+            
             if rule.name and not rule.name.isupper():
                 # Convert to all uppercase for lexer rules (ANTLR convention)
                 correct_name = rule.name.upper()
                 
-                issues.append(Issue(
-                    rule_id=self.rule_id,
-                    severity=config.severity,
+                self.issues.append(Issue(
+                    rule_id=self.lint_rule.rule_id,
+                    severity=self.config.severity,
                     message=f"Lexer rule '{rule.name}' should be all uppercase",
-                    file_path=grammar.file_path,
+                    file_path=self.grammar.file_path,
                     range=rule.range,
                     suggestions=[
                         FixSuggestion(
@@ -76,8 +67,15 @@ class LexerRuleNamingRule(LintRule):
                         )
                     ]
                 ))
-        
-        return issues
+    
+    visitor_class = Visitor
+    
+    def __init__(self):
+        super().__init__(
+            rule_id="N002",
+            name="Lexer Rule Naming", 
+            description="Lexer rule names must start with an uppercase letter"
+        )
 
 
 class InconsistentNamingRule(LintRule):
@@ -1,14 +1,23 @@
-"""Performance linting rules (P001-P002)."""
+"""Performance linting rules (P001-P005)."""
 
-from typing import List, Set
+import re
+from typing import Dict, List, Optional, Sequence, Set, Tuple
 
-from ..core.models import FixSuggestion, GrammarAST, Issue, RuleConfig
+from ..core import ebnf
+from ..core.analysis import GrammarAnalysis
+from ..core.index import Facet, GrammarIndex
+from ..core.intervals import char_set, char_set_items
+from ..core.lexer_dfa import LexerDFA, rescan_distances
+from ..core.lookahead import LookaheadDecision
+from ..core.models import Element, FixSuggestion, GrammarAST, Issue, Rule, RuleConfig
 from ..core.rule_engine import LintRule
 
 
 class BacktrackingRule(LintRule):
     """P001: Grammar may cause excessive backtracking."""
     
+    requires = frozenset({Facet.FIRST_SETS})
+    
     def __init__(self):
         super().__init__(
             rule_id="P001",
@@ -18,10 +27,11 @@ class BacktrackingRule(LintRule):
     
     def check(self, grammar: GrammarAST, config: RuleConfig) -> List[Issue]:
         issues = []
+        analysis = GrammarIndex.of(grammar).analysis
         
         for rule in grammar.rules:
             # Check for patterns that cause backtracking
-            backtrack_patterns = self._find_backtracking_patterns(rule)
+            backtrack_patterns = self._find_backtracking_patterns(rule, analysis)
             
             if backtrack_patterns:
                 for pattern, reason in backtrack_patterns:
@@ -41,13 +51,40 @@ class BacktrackingRule(LintRule):
         
         return issues
     
-    def _find_backtracking_patterns(self, rule) -> List:
+    def _find_backtracking_patterns(self, rule, analysis: Optional[GrammarAnalysis] = None) -> List:
         """Find patterns that may cause excessive backtracking."""
         patterns = []
         
+        # Alternatives of the rule with overlapping LL(1) lookahead sets
+        conflicting: Dict[int, Set[int]] = {}
+        analyzed = analysis is not None and rule.name in analysis.rules
+        if analyzed:
+            for conflict in analysis.conflicts(rule.name):
+                if conflict.block is None:
+                    i, j = conflict.alternatives
+                    conflicting.setdefault(i, set()).add(j)
+                    conflicting.setdefault(j, set()).add(i)
+            
+            for i, alt in enumerate(rule.alternatives):
+                later = [j for j in conflicting.get(i, ()) if j > i]
+                if not later:
+                    continue
+                other = rule.alternatives[min(later)]
+                if self._has_nullable_prefix(analysis, alt) or self._has_nullable_prefix(analysis, other):
+                    patterns.append((
+                        "Optional prefix conflicts with another alternative",
+                        "optional prefix may cause backtracking"
+                    ))
+                else:
+                    patterns.append((
+                        "Factor out common prefix or reorder alternatives",
+                        "alternatives with common prefix require backtracking"
+                    ))
+        
         # Check for common prefix in alternatives (key backtracking cause)
-        if len(rule.alternatives) > 1:
+        elif len(rule.alternatives) > 1:
             for i, alt1 in enumerate(rule.alternatives):
+                self.checkpoint()
                 for alt2 in rule.alternatives[i+1:]:
                     if self._alternatives_have_common_prefix(alt1, alt2):
                         patterns.append((
@@ -63,14 +100,15 @@ class BacktrackingRule(LintRule):
                         ))
                         break
         
-        for alt in rule.alternatives:
+        for index, alt in enumerate(rule.alternatives):
+            self.checkpoint()
+            
             # Check for (x)* (y)* patterns
             has_consecutive_star = False
             prev_was_star = False
             
             for element in alt.elements:
-                text = element.text
-                if '*' in text:
+                if self._is_closure(element):
                     if prev_was_star:
                         has_consecutive_star = True
                         patterns.append((
@@ -83,14 +121,19 @@ class BacktrackingRule(LintRule):
                     prev_was_star = False
             
             # Check for overlapping alternatives with repetition
-            if '+' in str(alt.elements) or '*' in str(alt.elements):
-                for other_alt in rule.alternatives:
-                    if alt != other_alt and self._alternatives_overlap(alt, other_alt):
-                        patterns.append((
-                            "Reorder alternatives or use predicates",
-                            "overlapping alternatives with repetition"
-                        ))
-                        break
+            if self._has_repetition(alt):
+                if analyzed:
+                    overlaps = bool(conflicting.get(index))
+                else:
+                    overlaps = any(
+                        alt != other_alt and self._alternatives_overlap(alt, other_alt)
+                        for other_alt in rule.alternatives
+                    )
+                if overlaps:
+                    patterns.append((
+                        "Reorder alternatives or use predicates",
+                        "overlapping alternatives with repetition"
+                    ))
         
         # Check for deeply nested optional groups
         for alt in rule.alternatives:
@@ -116,24 +159,45 @@ class BacktrackingRule(LintRule):
         if not alt1.elements or not alt2.elements:
             return False
         
-        # Check if alt1 starts with optional group
-        first_elem = alt1.elements[0].text
-        if '?' in first_elem and ('(' in first_elem or ')' in first_elem):
-            # Extract the optional content
-            optional_content = first_elem.strip('()?')
-            # Check if alt2 starts with the same content
-            if alt2.elements[0].text.strip("'\"") == optional_content.strip("'\""):
-                return True
-        
-        # Check reverse case
-        first_elem = alt2.elements[0].text
-        if '?' in first_elem and ('(' in first_elem or ')' in first_elem):
-            optional_content = first_elem.strip('()?')
-            if alt1.elements[0].text.strip("'\"") == optional_content.strip("'\""):
+        # Check if alt1 starts with an optional group matching the start of alt2,
+        # then the reverse case
+        for first, other in ((alt1, alt2), (alt2, alt1)):
+            optional_content = self._optional_content(first.elements[0])
+            if (optional_content is not None and
+                    other.elements[0].text.strip("'\"") == optional_content.strip("'\"")):
                 return True
         
         return False
     
+    def _has_nullable_prefix(self, analysis: GrammarAnalysis, alternative) -> bool:
+        """Check if an alternative starts with an element that can be empty."""
+        return bool(alternative.elements) and analysis.is_nullable(alternative.elements[0].node)
+    
+    def _optional_content(self, element: Element) -> Optional[str]:
+        """Text inside an optional group element, or None if it is not one."""
+        if element.node is not None:
+            if isinstance(element.node, ebnf.OptionalBlock):
+                return element.node.element.text.strip('()')
+            return None
+        
+        text = element.text
+        if '?' in text and ('(' in text or ')' in text):
+            return text.strip('()?')
+        return None
+    
+    def _is_closure(self, element: Element) -> bool:
+        """Check if an element is a ``*`` repetition."""
+        if element.node is not None:
+            return isinstance(element.node, ebnf.Closure)
+        return '*' in element.text
+    
+    def _has_repetition(self, alternative) -> bool:
+        """Check if an alternative contains a ``*`` or ``+`` repetition."""
+        if alternative.node is not None:
+            return bool(alternative.node.suffixes & {'*', '+'})
+        text = str(alternative.elements)
+        return '+' in text or '*' in text
+    
     def _alternatives_overlap(self, alt1, alt2) -> bool:
         """Check if two alternatives might overlap."""
         if not alt1.elements or not alt2.elements:
@@ -144,6 +208,9 @@ class BacktrackingRule(LintRule):
     
     def _count_nested_optionals(self, alternative) -> int:
         """Count nesting level of optional groups."""
+        if alternative.node is not None:
+            return _optional_nesting(alternative.node)
+        
         max_level = 0
         current_level = 0
         
@@ -160,6 +227,32 @@ class BacktrackingRule(LintRule):
         return max_level
 
 
+def _optional_nesting(node: ebnf.Node) -> int:
+    """Deepest nesting of ``?`` and ``*`` groups below a node."""
+    nested = max((_optional_nesting(child) for child in node.children), default=0)
+    if isinstance(node, (ebnf.OptionalBlock, ebnf.Closure)) and isinstance(node.element, ebnf.Block):
+        return nested + 1
+    return nested
+
+
+def _is_repeated_wildcard(node: ebnf.Node) -> bool:
+    return isinstance(node, ebnf.Closure) and isinstance(node.element, ebnf.Wildcard)
+
+
+def _repeated_alternatives(block: ebnf.Block) -> List[ebnf.Node]:
+    """Alternatives of a block that consist of a single repetition."""
+    return [
+        alt.elements[0] for alt in block.alternatives
+        if len(alt.elements) == 1 and isinstance(alt.elements[0], (ebnf.Closure, ebnf.PositiveClosure))
+    ]
+
+
+def _is_single_character(alternative: ebnf.Alternative) -> bool:
+    elements = alternative.elements
+    return (len(elements) == 1 and isinstance(elements[0], ebnf.Literal) and
+            len(elements[0].value) == 1)
+
+
 class InefficientLexerRule(LintRule):
     """P002: Inefficient lexer patterns."""
     
@@ -201,6 +294,10 @@ class InefficientLexerRule(LintRule):
         
         for alt in rule.alternatives:
             for element in alt.elements:
+                if element.node is not None:
+                    inefficiencies.extend(self._find_inefficient_nodes(element.node))
+                    continue
+                
                 text = element.text
                 
                 # Check for catastrophic backtracking patterns like (.*)* or (.*)+
@@ -211,7 +308,6 @@ class InefficientLexerRule(LintRule):
                     ))
                 
                 # Check for nested quantifiers like (a+)+ or (\w*)*
-                import re
                 nested_pattern = r'\([^)]*[+*]\)[+*]'
                 if re.search(nested_pattern, text):
                     inefficiencies.append((
@@ -256,19 +352,251 @@ class InefficientLexerRule(LintRule):
         
         return inefficiencies
     
+    def _find_inefficient_nodes(self, node: ebnf.Node) -> List:
+        """Find inefficient patterns in the EBNF tree of one element."""
+        inefficiencies = []
+        nodes = list(node.walk())
+        repeated_blocks = [
+            n for n in nodes
+            if isinstance(n, (ebnf.Closure, ebnf.PositiveClosure)) and isinstance(n.element, ebnf.Block)
+        ]
+        
+        inner_repetitions = [inner for n in repeated_blocks for inner in _repeated_alternatives(n.element)]
+        
+        # Repetition of a block that matches any text, like (.*)* or (.*)+
+        if any(_is_repeated_wildcard(inner) for inner in inner_repetitions):
+            inefficiencies.append((
+                "catastrophic backtracking pattern",
+                "Remove nested quantifiers or use atomic groups"
+            ))
+        
+        # Repetition of a block with a repeated alternative, like (a+)+ or (a | b*)*
+        if inner_repetitions:
+            inefficiencies.append((
+                "nested quantifiers can cause exponential backtracking",
+                "Flatten nested quantifiers or use possessive quantifiers"
+            ))
+        
+        # Greedy .* at the beginning; the non-greedy .*? stops at the first match
+        if _is_repeated_wildcard(node) and node.greedy:
+            inefficiencies.append((
+                ".* at beginning of pattern",
+                "Move .* to the end or use more specific pattern"
+            ))
+        
+        if sum(1 for n in nodes if _is_repeated_wildcard(n)) > 1:
+            inefficiencies.append((
+                "multiple .* in pattern",
+                "Use single .* or more specific patterns"
+            ))
+        
+        char_sets = [n for n in nodes if isinstance(n, ebnf.CharSet)]
+        if char_sets and len(char_sets[0].text) > 20 and self._can_simplify_char_class(char_sets[0].text):
+            inefficiencies.append((
+                "complex character class",
+                "Simplify character class using ranges or complement"
+            ))
+        
+        # Alternation of single characters that could be a character class
+        for n in nodes:
+            if (isinstance(n, ebnf.Block) and len(n.alternatives) > 6 and
+                    all(_is_single_character(alt) for alt in n.alternatives)):
+                inefficiencies.append((
+                    "inefficient alternation pattern",
+                    "Use character class [a-h] instead of (a|b|c|d|e|f|g|h)"
+                ))
+                break
+        
+        return inefficiencies
+    
     def _can_simplify_char_class(self, char_class: str) -> bool:
-        """Check if character class can be simplified."""
-        # Simple heuristic: consecutive characters that could be a range
-        chars = char_class[1:-1]  # Remove [ and ]
-        
-        # Check for consecutive ASCII characters
-        if len(chars) > 5:
-            consecutive_count = 0
-            for i in range(len(chars) - 1):
-                if ord(chars[i+1]) == ord(chars[i]) + 1:
-                    consecutive_count += 1
+        """Check if a character class lists more items than the ranges it covers."""
+        body = char_class[1:-1]
+        try:
+            return char_set_items(body) > len(char_set(body))
+        except (ValueError, IndexError):
+            return False
+
+
+class DeepLookaheadRule(LintRule):
+    """P003: Decision needs deep lookahead."""
+    
+    requires = frozenset({Facet.LOOKAHEAD})
+    
+    def __init__(self):
+        super().__init__(
+            rule_id="P003",
+            name="Deep Lookahead",
+            description="Decisions whose alternatives can only be told apart with many tokens of lookahead"
+        )
+    
+    def check(self, grammar: GrammarAST, config: RuleConfig) -> List[Issue]:
+        max_lookahead = config.thresholds.get("maxLookahead", 3)
+        cap = max(config.thresholds.get("lookaheadCap", 6), max_lookahead + 1)
+        lookahead = GrammarIndex.of(grammar).lookahead
+        
+        flagged: List[Tuple[LookaheadDecision, Rule]] = []
+        for rule in grammar.rules:
+            if rule.name not in lookahead.analysis.rules:
+                continue
+            self.checkpoint()
+            for decision in lookahead.decisions(rule.name, cap):
+                if decision.k is None or decision.k > max_lookahead:
+                    flagged.append((decision, rule))
+        
+        # Most expensive decisions first
+        flagged.sort(key=lambda item: -item[0].cost)
+        issues = []
+        for decision, rule in flagged:
+            alternatives = _format_alternatives(decision.alternatives)
+            if decision.block is not None:
+                alternatives += f" of the subrule at line {decision.block.range.start.line}"
+            if decision.ambiguous:
+                reason = f"alternatives {alternatives} can match the same input"
+            elif decision.k is None:
+                reason = f"alternatives {alternatives} are not LL({cap})"
+            else:
+                reason = f"alternatives {alternatives} need LL({decision.k}) lookahead"
+            issues.append(Issue(
+                rule_id=self.rule_id,
+                severity=config.severity,
+                message=f"Rule '{rule.name}' has a deep lookahead decision: {reason} "
+                        f"(estimated cost {decision.cost})",
+                file_path=grammar.file_path,
+                range=rule.range if decision.block is None else decision.block.range,
+                suggestions=[
+                    FixSuggestion(
+                        description="Reduce lookahead",
+                        fix="Left-factor the common prefix of the alternatives"
+                    )
+                ]
+            ))
+        
+        return issues
+
+
+class LexerStateExplosionRule(LintRule):
+    """P004: Lexer mode needs a large DFA."""
+    
+    requires = frozenset({Facet.LEXER_DFA})
+    
+    def __init__(self):
+        super().__init__(
+            rule_id="P004",
+            name="Lexer State Explosion",
+            description="Lexer modes whose DFA has many states or splits the alphabet into many character classes"
+        )
+    
+    def check(self, grammar: GrammarAST, config: RuleConfig) -> List[Issue]:
+        max_states = config.thresholds.get("maxDfaStates", 2000)
+        max_classes = config.thresholds.get("maxCharClasses", 128)
+        rules = {rule.name: rule for rule in grammar.rules if rule.is_lexer_rule}
+        
+        issues = []
+        for mode, dfa in GrammarIndex.of(grammar).lexer_dfas.items():
+            self.checkpoint()
+            if not dfa.rule_names:
+                continue
+            mode_name = f"'{mode}'" if mode is not None else "'DEFAULT_MODE'"
+            
+            if dfa.truncated or dfa.state_count > max_states:
+                top = _top_rules(dfa, dfa.rule_states)
+                estimate = f"more than {dfa.state_count}" if dfa.truncated else str(dfa.state_count)
+                issues.append(Issue(
+                    rule_id=self.rule_id,
+                    severity=config.severity,
+                    message=f"Lexer mode {mode_name} needs an estimated {estimate} DFA states "
+                            f"(limit {max_states}); most states are in rules {_format_counts(top)}",
+                    file_path=grammar.file_path,
+                    range=rules[top[0][0]].range,
+                    suggestions=[
+                        FixSuggestion(
+                            description="Reduce DFA states",
+                            fix="Avoid fixed-length repetitions after loops that overlap them, "
+                                "and match keywords with one identifier rule where possible"
+                        )
+                    ]
+                ))
             
-            # If more than half are consecutive, it can be simplified
-            return consecutive_count > len(chars) / 2
+            if dfa.class_count > max_classes:
+                top = _top_rules(dfa, dfa.rule_boundaries)
+                issues.append(Issue(
+                    rule_id=self.rule_id,
+                    severity=config.severity,
+                    message=f"Lexer mode {mode_name} splits the characters into {dfa.class_count} classes "
+                            f"(limit {max_classes}); most class boundaries come from rules {_format_counts(top)}",
+                    file_path=grammar.file_path,
+                    range=rules[top[0][0]].range,
+                    suggestions=[
+                        FixSuggestion(
+                            description="Merge character sets",
+                            fix="Use shared fragments with wide ranges instead of many small sets"
+                        )
+                    ]
+                ))
         
-        return False
\ No newline at end of file
+        return issues
+
+
+class LexerRescanningRule(LintRule):
+    """P005: Lexer reads far past a token before falling back to it."""
+    
+    requires = frozenset({Facet.LEXER_DFA})
+    
+    def __init__(self):
+        super().__init__(
+            rule_id="P005",
+            name="Lexer Rescanning",
+            description="Tokens the lexer falls back to after reading far ahead for a longer match"
+        )
+    
+    def check(self, grammar: GrammarAST, config: RuleConfig) -> List[Issue]:
+        max_distance = config.thresholds.get("maxRescanDistance", 8)
+        rules = {rule.name: rule for rule in grammar.rules if rule.is_lexer_rule}
+        
+        issues = []
+        for dfa in GrammarIndex.of(grammar).lexer_dfas.values():
+            self.checkpoint()
+            for rescan in rescan_distances(dfa):
+                if rescan.distance is not None and rescan.distance <= max_distance:
+                    continue
+                if rescan.distance is None:
+                    amount = "any number of characters"
+                    cost = "; on long inputs this makes lexing quadratic"
+                else:
+                    amount = f"up to {rescan.distance} characters"
+                    cost = ""
+                candidates = " or ".join(rescan.candidates)
+                issues.append(Issue(
+                    rule_id=self.rule_id,
+                    severity=config.severity,
+                    message=f"Lexer rule '{rescan.token}' can be matched after the lexer reads {amount} "
+                            f"past it trying to match {candidates}, which are then scanned again{cost}",
+                    file_path=grammar.file_path,
+                    range=rules[rescan.token].range,
+                    suggestions=[
+                        FixSuggestion(
+                            description="Bound the rescanning",
+                            fix=f"Let {candidates} also match the prefixes it fails on, "
+                                "for example as an error token, so the lexer never backs up far"
+                        )
+                    ]
+                ))
+        
+        return issues
+
+
+def _top_rules(dfa: LexerDFA, counts: List[int], limit: int = 3) -> List[Tuple[str, int]]:
+    ranked = sorted(zip(dfa.rule_names, counts), key=lambda item: -item[1])
+    return ranked[:limit]
+
+
+def _format_counts(counts: List[Tuple[str, int]]) -> str:
+    return ", ".join(f"{name} ({count})" for name, count in counts)
+
+
+def _format_alternatives(indexes: Sequence[int]) -> str:
+    numbers = [str(index + 1) for index in indexes]
+    if len(numbers) < 2:
+        return "".join(numbers)
+    return f"{', '.join(numbers[:-1])} and {numbers[-1]}"
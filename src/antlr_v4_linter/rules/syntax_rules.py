@@ -3,6 +3,7 @@
 import re
 from typing import List, Set
 
+from ..core.index import Facet, GrammarIndex
 from ..core.models import FixSuggestion, GrammarAST, Issue, Position, Range, RuleConfig
 from ..core.rule_engine import LintRule
 
@@ -10,6 +11,8 @@ from ..core.rule_engine import LintRule
 class MissingEOFRule(LintRule):
     """S001: Main parser rule doesn't consume EOF token."""
     
+    requires = frozenset({Facet.REFERENCE_GRAPH})
+    
     def __init__(self):
         super().__init__(
             rule_id="S001",
@@ -43,26 +46,8 @@ class MissingEOFRule(LintRule):
         else:
             # Auto-detect main rules
             # Build a set of all rules that are referenced by other rules
-            referenced_rules = set()
-            for rule in parser_rules:
-                for alternative in rule.alternatives:
-                    for i, element in enumerate(alternative.elements):
-                        # Check if this element is a rule reference
-                        if element.element_type == "rule_ref":
-                            referenced_rules.add(element.text)
-                        # Also check if the previous element was a rule ref followed by a suffix
-                        # This handles cases like "rs_colattributes?" where they're parsed as two elements
-                        elif element.element_type == "suffix" and i > 0:
-                            prev_element = alternative.elements[i - 1]
-                            if prev_element.element_type == "rule_ref":
-                                # Already added in the previous condition
-                                pass
-                        # Fallback check for rule references not properly tagged
-                        elif (element.text and 
-                              element.text[0].islower() and 
-                              element.text.isalnum() and
-                              not element.element_type in ["suffix", "terminal", "char_set", "token_ref"]):
-                            referenced_rules.add(element.text)
+            graph = GrammarIndex.of(grammar).reference_graph
+            referenced_rules = graph.rules_referenced_by(rule.name for rule in parser_rules)
             
             # Find potential main parser rules
             main_rule_candidates = []
@@ -145,8 +130,9 @@ class IncompleteInputParsingRule(LintRule):
         if grammar.declaration.grammar_type.value == "parser":
             return issues
         
-        # Check if there's an ANY rule or similar catch-all
-        lexer_rules = [rule for rule in grammar.rules if rule.is_lexer_rule]
+        # Check if there's an ANY rule or similar catch-all; rules of other
+        # modes only see the input after a mode switch
+        lexer_rules = [rule for rule in grammar.rules if rule.is_lexer_rule and rule.mode is None]
         has_any_rule = False
         
         for rule in lexer_rules:
@@ -186,6 +172,8 @@ class IncompleteInputParsingRule(LintRule):
 class AmbiguousStringLiteralsRule(LintRule):
     """S003: Same string literal used in multiple lexer rules."""
     
+    requires = frozenset({Facet.LITERALS})
+    
     def __init__(self):
         super().__init__(
             rule_id="S003",
@@ -196,56 +184,30 @@ class AmbiguousStringLiteralsRule(LintRule):
     def check(self, grammar: GrammarAST, config: RuleConfig) -> List[Issue]:
         issues = []
         
-        # Collect all string literals from lexer rules, grouped by mode
-        # Structure: {mode: {literal: [(rule, element)]}}
-        mode_literals = {}  
-        
-        lexer_rules = [rule for rule in grammar.rules if rule.is_lexer_rule]
-        
-        for rule in lexer_rules:
-            # Determine the mode for this rule (None for default mode)
-            mode = rule.mode if hasattr(rule, 'mode') else None
-            
-            if mode not in mode_literals:
-                mode_literals[mode] = {}
-            
-            for alternative in rule.alternatives:
-                for element in alternative.elements:
-                    # Only check actual string literals, not character sets
-                    if element.element_type == "terminal" and (
-                        element.text.startswith("'") or element.text.startswith('"')
-                    ):
-                        # Skip empty strings or malformed literals
-                        if len(element.text) < 2:
-                            continue
-                        
-                        literal = element.text
-                        if literal not in mode_literals[mode]:
-                            mode_literals[mode][literal] = []
-                        mode_literals[mode][literal].append((rule, element))
-        
-        # Find ambiguous literals within each mode
-        for mode, literal_to_rules in mode_literals.items():
-            for literal, rule_elements in literal_to_rules.items():
-                if len(rule_elements) > 1:
-                    # Get unique rules (same rule might use same literal multiple times)
-                    unique_rules = list(set(rule for rule, _ in rule_elements))
-                    
-                    if len(unique_rules) > 1:
-                        mode_str = f" in mode '{mode}'" if mode else ""
-                        for rule, element in rule_elements:
-                            issues.append(Issue(
-                                rule_id=self.rule_id,
-                                severity=config.severity,
-                                message=f"String literal {literal} is ambiguous{mode_str} (used in multiple lexer rules: {', '.join(r.name for r in unique_rules)})",
-                                file_path=grammar.file_path,
-                                range=element.range,
-                                suggestions=[
-                                    FixSuggestion(
-                                        description="Use unique string literals or consolidate rules",
-                                        fix=f"Consider using a shared token rule for {literal}"
-                                    )
-                                ]
-                            ))
+        # The literal trie of each mode groups the uses of equal literals,
+        # however their escapes are spelled
+        for mode, literals in GrammarIndex.of(grammar).literals.items():
+            mode_str = f" in mode '{mode}'" if mode else ""
+            for entry in literals:
+                # Unique rules (same rule might use same literal multiple times)
+                rule_names = list(dict.fromkeys(rule.name for rule, _ in entry.uses))
+                if len(rule_names) < 2:
+                    continue
+                
+                self.checkpoint()
+                for rule, element in entry.uses:
+                    issues.append(Issue(
+                        rule_id=self.rule_id,
+                        severity=config.severity,
+                        message=f"String literal {entry.raw} is ambiguous{mode_str} (used in multiple lexer rules: {', '.join(rule_names)})",
+                        file_path=grammar.file_path,
+                        range=element.range,
+                        suggestions=[
+                            FixSuggestion(
+                                description="Use unique string literals or consolidate rules",
+                                fix=f"Consider using a shared token rule for {entry.raw}"
+                            )
+                        ]
+                    ))
         
         return issues
\ No newline at end of file
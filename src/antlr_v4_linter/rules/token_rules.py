@@ -1,14 +1,22 @@
 """Token and lexer linting rules (T001-T003)."""
 
-from typing import Dict, List, Set
+from itertools import combinations
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
 
-from ..core.models import FixSuggestion, GrammarAST, Issue, RuleConfig
+from ..core import ebnf
+from ..core.index import Facet, GrammarIndex
+from ..core.intervals import IntervalSet, element_chars, format_char_set
+from ..core.lexer_dfa import build_lexer_dfa
+from ..core.literal_index import literal_text
+from ..core.models import FixSuggestion, GrammarAST, Issue, Rule, RuleConfig
 from ..core.rule_engine import LintRule
 
 
 class OverlappingTokensRule(LintRule):
     """T001: Overlapping token definitions."""
     
+    requires = frozenset({Facet.LITERALS})
+    
     def __init__(self):
         super().__init__(
             rule_id="T001",
@@ -21,27 +29,61 @@ class OverlappingTokensRule(LintRule):
         
         lexer_rules = [rule for rule in grammar.rules if rule.is_lexer_rule and not rule.is_fragment]
         
-        # Check for potential overlaps
-        for i, rule1 in enumerate(lexer_rules):
-            for rule2 in lexer_rules[i+1:]:
-                overlap = self._check_overlap(rule1, rule2)
-                if overlap:
-                    issues.append(Issue(
-                        rule_id=self.rule_id,
-                        severity=config.severity,
-                        message=f"Token '{rule1.name}' may overlap with '{rule2.name}': {overlap}",
-                        file_path=grammar.file_path,
-                        range=rule1.range,
-                        suggestions=[
-                            FixSuggestion(
-                                description="Review token order or make patterns more specific",
-                                fix=f"Consider reordering tokens or using more specific patterns"
-                            )
-                        ]
-                    ))
+        # Check the pairs that may overlap
+        for i, j in self._candidate_pairs(grammar, lexer_rules):
+            self.checkpoint()
+            rule1, rule2 = lexer_rules[i], lexer_rules[j]
+            overlap = self._check_overlap(rule1, rule2)
+            if overlap:
+                issues.append(Issue(
+                    rule_id=self.rule_id,
+                    severity=config.severity,
+                    message=f"Token '{rule1.name}' may overlap with '{rule2.name}': {overlap}",
+                    file_path=grammar.file_path,
+                    range=rule1.range,
+                    suggestions=[
+                        FixSuggestion(
+                            description="Review token order or make patterns more specific",
+                            fix=f"Consider reordering tokens or using more specific patterns"
+                        )
+                    ]
+                ))
         
         return issues
     
+    def _candidate_pairs(self, grammar: GrammarAST, lexer_rules: List[Rule]) -> List[Tuple[int, int]]:
+        """Positions (i, j), i < j, of the rule pairs one of the overlap checks may report.
+        
+        Only rules of the same lexer mode are paired. Rules sharing a literal
+        are looked up in the literal trie of their mode; the other checks pair
+        the few identifier, numeric and set rules.
+        """
+        position = {id(rule): i for i, rule in enumerate(lexer_rules)}
+        pairs: Set[Tuple[int, int]] = set()
+        
+        for literals in GrammarIndex.of(grammar).literals.values():
+            for entry in literals:
+                users = sorted({position[id(rule)] for rule, _ in entry.uses if id(rule) in position})
+                pairs.update(combinations(users, 2))
+        
+        modes: Dict[Optional[str], Tuple[List[int], List[int], List[int], List[int]]] = {}
+        for i, rule in enumerate(lexer_rules):
+            identifiers, keywords, numeric, sets = modes.setdefault(rule.mode, ([], [], [], []))
+            if self._is_identifier_pattern(self._get_simple_pattern(rule)):
+                identifiers.append(i)
+            if self._is_keyword_like(rule):
+                keywords.append(i)
+            if self._is_numeric_pattern(rule):
+                numeric.append(i)
+            if _char_set_pattern(rule) is not None:
+                sets.append(i)
+        
+        for identifiers, keywords, numeric, sets in modes.values():
+            pairs.update((min(i, j), max(i, j)) for i in identifiers for j in keywords if i != j)
+            pairs.update(combinations(numeric, 2))
+            pairs.update(combinations(sets, 2))
+        return sorted(pairs)
+    
     def _check_overlap(self, rule1, rule2) -> str:
         """Check if two rules might overlap."""
         # Simple heuristic checks for common overlap patterns
@@ -70,6 +112,14 @@ class OverlappingTokensRule(LintRule):
             if self._numeric_patterns_overlap(rule1, rule2):
                 return f"numeric patterns may overlap"
         
+        # Check for character sets with common characters; when one set contains
+        # the other, rule order decides, which UnreachableTokenRule checks
+        set1, set2 = _char_set_pattern(rule1), _char_set_pattern(rule2)
+        if set1 is not None and set2 is not None:
+            common = set1[0] & set2[0]
+            if common and common != set1[0] and common != set2[0]:
+                return f"both match characters in {format_char_set(common)}"
+        
         return ""
     
     def _is_numeric_pattern(self, rule) -> bool:
@@ -178,6 +228,8 @@ class OverlappingTokensRule(LintRule):
 class UnreachableTokenRule(LintRule):
     """T002: Unreachable token rule."""
     
+    requires = frozenset({Facet.LITERALS, Facet.ATN})
+    
     def __init__(self):
         super().__init__(
             rule_id="T002",
@@ -189,17 +241,12 @@ class UnreachableTokenRule(LintRule):
         issues = []
         
         lexer_rules = [rule for rule in grammar.rules if rule.is_lexer_rule and not rule.is_fragment]
+        shadowing = self._shadowing_rules(grammar, lexer_rules)
         
-        # Check for rules that might be unreachable
+        # Report the rules that might be shadowed by earlier rules
         for i, rule in enumerate(lexer_rules):
-            # Check if this rule might be shadowed by earlier rules
-            shadowing_rules = []
-            
-            for earlier_rule in lexer_rules[:i]:
-                if self._shadows(earlier_rule, rule):
-                    shadowing_rules.append(earlier_rule.name)
-            
-            if shadowing_rules:
+            if i in shadowing:
+                shadowing_rules = [lexer_rules[j].name for j in sorted(shadowing[i])]
                 issues.append(Issue(
                     rule_id=self.rule_id,
                     severity=config.severity,
@@ -216,41 +263,81 @@ class UnreachableTokenRule(LintRule):
         
         return issues
     
-    def _shadows(self, earlier_rule, later_rule) -> bool:
-        """Check if earlier_rule might shadow later_rule."""
-        # Simple heuristic: check if earlier rule is more general
-        
-        # Check if rules have identical patterns
-        if self._have_identical_patterns(earlier_rule, later_rule):
-            return True
+    def _shadowing_rules(self, grammar: GrammarAST, lexer_rules: List[Rule]) -> Dict[int, Set[int]]:
+        """Positions of the earlier rules that might shadow each rule, by its position.
+        
+        Only rules of the same lexer mode compete, so the earlier rules of
+        each kind are kept per mode.
+        """
+        shadowing: Dict[int, Set[int]] = {}
+        patterns: Dict[Tuple[Optional[str], FrozenSet[str]], List[int]] = {}
+        catch_alls: Dict[Optional[str], List[int]] = {}
+        identifiers: Dict[Optional[str], List[int]] = {}
+        sets: Dict[Optional[str], List[Tuple[int, IntervalSet, bool]]] = {}
         
-        # If earlier rule has a catch-all pattern
-        for alt in earlier_rule.alternatives:
-            for element in alt.elements:
-                if element.text in ['.', '.*', '.+']:
-                    return True
-        
-        # Check if later rule is a specific keyword shadowed by ID pattern
-        if self._is_identifier_like(earlier_rule) and self._is_specific_keyword(later_rule):
-            return True
-        
-        return False
+        for i, rule in enumerate(lexer_rules):
+            self.checkpoint()
+            mode = rule.mode
+            earlier: Set[int] = set()
+            
+            # Rules with identical patterns
+            same = patterns.setdefault((mode, self._patterns(rule)), [])
+            earlier.update(same)
+            same.append(i)
+            
+            # Earlier rules with a catch-all pattern
+            earlier.update(catch_alls.get(mode, ()))
+            
+            # A specific keyword shadowed by an ID pattern
+            if self._is_specific_keyword(rule):
+                earlier.update(identifiers.get(mode, ()))
+            
+            # Earlier character sets matching everything this set does
+            later = _char_set_pattern(rule)
+            if later is not None and later[0]:
+                earlier.update(j for j, chars, repeated in sets.get(mode, ())
+                               if later[0].issubset(chars) and (repeated or not later[1]))
+            
+            if earlier:
+                shadowing[i] = earlier
+            if self._has_catch_all(rule):
+                catch_alls.setdefault(mode, []).append(i)
+            if self._is_identifier_like(rule):
+                identifiers.setdefault(mode, []).append(i)
+            if later is not None:
+                sets.setdefault(mode, []).append((i, later[0], later[1]))
+        
+        # A literal rule whose text an earlier rule also matches in full, found
+        # by walking the earlier rule's DFA over the literal trie of its mode
+        index = GrammarIndex.of(grammar)
+        literals = index.literals
+        atn = index.atns.lexer
+        positions: Dict[str, List[int]] = {}
+        for i, rule in enumerate(lexer_rules):
+            positions.setdefault(rule.name, []).append(i)
+        for j, rule in enumerate(lexer_rules):
+            if atn is None or literal_text(rule) is not None or rule.mode not in literals:
+                continue
+            self.checkpoint()
+            dfa = build_lexer_dfa(atn, [rule.name], rule.mode)
+            for entry in literals[rule.mode].accepted_by(dfa):
+                for name in entry.rules:
+                    for i in positions.get(name, ()):
+                        if i > j:
+                            shadowing.setdefault(i, set()).add(j)
+        
+        return shadowing
     
-    def _have_identical_patterns(self, rule1, rule2) -> bool:
-        """Check if two rules have identical patterns."""
-        # Get all patterns from both rules
-        patterns1 = set()
-        for alt in rule1.alternatives:
-            pattern = ' '.join(elem.text for elem in alt.elements)
-            patterns1.add(pattern)
-        
-        patterns2 = set()
-        for alt in rule2.alternatives:
-            pattern = ' '.join(elem.text for elem in alt.elements)
-            patterns2.add(pattern)
-        
-        # If they have the same patterns, they're identical
-        return patterns1 == patterns2
+    def _patterns(self, rule) -> FrozenSet[str]:
+        """The patterns of the alternatives of a rule; rules with equal patterns are identical."""
+        return frozenset(' '.join(elem.text for elem in alt.elements) for alt in rule.alternatives)
+    
+    def _has_catch_all(self, rule) -> bool:
+        """Check if rule has an alternative that matches any character."""
+        return any(
+            len(alt.elements) == 1 and alt.elements[0].text in ['.', '.*', '.+']
+            for alt in rule.alternatives
+        )
     
     def _is_identifier_like(self, rule) -> bool:
         """Check if rule matches identifier-like patterns."""
@@ -278,6 +365,8 @@ class UnreachableTokenRule(LintRule):
 class UnusedTokenRule(LintRule):
     """T003: Token defined but never used."""
     
+    requires = frozenset({Facet.REFERENCE_GRAPH})
+    
     def __init__(self):
         super().__init__(
             rule_id="T003",
@@ -297,13 +386,8 @@ class UnusedTokenRule(LintRule):
         parser_rules = [rule for rule in grammar.rules if not rule.is_lexer_rule]
         
         # Collect all token references from parser rules
-        used_tokens = set()
-        for rule in parser_rules:
-            for alt in rule.alternatives:
-                for element in alt.elements:
-                    # Check if element references a token (uppercase name)
-                    if element.text and element.text[0].isupper() and element.text.isalnum():
-                        used_tokens.add(element.text)
+        graph = GrammarIndex.of(grammar).reference_graph
+        used_tokens = graph.tokens_referenced_by(rule.name for rule in parser_rules)
         
         # Check for unused tokens
         for token_rule in lexer_rules:
@@ -327,4 +411,20 @@ class UnusedTokenRule(LintRule):
                     ]
                 ))
         
-        return issues
\ No newline at end of file
+        return issues
+
+
+def _char_set_pattern(rule) -> Optional[Tuple[IntervalSet, bool]]:
+    """Characters of a rule that is one set element, and whether it repeats with + or *."""
+    if len(rule.alternatives) != 1 or rule.alternatives[0].node is None:
+        return None
+    elements = rule.alternatives[0].node.elements
+    if len(elements) != 1:
+        return None
+    element, repeated = elements[0], False
+    if isinstance(element, (ebnf.Closure, ebnf.PositiveClosure)):
+        element, repeated = element.element, True
+    try:
+        return element_chars(element), repeated
+    except (ValueError, IndexError):
+        return None
@@ -0,0 +1,16 @@
+"""Fixtures shared by the test suites."""
+
+import pytest
+
+from antlr_v4_linter.core.parser import AntlrGrammarParser
+
+
+@pytest.fixture
+def parse():
+    """Parse grammar text as if it were read from ``file_name``."""
+    parser = AntlrGrammarParser()
+
+    def parse(content, file_name="T.g4"):
+        return parser.parse_content(content, file_name)
+
+    return parse
@@ -1,11 +1,14 @@
 """Integration tests for the complete linter."""
 
+import json
 import tempfile
 from pathlib import Path
 
 import pytest
 from antlr_v4_linter.core.linter import ANTLRLinter
 from antlr_v4_linter.core.models import LinterConfig, Severity
+from antlr_v4_linter.core.reporter import JsonReporter, TextReporter
+from antlr_v4_linter.core.stats import LintStats
 
 
 class TestANTLRLinter:
@@ -159,4 +162,86 @@ class TestANTLRLinter:
         finally:
             # Clean up
             for file_path in files:
-                Path(file_path).unlink()
\ No newline at end of file
+                Path(file_path).unlink()
+    
+    def test_lint_content_matches_lint_file(self):
+        """Linting text gives the same issues as linting the same text on disk."""
+        content = "grammar Bad; Program: ID; id: [a-zA-Z]+; ID: [a-zA-Z]+;"
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.g4', delete=False) as f:
+            f.write(content)
+        
+        try:
+            linter = ANTLRLinter()
+            from_file = linter.lint_file(f.name)
+            from_content = linter.lint_content(content, f.name)
+        finally:
+            Path(f.name).unlink()
+        
+        assert from_content.file_path == f.name
+        assert [(i.rule_id, i.message, i.range) for i in from_content.issues] == \
+            [(i.rule_id, i.message, i.range) for i in from_file.issues]
+    
+    def test_lint_batch_keeps_input_order(self):
+        """Virtual paths need not exist; results follow the input order."""
+        sources = [
+            ("rpc/Bad.g4", "grammar Bad; program: ID; ID: [a-zA-Z]+;"),
+            ("rpc/Good.g4", "grammar Good; program: ID EOF; ID: [a-zA-Z]+;"),
+            ("rpc/Broken.g4", "grammar Broken; program: ;; ID"),
+            ("rpc/Bad.g4", "grammar Bad; program: ID EOF; ID: [a-zA-Z]+;"),
+        ]
+        
+        linter = ANTLRLinter()
+        results = linter.lint_batch(sources)
+        
+        assert [r.file_path for r in results] == [path for path, _ in sources]
+        assert "S001" in [i.rule_id for i in results[0].issues]
+        assert "S001" not in [i.rule_id for i in results[3].issues]
+        assert all(i.file_path == "rpc/Good.g4" for i in results[1].issues)
+    
+    def test_lint_content_respects_exclude_patterns(self):
+        """Virtual paths are matched against the exclude patterns like real ones."""
+        config = LinterConfig.default()
+        config.exclude_patterns = ["*Generated*.g4"]
+        
+        result = ANTLRLinter(config).lint_content("grammar X; Bad: 'x';", "MyGenerated.g4")
+        
+        assert result.issues == []
+    
+    def test_identical_files_are_linted_once(self):
+        """Copies of a grammar share one lint run; issues are reported for every path."""
+        vendored = "grammar Vendored; program: ID; ID: [a-zA-Z]+;"
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for name, content in [("a", vendored), ("b", "grammar Own; program: ID EOF; ID: [a-z]+;"),
+                                  ("c", vendored)]:
+                path = Path(tmp) / name / "Vendored.g4"
+                path.parent.mkdir()
+                path.write_text(content)
+                paths.append(str(path))
+            
+            linter = ANTLRLinter()
+            linter.stats = LintStats()
+            results = linter.lint_files(paths)
+        
+        assert [r.file_path for r in results] == paths
+        assert linter.stats.files == 2
+        assert results[2].duplicate_of == paths[0]
+        assert results[0].duplicate_of is None and results[1].duplicate_of is None
+        assert results[2].issues
+        assert [(i.rule_id, i.message) for i in results[2].issues] == \
+            [(i.rule_id, i.message) for i in results[0].issues]
+        assert all(i.file_path == paths[2] for i in results[2].issues)
+        assert all(i.file_path == paths[0] for i in results[0].issues)
+        
+        summary = json.loads(JsonReporter().format_results(results))["summary"]
+        assert summary["deduplicatedFiles"] == 1
+        assert "Deduplicated files: 1" in TextReporter(use_colors=False).format_results(results)
+    
+    def test_lint_batch_deduplicates_contents(self):
+        text = "grammar Bad; program: ID; ID: [a-zA-Z]+;"
+        results = ANTLRLinter().lint_batch([("x/Bad.g4", text), ("y/Bad.g4", text)])
+        
+        assert results[1].duplicate_of == "x/Bad.g4"
+        assert all(i.file_path == "y/Bad.g4" for i in results[1].issues)
\ No newline at end of file
@@ -0,0 +1,109 @@
+"""Stress tests for linting from many threads at once."""
+
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from antlr_v4_linter.core.linter import ANTLRLinter
+from antlr_v4_linter.core.parser import AntlrGrammarParser, DFACache
+from antlr_v4_linter.grammars.ANTLRv4Parser import ANTLRv4Parser
+
+
+GRAMMARS = {
+    "Expr.g4": """
+        grammar Expr;
+        options { language = Python3; }
+        @header { import sys }
+        program: statement+ EOF;
+        statement: ID '=' expr ';' #assign | expr ';' #bare;
+        expr: <assoc=right> expr '^' expr | expr ('*' | '/') expr | expr ('+' | '-') expr
+            | '(' expr ')' | ID | INT;
+        ID: [a-zA-Z_] [a-zA-Z_0-9]*;
+        INT: '0' | [1-9] [0-9]*;
+        WS: [ \\t\\r\\n]+ -> skip;
+    """,
+    "Modes.g4": """
+        lexer grammar Modes;
+        channels { COMMENTS }
+        OPEN: '<' -> pushMode(TAG);
+        TEXT: ~'<'+;
+        LINE_COMMENT: '//' ~[\\r\\n]* -> channel(COMMENTS);
+        mode TAG;
+        CLOSE: '>' -> popMode;
+        NAME: [a-z]+ { self.text.islower() }?;
+        SPACE: ' ' -> skip;
+    """,
+    "Args.g4": """
+        parser grammar Args;
+        options { tokenVocab = Modes; }
+        document locals [int depth = 0]: element* EOF;
+        element returns [str name]: OPEN NAME CLOSE {$name = $NAME.text;} | TEXT;
+        catch [Exception e] { pass }
+        finally { pass }
+    """,
+    "Broken.g4": "grammar Broken; program: ( ; ID: [a-z;",
+}
+
+
+@pytest.fixture
+def grammar_paths():
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for name, text in GRAMMARS.items():
+            path = Path(tmp) / name
+            path.write_text(text)
+            paths.append(str(path))
+        yield paths
+
+
+@pytest.fixture
+def fast_thread_switching():
+    """Switch threads as often as possible to provoke interleavings."""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        yield
+    finally:
+        sys.setswitchinterval(interval)
+
+
+@pytest.mark.parametrize("dfa_cache", list(DFACache), ids=lambda mode: mode.value)
+def test_concurrent_linting_is_deterministic(dfa_cache, grammar_paths, fast_thread_switching):
+    """Many threads sharing one linter get the same results as a single thread."""
+    expected = ANTLRLinter(dfa_cache=dfa_cache).lint_files(grammar_paths)
+    linter = ANTLRLinter(dfa_cache=dfa_cache)
+    
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        runs = list(pool.map(lambda _: linter.lint_files(grammar_paths), range(48)))
+    
+    assert all(results == expected for results in runs)
+    assert all(result.issues for result in expected)
+
+
+@pytest.mark.parametrize("dfa_cache", list(DFACache), ids=lambda mode: mode.value)
+def test_recognizers_are_per_thread(dfa_cache):
+    """Threads get recognizers of their own; DFAs are shared only in locked mode."""
+    parser = AntlrGrammarParser(dfa_cache)
+    recognizers = []
+    
+    def collect():
+        recognizers.append(parser._recognizers())
+    
+    threads = [threading.Thread(target=collect) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    first, second = recognizers
+    assert first.parser is not second.parser
+    first_dfas = first.parser._interp.decisionToDFA
+    second_dfas = second.parser._interp.decisionToDFA
+    if dfa_cache is DFACache.LOCKED:
+        assert first_dfas is second_dfas is ANTLRv4Parser.decisionsToDFA
+    else:
+        assert first_dfas is not second_dfas
+        assert first_dfas is not ANTLRv4Parser.decisionsToDFA
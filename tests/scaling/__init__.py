@@ -0,0 +1 @@
+"""Scaling tests for antlr-v4-linter."""
\ No newline at end of file
@@ -0,0 +1,234 @@
+"""Asymptotic scaling tests for the built-in rules and grammar facets.
+
+Each rule runs on generated grammars of size N, 2N and 4N along several
+shapes (number of rules, alternatives per rule, elements per alternative,
+depth of a rule reference chain). Work is measured as the number of Python
+trace events (calls and executed lines), which is deterministic, unlike
+wall time. A rule fails if the growth between sizes exceeds the
+complexity class declared for it below.
+"""
+
+import math
+import sys
+from typing import Callable, Dict, List
+
+import pytest
+from antlr_v4_linter.core.index import Facet, GrammarIndex
+from antlr_v4_linter.core.linter import ANTLRLinter
+from antlr_v4_linter.core.models import GrammarAST, Issue, RuleConfig
+from antlr_v4_linter.core.parser import AntlrGrammarParser
+from antlr_v4_linter.core.rule_engine import LintRule
+
+
+# Complexity classes, as the exponent k of O(n^k)
+CONSTANT = 0
+LINEAR = 1
+QUADRATIC = 2
+
+# Allowed excess of the measured exponent over the declared one
+TOLERANCE = 0.3
+
+SIZES = (25, 50, 100)
+
+
+def many_rules(n: int) -> str:
+    """N parser rules, each with a keyword token of its own."""
+    lines = ["grammar Scale;", "start: r0 EOF;"]
+    for i in range(n):
+        following = f"r{i + 1}" if i + 1 < n else "ID"
+        lines.append(f"r{i}: K{i} {following} | ID '=' INT ';' | '(' r{i} ')';")
+    lines.extend(f"K{i}: 'k{i}';" for i in range(n))
+    lines.extend(["ID: [a-zA-Z_]+;", "INT: [0-9]+;", "WS: [ \\t\\r\\n]+ -> skip;"])
+    return "\n".join(lines)
+
+
+def wide_rule(n: int) -> str:
+    """One parser rule with N alternatives."""
+    alternatives = " | ".join(f"K{i} ID" for i in range(n))
+    lines = ["grammar Scale;", "start: choice EOF;", f"choice: {alternatives};"]
+    lines.extend(f"K{i}: 'k{i}';" for i in range(n))
+    lines.extend(["ID: [a-zA-Z_]+;", "WS: [ \\t\\r\\n]+ -> skip;"])
+    return "\n".join(lines)
+
+
+def long_alternative(n: int) -> str:
+    """One parser rule with a single alternative of N elements."""
+    sequence = " ".join("(ID | INT)? ','" if i % 2 else "ID '=' INT" for i in range(n))
+    return "\n".join([
+        "grammar Scale;", "start: sequence EOF;", f"sequence: {sequence};",
+        "ID: [a-zA-Z_]+;", "INT: [0-9]+;", "WS: [ \\t\\r\\n]+ -> skip;",
+    ])
+
+
+def reference_chain(n: int) -> str:
+    """N parser rules, each starting with a reference to the next one."""
+    lines = ["grammar Scale;", "start: r0 EOF;"]
+    for i in range(n - 1):
+        lines.append(f"r{i}: r{i + 1} ';' | K{i};")
+    lines.append(f"r{n - 1}: K{n - 1};")
+    lines.extend(f"K{i}: 'k{i}';" for i in range(n))
+    lines.append("WS: [ \\t\\r\\n]+ -> skip;")
+    return "\n".join(lines)
+
+
+SHAPES: Dict[str, Callable[[int], str]] = {
+    "rules": many_rules,
+    "alternatives": wide_rule,
+    "elements": long_alternative,
+    "chain": reference_chain,
+}
+
+# Worst complexity over all shapes; every registered rule must be listed
+RULE_COMPLEXITY = {
+    "S001": LINEAR,
+    "S002": LINEAR,
+    "S003": LINEAR,
+    "N001": LINEAR,
+    "N002": LINEAR,
+    "N003": LINEAR,
+    "L001": LINEAR,
+    "L002": LINEAR,
+    "L003": LINEAR,
+    "C001": LINEAR,
+    "C002": LINEAR,
+    "C003": LINEAR,
+    "T001": LINEAR,
+    "T002": LINEAR,
+    "T003": LINEAR,
+    "E001": LINEAR,
+    "E002": QUADRATIC,  # Compares every pair of alternatives of a rule
+    "P001": QUADRATIC,  # Compares every pair of alternatives of a rule
+    "P002": LINEAR,
+    "P003": LINEAR,
+    "P004": LINEAR,
+    "P005": LINEAR,
+    "D001": LINEAR,
+    "D002": CONSTANT,
+}
+
+FACET_COMPLEXITY = {
+    Facet.REFERENCE_GRAPH: LINEAR,
+    Facet.FIRST_SETS: LINEAR,
+    Facet.LOOKAHEAD: LINEAR,
+    Facet.ATN: LINEAR,
+    Facet.LEXER_DFA: LINEAR,
+    Facet.LITERALS: LINEAR,
+}
+
+_parser = AntlrGrammarParser()
+_grammars: Dict[str, List[GrammarAST]] = {}
+
+
+def grammars(shape: str) -> List[GrammarAST]:
+    """The parsed grammars of a shape at each size, with all lexical facets."""
+    if shape not in _grammars:
+        _grammars[shape] = [
+            _parser.parse_content(SHAPES[shape](size), "Scale.g4", frozenset(Facet))
+            for size in SIZES
+        ]
+    return _grammars[shape]
+
+
+def count_operations(func: Callable[[], object]) -> int:
+    """Number of Python calls and executed lines while running ``func``."""
+    count = 0
+    
+    def trace(frame, event, arg):
+        nonlocal count
+        count += 1
+        return trace
+    
+    previous = sys.gettrace()
+    sys.settrace(trace)
+    try:
+        func()
+    finally:
+        sys.settrace(previous)
+    return count
+
+
+def growth_exponent(operations: List[int]) -> float:
+    """Largest exponent k such that doubling the size multiplied work by 2^k."""
+    return max(
+        math.log2(larger / smaller) if smaller else 0.0
+        for smaller, larger in zip(operations, operations[1:])
+    )
+
+
+def measure_rule(rule: LintRule, shape: str) -> List[int]:
+    operations = []
+    for grammar in grammars(shape):
+        GrammarIndex.of(grammar).build(rule.requires)
+        rule.check(grammar, RuleConfig())  # Warm up caches and imports
+        operations.append(count_operations(lambda: rule.check(grammar, RuleConfig())))
+    return operations
+
+
+def _rules() -> List[LintRule]:
+    return ANTLRLinter().rule_engine.rules
+
+
+def _describe(operations: List[int]) -> str:
+    return ", ".join(f"{ops} ops at N={size}" for size, ops in zip(SIZES, operations))
+
+
+class TestRuleScaling:
+    """Test that no rule grows faster than its declared complexity."""
+    
+    def test_every_rule_declares_its_complexity(self):
+        """New rules must be added to RULE_COMPLEXITY."""
+        assert sorted(rule.rule_id for rule in _rules()) == sorted(RULE_COMPLEXITY)
+    
+    @pytest.mark.parametrize("shape", sorted(SHAPES))
+    @pytest.mark.parametrize("rule", _rules(), ids=lambda rule: rule.rule_id)
+    def test_rule_growth_within_declared_class(self, rule, shape):
+        operations = measure_rule(rule, shape)
+        exponent = growth_exponent(operations)
+        
+        assert exponent <= RULE_COMPLEXITY[rule.rule_id] + TOLERANCE, (
+            f"{rule.rule_id} grows as O(n^{exponent:.2f}) with the number of {shape} "
+            f"({_describe(operations)}), declared O(n^{RULE_COMPLEXITY[rule.rule_id]})"
+        )
+    
+    @pytest.mark.parametrize("shape", sorted(SHAPES))
+    @pytest.mark.parametrize("facet", sorted(FACET_COMPLEXITY, key=lambda facet: facet.value),
+                             ids=lambda facet: facet.value)
+    def test_facet_growth_within_declared_class(self, facet, shape):
+        operations = [
+            count_operations(lambda: GrammarIndex(grammar).build({facet}))
+            for grammar in grammars(shape)
+        ]
+        exponent = growth_exponent(operations)
+        
+        assert exponent <= FACET_COMPLEXITY[facet] + TOLERANCE, (
+            f"{facet.value} grows as O(n^{exponent:.2f}) with the number of {shape} "
+            f"({_describe(operations)}), declared O(n^{FACET_COMPLEXITY[facet]})"
+        )
+
+
+class QuadraticRule(LintRule):
+    """Compares every pair of rules."""
+    
+    def __init__(self):
+        super().__init__("X001", "Quadratic", "Pairwise rule comparison")
+    
+    def check(self, grammar: GrammarAST, config: RuleConfig) -> List[Issue]:
+        for rule in grammar.rules:
+            for other in grammar.rules:
+                if rule is not other and rule.name == other.name:
+                    break
+        return []
+
+
+class TestHarness:
+    """Test the measurement itself."""
+    
+    def test_quadratic_rule_exceeds_linear_class(self):
+        """A pairwise loop is reported as quadratic."""
+        exponent = growth_exponent(measure_rule(QuadraticRule(), "rules"))
+        assert exponent > LINEAR + TOLERANCE
+    
+    def test_growth_exponent(self):
+        assert growth_exponent([10, 20, 40]) == 1.0
+        assert growth_exponent([10, 40, 160]) == 2.0
+        assert growth_exponent([5, 5, 5]) == 0.0
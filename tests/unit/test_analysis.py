@@ -0,0 +1,134 @@
+"""Tests for the nullable, FIRST and FOLLOW analysis."""
+
+import pytest
+
+from antlr_v4_linter.core.analysis import Vocabulary, _components, format_tokens
+from antlr_v4_linter.core.index import GrammarIndex
+
+
+GRAMMAR = """grammar T;
+program: stmt* EOF;
+stmt: ID '=' expr ';' | expr ';' | mod? 'x' | 'x' ;
+mod: 'x' | ;
+expr: expr '+' term | term;
+term: ID | INT | '(' expr ')' | (ID | ID '.' ID) ;
+ID: [a-z]+;
+INT: [0-9]+;
+PLUS: '+';
+"""
+
+
+@pytest.fixture
+def analyze(parse):
+    def analyze(content):
+        return GrammarIndex.of(parse(content)).analysis
+
+    return analyze
+
+
+def names(analysis, tokens):
+    return set(analysis.vocabulary.names_of(tokens))
+
+
+class TestGrammarAnalysis:
+    """Test the rule sets and the LL(1) conflicts."""
+
+    def test_nullable(self, analyze):
+        analysis = analyze(GRAMMAR)
+        assert analysis.nullable == {
+            "program": False, "stmt": False, "mod": True, "expr": False, "term": False,
+        }
+
+    def test_first_sets(self, analyze):
+        analysis = analyze(GRAMMAR)
+        # Literals defined by a lexer rule of their own use the rule name
+        assert names(analysis, analysis.first["expr"]) == {"ID", "INT", "'('"}
+        assert names(analysis, analysis.first["stmt"]) == {"ID", "INT", "'('", "'x'"}
+        assert names(analysis, analysis.first["program"]) == {"ID", "INT", "'('", "'x'", "EOF"}
+
+    def test_follow_sets(self, analyze):
+        analysis = analyze(GRAMMAR)
+        assert names(analysis, analysis.follow["program"]) == {"EOF"}
+        assert names(analysis, analysis.follow["expr"]) == {"PLUS", "';'", "')'"}
+        assert names(analysis, analysis.follow["term"]) == {"PLUS", "';'", "')'"}
+        assert names(analysis, analysis.follow["mod"]) == {"'x'"}
+
+    def test_conflicts(self, analyze):
+        analysis = analyze(GRAMMAR)
+        stmt = {(c.alternatives, tuple(c.tokens)) for c in analysis.conflicts("stmt") if c.block is None}
+        assert stmt == {((0, 1), ("ID",)), ((2, 3), ("'x'",))}
+        # mod can be empty, so entering mod? and skipping it both start with 'x'
+        optional = [c for c in analysis.conflicts("stmt") if c.block is not None]
+        assert [(c.block.text, c.alternatives, c.tokens) for c in optional] == [("mod?", (0, 1), ["'x'"])]
+
+        # Left-recursive alternatives are rewritten by ANTLR
+        assert analysis.conflicts("expr") == []
+
+        block_conflicts = [c for c in analysis.conflicts("term") if c.block is not None]
+        assert len(block_conflicts) == 1
+        assert block_conflicts[0].block.text == "(ID|ID'.'ID)"
+        assert block_conflicts[0].tokens == ["ID"]
+
+    def test_nullable_alternative_uses_follow(self, analyze):
+        analysis = analyze("grammar T; s: a B ; a: B? | C ; B: 'b'; C: 'c';")
+        assert [(c.block, c.alternatives, c.tokens) for c in analysis.conflicts("a")] == [
+            (analysis.rules["a"].alternatives[0].node.elements[0], (0, 1), ["B"]),
+        ]
+        assert analysis.lookahead([alt.node for alt in analysis.rules["a"].alternatives],
+                                  analysis.follow["a"]) == [
+            analysis.vocabulary.bit("B"), analysis.vocabulary.bit("C")
+        ]
+
+        analysis = analyze("grammar T; s: a B ; a: B? C | ; B: 'b'; C: 'c';")
+        assert [(c.alternatives, c.tokens) for c in analysis.conflicts("a")] == [((0, 1), ["B"])]
+
+    def test_loop_decisions(self, analyze):
+        analysis = analyze("grammar T; s: A* A B | C+ D? C | D? ; A: 'a'; B: 'b'; C: 'c'; D: 'd';")
+        assert [(c.block.text, c.alternatives, c.tokens) for c in analysis.conflicts("s")] == [
+            ("A*", (0, 1), ["A"]), ("C+", (0, 1), ["C"]),
+        ]
+        loop = analysis.rules["s"].alternatives[0].node.elements[0]
+        assert analysis.loop_lookahead(loop) == [analysis.vocabulary.bit("A")] * 2
+
+    def test_predicated_alternatives_are_skipped(self, analyze):
+        analysis = analyze("grammar T; s: {p()}? ID | ID ; ID: [a-z]+;")
+        assert analysis.conflicts("s") == []
+
+    def test_wildcard_and_not_set(self, analyze):
+        analysis = analyze("grammar T; s: . | ~(A | B) | A ; A: 'a'; B: 'b'; C: 'c';")
+        conflicts = {c.alternatives: set(c.tokens) for c in analysis.conflicts("s")}
+        assert conflicts[(0, 2)] == {"A"}
+        assert "A" not in conflicts[(0, 1)] and "C" in conflicts[(0, 1)]
+        assert (1, 2) not in conflicts
+
+    def test_reference_cycles(self, analyze):
+        analysis = analyze("grammar T; a: b X | Y ; b: c | ; c: a | Z ; X: 'x'; Y: 'y'; Z: 'z';")
+        assert analysis.nullable == {"a": False, "b": True, "c": False}
+        for name in ("a", "b", "c"):
+            assert names(analysis, analysis.first[name]) >= {"Y", "Z"}
+        assert names(analysis, analysis.first["a"]) == {"X", "Y", "Z"}
+
+    def test_long_reference_chain(self, analyze):
+        rules = [f"r{i}: r{i + 1} ';' | K;" for i in range(3000)] + ["r3000: K;", "K: 'k';"]
+        analysis = analyze("grammar T;\n" + "\n".join(rules))
+        assert names(analysis, analysis.first["r0"]) == {"K"}
+        assert names(analysis, analysis.follow["r3000"]) == {"';'"}
+
+
+class TestHelpers:
+    def test_vocabulary(self):
+        vocabulary = Vocabulary()
+        tokens = vocabulary.bit("A") | vocabulary.bit("C")
+        vocabulary.bit("B")
+        assert vocabulary.bit("A") == 1
+        assert vocabulary.names_of(tokens) == ["A", "C"]
+        assert vocabulary.names_of(vocabulary.all) == ["A", "C", "B"]
+
+    def test_components_in_dependency_order(self):
+        graph = {"a": {"b"}, "b": {"c"}, "c": {"b", "d"}, "d": set()}
+        components = [sorted(component) for component in _components(graph)]
+        assert components == [["d"], ["b", "c"], ["a"]]
+
+    def test_format_tokens(self):
+        assert format_tokens(["A", "B"]) == "A, B"
+        assert format_tokens(["A", "B", "C", "D", "E"]) == "A, B, C and 2 more"
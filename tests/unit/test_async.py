@@ -0,0 +1,145 @@
+"""Tests for the asyncio API of the linter."""
+
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from antlr_v4_linter.core.linter import ANTLRLinter
+from antlr_v4_linter.core.models import GrammarAST, Issue, LinterConfig, RuleConfig
+from antlr_v4_linter.core.rule_engine import LintRule
+
+
+GRAMMAR = """
+grammar Calc;
+program: expr EOF;
+expr: expr '+' expr | INT;
+INT: [0-9]+;
+WS: [ \\t\\r\\n]+ -> skip;
+"""
+
+
+class SleepyRule(LintRule):
+    """Blocks its worker thread for a while on every grammar."""
+    
+    def __init__(self, seconds: float):
+        super().__init__("X001", "Sleepy", "Sleeps")
+        self.seconds = seconds
+    
+    def check(self, grammar: GrammarAST, config: RuleConfig) -> List[Issue]:
+        time.sleep(self.seconds)
+        return []
+
+
+def write_grammars(directory: str, count: int) -> List[str]:
+    paths = []
+    for i in range(count):
+        path = Path(directory) / f"G{i}.g4"
+        path.write_text(GRAMMAR.replace("Calc", f"G{i}"))
+        paths.append(str(path))
+    return paths
+
+
+def messages(result) -> List[str]:
+    return [issue.message for issue in result.issues]
+
+
+class TestAsyncLinting:
+    """Test the coroutine and async generator entry points."""
+    
+    def test_lint_file_async_matches_lint_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_grammars(tmp, 1)[0]
+            linter = ANTLRLinter()
+            try:
+                result = asyncio.run(linter.lint_file_async(path))
+            finally:
+                linter.close()
+            
+            assert result.file_path == path
+            assert messages(result) == messages(ANTLRLinter().lint_file(path))
+    
+    def test_lint_content_async(self):
+        linter = ANTLRLinter()
+        try:
+            result = asyncio.run(linter.lint_content_async(GRAMMAR, "Calc.g4"))
+        finally:
+            linter.close()
+        
+        assert result.file_path == "Calc.g4"
+        assert any(issue.rule_id == "E002" for issue in result.issues)
+    
+    def test_lint_files_async_yields_every_result(self):
+        """Results, including errors for missing files, come back as they complete."""
+        async def collect(linter, paths):
+            return [result async for result in linter.lint_files_async(paths, max_concurrency=2)]
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = write_grammars(tmp, 5) + [str(Path(tmp) / "Missing.g4")]
+            linter = ANTLRLinter()
+            try:
+                results = asyncio.run(collect(linter, paths))
+            finally:
+                linter.close()
+        
+        assert sorted(result.file_path for result in results) == sorted(paths)
+        missing = next(result for result in results if result.file_path.endswith("Missing.g4"))
+        assert missing.issues[0].rule_id == "PARSE_ERROR"
+        assert "Grammar file not found" in missing.issues[0].message
+    
+    def test_event_loop_keeps_running(self):
+        """Rules run off the event loop, which keeps serving other tasks."""
+        linter = ANTLRLinter(LinterConfig(rules={"X001": RuleConfig()}))
+        linter.register_rule(SleepyRule(0.2))
+        ticks = []
+        
+        async def ticker():
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+        
+        async def main():
+            ticking = asyncio.ensure_future(ticker())
+            try:
+                await linter.lint_content_async(GRAMMAR)
+            finally:
+                ticking.cancel()
+        
+        try:
+            asyncio.run(main())
+        finally:
+            linter.close()
+        
+        assert len(ticks) >= 5
+    
+    def test_closing_the_generator_cancels_pending_files(self):
+        """Files that have not started are not linted after the consumer stops."""
+        linter = ANTLRLinter(LinterConfig(rules={"X001": RuleConfig()}), max_workers=1)
+        rule = SleepyRule(0.05)
+        linter.register_rule(rule)
+        linted = []
+        original_check = rule.check
+        
+        def check(grammar, config):
+            linted.append(grammar.file_path)
+            return original_check(grammar, config)
+        
+        rule.check = check
+        
+        async def first(paths):
+            results = linter.lint_files_async(paths, max_concurrency=1)
+            result = await results.__anext__()
+            await results.aclose()
+            await asyncio.sleep(0.2)
+            return result
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = write_grammars(tmp, 6)
+            try:
+                result = asyncio.run(first(paths))
+            finally:
+                linter.close()
+        
+        assert result.file_path in linted
+        assert len(linted) < len(paths)
@@ -0,0 +1,171 @@
+"""Tests for the ATNs built from the EBNF trees."""
+
+from antlr4.Token import Token
+from antlr4.atn.ATNState import ATNState
+from antlr4.atn.Transition import Transition
+
+from antlr_v4_linter.core.atn import build_atns
+from antlr_v4_linter.core.index import Facet, GrammarIndex
+from antlr_v4_linter.core.parser import AntlrGrammarParser
+
+TOKENS = "A: 'a'; B: 'b'; C: 'c';"
+
+
+def build(content):
+    return build_atns(AntlrGrammarParser().parse_content(content, "T.g4"))
+
+
+def in_set(ranges, symbol):
+    return any(low <= symbol <= high for low, high in ranges)
+
+
+def accepts(atn, rule_name, symbols):
+    """Simulate the ATN on token types or code points, starting at a rule."""
+    stop = atn.rule_stop_states[atn.rule_index(rule_name)]
+    configs = {(atn.rule_start_states[atn.rule_index(rule_name)], ())}
+
+    def closure(configs):
+        pending, seen = list(configs), set(configs)
+        while pending:
+            state, stack = pending.pop()
+            moves = []
+            if atn.state_types[state] == ATNState.RULE_STOP and stack:
+                moves.append((stack[-1], stack[:-1]))
+            for kind, target, arg, arg2 in atn.transitions(state):
+                if kind == Transition.RULE:
+                    moves.append((target, stack + (arg2,)))
+                elif kind in (Transition.EPSILON, Transition.ACTION, Transition.PREDICATE):
+                    moves.append((target, stack))
+            for move in moves:
+                if move not in seen:
+                    seen.add(move)
+                    pending.append(move)
+        return seen
+
+    for symbol in symbols:
+        following = set()
+        for state, stack in closure(configs):
+            for kind, target, arg, arg2 in atn.transitions(state):
+                if ((kind == Transition.ATOM and arg == symbol) or
+                        (kind == Transition.RANGE and arg <= symbol <= arg2) or
+                        (kind == Transition.SET and in_set(atn.sets[arg], symbol)) or
+                        (kind == Transition.NOT_SET and not in_set(atn.sets[arg], symbol)) or
+                        kind == Transition.WILDCARD):
+                    following.add((target, stack))
+        configs = following
+    return (stop, ()) in closure(configs)
+
+
+def token_types(atn, *names):
+    return [Token.EOF if name == "EOF" else atn.token_names.index(name) + 1 for name in names]
+
+
+class TestParserATN:
+    """Test the states and transitions of parser rules."""
+
+    def test_rule_start_and_stop_states(self):
+        atn = build(f"grammar T; s: A t ; t: B ; {TOKENS}").parser
+        assert atn.rule_names == ["s", "t"]
+        assert [atn.state_types[s] for s in atn.rule_start_states] == [ATNState.RULE_START] * 2
+        assert [atn.state_types[s] for s in atn.rule_stop_states] == [ATNState.RULE_STOP] * 2
+        assert all(atn.state_rules[s] == 1 for s in (atn.rule_start_states[1], atn.rule_stop_states[1]))
+
+    def test_rule_transition_returns_to_follow_state(self):
+        atn = build(f"grammar T; s: t B ; t: A ; {TOKENS}").parser
+        calls = [(target, arg, arg2) for state in range(atn.state_count)
+                 for kind, target, arg, arg2 in atn.transitions(state) if kind == Transition.RULE]
+        assert len(calls) == 1
+        target, rule, follow = calls[0]
+        assert target == atn.rule_start_states[1] and rule == 1
+        assert [kind for kind, *_ in atn.transitions(follow)] == [Transition.EPSILON]
+        assert accepts(atn, "s", token_types(atn, "A", "B"))
+        assert not accepts(atn, "s", token_types(atn, "A"))
+
+    def test_block_and_loop_decisions(self):
+        atn = build(f"grammar T; s: (A | B) C? (A B)* C+ | B ; {TOKENS}").parser
+        kinds = sorted(atn.state_types[state] for state in atn.decision_states)
+        assert kinds == sorted([
+            ATNState.BLOCK_START, ATNState.BLOCK_START, ATNState.BLOCK_START,
+            ATNState.STAR_LOOP_ENTRY, ATNState.PLUS_LOOP_BACK,
+        ])
+        assert atn.decision_nodes.count(None) == 1
+        for state in atn.decision_states:
+            assert len(list(atn.transitions(state))) == 2
+
+        A, B, C = token_types(atn, "A", "B", "C")
+        assert accepts(atn, "s", [A, C])
+        assert accepts(atn, "s", [B, C, A, B, A, B, C, C])
+        assert accepts(atn, "s", [B])
+        assert not accepts(atn, "s", [A, C, A, C])
+        assert not accepts(atn, "s", [A])
+
+    def test_non_greedy_loop_prefers_exit(self):
+        atn = build(f"grammar T; s: A*? B | A+? C ; {TOKENS}").parser
+        loops = [state for state in atn.decision_states
+                 if atn.state_types[state] in (ATNState.STAR_LOOP_ENTRY, ATNState.PLUS_LOOP_BACK)]
+        for state in loops:
+            exit_target = next(atn.transitions(state))[1]
+            assert atn.state_types[exit_target] == ATNState.LOOP_END
+
+    def test_token_types(self):
+        atn = build("grammar T; s: 'x' ID ~('x' | K) . EOF ; ID: [a-z]+; X: 'x';").parser
+        # Lexer rules come first, then tokens without a rule; literals use their rule
+        assert atn.token_names == ["ID", "X", "K"]
+        K, ID, X, EOF = token_types(atn, "K", "ID", "X", "EOF")
+        assert EOF == Token.EOF
+        assert accepts(atn, "s", [X, ID, ID, K, EOF])
+        assert not accepts(atn, "s", [X, ID, K, K, EOF])
+
+    def test_left_recursion_is_rewritten_into_a_loop(self):
+        atn = build("grammar T; e: e '*' e | e '+' e | ID ; ID: [a-z]+; PLUS: '+'; TIMES: '*';").parser
+        assert atn.unsupported == {}
+        ID, PLUS, TIMES = token_types(atn, "ID", "PLUS", "TIMES")
+        assert accepts(atn, "e", [ID, PLUS, ID, TIMES, ID])
+        assert not accepts(atn, "e", [ID, PLUS])
+
+    def test_unknown_rule_is_reported(self):
+        atn = build(f"grammar T; s: missing A ; {TOKENS}").parser
+        assert atn.unsupported == {"s": "reference to unknown rule missing"}
+
+    def test_compact_storage(self):
+        rules = [f"r{i}: r{i + 1} (',' A)* | B A? | ('(' r{i + 1} ')')+ ;" for i in range(500)]
+        atn = build("grammar T;\n" + "\n".join(rules) + f"\nr500: C; {TOKENS}").parser
+        assert atn.state_count > 15000
+        assert atn.nbytes < 32 * atn.state_count
+
+
+class TestLexerATN:
+    """Test the character transitions of lexer rules."""
+
+    def test_literals_ranges_and_sets(self):
+        atn = build("lexer grammar L; K: 'if' ; ID: [a-z_]+ 'x'..'z'? ; S: ~[\\n\"] . ; fragment F: 'f' ;").lexer
+        assert atn.rule_names == ["K", "ID", "S", "F"]
+        assert accepts(atn, "K", [ord(c) for c in "if"])
+        assert not accepts(atn, "K", [ord(c) for c in "i"])
+        assert accepts(atn, "ID", [ord(c) for c in "a_by"])
+        assert not accepts(atn, "ID", [ord(c) for c in "A"])
+        assert accepts(atn, "S", [ord(c) for c in "a\n"])
+        assert not accepts(atn, "S", [ord(c) for c in "\na"])
+
+    def test_mode_start_state(self):
+        atn = build("lexer grammar L; A: 'a' ; B: F 'b' ; fragment F: 'f' ;").lexer
+        start = atn.mode_start_states[None]
+        assert atn.state_types[start] == ATNState.TOKEN_START
+        assert start in atn.decision_states
+        # Fragments cannot be matched on their own
+        targets = [target for _, target, _, _ in atn.transitions(start)]
+        assert targets == [atn.rule_start_states[0], atn.rule_start_states[1]]
+        assert accepts(atn, "B", [ord("f"), ord("b")])
+
+    def test_unicode_properties(self):
+        atn = build("lexer grammar L; U: [\\p{Lu}]+ ; X: [\\p{Script=Greek}] ;").lexer
+        assert atn.unsupported == {"X": "unsupported Unicode property Script=Greek"}
+        assert accepts(atn, "U", [ord(c) for c in "AÉΣ"])
+        assert not accepts(atn, "U", [ord(c) for c in "Aé"])
+
+    def test_parser_and_lexer_facet(self):
+        grammar = AntlrGrammarParser().parse_content("lexer grammar L; A: 'a' ;", "L.g4")
+        index = GrammarIndex.of(grammar)
+        assert index.atns.parser is None
+        assert index.atns.lexer.rule_names == ["A"]
+        assert Facet.ATN in index.computed
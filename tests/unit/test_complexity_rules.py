@@ -236,6 +236,14 @@ class TestExcessiveComplexityRule:
         issues = rule.check(grammar, config)
         # Cyclomatic complexity = alternatives + quantifiers
         # Should trigger if complexity > 5
+    
+    def test_literal_parentheses_are_not_nesting(self, parse):
+        """Test that quoted parentheses do not count as nesting."""
+        rule = ExcessiveComplexityRule()
+        config = RuleConfig(enabled=True, severity=Severity.WARNING, thresholds={"maxNestingDepth": 1})
+        
+        grammar = parse("grammar T; s: '(' '(' '(' '(' '(' '(' A ')' ')' ')' ')' ')' ')' ;")
+        assert rule.check(grammar, config) == []
 
 
 class TestDeeplyNestedRuleRule:
@@ -381,6 +389,24 @@ class TestDeeplyNestedRuleRule:
         
         issues = rule.check(grammar, config)
         assert len(issues) == 0
+    
+    def test_literal_parentheses_are_not_nesting(self, parse):
+        """Test that quoted parentheses do not count as nesting."""
+        rule = DeeplyNestedRuleRule()
+        config = RuleConfig(enabled=True, severity=Severity.WARNING, thresholds={"maxNestingDepth": 1})
+        
+        grammar = parse("grammar T; s: '(' '(' '(' '(' '(' '(' A ')' ')' ')' ')' ')' ')' ;")
+        assert rule.check(grammar, config) == []
+    
+    def test_block_nesting_is_reported(self, parse):
+        """Test detection of nested blocks in a parsed grammar."""
+        rule = DeeplyNestedRuleRule()
+        config = RuleConfig(enabled=True, severity=Severity.WARNING, thresholds={"maxNestingDepth": 2})
+        
+        grammar = parse("grammar T; s: (A (B (C))) ;")
+        issues = rule.check(grammar, config)
+        assert len(issues) == 1
+        assert "depth: 3" in issues[0].message
 
 
 class TestVeryLongRuleRule:
@@ -494,4 +520,4 @@ class TestVeryLongRuleRule:
         )
         
         issues = rule.check(grammar, relaxed_config)
-        assert len(issues) == 0
\ No newline at end of file
+        assert len(issues) == 0
@@ -0,0 +1,82 @@
+"""Tests for the EBNF tree built next to the flat element lists."""
+
+from antlr_v4_linter.core import ebnf
+from antlr_v4_linter.core.parser import AntlrGrammarParser
+
+
+def first_alternative(grammar, name):
+    rule = next(r for r in grammar.rules if r.name == name)
+    return rule.alternatives[0]
+
+
+class TestEbnfTree:
+    """Test the structure of the tree and its computed fields."""
+
+    def test_parser_elements(self, parse):
+        grammar = parse("grammar T; s: left=expr[1] (',' ids+=ID)* ('x' | ~(A | B) | .)?? {act}? {code} EOF # lab;")
+        alternative = first_alternative(grammar, "s")
+        labeled, closure, optional, predicate, action, eof = [e.node for e in alternative.elements]
+
+        assert isinstance(alternative.node, ebnf.Alternative)
+        assert alternative.node.label == "lab"
+        assert alternative.node.elements == [e.node for e in alternative.elements]
+
+        assert isinstance(labeled, ebnf.Labeled)
+        assert (labeled.label, labeled.operator) == ("left", "=")
+        assert isinstance(labeled.element, ebnf.RuleRef)
+        assert (labeled.element.name, labeled.element.arguments) == ("expr", "1")
+
+        assert isinstance(closure, ebnf.Closure) and closure.greedy
+        block = closure.element
+        assert isinstance(block, ebnf.Block)
+        literal, ids = block.alternatives[0].elements
+        assert isinstance(literal, ebnf.Literal) and literal.value == ","
+        assert ids.operator == "+=" and isinstance(ids.element, ebnf.TokenRef)
+
+        assert isinstance(optional, ebnf.OptionalBlock) and not optional.greedy
+        _, not_set, wildcard = [alt.elements[0] for alt in optional.element.alternatives]
+        assert isinstance(not_set, ebnf.NotSet)
+        assert [n.name for n in not_set.elements] == ["A", "B"]
+        assert isinstance(wildcard, ebnf.Wildcard)
+
+        assert isinstance(predicate, ebnf.Predicate) and predicate.code == "act"
+        assert isinstance(action, ebnf.Action) and action.code == "code"
+        assert isinstance(eof, ebnf.TokenRef) and eof.name == "EOF"
+
+    def test_lexer_elements_and_commands(self, parse):
+        grammar = parse("lexer grammar T; A: 'a'..'z' [0-9]+ ~'\\n'* ('x' | 'y')+? -> channel(HIDDEN), skip;")
+        alternative = first_alternative(grammar, "A")
+        char_range, digits, not_newline, block = [e.node for e in alternative.elements]
+
+        assert isinstance(char_range, ebnf.CharRange)
+        assert (char_range.start, char_range.end) == ("a", "z")
+        assert isinstance(digits, ebnf.PositiveClosure)
+        assert isinstance(digits.element, ebnf.CharSet) and digits.element.body == "0-9"
+        assert isinstance(not_newline.element, ebnf.NotSet)
+        assert isinstance(block, ebnf.PositiveClosure) and not block.greedy
+
+        commands = alternative.node.commands
+        assert [(c.name, c.argument) for c in commands] == [("channel", "HIDDEN"), ("skip", None)]
+
+    def test_computed_fields(self, parse):
+        grammar = parse("grammar T; s: A (B (C | D?)*)+ '(' {x} ;")
+        node = first_alternative(grammar, "s").node
+
+        # Literal parentheses and actions are not nesting
+        assert node.depth == 2
+        assert node.token_count == 5
+        assert node.suffixes == {"?", "*", "+"}
+        assert node.text == "A(B(C|D?)*)+'('{x}"
+
+    def test_walk_is_depth_first(self, parse):
+        grammar = parse("grammar T; s: (A B)? C ;")
+        node = first_alternative(grammar, "s").node
+        atoms = [n.name for n in node.walk() if isinstance(n, ebnf.TokenRef)]
+        assert atoms == ["A", "B", "C"]
+
+    def test_tree_survives_syntax_errors(self):
+        parser = AntlrGrammarParser()
+        for content in ("grammar T; r: ( ;", "grammar T; r: ~( ;", "lexer grammar T; A: 'a'.. -> ;"):
+            grammar = parser.parse_content(content, "T.g4")
+            assert parser._recognizers().error_listener.errors
+            assert all(alt.node is not None for rule in grammar.rules for alt in rule.alternatives)
@@ -0,0 +1,37 @@
+"""Comprehensive tests for error handling rules."""
+
+from antlr_v4_linter.core.models import RuleConfig, Severity
+from antlr_v4_linter.rules.error_handling_rules import PotentialAmbiguityRule
+
+
+class TestPotentialAmbiguityRule:
+    """Test E002: Potential ambiguity rule."""
+    
+    def test_ambiguity_through_rule_references(self, parse):
+        """Test detection of alternatives whose referenced rules start alike."""
+        rule = PotentialAmbiguityRule()
+        config = RuleConfig(enabled=True, severity=Severity.WARNING)
+        
+        grammar = parse("grammar T; s: a | b ; a: ID '=' INT ; b: ID '(' ')' ; ID: [a-z]+; INT: [0-9]+;")
+        assert [issue.message for issue in rule.check(grammar, config)] == [
+            "Rule 's' has potentially ambiguous alternatives: alternatives 1 and 2 can both start with ID"
+        ]
+    
+    def test_optional_block_and_what_follows(self, parse):
+        """Test detection of an optional block that starts like the elements after it."""
+        rule = PotentialAmbiguityRule()
+        config = RuleConfig(enabled=True, severity=Severity.WARNING)
+        
+        grammar = parse("grammar T; s: (A B)? A C ; A: 'a'; B: 'b'; C: 'c';")
+        assert [issue.message for issue in rule.check(grammar, config)] == [
+            "Rule 's' has potentially ambiguous alternatives: "
+            "alternatives 1 and 2 of the subrule at line 1 can both start with A"
+        ]
+    
+    def test_distinct_prefixes(self, parse):
+        """Test that alternatives starting with different tokens are not reported."""
+        rule = PotentialAmbiguityRule()
+        config = RuleConfig(enabled=True, severity=Severity.WARNING)
+        
+        grammar = parse("grammar T; s: a | b ; a: X Y ; b: Z Y ; X: 'x'; Y: 'y'; Z: 'z';")
+        assert rule.check(grammar, config) == []
@@ -0,0 +1,140 @@
+"""Tests for the random sentence generator."""
+
+import io
+import tempfile
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from antlr_v4_linter.cli.main import cli
+from antlr_v4_linter.core.generator import CHUNK_SIZE, SentenceGenerator, write_inputs
+from antlr_v4_linter.core.index import GrammarIndex
+
+GRAMMARS = Path(__file__).parents[2] / "src" / "antlr_v4_linter" / "grammars"
+
+CALC = """
+grammar Calc;
+program: stat+ EOF;
+stat: ID '=' expr ';' | 'print' '(' expr? ')' ';';
+expr: expr ('*' | '/') expr | expr ('+' | '-') expr | ID | INT | STRING | '(' expr ')';
+PRINT: 'print';
+ID: [a-z_] [a-z0-9_]*;
+INT: [0-9]+;
+STRING: '"' (~["\\\\\\r\\n] | '\\\\' .)* '"';
+WS: [ \\t\\r\\n]+ -> skip;
+"""
+
+
+@pytest.fixture
+def generate(parse):
+    def generate(content, size=200, **kwargs):
+        return "".join(SentenceGenerator([parse(content)], **kwargs).sentence(size))
+
+    return generate
+
+
+class TestSentenceGenerator:
+    """Test the sentences and their sizes."""
+
+    def test_tokens_are_matched_by_their_rules(self, parse):
+        grammar = parse(CALC, "Calc.g4")
+        dfa = GrammarIndex.of(grammar).lexer_dfas[None]
+        generator = SentenceGenerator([grammar], seed=3)
+        words = "".join(generator.sentence(2000)).split(" ")
+        # Literals without a lexer rule of their own become implicit tokens
+        implicit = set("=;()*/+-")
+        assert all(word in implicit or dfa.match(word) in ("PRINT", "ID", "INT", "STRING") for word in words)
+        assert generator.separator == " "
+        assert words[-1] == ";"
+
+    def test_brackets_stay_balanced_under_the_depth_limit(self, generate):
+        text = generate("grammar T; s: e+ ; e: '(' e* ')' | 'x' ;", size=5000, max_depth=6, seed=1)
+        depth = 0
+        for word in text.split():
+            depth += {"(": 1, ")": -1}.get(word, 0)
+            assert 0 <= depth <= 7
+        assert depth == 0
+
+    def test_left_recursive_rule_finishes(self, generate):
+        text = generate("grammar T; e: e '+' e | e '*' e | 'x' ;", size=50, seed=2)
+        assert text.split()[0] == "x" and text.split()[-1] == "x"
+
+    def test_size_is_reached_and_not_far_exceeded(self, generate):
+        text = generate(CALC, size=20000, seed=5)
+        assert 20000 <= len(text) < 21000
+
+    def test_seed_makes_sentences_reproducible(self, generate):
+        assert generate(CALC, seed=7) == generate(CALC, seed=7)
+        assert generate(CALC, seed=7) != generate(CALC, seed=8)
+
+    def test_sentences_are_streamed_in_chunks(self, parse):
+        generator = SentenceGenerator([parse(CALC)], seed=4)
+        chunks = list(generator.sentence(5 * CHUNK_SIZE))
+        assert len(chunks) >= 5
+        assert all(len(chunk) < 2 * CHUNK_SIZE for chunk in chunks)
+        out = io.StringIO()
+        assert generator.write(out, 100) == len(out.getvalue())
+
+    def test_split_grammars_and_token_names(self, parse, generate):
+        parser = parse("parser grammar P; options { tokenVocab = L; } s: A B* OTHER ;", "P.g4")
+        lexer = parse("lexer grammar L; A: 'a' ; B: 'b' [0-9] ; WS: ' ' -> skip ;", "L.g4")
+        text = "".join(SentenceGenerator([parser, lexer], seed=1).sentence(10))
+        words = text.split(" ")
+        assert words[0] == "a" and words[-1] == "OTHER"
+        assert all(len(word) == 2 and word[0] == "b" for word in words[1:-1])
+        # Without lexer rules, token names are separated by spaces
+        assert generate("parser grammar P; s: A B ;") == "A B"
+
+    def test_start_rule_errors(self, parse):
+        with pytest.raises(ValueError, match="Unknown start rule"):
+            SentenceGenerator([parse(CALC)], start_rule="missing")
+        with pytest.raises(ValueError, match="cannot derive"):
+            SentenceGenerator([parse("grammar T; s: '(' s ')' ;")])
+        with pytest.raises(ValueError, match="no parser rules"):
+            SentenceGenerator([parse("lexer grammar L; A: 'a' ;")])
+
+    def test_write_inputs(self, parse):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = write_inputs(SentenceGenerator([parse(CALC)], seed=1), tmp, 12, 100, ".calc")
+            assert [Path(path).name for path in paths[:2]] == ["input-00.calc", "input-01.calc"]
+            assert all(Path(path).read_text().endswith(";\n") for path in paths)
+
+
+class TestGenerateInputsCommand:
+    """Test `antlr-lint generate-inputs` and `profile-grammar --generate`."""
+
+    def test_writes_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            grammar = Path(tmp) / "Calc.g4"
+            grammar.write_text(CALC)
+            output = Path(tmp) / "out"
+            result = CliRunner().invoke(cli, [
+                "generate-inputs", str(grammar), "-n", "3", "-s", "50", "-o", str(output), "--seed", "1",
+            ])
+            assert result.exit_code == 0, result.output
+            assert sorted(path.name for path in output.iterdir()) == [
+                "input-0.txt", "input-1.txt", "input-2.txt",
+            ]
+
+    def test_stdout_and_errors(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            grammar = Path(tmp) / "Calc.g4"
+            grammar.write_text(CALC)
+            result = CliRunner().invoke(cli, ["generate-inputs", str(grammar), "-n", "2", "-o", "-",
+                                              "--start-rule", "expr", "-s", "10"])
+            assert result.exit_code == 0, result.output
+            assert len(result.output.splitlines()) == 2
+
+            result = CliRunner().invoke(cli, ["generate-inputs", str(grammar), "--start-rule", "nope"])
+            assert result.exit_code == 1
+            assert "Unknown start rule" in result.output
+
+    def test_profile_generated_sentences(self):
+        result = CliRunner().invoke(cli, [
+            "profile-grammar", "--interp", str(GRAMMARS / "ANTLRv4Parser.interp"),
+            "--lexer-interp", str(GRAMMARS / "ANTLRv4Lexer.interp"),
+            "--generate", "2", "--size", "300", "--seed", "1", "--jobs", "1", "--no-colors",
+        ])
+        assert result.exit_code == 0, result.output
+        assert "Profiled 2 files" in result.output
@@ -0,0 +1,153 @@
+"""Tests for the profile-grammar subcommand."""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+from antlr4 import CommonTokenStream, InputStream
+from click.testing import CliRunner
+
+from antlr_v4_linter.cli.main import cli
+from antlr_v4_linter.core.grammar_profile import (
+    DecisionStats,
+    GrammarProfile,
+    GrammarProfiler,
+    InterpreterData,
+    input_files,
+    profile_grammar,
+    profile_issues,
+)
+from antlr_v4_linter.core.models import Severity
+from antlr_v4_linter.core.parser import AntlrGrammarParser
+from antlr_v4_linter.grammars.ANTLRv4Lexer import ANTLRv4Lexer
+
+GRAMMARS = Path(__file__).parents[2] / "src" / "antlr_v4_linter" / "grammars"
+LEXER_INTERP = str(GRAMMARS / "ANTLRv4Lexer.interp")
+PARSER_INTERP = str(GRAMMARS / "ANTLRv4Parser.interp")
+
+SAMPLE = """
+grammar Calc;
+program: stat+ EOF;
+stat: ID '=' expr ';' | expr ';';
+expr: expr ('*' | '/') expr | expr ('+' | '-') expr | ID | INT | '(' expr ')';
+ID: [a-z]+;
+INT: [0-9]+;
+WS: [ \\t\\r\\n]+ -> skip;
+"""
+
+
+class TestGrammarProfiler:
+    """Test the interpreters and the prediction statistics."""
+
+    def test_load_interp_files(self):
+        lexer = InterpreterData.load(LEXER_INTERP)
+        parser = InterpreterData.load(PARSER_INTERP)
+        assert lexer.is_lexer and not parser.is_lexer
+        assert lexer.mode_names[0] == "DEFAULT_MODE"
+        assert parser.rule_names[0] == "grammarSpec"
+        assert parser.symbolic_names[parser.symbolic_names.index("GRAMMAR")] == "GRAMMAR"
+        assert parser.literal_names[0] is None
+
+    def test_load_rejects_other_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "X.interp"
+            path.write_text("rule names:\na\n")
+            with pytest.raises(ValueError):
+                InterpreterData.load(str(path))
+
+    def test_parser_interpreter_statistics(self):
+        """The interpreter parses what the generated parser parses, recording each prediction."""
+        profiler = GrammarProfiler(InterpreterData.load(LEXER_INTERP), InterpreterData.load(PARSER_INTERP))
+        # The ANTLR grammar lexer needs the code of its superclass, so use the generated one
+        profiler.parser.setTokenStream(CommonTokenStream(ANTLRv4Lexer(InputStream(SAMPLE))))
+        profiler.parser.parse(profiler.start_rule_index)
+        profile = profiler.result()
+
+        assert profile.syntax_errors == 0
+        invoked = {stats.rule_name for stats in profile.decisions if stats.invocations}
+        assert {"grammarSpec", "alternative", "element"} <= invoked
+        assert max(stats.max_lookahead for stats in profile.decisions) >= 2
+        assert profile.prediction_seconds > 0
+
+        profiler.reset()
+        assert profiler.profile.decisions[0].invocations == 0
+        assert profiler.parser._interp.decisions is profiler.profile.decisions
+
+    def test_profile_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ("a.g4", "b.g4", ".hidden/c.g4"):
+                (Path(tmp) / name).parent.mkdir(exist_ok=True)
+                (Path(tmp) / name).write_text(SAMPLE)
+            paths = input_files([tmp])
+            assert [Path(path).name for path in paths] == ["a.g4", "b.g4"]
+
+            lexer, parser = InterpreterData.load(LEXER_INTERP), InterpreterData.load(PARSER_INTERP)
+            profile = profile_grammar(lexer, parser, paths, jobs=1)
+            assert profile.files == 2
+            assert profile.tokens > 0
+            assert any(stats.invocations for stats in profile.decisions)
+
+            lexer_only = profile_grammar(lexer, None, paths, jobs=1)
+            assert lexer_only.tokens == profile.tokens
+            assert lexer_only.decisions == []
+
+    def test_parallel_profile_matches_serial_counts(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for index in range(4):
+                (Path(tmp) / f"s{index}.g4").write_text(SAMPLE)
+            paths = input_files([tmp])
+            lexer, parser = InterpreterData.load(LEXER_INTERP), InterpreterData.load(PARSER_INTERP)
+            serial = profile_grammar(lexer, parser, paths, jobs=1)
+            parallel = profile_grammar(lexer, parser, paths, jobs=2)
+
+            assert (parallel.files, parallel.tokens, parallel.syntax_errors) == (
+                serial.files, serial.tokens, serial.syntax_errors)
+            assert [s.invocations for s in parallel.decisions] == [s.invocations for s in serial.decisions]
+
+
+class TestProfileIssues:
+    """Test how decision statistics become issues."""
+
+    def test_issues_at_rule_ranges(self):
+        grammar = AntlrGrammarParser().parse_content(SAMPLE, "Calc.g4")
+        profile = GrammarProfile(decisions=[
+            DecisionStats(0, "program", invocations=10, max_lookahead=1, seconds=0.01),
+            DecisionStats(1, "stat", invocations=4, ll_fallbacks=2, max_lookahead=3, seconds=0.001),
+            DecisionStats(2, "expr", invocations=20, max_lookahead=5, seconds=0.0001),
+            DecisionStats(3, "expr", invocations=20, max_lookahead=1, seconds=0.0001),
+            DecisionStats(4, "missing", invocations=1, ll_fallbacks=1, max_lookahead=1, seconds=0.0),
+        ])
+        issues = profile_issues(profile, grammar, "Calc.g4")
+
+        assert [issue.message.split(":")[0] for issue in issues] == [
+            "Decision 0 in rule 'program' was predicted 10 times",
+            "Decision 1 in rule 'stat' was predicted 4 times",
+            "Decision 2 in rule 'expr' was predicted 20 times",
+            "Decision 4 in rule 'missing' was predicted 1 time",
+        ]
+        assert issues[1].message.endswith("up to 3 tokens of lookahead, 2 full-context (LL) fallbacks")
+        assert [issue.severity for issue in issues] == [
+            Severity.INFO, Severity.WARNING, Severity.INFO, Severity.WARNING,
+        ]
+        assert issues[1].range.start.line == 4
+        assert issues[3].range.start.line == 1
+        assert {issue.rule_id for issue in issues} == {"R001"}
+
+
+class TestProfileGrammarCommand:
+    """Test `antlr-lint profile-grammar`."""
+
+    def test_reports_decisions_and_issues(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            (Path(tmp) / "sample.g4").write_text(SAMPLE)
+            result = CliRunner().invoke(cli, [
+                "profile-grammar", "--interp", PARSER_INTERP, "--lexer-interp", LEXER_INTERP,
+                "--inputs", tmp, "--jobs", "1", "--no-colors",
+            ])
+
+            assert result.exit_code == 0, result.output
+            assert "Profiled 1 files" in result.output
+            assert "max k" in result.output
+            # Issues go to the grammar next to the parser .interp file
+            assert "ANTLRv4Parser.g4" in result.output
+            assert "(R001)" in result.output
@@ -0,0 +1,109 @@
+"""Tests for rule facet declarations and the grammar index."""
+
+from antlr_v4_linter.core.index import Facet, GrammarIndex
+from antlr_v4_linter.core.linter import ANTLRLinter
+from antlr_v4_linter.core.models import LinterConfig, RuleConfig
+from antlr_v4_linter.core.parser import AntlrGrammarParser
+
+
+GRAMMAR = """/*
+ * Expressions.
+ */
+grammar Expr;
+
+// Entry point
+program: statement+ EOF;
+statement: ID '=' expr ';' | expr ';' | ';';
+expr: expr '+' term | term;
+term: ID | INT;
+
+IF: 'if';
+ID: [a-zA-Z_] [a-zA-Z_0-9]*;
+INT: DIGIT+;
+fragment DIGIT: '0'..'9';
+WS: [ \\t\\r\\n]+ -> skip;
+"""
+
+
+class TestFacetPlanning:
+    """Test that only facets required by enabled rules are built."""
+    
+    def _run(self, config: LinterConfig):
+        linter = ANTLRLinter(config)
+        plan = linter.rule_engine.compile(config)
+        grammar = linter.parser.parse_content(GRAMMAR, "Expr.g4", plan.facets)
+        issues = linter.rule_engine.run_plan(grammar, plan)
+        return plan, grammar, issues
+    
+    def test_single_rule_builds_nothing(self):
+        """A rule without requirements does not pay for any facet."""
+        plan, grammar, _ = self._run(LinterConfig(rules={"N001": RuleConfig()}))
+        
+        assert plan.facets == frozenset()
+        assert grammar.index.computed == set()
+        assert grammar.index.tokens is None
+        assert grammar.index.comments is None
+    
+    def test_default_rules_build_only_what_they_require(self):
+        """The default rule set needs the reference graph but no lexer DFA."""
+        plan, grammar, _ = self._run(LinterConfig.default())
+        
+        assert Facet.REFERENCE_GRAPH in plan.facets
+        assert Facet.LEXER_DFA not in plan.facets
+        assert Facet.REFERENCE_GRAPH in grammar.index.computed
+        assert Facet.LEXER_DFA not in grammar.index.computed
+    
+    def test_documentation_rules_use_comments(self):
+        """D001 and D002 see the comments captured while parsing."""
+        config = LinterConfig(rules={"D001": RuleConfig(), "D002": RuleConfig()})
+        plan, grammar, issues = self._run(config)
+        
+        assert plan.facets == {Facet.COMMENTS, Facet.TOKENS}
+        assert [c.text for c in grammar.index.comments] == [
+            "/*\n * Expressions.\n */", "// Entry point"
+        ]
+        # Only the undocumented complex rule is reported; the header is present
+        assert [i.message for i in issues] == ["Complex rule 'statement' lacks documentation"]
+
+
+class TestGrammarIndex:
+    """Test the individual facets."""
+    
+    def test_lexical_facets_are_captured_on_request(self):
+        """Tokens and raw source are kept only when asked for."""
+        parser = AntlrGrammarParser()
+        grammar = parser.parse_content(GRAMMAR, "Expr.g4", {Facet.COMMENTS, Facet.RAW_SOURCE})
+        
+        assert grammar.index.tokens is None
+        assert grammar.index.source == GRAMMAR
+        assert grammar.index.comments[1].line == 6
+        assert grammar.index.comments[0].end_line == 3
+    
+    def test_reference_graph(self):
+        """The graph records rule and token references per rule."""
+        grammar = AntlrGrammarParser().parse_content(GRAMMAR, "Expr.g4")
+        graph = GrammarIndex.of(grammar).reference_graph
+        
+        assert graph.rule_refs["expr"] == {"expr", "term"}
+        assert graph.tokens_referenced_by(["term", "statement"]) == {"ID", "INT"}
+        assert "program" not in graph.rules_referenced_by(["statement", "expr", "term"])
+    
+    def test_first_sets(self):
+        """FIRST sets follow rule references of leading elements."""
+        grammar = AntlrGrammarParser().parse_content(GRAMMAR, "Expr.g4")
+        first = GrammarIndex.of(grammar).first_sets
+        
+        assert first["term"] == {"ID", "INT"}
+        assert first["expr"] == {"ID", "INT"}
+    
+    def test_lexer_dfa(self):
+        """The lexer DFA resolves matches the way ANTLR does."""
+        grammar = AntlrGrammarParser().parse_content(GRAMMAR, "Expr.g4")
+        dfa = GrammarIndex.of(grammar).lexer_dfas[None]
+        
+        assert dfa.unsupported == {}
+        assert dfa.rule_names == ["IF", "ID", "INT", "WS"]
+        assert dfa.match("if") == "IF"
+        assert dfa.match("iff") == "ID"
+        assert dfa.match("42") == "INT"
+        assert dfa.match("4a") is None
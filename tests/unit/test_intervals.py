@@ -0,0 +1,90 @@
+"""Tests for code point interval sets and the char set syntax."""
+
+import random
+import unicodedata
+
+import pytest
+
+from antlr_v4_linter.core.intervals import (
+    ALL,
+    EMPTY,
+    MAX_CODE_POINT,
+    CharSetError,
+    IntervalSet,
+    char_set,
+    char_set_items,
+    decode_literal,
+    format_char_set,
+    unicode_property,
+)
+from antlr_v4_linter.core.unicode_tables import UNICODE_VERSION
+
+
+def points(chars):
+    return {code_point for low, high in chars for code_point in range(low, high + 1)}
+
+
+def random_set(rng):
+    return IntervalSet.of((low, low + rng.randrange(4)) for low in rng.sample(range(50), rng.randrange(8)))
+
+
+class TestIntervalSet:
+    """Test the set operations against Python sets."""
+
+    def test_of_merges_overlapping_and_adjacent_intervals(self):
+        chars = IntervalSet.of([(10, 12), (1, 3), (4, 5), (11, 20)])
+        assert list(chars) == [(1, 5), (10, 20)]
+        assert len(chars) == 2 and chars.size == 16
+        assert 5 in chars and 6 not in chars and 0 not in chars
+
+    def test_operations_match_python_sets(self):
+        rng = random.Random(0)
+        for _ in range(500):
+            a, b = random_set(rng), random_set(rng)
+            assert points(a | b) == points(a) | points(b)
+            assert points(a & b) == points(a) & points(b)
+            assert points(a - b) == points(a) - points(b)
+            assert a.issubset(b) == (points(a) <= points(b))
+            assert a.isdisjoint(b) == (not points(a) & points(b))
+            assert ~~a == a
+
+    def test_complement_and_hashing(self):
+        assert ~EMPTY == ALL and ~ALL == EMPTY
+        assert list(~IntervalSet.range(0, 9)) == [(10, MAX_CODE_POINT)]
+        assert {IntervalSet.of([(1, 2)]): 1}[IntervalSet.range(1, 2)] == 1
+
+
+class TestCharSetSyntax:
+    """Test decoding of ANTLR literals and character sets."""
+
+    def test_escapes_and_ranges(self):
+        assert decode_literal("a\\n\\u0041\\u{1F600}\\'") == "a\nA\U0001F600'"
+        assert list(char_set("a-c\\]\\-_")) == [(45, 45), (93, 93), (95, 95), (97, 99)]
+        assert list(char_set("\\u{10000}-\\u{10FFFF}")) == [(0x10000, MAX_CODE_POINT)]
+        assert char_set_items("a-cxyz\\p{Nd}") == 5
+        with pytest.raises(CharSetError):
+            char_set("z-a")
+
+    def test_unicode_properties(self):
+        upper = unicode_property("Lu")
+        assert upper == unicode_property("Uppercase_Letter") == unicode_property("gc=Lu")
+        assert unicode_property("L") == unicode_property("Lu") | unicode_property("Ll") | unicode_property(
+            "Lt") | unicode_property("Lm") | unicode_property("Lo")
+        assert char_set("\\P{Lu}") == ~upper
+        assert list(unicode_property("ASCII")) == [(0, 0x7F)]
+        with pytest.raises(CharSetError, match="Script=Latin"):
+            unicode_property("Script=Latin")
+
+    @pytest.mark.skipif(unicodedata.unidata_version != UNICODE_VERSION,
+                        reason="tables are from another Unicode version")
+    def test_tables_match_unicodedata(self):
+        rng = random.Random(1)
+        categories = {code: unicode_property(code) for code in ("Lu", "Nd", "Zs", "Mn", "Cn", "Co")}
+        for code_point in rng.sample(range(MAX_CODE_POINT + 1), 5000):
+            category = unicodedata.category(chr(code_point))
+            for code, chars in categories.items():
+                assert (code_point in chars) == (category == code)
+
+    def test_format(self):
+        assert format_char_set(char_set("a-c\\t\\]\\u{1F600}")) == "[\\t\\]a-c\\u{1F600}]"
+        assert format_char_set(IntervalSet.of((i * 2, i * 2) for i in range(10)), limit=2) == "[\\u0000\\u0002...]"
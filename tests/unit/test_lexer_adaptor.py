@@ -0,0 +1,46 @@
+"""Tests for the LexerAdaptor rule-type state machine."""
+
+from antlr4 import InputStream, Token
+
+from antlr_v4_linter.grammars.ANTLRv4Lexer import ANTLRv4Lexer
+from antlr_v4_linter.grammars.ANTLRv4Parser import ANTLRv4Parser
+
+
+def _lex(content: str):
+    lexer = ANTLRv4Lexer(InputStream(content))
+    tokens = []
+    while True:
+        token = lexer.nextToken()
+        if token.type == Token.EOF:
+            return tokens
+        if token.channel == Token.DEFAULT_CHANNEL:
+            tokens.append((token.type, token.text))
+
+
+class TestLexerAdaptor:
+    """Test token retyping and rule-type tracking in LexerAdaptor.emit."""
+
+    def test_identifiers_are_retyped(self):
+        """Uppercase identifiers become TOKEN_REF, lowercase become RULE_REF."""
+        tokens = _lex("grammar T; start: ID Ünï; ID: 'x';")
+        types = {text: token_type for token_type, text in tokens}
+        assert types["start"] == ANTLRv4Parser.RULE_REF
+        assert types["ID"] == ANTLRv4Parser.TOKEN_REF
+        assert types["Ünï"] == ANTLRv4Parser.TOKEN_REF
+
+    def test_brackets_depend_on_rule_type(self):
+        """'[' starts a char set in lexer rules and an argument in parser rules."""
+        tokens = _lex("grammar T; r[int x]: ID; ID: [a-z]+;")
+        types = [token_type for token_type, _ in tokens]
+        assert ANTLRv4Parser.LEXER_CHAR_SET in types
+        assert ANTLRv4Parser.BEGIN_ARGUMENT in types
+
+    def test_options_block_inside_lexer_rule(self):
+        """A ';' inside a lexer rule's options block does not end the rule."""
+        tokens = _lex("lexer grammar T; ID options { caseInsensitive = true; } : [a-z]+;")
+        assert (ANTLRv4Parser.LEXER_CHAR_SET, "[a-z]") in tokens
+
+    def test_prequel_blocks_reset_rule_type(self):
+        """tokens {...} and @header {...} blocks leave the lexer outside any rule."""
+        tokens = _lex("grammar T; tokens { A, B } @header { import x; } ID: [a-z]+;")
+        assert (ANTLRv4Parser.LEXER_CHAR_SET, "[a-z]") in tokens
@@ -0,0 +1,74 @@
+"""Tests for the lexer DFA statistics and rescan distances."""
+
+from antlr_v4_linter.core.atn import build_lexer_atn
+from antlr_v4_linter.core.lexer_dfa import build_lexer_dfa, build_lexer_dfas, rescan_distances
+
+
+def distances(dfa):
+    return [(rescan.token, rescan.distance, rescan.candidates) for rescan in rescan_distances(dfa)]
+
+
+class TestLexerDFAStatistics:
+    """Test state counts, rule contributions and the state cap."""
+
+    def test_states_per_rule(self, parse):
+        dfa = build_lexer_dfas(build_lexer_atn(parse("lexer grammar L; IF: 'if' ; ID: [a-z]+ ; INT: [0-9]+ ;")))[None]
+        assert dfa.rule_names == ["IF", "ID", "INT"]
+        assert dfa.state_count == 5
+        # Every rule is live in the start state; ID also after 'i', 'if' and other letters
+        assert dfa.rule_states == [3, 4, 2]
+        assert dfa.class_count == 9
+        assert dfa.rule_boundaries == [4, 2, 2]
+        assert not dfa.truncated
+
+    def test_compiled_from_syntax_trees(self, parse):
+        """Fragment references inside blocks and escapes compile like ANTLR reads them."""
+        dfa = build_lexer_dfas(build_lexer_atn(parse(
+            "lexer grammar L; S: '\"' (ESC | ~[\"\\\\])* '\"' ; N: DIGIT+ ;"
+            " fragment ESC: '\\\\' (HEX HEX | [nt]) ; fragment HEX: [0-9a-f] ; fragment DIGIT: [0-9] ;"
+        )))[None]
+        assert dfa.unsupported == {}
+        assert dfa.match('"a\\41\\n"') == "S"
+        assert dfa.match('"\\4"') is None
+        assert dfa.match("42") == "N"
+
+    def test_subset_construction_stops_at_the_cap(self, parse):
+        # The DFA must remember the last 9 characters: 2^9 states
+        grammar = parse("lexer grammar L; ID: [a-z]+ ; AB: ('a' | 'b')* 'a'" + " ('a' | 'b')" * 8 + " ;")
+        atn = build_lexer_atn(grammar)
+        full = build_lexer_dfa(atn, atn.rule_names)
+        assert full.state_count > 512 and not full.truncated
+        capped = build_lexer_dfa(atn, atn.rule_names, max_states=100)
+        assert capped.state_count == 100 and capped.truncated
+        assert capped.match("ab") == "ID"
+
+
+class TestRescanDistances:
+    """Test how far the lexer reads before falling back to a shorter token."""
+
+    def rescans(self, parse, content):
+        return distances(build_lexer_dfas(build_lexer_atn(parse(content)))[None])
+
+    def test_unbounded_loop_before_failure(self, parse):
+        assert self.rescans(parse, "lexer grammar L; A: 'a'+ 'b' ; B: 'a' ;") == [("B", None, ["A"])]
+
+    def test_bounded_distance(self, parse):
+        assert self.rescans(parse, "lexer grammar L; E: '....' ; D: '.' ; ID: [a-z]+ ;") == [("D", 2, ["E"])]
+
+    def test_distances_per_mode(self, parse):
+        grammar = parse("lexer grammar L; A: 'a'+ 'b' ; B: 'a' ; mode M; C: 'x'+ 'y' ; D: 'x' ;")
+        dfas = build_lexer_dfas(build_lexer_atn(grammar))
+        assert distances(dfas["M"]) == [("D", None, ["C"])]
+
+    def test_non_greedy_loops_stop_at_the_first_match(self, parse):
+        content = "lexer grammar L; DIV: '/' ; COMMENT: '/*' .*? '*/' ; STR: '\"' .*? '\"' ;"
+        assert self.rescans(parse, content) == [("DIV", None, ["COMMENT"])]
+        dfa = build_lexer_dfas(build_lexer_atn(parse(content)))[None]
+        assert dfa.match("/* a */") == "COMMENT"
+        assert dfa.match("/* a */ b */") is None
+        # A greedy loop goes on looking for a later end
+        assert self.rescans(parse, "lexer grammar L; COMMENT: '/*' .* '*/' ;") == [("COMMENT", None, ["COMMENT"])]
+
+    def test_no_fallback_without_a_shorter_token(self, parse):
+        assert self.rescans(parse, "lexer grammar L; S: '\"' ~'\"'* '\"' ; ID: [a-z]+ ;") == []
+        assert self.rescans(parse, "lexer grammar L; IF: 'if' ; ID: [a-z]+ ;") == []
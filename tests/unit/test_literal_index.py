@@ -0,0 +1,66 @@
+"""Tests for the literal trie."""
+
+from antlr_v4_linter.core.atn import build_lexer_atn
+from antlr_v4_linter.core.index import GrammarIndex
+from antlr_v4_linter.core.lexer_dfa import build_lexer_dfa
+from antlr_v4_linter.core.literal_index import build_literal_indexes
+
+KEYWORDS = """lexer grammar L;
+IN: 'in' ;
+INT: 'int' ;
+INTERFACE: 'interface' ;
+ARROW: '-' '>' ;
+PLUS: '+' | '+=' ;
+ID: [a-z]+ ;
+NUM: [0-9]+ ;
+"""
+
+
+class TestLiteralIndex:
+    """Test exact, prefix and automaton lookups."""
+
+    def test_exact_lookup(self, parse):
+        literals = build_literal_indexes(parse(KEYWORDS))[None]
+        assert literals.rules_for("int") == ["INT"]
+        assert literals.rules_for("->") == ["ARROW"]
+        assert literals.rules_for("+") == []
+        assert [rule.name for rule, _ in literals.get("+").uses] == ["PLUS"]
+        assert "inter" not in literals
+        assert [entry.raw for entry in literals][:4] == ["'in'", "'int'", "'interface'", "'-'"]
+
+    def test_prefixes(self, parse):
+        literals = build_literal_indexes(parse(KEYWORDS))[None]
+        assert [entry.text for entry in literals.prefixes("interface")] == ["in", "int"]
+        assert literals.prefixes("in") == []
+        pairs = [(shorter.text, longer.text) for shorter, longer in literals.prefix_pairs()]
+        assert pairs == [
+            ("in", "int"), ("in", "interface"), ("int", "interface"), ("-", "->"), ("+", "+="),
+        ]
+
+    def test_literals_an_identifier_matches(self, parse):
+        grammar = parse(KEYWORDS)
+        literals = build_literal_indexes(grammar)[None]
+        atn = build_lexer_atn(grammar)
+        identifier = build_lexer_dfa(atn, ["ID"])
+        assert [entry.text for entry in literals.accepted_by(identifier)] == ["in", "int", "interface"]
+        number = build_lexer_dfa(atn, ["NUM"])
+        assert list(literals.accepted_by(number)) == []
+
+    def test_escapes_are_decoded(self, parse):
+        literals = build_literal_indexes(parse("lexer grammar L; A: 'a' ; B: '\\u0061' ; C: '\\q' ;"))[None]
+        assert [rule.name for rule, _ in literals.get("a").uses] == ["A", "B"]
+        assert literals.get("a").raw == "'a'"
+        # Invalid escapes are kept apart, by their raw text
+        assert [entry.raw for entry in literals] == ["'a'", "'\\q'"]
+
+    def test_facet(self, parse):
+        grammar = parse(KEYWORDS)
+        assert GrammarIndex.of(grammar).literals[None].rules_for("in") == ["IN"]
+
+    def test_one_trie_per_mode(self, parse):
+        grammar = parse("lexer grammar L; A: 'a' -> pushMode(M) ; mode M; B: 'a' ; C: 'c' -> popMode ;")
+        literals = GrammarIndex.of(grammar).literals
+        assert set(literals) == {None, "M"}
+        assert literals[None].rules_for("a") == ["A"]
+        assert literals["M"].rules_for("a") == ["B"]
+        assert "c" not in literals[None]
@@ -0,0 +1,89 @@
+"""Tests for the bounded LL(k) lookahead analysis."""
+
+import pytest
+
+from antlr_v4_linter.core.index import GrammarIndex
+
+TOKENS = "A: 'a'; B: 'b'; C: 'c'; D: 'd'; E: 'e';"
+
+
+@pytest.fixture
+def decisions(parse):
+    def decisions(content, rule_name, cap=6):
+        lookahead = GrammarIndex.of(parse(content)).lookahead
+        return [
+            (d.block.text if d.block else None, d.k, d.alternatives, d.ambiguous)
+            for d in lookahead.decisions(rule_name, cap)
+        ]
+
+    return decisions
+
+
+class TestLookaheadAnalysis:
+    """Test the minimal k of conflicting decisions."""
+
+    def test_common_prefix(self, decisions):
+        grammar = f"grammar T; s: A B C | A B D | E ; {TOKENS}"
+        assert decisions(grammar, "s") == [(None, 3, (0, 1), False)]
+
+    def test_prefix_through_rule_references(self, decisions):
+        grammar = f"grammar T; s: a C | a D ; a: A B ; {TOKENS}"
+        assert decisions(grammar, "s") == [(None, 3, (0, 1), False)]
+
+    def test_decisions_without_conflicts_are_left_out(self, decisions):
+        assert decisions(f"grammar T; s: A B | C D ; {TOKENS}", "s") == []
+
+    def test_block_decision_looks_past_the_block(self, decisions):
+        grammar = f"grammar T; s: (A | A B) B C ; {TOKENS}"
+        assert decisions(grammar, "s") == [("(A|AB)", 3, (0, 1), False)]
+
+    def test_lookahead_continues_after_the_rule(self, decisions):
+        grammar = f"grammar T; s: t B C | t B D ; t: A | A B ; {TOKENS}"
+        assert decisions(grammar, "t") == [(None, 3, (0, 1), False)]
+
+    def test_loops_are_not_ll_k(self, decisions):
+        grammar = f"grammar T; s: A* B | A* C ; {TOKENS}"
+        assert decisions(grammar, "s") == [(None, None, (0, 1), False)]
+
+    def test_loop_decisions(self, decisions):
+        assert decisions(f"grammar T; s: (A B C D)* A B C E ; {TOKENS}", "s") == [("(ABCD)*", 4, (0, 1), False)]
+        assert decisions(f"grammar T; s: (A B C D)+ A B C E ; {TOKENS}", "s") == [("(ABCD)+", 4, (0, 1), False)]
+
+    def test_optional_decision(self, decisions):
+        assert decisions(f"grammar T; s: (A B C D)? A B C E ; {TOKENS}", "s") == [("(ABCD)?", 4, (0, 1), False)]
+
+    def test_trailing_separator(self, decisions):
+        grammar = "grammar T; list: item (',' item)* ','? ; item: ID ; ID: [a-z]+;"
+        assert decisions(grammar, "list") == [("(','item)*", 2, (0, 1), False)]
+
+    def test_cap(self, decisions):
+        grammar = f"grammar T; s: A A A A B | A A A A C ; {TOKENS}"
+        assert decisions(grammar, "s", cap=5) == [(None, 5, (0, 1), False)]
+        assert decisions(grammar, "s", cap=4) == [(None, None, (0, 1), False)]
+
+    def test_ambiguous_alternatives(self, decisions):
+        assert decisions(f"grammar T; s: A | A B? ; {TOKENS}", "s") == [(None, None, (0, 1), True)]
+        grammar = f"grammar T; p: s EOF ; s: a | b ; a: A C ; b: A C ; {TOKENS}"
+        assert decisions(grammar, "s") == [(None, None, (0, 1), True)]
+
+    def test_left_recursion(self, decisions):
+        grammar = "grammar T; e: e '+' e | e '*' e | ID | ID '(' e ')' ; ID: [a-z]+;"
+        assert decisions(grammar, "e") == [(None, 2, (2, 3), False)]
+
+    def test_indirect_left_recursion_terminates(self, decisions):
+        grammar = f"grammar T; s: p ; p: f | g | A ; f: p B | A C ; g: p D | A E ; {TOKENS}"
+        for name in ("p", "f", "g"):
+            for _, k, _, _ in decisions(grammar, name):
+                assert k is None or k <= 6
+
+    def test_long_reference_chain(self, decisions):
+        # The lookahead of r2000 continues at the end of r1999, ..., r0
+        rules = [f"r{i}: r{i + 1} ;" for i in range(2000)]
+        grammar = "\n".join(["grammar T;", "s: r0 B C | r0 D ;", *rules, "r2000: A | A B ;", TOKENS])
+        assert decisions(grammar, "r2000") == [(None, 3, (0, 1), False)]
+
+    def test_work_budget(self, decisions):
+        # Every rule of the chain can start with A B, under a call stack of its own
+        rules = [f"r{i}: r{i + 1} | A B r{i + 1} C ;" for i in range(500)]
+        grammar = "\n".join(["grammar T;", *rules, "r500: A B C | A B D ;", TOKENS])
+        assert decisions(grammar, "r0") == [(None, None, (0, 1), False)]
@@ -0,0 +1,76 @@
+"""Tests for the tracemalloc memory report."""
+
+import json
+import tempfile
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from antlr_v4_linter.cli.main import cli
+from antlr_v4_linter.core.linter import ANTLRLinter
+from antlr_v4_linter.core.memory import MemoryProfiler, format_bytes
+
+
+GRAMMAR = """
+grammar Calc;
+program: expr EOF;
+expr: expr '+' expr | INT;
+INT: [0-9]+;
+WS: [ \\t\\r\\n]+ -> skip;
+"""
+
+
+class TestMemoryProfiler:
+    """Test the per-phase memory report."""
+    
+    def test_phases_are_measured_per_file(self):
+        """Every file gets read/lex/parse/build/rules records with allocation sites."""
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for name in ("A", "B"):
+                path = Path(tmp) / f"{name}.g4"
+                path.write_text(GRAMMAR.replace("Calc", name))
+                paths.append(str(path))
+            
+            linter = ANTLRLinter()
+            linter.memory = MemoryProfiler()
+            linter.memory.start()
+            try:
+                linter.lint_files(paths)
+            finally:
+                linter.memory.stop()
+        
+        report = linter.memory.to_json()
+        for path in paths:
+            assert list(report["files"][path]) == ["read", "lex", "parse", "build", "rules"]
+        assert report["phases"]["lex"]["peak_bytes"] > 0
+        assert report["phases"]["parse"]["top_sites"]
+        assert all(site["size_bytes"] > 0 for site in report["phases"]["parse"]["top_sites"])
+        assert "Memory by phase" in linter.memory.format()
+    
+    def test_phases_pass_through_when_not_tracing(self):
+        """Nothing is recorded unless tracemalloc is running."""
+        profiler = MemoryProfiler()
+        with profiler.phase("parse", "A.g4"):
+            pass
+        assert profiler.phases == []
+    
+    def test_format_bytes(self):
+        assert format_bytes(512) == "512 B"
+        assert format_bytes(1536) == "1.5 KiB"
+        assert format_bytes(3 * 1024 * 1024) == "3.0 MiB"
+    
+    def test_cli_writes_json_report(self):
+        """`lint --memory-report-json` writes the report, including discovery and report."""
+        with tempfile.TemporaryDirectory() as tmp:
+            grammar = Path(tmp) / "Calc.g4"
+            grammar.write_text(GRAMMAR)
+            report_path = Path(tmp) / "memory.json"
+            
+            CliRunner().invoke(cli, ["lint", "--no-colors", "--memory-report-json",
+                                     str(report_path), str(grammar)])
+            
+            report = json.loads(report_path.read_text())
+        
+        assert {"discovery", "parse", "rules", "report"} <= set(report["phases"])
+        assert str(grammar) in report["files"]
@@ -0,0 +1,77 @@
+"""Tests for AntlrGrammarParser recognizer reuse."""
+
+import tempfile
+import threading
+from pathlib import Path
+
+from antlr_v4_linter.core.models import GrammarType
+from antlr_v4_linter.core.parser import AntlrGrammarParser
+
+
+class TestAntlrGrammarParser:
+    """Test parsing with pooled lexer and parser instances."""
+
+    def test_recognizers_are_reused(self):
+        """Consecutive parses on one thread share the same ANTLR parser."""
+        parser = AntlrGrammarParser()
+        first = parser.parse_content("grammar A; a: 'x';", "A.g4")
+        recognizers = parser._recognizers()
+        second = parser.parse_content("lexer grammar B; B1: 'y'; B2: [a-z];", "B.g4")
+
+        assert parser._recognizers() is recognizers
+        assert first.declaration.name == "A"
+        assert [r.name for r in first.rules] == ["a"]
+        assert second.declaration.name == "B"
+        assert second.declaration.grammar_type == GrammarType.LEXER
+        assert [r.name for r in second.rules] == ["B1", "B2"]
+
+    def test_state_does_not_leak_after_errors(self):
+        """A syntax error in one input does not affect the next parse."""
+        parser = AntlrGrammarParser()
+        parser.parse_content("grammar Broken; r: ( ;", "Broken.g4")
+        assert parser._recognizers().error_listener.errors
+
+        grammar = parser.parse_content("grammar Ok; r: ID; ID: [a-z]+;", "Ok.g4")
+        assert parser._recognizers().error_listener.errors == []
+        assert [r.name for r in grammar.rules] == ["r", "ID"]
+        assert grammar.rules[1].alternatives[0].elements[0].text == "[a-z]+"
+
+    def test_rules_of_lexer_modes(self):
+        """Rules after a mode declaration are kept, tagged with the mode."""
+        grammar = AntlrGrammarParser().parse_content(
+            "lexer grammar M; A: 'a' -> pushMode(X); mode X; B: 'b'; C: 'c' -> popMode;"
+            " mode DEFAULT_MODE; D: 'd';", "M.g4")
+        assert [(r.name, r.mode) for r in grammar.rules] == [
+            ("A", None), ("B", "X"), ("C", "X"), ("D", None),
+        ]
+
+    def test_parse_many(self):
+        """parse_many returns one AST per file, in input order."""
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for i in range(5):
+                path = Path(tmp) / f"G{i}.g4"
+                path.write_text(f"grammar G{i}; r{i}: 'k{i}' EOF;")
+                paths.append(str(path))
+
+            grammars = AntlrGrammarParser().parse_many(paths)
+
+        assert [g.declaration.name for g in grammars] == [f"G{i}" for i in range(5)]
+        assert [g.file_path for g in grammars] == paths
+
+    def test_each_thread_gets_its_own_recognizers(self):
+        """Recognizers are not shared between threads."""
+        parser = AntlrGrammarParser()
+        seen = []
+
+        def work():
+            parser.parse_content("grammar T; t: 'x';", "T.g4")
+            seen.append(parser._recognizers())
+
+        threads = [threading.Thread(target=work) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len({id(r) for r in seen}) == 3
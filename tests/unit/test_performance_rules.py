@@ -1,14 +1,31 @@
 """Comprehensive tests for performance rules."""
 
 import pytest
+from antlr_v4_linter.core.index import GrammarIndex
+from antlr_v4_linter.core.linter import ANTLRLinter
 from antlr_v4_linter.core.models import (
     GrammarAST, GrammarDeclaration, GrammarType, Position, Range,
     Rule, RuleConfig, Severity, Alternative, Element
 )
 from antlr_v4_linter.rules.performance_rules import (
-    BacktrackingRule, InefficientLexerRule
+    BacktrackingRule, InefficientLexerRule, DeepLookaheadRule,
+    LexerStateExplosionRule, LexerRescanningRule
 )
 
+TOKENS = "A: 'a'; B: 'b'; C: 'c'; D: 'd'; E: 'e';"
+
+# The DFA must remember the last n + 1 characters: 2^(n + 1) states
+EXPLOSION = "lexer grammar L; ID: [a-z]+ ; AB: ('a' | 'b')* 'a' {} ; WS: ' ' -> skip ;"
+
+
+@pytest.fixture
+def explosion(parse):
+    """Parse the EXPLOSION grammar with n trailing choices."""
+    def explosion(n):
+        return parse(EXPLOSION.replace("{}", "('a' | 'b') " * n))
+    
+    return explosion
+
 
 class TestBacktrackingRule:
     """Test P001: Backtracking rule."""
@@ -298,6 +315,41 @@ class TestBacktrackingRule:
         issues = rule.check(grammar, config)
         assert len(issues) >= 1
         assert any(issue.rule_id == "P001" for issue in issues)
+    
+    def test_literal_star_is_not_repetition(self, parse):
+        """Test that a quoted '*' is not read as a repetition."""
+        rule = BacktrackingRule()
+        config = RuleConfig(enabled=True, severity=Severity.WARNING)
+        
+        grammar = parse("grammar T; e: e '*' e | e '/' e | A ;")
+        messages = [issue.message for issue in rule.check(grammar, config)]
+        assert not any("repetition" in message for message in messages)
+    
+    def test_nested_optionals(self, parse):
+        """Test detection of optional groups nested in optional groups."""
+        rule = BacktrackingRule()
+        config = RuleConfig(enabled=True, severity=Severity.WARNING)
+        
+        grammar = parse("grammar T; s: (A (B (C)?)?)? D ;")
+        messages = [issue.message for issue in rule.check(grammar, config)]
+        assert any("nested optional groups (level 3)" in message for message in messages)
+    
+    def test_optional_prefix_through_rule_references(self, parse):
+        """Test detection of an optional prefix that conflicts with another alternative."""
+        rule = BacktrackingRule()
+        config = RuleConfig(enabled=True, severity=Severity.WARNING)
+        
+        grammar = parse("grammar T; s: sign? NUMBER | MINUS s ; sign: MINUS ; MINUS: '-'; NUMBER: [0-9]+;")
+        messages = [issue.message for issue in rule.check(grammar, config)]
+        assert messages == ["Rule 's' may cause excessive backtracking: optional prefix may cause backtracking"]
+    
+    def test_distinct_prefixes(self, parse):
+        """Test that alternatives starting with different tokens are not reported."""
+        rule = BacktrackingRule()
+        config = RuleConfig(enabled=True, severity=Severity.WARNING)
+        
+        grammar = parse("grammar T; s: a | b ; a: X Y ; b: Z Y ; X: 'x'; Y: 'y'; Z: 'z';")
+        assert rule.check(grammar, config) == []
 
 
 class TestInefficientLexerRule:
@@ -530,4 +582,154 @@ class TestInefficientLexerRule:
         
         issues = rule.check(grammar, config)
         if len(issues) > 0:
-            assert any("suggestion" in str(issue.suggestions) for issue in issues if issue.suggestions)
\ No newline at end of file
+            assert any("suggestion" in str(issue.suggestions) for issue in issues if issue.suggestions)
+    
+    def test_patterns_read_from_the_tree(self, parse):
+        """Test the suffixes of nested blocks, wildcards and non-greedy loops."""
+        rule = InefficientLexerRule()
+        config = RuleConfig(enabled=True, severity=Severity.WARNING)
+        
+        grammar = parse("lexer grammar T; A: (.*)* ; B: '/*' .*? '*/' ; C: .* 'c' ; D: ('x' | ~[a]*)+ ;")
+        messages = [issue.message for issue in rule.check(grammar, config)]
+        
+        assert "Lexer rule 'A' has inefficient pattern: catastrophic backtracking pattern" in messages
+        assert not any("'B'" in message for message in messages)
+        assert "Lexer rule 'C' has inefficient pattern: .* at beginning of pattern" in messages
+        assert ("Lexer rule 'D' has inefficient pattern: "
+                "nested quantifiers can cause exponential backtracking") in messages
+    
+    def test_char_class_simplification_reads_escapes(self, parse):
+        """Test that escaped ranges are decoded before suggesting a simpler set."""
+        rule = InefficientLexerRule()
+        config = RuleConfig(enabled=True, severity=Severity.WARNING)
+        
+        grammar = parse("lexer grammar L; A: [abcdefghijklmnopqrstu] ; B: [\\u0041-\\u005A\\u0061-\\u007A_] ;")
+        messages = [issue.message for issue in rule.check(grammar, config)]
+        assert len(messages) == 1 and "'A'" in messages[0]
+
+
+class TestDeepLookaheadRule:
+    """Test P003: Deep lookahead rule."""
+    
+    def test_thresholds_and_messages(self, parse):
+        """Test the LL(k) threshold and that the costliest decisions come first."""
+        rule = DeepLookaheadRule()
+        config = RuleConfig(enabled=True, severity=Severity.INFO, thresholds={"maxLookahead": 2})
+        
+        grammar = parse(
+            f"grammar T; s: A B C | A B D | E ; t: (A B C D | A B C E) ; u: A* B | A* C ; {TOKENS}"
+        )
+        messages = [issue.message for issue in rule.check(grammar, config)]
+        assert messages == [
+            "Rule 'u' has a deep lookahead decision: alternatives 1 and 2 are not LL(6) "
+            "(estimated cost 12)",
+            "Rule 't' has a deep lookahead decision: alternatives 1 and 2 of the subrule at line 1 "
+            "need LL(4) lookahead (estimated cost 8)",
+            "Rule 's' has a deep lookahead decision: alternatives 1 and 2 need LL(3) lookahead "
+            "(estimated cost 7)",
+        ]
+        
+        config.thresholds["maxLookahead"] = 3
+        messages = [issue.message for issue in rule.check(grammar, config)]
+        assert [message.split("'")[1] for message in messages] == ["u", "t"]
+    
+    def test_disabled_by_default(self):
+        """Test that P003 is opt-in."""
+        result = ANTLRLinter().lint_content(f"grammar T; s: A A A A B | A A A A C ; {TOKENS}", "T.g4")
+        assert not any(issue.rule_id == "P003" for issue in result.issues)
+
+
+class TestLexerStateExplosionRule:
+    """Test P004: Lexer state explosion rule."""
+    
+    def test_reports_states_and_rules(self, explosion):
+        """Test the estimated state count and the rules that contribute most."""
+        rule = LexerStateExplosionRule()
+        config = RuleConfig(enabled=True, severity=Severity.WARNING, thresholds={"maxDfaStates": 200})
+        
+        issues = rule.check(explosion(8), config)
+        assert len(issues) == 1
+        message = issues[0].message
+        assert message.startswith("Lexer mode 'DEFAULT_MODE' needs an estimated ")
+        assert "(limit 200); most states are in rules " in message
+        assert message.split("rules ")[1].split(" ")[0] in ("ID", "AB")
+        assert issues[0].range.start.line == 1
+        
+        assert rule.check(explosion(4), config) == []
+    
+    def test_reports_truncated_modes(self, explosion):
+        """Test the message when subset construction stops at the state cap."""
+        rule = LexerStateExplosionRule()
+        config = RuleConfig(enabled=True, severity=Severity.WARNING)
+        
+        grammar = explosion(16)
+        assert GrammarIndex.of(grammar).lexer_dfas[None].truncated
+        issues = rule.check(grammar, config)
+        assert "needs an estimated more than 10000 DFA states" in issues[0].message
+    
+    def test_reports_fragmented_alphabet(self, parse):
+        """Test detection of rules that split the characters into many classes."""
+        rule = LexerStateExplosionRule()
+        config = RuleConfig(enabled=True, severity=Severity.INFO, thresholds={"maxCharClasses": 64})
+        
+        keywords = " ".join(f"K{i}: '{chr(0x100 + 2 * i)}' ;" for i in range(40))
+        grammar = parse(f"lexer grammar L; {keywords} ID: [a-z]+ ;")
+        assert [issue.message for issue in rule.check(grammar, config)] == [
+            "Lexer mode 'DEFAULT_MODE' splits the characters into 83 classes (limit 64); "
+            "most class boundaries come from rules K0 (2), K1 (2), K2 (2)"
+        ]
+    
+    def test_reports_the_mode_of_the_explosion(self, parse):
+        """Test that each lexer mode is measured on its own."""
+        rule = LexerStateExplosionRule()
+        config = RuleConfig(enabled=True, severity=Severity.WARNING, thresholds={"maxDfaStates": 200})
+        
+        grammar = parse(
+            "lexer grammar L; OPEN: '<' -> pushMode(INSIDE) ; WS: ' ' -> skip ;\n"
+            "mode INSIDE; ID: [a-z]+ ; AB: ('a' | 'b')* 'a'" + " ('a' | 'b')" * 8 + " ; CLOSE: '>' -> popMode ;"
+        )
+        dfas = GrammarIndex.of(grammar).lexer_dfas
+        assert dfas[None].rule_names == ["OPEN", "WS"]
+        assert dfas["INSIDE"].rule_names == ["ID", "AB", "CLOSE"]
+        
+        issues = rule.check(grammar, config)
+        assert len(issues) == 1
+        assert issues[0].message.startswith("Lexer mode 'INSIDE' needs an estimated ")
+        assert issues[0].range.start.line == 2
+    
+    def test_disabled_by_default(self):
+        """Test that P004 is opt-in."""
+        result = ANTLRLinter().lint_content(EXPLOSION.replace("{}", "('a' | 'b') " * 12), "L.g4")
+        assert not any(issue.rule_id == "P004" for issue in result.issues)
+
+
+class TestLexerRescanningRule:
+    """Test P005: Lexer rescanning rule."""
+    
+    def test_thresholds_and_messages(self, parse):
+        """Test unbounded and bounded rescan distances against the threshold."""
+        rule = LexerRescanningRule()
+        config = RuleConfig(enabled=True, severity=Severity.WARNING, thresholds={"maxRescanDistance": 1})
+        
+        grammar = parse("lexer grammar L; A: 'a'+ 'b' ; B: 'a' ; E: '....' ; D: '.' ;")
+        messages = [issue.message for issue in rule.check(grammar, config)]
+        assert messages == [
+            "Lexer rule 'B' can be matched after the lexer reads any number of characters past it "
+            "trying to match A, which are then scanned again; on long inputs this makes lexing quadratic",
+            "Lexer rule 'D' can be matched after the lexer reads up to 2 characters past it "
+            "trying to match E, which are then scanned again",
+        ]
+        
+        config.thresholds["maxRescanDistance"] = 2
+        issues = rule.check(grammar, config)
+        assert [issue.message.split("'")[1] for issue in issues] == ["B"]
+    
+    def test_reports_rules_of_other_modes(self, parse):
+        """Test that rules of every lexer mode are checked."""
+        rule = LexerRescanningRule()
+        config = RuleConfig(enabled=True, severity=Severity.WARNING)
+        
+        grammar = parse("lexer grammar L; A: 'a'+ 'b' ; B: 'a' ;\nmode M;\nC: 'x'+ 'y' ; D: 'x' ;")
+        issues = rule.check(grammar, config)
+        assert [issue.message.split("'")[1] for issue in issues] == ["B", "D"]
+        assert issues[1].range.start.line == 3
@@ -0,0 +1,63 @@
+"""Tests for the profile subcommand."""
+
+import pstats
+import tempfile
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from antlr_v4_linter.cli.main import cli
+from antlr_v4_linter.core.profiling import subsystem
+
+
+GRAMMAR = """
+grammar Calc;
+program: expr EOF;
+expr: expr '+' expr | INT;
+INT: [0-9]+;
+WS: [ \\t\\r\\n]+ -> skip;
+"""
+
+
+class TestProfileCommand:
+    """Test `antlr-lint profile`."""
+    
+    def test_writes_pstats_and_collapsed_stacks(self):
+        """The profile is saved in both formats and summarized by subsystem."""
+        with tempfile.TemporaryDirectory() as tmp:
+            grammar = Path(tmp) / "Calc.g4"
+            grammar.write_text(GRAMMAR)
+            prefix = str(Path(tmp) / "run")
+            
+            result = CliRunner().invoke(cli, ["profile", str(grammar), "-o", prefix, "--top", "2"])
+            
+            assert result.exit_code == 0, result.output
+            assert "runtime parser" in result.output
+            assert "rules/naming_rules" in result.output
+            
+            stats = pstats.Stats(prefix + ".pstats")
+            assert any(func[2] == "lint_files" for func in stats.stats)
+            
+            lines = Path(prefix + ".collapsed").read_text().splitlines()
+            assert lines
+            for line in lines:
+                stack, count = line.rsplit(" ", 1)
+                assert int(count) > 0
+                assert stack.startswith(("lint_files", "format_results", "<"))
+    
+    def test_subsystems(self):
+        """Source files are grouped into linter subsystems."""
+        package = "/site-packages/antlr_v4_linter"
+        assert subsystem(f"{package}/rules/token_rules.py") == "rules/token_rules"
+        assert subsystem(f"{package}/core/parser.py") == "AST builder"
+        assert subsystem(f"{package}/core/ebnf.py") == "AST builder"
+        assert subsystem(f"{package}/grammars/ANTLRv4Parser.py") == "runtime parser"
+        assert subsystem(f"{package}/grammars/LexerAdaptor.py") == "runtime lexer"
+        assert subsystem(f"{package}/core/reporter.py") == "reporter"
+        for module in ("index", "analysis", "lookahead", "atn", "lexer_dfa", "literal_index", "intervals"):
+            assert subsystem(f"{package}/core/{module}.py") == "rule engine"
+        assert subsystem(f"{package}/core/linter.py") == "linter"
+        assert subsystem(f"{package}/core/generator.py") == "tools"
+        assert subsystem("/site-packages/antlr4/atn/LexerATNSimulator.py") == "runtime lexer"
+        assert subsystem("/site-packages/antlr4/atn/ParserATNSimulator.py") == "runtime parser"
+        assert subsystem("~") == "builtins"
@@ -0,0 +1,237 @@
+"""Tests for the rule engine's shared traversal."""
+
+import pickle
+import time
+from typing import List
+
+from antlr_v4_linter.core.config import ConfigLoader, ConfigValidator
+from antlr_v4_linter.core.linter import ANTLRLinter
+from antlr_v4_linter.core.models import (
+    GrammarAST, Issue, LinterConfig, Position, Range, RuleConfig, Severity
+)
+from antlr_v4_linter.core.rule_engine import (
+    LintRule, RuleEngine, RuleVisitor, VisitorLintRule, walk_grammar
+)
+from antlr_v4_linter.core.stats import LintStats
+
+
+GRAMMAR = """
+grammar Fused;
+
+program: statement+ EOF;
+statement
+    : ID '=' expr ';'     # assign
+    | 'print' expr ';'    # assign
+    | (((((ID)))))
+    ;
+expr: expr '+' expr | ID | Int | '(' expr ')';
+
+ID: [a-z]+;
+Int: [0-9]+;
+WS: [ \\t\\r\\n]+ -> skip;
+"""
+
+
+class CountingVisitor(RuleVisitor):
+    def __init__(self, lint_rule, grammar, config):
+        super().__init__(lint_rule, grammar, config)
+        self.events = []
+
+    def on_rule(self, rule):
+        self.events.append(("rule", rule.name))
+
+    def on_element(self, rule, alternative, element):
+        self.events.append(("element", element.text))
+
+    def on_grammar_end(self):
+        self.events.append(("end",))
+
+
+class LegacyRule(LintRule):
+    def __init__(self):
+        super().__init__("X001", "Legacy", "Reports once per grammar")
+
+    def check(self, grammar: GrammarAST, config: RuleConfig) -> List[Issue]:
+        return [Issue("X001", config.severity, "legacy", grammar.file_path,
+                      Range(Position(1, 1), Position(1, 1)))]
+
+
+class TestRuleEngine:
+    """Test fused visitor rules alongside legacy check() rules."""
+
+    def _grammar(self):
+        return ANTLRLinter().parser.parse_content(GRAMMAR, "Fused.g4")
+
+    def test_fused_and_separate_runs_report_the_same_issues(self):
+        """Running visitor rules in one traversal does not change the results."""
+        grammar = self._grammar()
+        fused = ANTLRLinter()
+        separate = ANTLRLinter()
+        separate.get_rule_engine().fuse_traversal = False
+
+        def summary(issues):
+            return [(i.rule_id, i.message, i.range.start.line) for i in issues]
+
+        fused_issues = fused.rule_engine.run_rules(grammar, fused.config)
+        separate_issues = separate.rule_engine.run_rules(grammar, separate.config)
+        assert summary(fused_issues) == summary(separate_issues)
+        assert {"N002", "L001", "L003", "C002"} <= {i.rule_id for i in fused_issues}
+
+    def test_events_are_dispatched_only_to_overridden_hooks(self):
+        """Visitors receive exactly the events they subscribe to, in AST order."""
+        grammar = self._grammar()
+        rule = VisitorLintRule("X002", "Counting", "Counts events")
+        visitor = CountingVisitor(rule, grammar, RuleConfig())
+
+        walk_grammar(grammar, [visitor])
+
+        rule_events = [e for e in visitor.events if e[0] == "rule"]
+        element_events = [e for e in visitor.events if e[0] == "element"]
+        assert [name for _, name in rule_events] == [r.name for r in grammar.rules]
+        assert len(element_events) == sum(
+            len(alt.elements) for r in grammar.rules for alt in r.alternatives
+        )
+        assert visitor.events[-1] == ("end",)
+
+    def test_legacy_rules_keep_registration_order(self):
+        """Issues are reported in rule registration order, whatever the execution path."""
+        grammar = self._grammar()
+        engine = RuleEngine()
+        linter = ANTLRLinter()
+        engine.register_rule(linter.rule_engine.get_rule("N002"))
+        engine.register_rule(LegacyRule())
+        engine.register_rule(linter.rule_engine.get_rule("L003"))
+
+        config = LinterConfig(rules={
+            "N002": RuleConfig(), "X001": RuleConfig(), "L003": RuleConfig()
+        })
+        rule_ids = [issue.rule_id for issue in engine.run_rules(grammar, config)]
+
+        assert rule_ids == ["N002", "X001", "L003", "L003"]
+
+
+class TestExecutionPlan:
+    """Test compiling a LinterConfig into an execution plan."""
+
+    def test_plan_is_reused_until_config_changes(self):
+        """The same plan is returned while the configuration is unchanged."""
+        engine = ANTLRLinter().get_rule_engine()
+        config = LinterConfig.default()
+
+        plan = engine.compile(config)
+        assert engine.compile(config) is plan
+        assert "C001" in plan.rule_ids
+
+        config.rules["C001"].enabled = False
+        new_plan = engine.compile(config)
+        assert new_plan is not plan
+        assert "C001" not in new_plan.rule_ids
+
+        config.rules["N002"].thresholds["extra"] = [1, 2]
+        assert engine.compile(config) is not new_plan
+
+    def test_plan_is_isolated_from_later_config_changes(self):
+        """Mutating the config does not alter an already compiled plan."""
+        engine = ANTLRLinter().get_rule_engine()
+        config = LinterConfig.default()
+        plan = engine.compile(config)
+
+        config.rules["C001"].thresholds["maxAlternatives"] = 1
+        config.rules["N002"].severity = Severity.INFO
+
+        planned = {p.rule.rule_id: p for p in plan.rules}
+        assert planned["C001"].config.thresholds["maxAlternatives"] == 10
+        assert planned["N002"].severity == Severity.ERROR
+
+    def test_plan_severity_is_applied(self):
+        """Issues take the severity resolved in the plan."""
+        linter = ANTLRLinter()
+        grammar = linter.parser.parse_content(GRAMMAR, "Fused.g4")
+        config = LinterConfig(rules={"N002": RuleConfig(severity=Severity.INFO)})
+
+        issues = linter.rule_engine.run_plan(grammar, linter.rule_engine.compile(config))
+        assert issues and all(i.severity == Severity.INFO for i in issues)
+
+    def test_plan_can_be_pickled(self):
+        """Plans can be shipped to worker processes."""
+        plan = ANTLRLinter().get_rule_engine().compile(LinterConfig.default())
+        restored = pickle.loads(pickle.dumps(plan))
+        assert restored.rule_ids == plan.rule_ids
+        assert restored.fingerprint == plan.fingerprint
+
+
+class SlowRule(LintRule):
+    def __init__(self, rule_id="X003"):
+        super().__init__(rule_id, "Slow", "Loops until interrupted")
+
+    def check(self, grammar: GrammarAST, config: RuleConfig) -> List[Issue]:
+        deadline = time.perf_counter() + 5
+        while time.perf_counter() < deadline:
+            self.checkpoint()
+            time.sleep(0.001)
+        return []
+
+
+class TestTimeBudgets:
+    """Test per-rule and per-file time budgets."""
+
+    def _grammar(self):
+        return ANTLRLinter().parser.parse_content(GRAMMAR, "Fused.g4")
+
+    def test_rule_budget_interrupts_rule(self):
+        """A rule over its budget is interrupted and reported as RULE_TIMEOUT."""
+        engine = RuleEngine()
+        engine.register_rule(SlowRule())
+        engine.register_rule(LegacyRule())
+        config = LinterConfig(rules={
+            "X003": RuleConfig(time_budget_ms=20), "X001": RuleConfig()
+        })
+        stats = LintStats()
+
+        start = time.perf_counter()
+        issues = engine.run_plan(self._grammar(), engine.compile(config), stats)
+
+        assert time.perf_counter() - start < 2
+        assert [i.rule_id for i in issues] == ["RULE_TIMEOUT", "X001"]
+        assert issues[0].severity == Severity.INFO
+        assert "X003" in issues[0].message
+        assert [(o.rule_id, o.scope) for o in stats.budget_overruns] == [("X003", "rule")]
+        assert "Budget overruns: 1" in stats.format()
+
+    def test_file_budget_skips_remaining_rules(self):
+        """Once the file budget is spent, later rules are skipped."""
+        engine = RuleEngine()
+        engine.register_rule(SlowRule("X003"))
+        engine.register_rule(SlowRule("X004"))
+        engine.register_rule(ANTLRLinter().rule_engine.get_rule("N002"))
+        config = LinterConfig(
+            rules={"X003": RuleConfig(), "X004": RuleConfig(), "N002": RuleConfig()},
+            file_time_budget_ms=20,
+        )
+
+        issues = engine.run_plan(self._grammar(), engine.compile(config))
+
+        assert [i.rule_id for i in issues] == ["RULE_TIMEOUT"] * 3
+        assert "skipped" in issues[1].message
+
+    def test_budgets_load_from_config(self):
+        """Budgets are read from antlr-lint.json and round-trip."""
+        data = {
+            "ruleTimeBudgetMs": 500,
+            "fileTimeBudgetMs": 2000,
+            "rules": {"P001": {"enabled": True, "timeBudgetMs": 100}},
+        }
+        config = ConfigLoader.load_from_dict(data)
+
+        assert config.rule_time_budget_ms == 500
+        assert config.file_time_budget_ms == 2000
+        assert config.rules["P001"].time_budget_ms == 100
+        assert ConfigValidator.validate_config(config) == []
+        assert ConfigLoader._config_to_dict(config)["rules"]["P001"]["timeBudgetMs"] == 100
+
+        plan = ANTLRLinter().get_rule_engine().compile(config)
+        assert plan.rules[0].time_budget_ms == 100
+        assert plan.file_time_budget_ms == 2000
+
+        config.rule_time_budget_ms = -1
+        assert ConfigValidator.validate_config(config)
@@ -0,0 +1,81 @@
+"""Tests for the memory-mapped grammar input stream."""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+from antlr4 import FileStream, Token
+
+from antlr_v4_linter.core.parser import AntlrGrammarParser
+from antlr_v4_linter.core.streams import MmapCharStream
+from antlr_v4_linter.grammars.ANTLRv4Lexer import ANTLRv4Lexer
+
+
+GRAMMAR = """grammar Unicode;
+// Ünïcödé comment with 漢字 and an emoji 🎉
+start: ID+ EOF;
+ID: [a-zA-Zα-ω]+;
+STR: 'héllo' | '世界';
+WS: [ \\t\\r\\n]+ -> skip;
+"""
+
+
+def _write(content: str) -> str:
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.g4', delete=False, encoding='utf-8') as f:
+        f.write(content)
+    return f.name
+
+
+def _tokens(stream):
+    lexer = ANTLRv4Lexer(stream)
+    result = []
+    while True:
+        token = lexer.nextToken()
+        result.append((token.type, token.text, token.line, token.column))
+        if token.type == Token.EOF:
+            return result
+
+
+class TestMmapCharStream:
+    """Test MmapCharStream against the runtime FileStream."""
+
+    def test_tokens_match_file_stream(self):
+        """Lexing through the mapped stream yields the same tokens as FileStream."""
+        path = _write(GRAMMAR)
+        try:
+            expected = _tokens(FileStream(path, encoding='utf-8'))
+            # A tiny chunk size forces multi-byte characters to straddle chunks
+            for chunk_size in (1, 3, 7, 1 << 20):
+                assert _tokens(MmapCharStream(path, chunk_size=chunk_size)) == expected
+        finally:
+            Path(path).unlink()
+
+    def test_decodes_lazily(self):
+        """Only the requested prefix of the file is decoded."""
+        path = _write("grammar Lazy;\n" + "// filler\n" * 100)
+        try:
+            stream = MmapCharStream(path, chunk_size=16)
+            assert stream.LA(1) == ord('g')
+            assert len(stream.data) == 16
+            assert stream.size == len("grammar Lazy;\n" + "// filler\n" * 100)
+            assert stream.getText(0, 6) == "grammar"
+        finally:
+            Path(path).unlink()
+
+    def test_empty_file(self):
+        """Empty files cannot be mapped but still behave as empty input."""
+        path = _write("")
+        try:
+            stream = MmapCharStream(path)
+            assert stream.LA(1) == Token.EOF
+            assert stream.size == 0
+            assert stream.getText(0, 10) == ""
+            with pytest.raises(Exception):
+                stream.consume()
+        finally:
+            Path(path).unlink()
+
+    def test_missing_file(self):
+        """A missing grammar file is reported by the parser."""
+        with pytest.raises(FileNotFoundError, match="Grammar file not found"):
+            AntlrGrammarParser().parse_file("/nonexistent/Missing.g4")
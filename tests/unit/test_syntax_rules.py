@@ -494,4 +494,27 @@ class TestAmbiguousStringLiteralsRule:
         issues = rule.check(grammar, config)
         assert len(issues) == 2
         assert all(issue.rule_id == "S003" for issue in issues)
-        assert all("'if'" in issue.message for issue in issues)
\ No newline at end of file
+        assert all("'if'" in issue.message for issue in issues)
+    
+    def test_literal_spelled_differently(self, parse):
+        """Test that literals are compared after decoding their escapes."""
+        rule = AmbiguousStringLiteralsRule()
+        config = RuleConfig(enabled=True, severity=Severity.ERROR)
+        
+        grammar = parse("lexer grammar L; A: 'a' ; B: '\\u0061' 'b' ;")
+        assert [issue.message for issue in rule.check(grammar, config)] == [
+            "String literal 'a' is ambiguous (used in multiple lexer rules: A, B)",
+        ] * 2
+    
+    def test_literals_of_different_modes(self, parse):
+        """Test that a literal is only ambiguous inside one mode."""
+        rule = AmbiguousStringLiteralsRule()
+        config = RuleConfig(enabled=True, severity=Severity.ERROR)
+        
+        grammar = parse("lexer grammar L; ID: [a-z]+ ; COMMA: ',' ;\nmode M; IF: 'if' ; SEP: ',' ;")
+        assert rule.check(grammar, config) == []
+        
+        grammar = parse("lexer grammar L; X: 'x' ;\nmode M; ID: [a-z]+ ; IF: 'if' ; COMMA: ',' ; SEP: ',' ;")
+        assert [issue.message for issue in rule.check(grammar, config)] == [
+            "String literal ',' is ambiguous in mode 'M' (used in multiple lexer rules: COMMA, SEP)",
+        ] * 2
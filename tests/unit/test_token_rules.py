@@ -215,6 +215,37 @@ class TestOverlappingTokensRule:
         
         issues = rule.check(grammar, config)
         assert len(issues) == 0
+    
+    def test_overlap_of_shared_literals(self, parse):
+        """Test detection of a literal used by a longer token and defined by another."""
+        rule = OverlappingTokensRule()
+        config = RuleConfig(enabled=True, severity=Severity.WARNING)
+        
+        grammar = parse("lexer grammar L; A: 'x' 'y' ; B: 'z' ; C: 'x' ;")
+        messages = [issue.message for issue in rule.check(grammar, config)]
+        assert messages == ["Token 'A' may overlap with 'C': both match 'x'"]
+    
+    def test_partially_overlapping_sets(self, parse):
+        """Test detection of character sets that share some characters."""
+        rule = OverlappingTokensRule()
+        config = RuleConfig(enabled=True, severity=Severity.WARNING)
+        
+        grammar = parse("lexer grammar L; A: [a-f]+ ; B: [d-k] ; C: [x-z] ;")
+        messages = [issue.message for issue in rule.check(grammar, config)]
+        assert messages == ["Token 'A' may overlap with 'B': both match characters in [d-f]"]
+    
+    def test_tokens_of_different_modes(self, parse):
+        """Test that tokens of different modes never overlap."""
+        rule = OverlappingTokensRule()
+        config = RuleConfig(enabled=True, severity=Severity.WARNING)
+        
+        grammar = parse("lexer grammar L; ID: [a-z]+ ; COMMA: ',' ;\nmode M; IF: 'if' ; SEP: ',' ;")
+        messages = [issue.message for issue in rule.check(grammar, config)]
+        assert not any("'IF'" in message or "'SEP'" in message for message in messages)
+        
+        grammar = parse("lexer grammar L; X: 'x' ;\nmode M; ID: [a-z]+ ; IF: 'if' ; COMMA: ',' ; SEP: ',' ;")
+        messages = [issue.message for issue in rule.check(grammar, config)]
+        assert "Token 'COMMA' may overlap with 'SEP': both match ','" in messages
 
 
 class TestUnreachableTokenRule:
@@ -410,6 +441,50 @@ class TestUnreachableTokenRule:
         assert any(issue.rule_id == "T002" for issue in issues)
         # Check that duplicate pattern is detected
         assert len(issues) >= 1
+    
+    def test_keyword_matched_by_earlier_token(self, parse):
+        """Test detection of literals that an earlier rule also matches."""
+        rule = UnreachableTokenRule()
+        config = RuleConfig(enabled=True, severity=Severity.WARNING)
+        
+        grammar = parse(
+            "lexer grammar L; NAME: LETTER (LETTER | '_')* ; IF: 'if' ; NUM: [0-9]+ ; ZERO: '0' ;"
+            " fragment LETTER: [a-z] ;"
+        )
+        assert [issue.message for issue in rule.check(grammar, config)] == [
+            "Token 'IF' may be unreachable (shadowed by: NAME)",
+            "Token 'ZERO' may be unreachable (shadowed by: NUM)",
+        ]
+    
+    def test_subsumed_sets_and_literals(self, parse):
+        """Test detection of character sets and literals inside an earlier set."""
+        rule = UnreachableTokenRule()
+        config = RuleConfig(enabled=True, severity=Severity.WARNING)
+        
+        grammar = parse(
+            "lexer grammar L; OP: [+\\-*/] ; PLUS: '+' ; HEX: [0-9a-f]+ ; DIGITS: [0-9]+ ; FF: 'ff' ;"
+            " LETTER: [\\p{L}] ; UPPER: [\\p{Lu}] ; UPPERS: [A-Z]+ ;"
+        )
+        assert [issue.message for issue in rule.check(grammar, config)] == [
+            "Token 'PLUS' may be unreachable (shadowed by: OP)",
+            "Token 'DIGITS' may be unreachable (shadowed by: HEX)",
+            "Token 'FF' may be unreachable (shadowed by: HEX)",
+            "Token 'UPPER' may be unreachable (shadowed by: LETTER)",
+        ]
+    
+    def test_tokens_of_different_modes(self, parse):
+        """Test that only earlier tokens of the same mode shadow a token."""
+        rule = UnreachableTokenRule()
+        config = RuleConfig(enabled=True, severity=Severity.WARNING)
+        
+        grammar = parse("lexer grammar L; ID: [a-z]+ ; COMMA: ',' ;\nmode M; IF: 'if' ; SEP: ',' ;")
+        assert rule.check(grammar, config) == []
+        
+        grammar = parse("lexer grammar L; X: 'x' ;\nmode M; ID: [a-z]+ ; IF: 'if' ; COMMA: ',' ; SEP: ',' ;")
+        assert [issue.message for issue in rule.check(grammar, config)] == [
+            "Token 'IF' may be unreachable (shadowed by: ID)",
+            "Token 'SEP' may be unreachable (shadowed by: COMMA)",
+        ]
 
 
 class TestUnusedTokenRule:
@@ -593,4 +668,4 @@ class TestUnusedTokenRule:
         )
         
         issues = rule.check(grammar, config)
-        assert len(issues) == 0
\ No newline at end of file
+        assert len(issues) == 0
@@ -0,0 +1,74 @@
+"""Tests for Chrome trace-event export."""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from antlr_v4_linter.cli.main import cli
+from antlr_v4_linter.core.linter import ANTLRLinter
+from antlr_v4_linter.core.stats import LintStats
+from antlr_v4_linter.core.trace import TraceRecorder
+
+
+GRAMMAR = """
+grammar Calc;
+program: expr EOF;
+expr: expr '+' expr | INT;
+INT: [0-9]+;
+WS: [ \\t\\r\\n]+ -> skip;
+"""
+
+
+class TestTraceRecorder:
+    """Test recording pipeline spans."""
+    
+    def test_spans_cover_each_file_and_rule(self):
+        """Every file gets read/lex/parse/build/rules spans; check() rules get their own."""
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for name in ("A", "B"):
+                path = Path(tmp) / f"{name}.g4"
+                path.write_text(GRAMMAR.replace("Calc", name))
+                paths.append(str(path))
+            
+            linter = ANTLRLinter()
+            linter.stats = LintStats()
+            linter.tracer = TraceRecorder()
+            linter.lint_files(paths)
+        
+        events = linter.tracer.to_json()["traceEvents"]
+        spans = [e for e in events if e["ph"] == "X"]
+        
+        for path in paths:
+            phases = [e["name"] for e in spans
+                      if e["cat"] == "phase" and e.get("args", {}).get("file") == path]
+            assert phases == ["read", "lex", "parse", "build", "rules"]
+            rules = {e["name"] for e in spans if e["cat"] == "rule" and e["args"]["file"] == path}
+            assert {"S001", "T001", "E002", "shared traversal"} <= rules
+        
+        assert all(e["pid"] == os.getpid() for e in events)
+        assert all(e["dur"] >= 0 for e in spans)
+        assert any(e["name"] == "thread_name" for e in events)
+        
+        # The statistics see the same events
+        assert set(linter.stats.phase_times) == {"hash", "read", "lex", "parse", "build", "rules"}
+        assert linter.stats.rule_calls["S001"] == 2
+    
+    def test_cli_writes_trace(self):
+        """`lint --trace` writes a trace with discovery and report spans."""
+        with tempfile.TemporaryDirectory() as tmp:
+            grammar = Path(tmp) / "Calc.g4"
+            grammar.write_text(GRAMMAR)
+            trace_path = Path(tmp) / "trace.json"
+            
+            CliRunner().invoke(cli, ["lint", "--no-colors", "--trace", str(trace_path), str(grammar)])
+            
+            trace = json.loads(trace_path.read_text())
+        
+        names = [e["name"] for e in trace["traceEvents"] if e["ph"] == "X"]
+        assert names[0] == "discovery"
+        assert names[-1] == "report"
+        assert "parse" in names